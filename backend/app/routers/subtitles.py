@@ -11,7 +11,6 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File, Form
 from fastapi.responses import FileResponse
 from pydantic import BaseModel, Field
-from pydub import AudioSegment
 
 from app.services.groq_client import transcribe
 from app.services.subs import convert_groq_to_subtitles
@@ -73,6 +72,7 @@ async def extract_audio_for_transcription(video_path: str, task_id: str) -> str:
         logger.info(f"🎵 Extracting audio from {video_path} for transcription...")
         
         # Load video and extract audio
+        from pydub import AudioSegment
         audio = AudioSegment.from_file(video_path)
         
         # Convert to standard format for Groq (16kHz, mono, WAV)
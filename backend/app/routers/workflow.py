@@ -20,14 +20,13 @@ import logging
 # Import our services
 from app.services.youtube import (
     get_video_id, download_video, cut_clips, cut_clips_vertical, cut_clips_vertical_async, DownloadError,
-    get_video_info, get_available_formats, youtube_service, YouTubeService
+    get_video_info, get_available_formats, get_youtube_service, YouTubeService
 )
 from app.services.transcript import fetch_youtube_transcript, extract_full_transcript
 from app.services.gemini import analyze_transcript_with_gemini
 from app.services.vertical_crop import crop_video_to_vertical
 from app.services.vertical_crop_async import (
     crop_video_to_vertical_async,
-    async_vertical_crop_service,
     AsyncVerticalCropService
 )
 # Add imports for subtitle processing
@@ -38,6 +37,8 @@ from app.services.groq_client import transcribe
 from app.services.thumbnail import generate_thumbnail
 from app.services.clip_storage import get_clip_storage_service, ClipStorageService
 from app.services.cleanup import get_cleanup_service, CleanupService
+from app.services.crop_cache import crop_path_cache
+from app.services.encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
 
 # NEW: Import the segment download service
 from app.services.segment_downloader import get_segment_download_service
@@ -47,9 +48,8 @@ from ..auth import get_current_user
 from ..database import get_db, AsyncSessionLocal
 from ..models import User, Video, VideoStatus, Clip
 
-# NEW: Import the new FFmpeg processor  
-from app.services.ffmpeg_video_processor import FFmpegVideoProcessor
-ffmpeg_processor = FFmpegVideoProcessor()
+# NEW: Import the new FFmpeg processor (built on first use - it loads MediaPipe)
+from app.services.ffmpeg_video_processor import get_ffmpeg_processor
 
 router = APIRouter()
 
@@ -159,6 +159,54 @@ def _update_workflow_progress(task_id: str, step: str, progress: int, message: s
             if data:
                 workflow_tasks[task_id].update(data)
 
+async def _generate_clip_subtitles(
+    clip_path: Path,
+    clips_dir: Path,
+    safe_title: str,
+    segment_index: int,
+    task_id: str
+) -> Optional[str]:
+    """
+    Transcribe a clip's audio with Groq and write its SRT (None if there is no speech)
+    
+    Cropping doesn't change the audio, so this can run on the horizontal clip before the crop.
+    """
+    # a. Extract audio from the clip
+    from pydub import AudioSegment
+    temp_audio_path = clips_dir / f"temp_audio_{safe_title}_{segment_index+1}.wav"
+    audio = AudioSegment.from_file(str(clip_path))
+    audio = audio.set_frame_rate(16000).set_channels(1)
+    audio.export(temp_audio_path, format="wav")
+    
+    # b. Transcribe the audio
+    from app.services.groq_client import transcribe
+    transcription_result = transcribe(
+        file_path=str(temp_audio_path),
+        apply_vad=True,
+        task_id=f"{task_id}_clip_{segment_index}"
+    )
+    
+    if temp_audio_path.exists():
+        temp_audio_path.unlink()
+    
+    if not transcription_result or not transcription_result.get("segments"):
+        print(f"⚠️ [Segment {segment_index+1}] No transcription found. Skipping subtitle burn.")
+        return None
+    
+    # c. Convert transcription to SRT
+    from app.services.subs import convert_groq_to_subtitles
+    subtitles_dir = clips_dir / "subtitles"
+    subtitles_dir.mkdir(exist_ok=True)
+    
+    srt_path, vtt_path = convert_groq_to_subtitles(
+        groq_segments=transcription_result["segments"],
+        output_dir=str(subtitles_dir),
+        filename_base=f"clip_{segment_index+1}_{safe_title}",
+        speech_sync_mode=True,  # Enable speech synchronization
+        word_timestamps=transcription_result.get("word_timestamps", [])  # Use word timing data
+    )
+    return srt_path
+
 # NEW: Fully parallel processing function for a single segment
 async def _process_single_viral_segment_parallel(
     segment_index: int,
@@ -169,11 +217,13 @@ async def _process_single_viral_segment_parallel(
     smoothing_strength: str,
     burn_subtitles: bool,
     font_size: int,
-    export_codec: str
+    export_codec: str,
+    cache_source_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """
     Processes a single viral segment in its own parallel task.
     This includes cutting, vertical cropping, and subtitle burning.
+    cache_source_id ("youtube_id:format") lets re-renders of the same segment reuse its crop path.
     """
     try:
         start_time_total = time.time()
@@ -188,7 +238,7 @@ async def _process_single_viral_segment_parallel(
         
         # --- 1. Cut Clip ---
         from app.services.youtube import create_clip_with_direct_ffmpeg
-        safe_title = youtube_service._sanitize_filename(title)
+        safe_title = get_youtube_service()._sanitize_filename(title)
         
         # Define clip paths
         base_dir = source_video_path.parent
@@ -201,15 +251,31 @@ async def _process_single_viral_segment_parallel(
         print(f"🚀 [Segment {segment_index+1}] Starting processing: '{title}'")
         print(f"   - Cutting segment: {start_time}s - {end_time}s")
         
-        if not create_clip_with_direct_ffmpeg(source_video_path, start_time, end_time, temp_horizontal_clip_path):
+        # The smart cut re-encodes the leading GOP synchronously - keep it off the event loop
+        if not await _run_blocking_task(create_clip_with_direct_ffmpeg, source_video_path, start_time, end_time, temp_horizontal_clip_path):
             raise Exception("Failed to cut video segment using ffmpeg.")
         
         processing_clip_path = temp_horizontal_clip_path
+        subtitled_clip_path = None
+        srt_path = None
+        encodes = 0
+        thumbnails_dir = base_dir / "thumbnails"
+        clip_id = f"clip_{segment_index+1}_{safe_title}"
+        thumbnail_result = None
+        
+        # 🎞️ SINGLE ENCODE - transcribe the horizontal clip first so the crop render burns the
+        # captions in the same FFmpeg pass (crop + subtitles + audio copy)
+        single_encode = create_vertical and burn_subtitles and export_codec == "h264"
+        if single_encode:
+            print(f"   - Generating subtitles for single-encode render...")
+            srt_path = await _generate_clip_subtitles(
+                temp_horizontal_clip_path, clips_dir, safe_title, segment_index, task_id
+            )
         
         # --- 2. Vertical Cropping (if enabled) ---
         if create_vertical:
             print(f"   - Applying vertical crop with '{smoothing_strength}' smoothing...")
-            vertical_clip_path = clips_dir / f"{safe_title}_vertical.mp4"
+            vertical_clip_path = clips_dir / f"{'subtitled_' if srt_path else ''}{safe_title}_vertical.mp4"
             
             from app.services.vertical_crop_async import crop_video_to_vertical_async
             import asyncio
@@ -220,16 +286,34 @@ async def _process_single_viral_segment_parallel(
                     input_path=temp_horizontal_clip_path,
                     output_path=vertical_clip_path,
                     use_speaker_detection=True,
-                    use_smart_scene_detection=False,  # 🚀 DISABLED for performance
+                    use_smart_scene_detection=True,  # 🎬 Cheap on the 64x36 proxy, cached per clip
                     smoothing_strength=smoothing_strength,
-                    task_id=f"{task_id}_seg_{segment_index+1}" if task_id else None
+                    task_id=f"{task_id}_seg_{segment_index+1}" if task_id else None,
+                    use_process_pool=True,  # 🚀 Segments crop in parallel - one worker process per clip
+                    cache_source_id=cache_source_id,
+                    cache_window=(start_time, end_time),
+                    subtitles_path=Path(srt_path) if srt_path else None,
+                    subtitle_font_size=font_size,
+                    # 🖼️ Thumbnail from the rendered frames - no second decode of the clip
+                    thumbnail_options={
+                        "output_dir": str(thumbnails_dir),
+                        "clip_id": clip_id,
+                        "timestamp": 1.0,
+                        "widths": [300]
+                    }
                 )
                 
                 if not crop_result.get("success"):
                     raise Exception(f"Vertical cropping failed: {crop_result.get('error')}")
                 
                 processing_clip_path = vertical_clip_path
-                print(f"   ✅ Vertical crop completed successfully")
+                encodes += crop_result.get("encodes", 1)
+                if crop_result.get("subtitles_burned"):
+                    subtitled_clip_path = vertical_clip_path
+                    print(f"   ✅ Vertical crop with burned-in subtitles completed in one encode")
+                else:
+                    print(f"   ✅ Vertical crop completed successfully")
+                thumbnail_result = crop_result.get("thumbnail")
                 
                 # Clean up the temp horizontal clip now that we have the vertical one
                 if temp_horizontal_clip_path.exists():
@@ -242,18 +326,16 @@ async def _process_single_viral_segment_parallel(
                     vertical_clip_path.unlink()
                 raise Exception(f"Vertical cropping failed: {crop_error}")
         
-        # --- 2.5. Thumbnail Generation (after vertical cropping) ---
-        print(f"   - Generating thumbnail...")
-        thumbnails_dir = base_dir / "thumbnails"
-        clip_id = f"clip_{segment_index+1}_{safe_title}"
-        
-        thumbnail_result = await generate_thumbnail(
-            video_path=processing_clip_path,
-            output_dir=thumbnails_dir,
-            clip_id=clip_id,
-            width=300,  # Good size for thumbnails
-            timestamp=1.0  # Extract frame at 1 second
-        )
+        # --- 2.5. Thumbnail Generation (unless the crop render already saved it) ---
+        if not (thumbnail_result and thumbnail_result.get("success")):
+            print(f"   - Generating thumbnail...")
+            thumbnail_result = await generate_thumbnail(
+                video_path=processing_clip_path,
+                output_dir=thumbnails_dir,
+                clip_id=clip_id,
+                width=300,  # Good size for thumbnails
+                timestamp=1.0  # Extract frame at 1 second
+            )
         
         thumbnail_path = None
         if thumbnail_result.get("success"):
@@ -263,71 +345,43 @@ async def _process_single_viral_segment_parallel(
         else:
             print(f"   ⚠️ Thumbnail generation failed: {thumbnail_result.get('error')}")
         
-        subtitled_clip_path = None
-        # --- 3. Subtitle Generation & Burning (if enabled) ---
-        if burn_subtitles:
+        # --- 3. Subtitle Generation & Burning (if enabled and not already burned by the crop render) ---
+        if burn_subtitles and subtitled_clip_path is None:
             print(f"   - Generating and burning subtitles...")
             
-            # a. Extract audio from the final (cropped) clip
-            from pydub import AudioSegment
-            temp_audio_path = clips_dir / f"temp_audio_{safe_title}_{segment_index+1}.wav"
-            audio = AudioSegment.from_file(str(processing_clip_path))
-            audio = audio.set_frame_rate(16000).set_channels(1)
-            audio.export(temp_audio_path, format="wav")
-            
-            # b. Transcribe the audio
-            from app.services.groq_client import transcribe
-            transcription_result = transcribe(
-                file_path=str(temp_audio_path),
-                apply_vad=True,
-                task_id=f"{task_id}_clip_{segment_index}"
-            )
-            
-            if temp_audio_path.exists():
-                temp_audio_path.unlink()
+            # The single-encode path already transcribed this clip
+            if not single_encode:
+                srt_path = await _generate_clip_subtitles(
+                    processing_clip_path, clips_dir, safe_title, segment_index, task_id
+                )
             
-            if not transcription_result or not transcription_result.get("segments"):
-                print(f"⚠️ [Segment {segment_index+1}] No transcription found. Skipping subtitle burn.")
-            else:
-                # c. Convert transcription to SRT
-                from app.services.subs import convert_groq_to_subtitles
-                subtitles_dir = clips_dir / "subtitles"
-                subtitles_dir.mkdir(exist_ok=True)
+            # d. Burn subtitles
+            if srt_path and Path(srt_path).exists():
+                from app.services.burn_in import burn_subtitles_to_video
+                subtitled_clip_path = clips_dir / f"subtitled_{processing_clip_path.name}"
                 
-                srt_path, vtt_path = convert_groq_to_subtitles(
-                    groq_segments=transcription_result["segments"],
-                    output_dir=str(subtitles_dir),
-                    filename_base=f"clip_{segment_index+1}_{safe_title}",
-                    speech_sync_mode=True,  # Enable speech synchronization
-                    word_timestamps=transcription_result.get("word_timestamps", [])  # Use word timing data
+                await _run_blocking_task(
+                    burn_subtitles_to_video,
+                    video_path=str(processing_clip_path),
+                    srt_path=srt_path,  # Use the generated SRT file path
+                    output_path=str(subtitled_clip_path),
+                    font_size=font_size,
+                    export_codec=export_codec
                 )
                 
-                # d. Burn subtitles
-                if srt_path and Path(srt_path).exists():
-                    from app.services.burn_in import burn_subtitles_to_video
-                    subtitled_clip_path = clips_dir / f"subtitled_{processing_clip_path.name}"
-                    
-                    await _run_blocking_task(
-                        burn_subtitles_to_video,
-                        video_path=str(processing_clip_path),
-                        srt_path=srt_path,  # Use the generated SRT file path
-                        output_path=str(subtitled_clip_path),
-                        font_size=font_size,
-                        export_codec=export_codec
-                    )
-                    
-                    if subtitled_clip_path.exists():
-                        # We have a new subtitled clip, remove the non-subtitled one
-                        processing_clip_path.unlink()
-                    else:
-                        subtitled_clip_path = None # Burn-in failed
+                if subtitled_clip_path.exists():
+                    # We have a new subtitled clip, remove the non-subtitled one
+                    processing_clip_path.unlink()
+                    encodes += 1
                 else:
-                    print(f"⚠️ [Segment {segment_index+1}] SRT file generation failed. Skipping burn.")
+                    subtitled_clip_path = None # Burn-in failed
+            elif srt_path is not None:
+                print(f"⚠️ [Segment {segment_index+1}] SRT file generation failed. Skipping burn.")
 
         final_clip_path = subtitled_clip_path if subtitled_clip_path else processing_clip_path
 
         total_time = time.time() - start_time_total
-        print(f"✅ [Segment {segment_index+1}] Finished processing in {total_time:.2f}s. Final file: {final_clip_path.name}")
+        print(f"✅ [Segment {segment_index+1}] Finished processing in {total_time:.2f}s ({encodes} video encodes). Final file: {final_clip_path.name}")
         
         # --- 4. Upload clip and thumbnail to Azure Blob Storage ---
         azure_clip_url = None
@@ -350,7 +404,7 @@ async def _process_single_viral_segment_parallel(
                 container_type="clips",
                 metadata={
                     "segment_index": str(segment_index),
-                    "title": youtube_service._sanitize_filename(title),
+                    "title": get_youtube_service()._sanitize_filename(title),
                     "start_time": str(start_time),
                     "end_time": str(end_time),
                     "duration": str(end_time - start_time),
@@ -374,7 +428,7 @@ async def _process_single_viral_segment_parallel(
                     metadata={
                         "clip_blob_name": clip_blob_name,
                         "segment_index": str(segment_index),
-                        "title": youtube_service._sanitize_filename(title),
+                        "title": get_youtube_service()._sanitize_filename(title),
                         "created_at": datetime.utcnow().isoformat()
                     }
                 )
@@ -398,6 +452,7 @@ async def _process_single_viral_segment_parallel(
             "clip_id": clip_id,
             "has_subtitles": "subtitled_" in final_clip_path.name,
             "processing_time": total_time,
+            "encodes": encodes,
             "storage_location": "azure_blob_storage" if azure_clip_url else "local_only"
         }
         
@@ -467,26 +522,27 @@ async def _ffmpeg_vertical_crop(input_path: Path, output_path: Path) -> bool:
         
         print(f"🎬 Cropping {width}x{height} to {crop_width}x{crop_height} (crop at {crop_x},{crop_y})")
         
-        # Pure FFmpeg command for vertical cropping with audio preservation
-        cmd = [
-            'ffmpeg', '-hide_banner', '-loglevel', 'error',
-            '-i', str(input_path),
-            '-vf', f'crop={crop_width}:{crop_height}:{crop_x}:{crop_y}',
-            '-c:v', 'libx264',  # Explicit H.264 codec for AV1 compatibility
-            '-c:a', 'copy',     # Copy audio without re-encoding
-            '-preset', 'fast',  # Fast encoding preset
-            '-crf', '23',       # Good quality
-            '-y', str(output_path)  # FIXED: -y flag before output path
-        ]
-        
-        # Execute FFmpeg cropping
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout, stderr = await process.communicate()
+        async with encoder_profiles.encode_async("crop_fallback", clip_id=input_path.name) as profile:
+            # Pure FFmpeg command for vertical cropping with audio preservation
+            cmd = [
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                *decoder_thread_args(profile),
+                '-i', str(input_path),
+                '-vf', f'crop={crop_width}:{crop_height}:{crop_x}:{crop_y}',
+                '-c:v', 'libx264',  # Explicit H.264 codec for AV1 compatibility
+                '-c:a', 'copy',     # Copy audio without re-encoding
+                *x264_args(profile),  # fast / CRF 23 when idle, faster under backlog
+                '-y', str(output_path)  # FIXED: -y flag before output path
+            ]
+            
+            # Execute FFmpeg cropping
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            
+            stdout, stderr = await process.communicate()
         
         if process.returncode == 0 and output_path.exists():
             file_size = output_path.stat().st_size / (1024 * 1024)
@@ -564,7 +620,7 @@ async def _process_video_workflow_async(
         
         vertical_clips = []
         for i, segment in enumerate(viral_segments):
-            safe_title = youtube_service._sanitize_filename(segment.get("title", f"segment_{i+1}"))
+            safe_title = get_youtube_service()._sanitize_filename(segment.get("title", f"segment_{i+1}"))
             
             # First, cut horizontal segment from the full video
             horizontal_clip_path = video_path.parent / f"{safe_title}_horizontal_{i+1}.mp4"
@@ -572,7 +628,8 @@ async def _process_video_workflow_async(
             print(f"🎬 Processing segment {i+1}/{len(viral_segments)}: {segment.get('start')}s to {segment.get('end')}s")
             
             # Cut the segment using FFmpeg
-            success = create_clip_with_direct_ffmpeg(
+            success = await _run_blocking_task(
+                create_clip_with_direct_ffmpeg,
                 video_path, 
                 segment.get('start'), 
                 segment.get('end'), 
@@ -595,7 +652,7 @@ async def _process_video_workflow_async(
                     input_path=horizontal_clip_path,
                     output_path=vertical_clip_path,
                     use_speaker_detection=True,
-                    use_smart_scene_detection=False,
+                    use_smart_scene_detection=True,
                     smoothing_strength=smoothing_strength,
                     task_id=f"{task_id}_seg_{i+1}" if task_id else None
                 )
@@ -612,6 +669,7 @@ async def _process_video_workflow_async(
                         # SLOW FALLBACK: Only use ultra-quality processor as last resort
                         print(f"   🚀 Trying ultra-quality FFmpeg processor for problematic video...")
                         try:
+                            ffmpeg_processor = await get_ffmpeg_processor()
                             ultra_result = await ffmpeg_processor.process_video_to_vertical_ultra_quality(
                                 horizontal_clip_path,
                                 vertical_clip_path,
@@ -633,6 +691,7 @@ async def _process_video_workflow_async(
             if not crop_success:
                 print(f"   🔧 Trying ultra-quality processor as final fallback...")
                 try:
+                    ffmpeg_processor = await get_ffmpeg_processor()
                     ultra_result = await ffmpeg_processor.process_video_to_vertical_ultra_quality(
                         horizontal_clip_path,
                         vertical_clip_path,
@@ -671,7 +730,7 @@ async def _process_video_workflow_async(
         
         final_clips = []
         for i, (vertical_clip, segment) in enumerate(zip(vertical_clips, viral_segments)):
-            safe_title = youtube_service._sanitize_filename(segment.get("title", f"segment_{i+1}"))
+            safe_title = get_youtube_service()._sanitize_filename(segment.get("title", f"segment_{i+1}"))
             subtitled_path = vertical_clip.parent / f"{safe_title}_final_{i+1}.mp4"
             
             print(f"🔤 Adding subtitles to clip {i+1}/{len(vertical_clips)}")
@@ -727,7 +786,7 @@ async def _process_video_workflow_async(
         azure_urls = []
         azure_clips_info = []  # Add detailed clip info including thumbnails
         for i, final_clip in enumerate(final_clips):
-            safe_title = youtube_service._sanitize_filename(viral_segments[i].get("title", f"segment_{i+1}"))
+            safe_title = get_youtube_service()._sanitize_filename(viral_segments[i].get("title", f"segment_{i+1}"))
             
             # Generate thumbnail before uploading
             print(f"   📸 Generating thumbnail for clip {i+1}...")
@@ -782,7 +841,7 @@ async def _process_video_workflow_async(
                 container_type="clips",
                 metadata={
                     "segment_index": str(i),
-                    "title": youtube_service._sanitize_filename(viral_segments[i].get("title", f"segment_{i+1}")),
+                    "title": get_youtube_service()._sanitize_filename(viral_segments[i].get("title", f"segment_{i+1}")),
                     "start_time": str(viral_segments[i].get("start")),
                     "end_time": str(viral_segments[i].get("end")),
                     "has_subtitles": "true",
@@ -926,7 +985,8 @@ async def _process_video_workflow_fast_async(
                 smoothing_strength=smoothing_strength,
                 burn_subtitles=burn_subtitles,
                 font_size=font_size,
-                export_codec=export_codec
+                export_codec=export_codec,
+                cache_source_id=f"{video_info['id']}:{quality}"
             )
             segment_tasks.append(task)
         
@@ -1177,11 +1237,11 @@ async def _process_video_workflow_optimized_async(
             segment_files = []
             for i, segment in enumerate(viral_segments):
                 from app.services.youtube import create_clip_with_direct_ffmpeg
-                safe_title = youtube_service._sanitize_filename(segment.get("title", f"segment_{i+1}"))
+                safe_title = get_youtube_service()._sanitize_filename(segment.get("title", f"segment_{i+1}"))
                 segment_path = full_video_path.parent / f"{safe_title}_{i+1}.mp4"
                 
-                success = create_clip_with_direct_ffmpeg(
-                    full_video_path, segment['start'], segment['end'], segment_path
+                success = await _run_blocking_task(
+                    create_clip_with_direct_ffmpeg, full_video_path, segment['start'], segment['end'], segment_path
                 )
                 if success:
                     segment_files.append(segment_path)
@@ -1332,7 +1392,7 @@ async def _process_single_segment_optimized(
         start_time_total = time.time()
         
         title = segment_data.get("title", f"Segment_{segment_index+1}")
-        safe_title = youtube_service._sanitize_filename(title)
+        safe_title = get_youtube_service()._sanitize_filename(title)
         
         print(f"🚀 [Optimized Segment {segment_index+1}] Processing: '{title}'")
         print(f"   📂 Source file: {segment_file.name}")
@@ -1348,9 +1408,10 @@ async def _process_single_segment_optimized(
                 input_path=segment_file,
                 output_path=vertical_clip_path,
                 use_speaker_detection=True,
-                use_smart_scene_detection=False,
+                use_smart_scene_detection=True,
                 smoothing_strength=smoothing_strength,
-                task_id=f"{task_id}_opt_seg_{segment_index+1}" if task_id else None
+                task_id=f"{task_id}_opt_seg_{segment_index+1}" if task_id else None,
+                use_process_pool=True  # 🚀 Segments crop in parallel - one worker process per clip
             )
             
             if crop_result.get("success"):
@@ -1433,7 +1494,7 @@ async def _process_single_segment_optimized(
                 container_type="clips",
                 metadata={
                     "segment_index": str(segment_index),
-                    "title": youtube_service._sanitize_filename(title),
+                    "title": get_youtube_service()._sanitize_filename(title),
                     "start_time": str(segment_data.get("start", 0.0)),
                     "end_time": str(segment_data.get("end", 60.0)),
                     "duration": str(segment_data.get("end", 60.0) - segment_data.get("start", 0.0)),
@@ -2426,6 +2487,7 @@ async def get_storage_usage(
     """
     try:
         usage = await cleanup_service.get_storage_usage()
+        usage["crop_cache"] = crop_path_cache.get_stats()
         return usage
         
     except Exception as e:
@@ -13,7 +13,7 @@ from pydantic import BaseModel, Field, HttpUrl
 
 from app.services.youtube import (
     download_video, get_video_info, get_available_formats, 
-    DownloadError, youtube_service
+    DownloadError, get_youtube_service
 )
 from app.exceptions import SubtitleError
 
@@ -284,7 +284,7 @@ async def health_check():
     """Health check for YouTube download service."""
     try:
         # Test Apify client availability and configuration
-        from app.services.youtube import youtube_service
+        youtube_service = get_youtube_service()
         
         # Check if Apify token is configured
         apify_configured = youtube_service.apify_token is not None
@@ -0,0 +1,157 @@
+"""
+Cost-aware admission queue for crop tasks
+Tasks wait for a share of a CPU budget instead of being rejected when the
+service is busy; waiting work is admitted first-in first-out with aging
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Relative cost of the per-frame work for each detector mode
+DETECTOR_COST = {
+    "none": 0.3,       # decode + crop + encode only
+    "speaker": 1.0,    # face detection and tracking
+    "group": 1.3,      # face detection plus split-screen planning
+}
+
+# Budget per CPU core: one 60 s 1080p30 clip with speaker detection
+COST_PER_CORE = 1920 * 1080 * 30 * 60 * DETECTOR_COST["speaker"]
+
+
+def estimate_crop_cost(width: int, height: int, frames: int, detector_mode: str = "speaker") -> float:
+    """Work estimate of one crop task: pixels x frames x detector mode"""
+    return max(1, width) * max(1, height) * max(1, frames) * DETECTOR_COST.get(detector_mode, 1.0)
+
+
+def default_crop_budget() -> float:
+    """Global cost budget derived from the CPU core count"""
+    return (os.cpu_count() or 1) * COST_PER_CORE
+
+
+class AdmissionTicket:
+    """A task's place in the admission queue (see AdmissionQueue.acquire)"""
+
+    def __init__(self, sequence: int, cost: float, task_id: Optional[str], loop: asyncio.AbstractEventLoop):
+        self.sequence = sequence
+        self.cost = cost
+        self.task_id = task_id
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self._loop = loop
+        self._future: asyncio.Future = loop.create_future()
+
+    @property
+    def wait_seconds(self) -> float:
+        end = self.admitted_at if self.admitted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+class AdmissionQueue:
+    """
+    Admit tasks while their summed cost fits the budget
+
+    Waiters are scanned in arrival order and every one that fits is admitted, so a
+    small task can pass a large one that is still waiting for room. Once a waiter has
+    waited aging_seconds nobody behind it is admitted until it runs - no task starves.
+    A task costing more than the whole budget runs alone. Safe to use from several
+    event loops and threads.
+    """
+
+    def __init__(self, budget: Optional[float] = None, max_active: int = 0, aging_seconds: float = 30.0):
+        """
+        Args:
+            budget: Total cost admitted at once (default: default_crop_budget())
+            max_active: Cap on admitted tasks regardless of cost (0 = no cap)
+            aging_seconds: Wait after which a task blocks everything queued behind it
+        """
+        self.budget = budget or default_crop_budget()
+        self.max_active = max_active
+        self.aging_seconds = aging_seconds
+
+        self._lock = threading.Lock()
+        self._waiting: Deque[AdmissionTicket] = deque()
+        self._sequence = itertools.count()
+        self.in_use = 0.0
+        self.active = 0
+
+        self.admitted = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.max_queued = 0
+
+    async def acquire(self, cost: float, task_id: Optional[str] = None) -> AdmissionTicket:
+        """Wait until the task may run; hand the ticket back with release()"""
+        ticket = AdmissionTicket(next(self._sequence), min(cost, self.budget), task_id, asyncio.get_running_loop())
+        with self._lock:
+            self._waiting.append(ticket)
+            self.max_queued = max(self.max_queued, len(self._waiting))
+            self._admit_waiting()
+        if not ticket._future.done():
+            logger.info(f"⏳ Task {task_id} queued for admission ({len(self._waiting)} waiting, {self.in_use / self.budget:.0%} of budget in use)")
+        try:
+            await ticket._future
+        except asyncio.CancelledError:
+            with self._lock:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    self._admit_waiting()
+                    raise
+            # Admitted just as the wait was cancelled - give the capacity back
+            self.release(ticket)
+            raise
+        return ticket
+
+    def release(self, ticket: AdmissionTicket):
+        """Return an admitted ticket's cost to the budget"""
+        with self._lock:
+            self.in_use = max(0.0, self.in_use - ticket.cost)
+            self.active -= 1
+            self._admit_waiting()
+
+    def _fits(self, ticket: AdmissionTicket) -> bool:
+        if self.max_active and self.active >= self.max_active:
+            return False
+        return self.active == 0 or self.in_use + ticket.cost <= self.budget
+
+    def _admit_waiting(self):
+        """Admit every waiter that fits, in arrival order (caller holds the lock)"""
+        now = time.monotonic()
+        for ticket in list(self._waiting):
+            if not self._fits(ticket):
+                if now - ticket.enqueued_at >= self.aging_seconds:
+                    break
+                continue
+            self._waiting.remove(ticket)
+            self.in_use += ticket.cost
+            self.active += 1
+            ticket.admitted_at = now
+            self.admitted += 1
+            self.total_wait_seconds += ticket.wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, ticket.wait_seconds)
+            ticket._loop.call_soon_threadsafe(_resolve, ticket._future)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "budget": self.budget,
+                "in_use": self.in_use,
+                "active": self.active,
+                "waiting": len(self._waiting),
+                "max_queued": self.max_queued,
+                "admitted": self.admitted,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.admitted, 3) if self.admitted else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3)
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
@@ -19,6 +19,8 @@ from typing import Optional, Dict, Any, Tuple
 import json
 import re
 
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
+
 logger = logging.getLogger(__name__)
 
 class AudioSyncManager:
@@ -148,11 +150,9 @@ class AudioSyncManager:
                 # No significant offset, direct copy
                 cmd.extend(['-map', '0:v:0', '-map', '0:a:0'])
             
-            # Codec settings for quality preservation
+            # Only the stream timing changes - copy the video instead of re-encoding it
             cmd.extend([
-                '-c:v', 'libx264',
-                '-preset', 'medium',
-                '-crf', '18',  # High quality
+                '-c:v', 'copy',
                 '-c:a', 'aac',
                 '-b:a', '192k',
                 '-ar', '48000',  # Standard audio sample rate
@@ -271,12 +271,13 @@ class AudioSyncManager:
         output_path: str,
         font_size: int = 15,
         export_codec: str = "h264",
-        crf: int = 18
+        crf: Optional[int] = None
     ) -> bool:
         """
         Burn subtitles with audio sync preservation
         
-        Enhanced version of subtitle burning that maintains A/V sync
+        Enhanced version of subtitle burning that maintains A/V sync.
+        Preset and CRF come from the encoder profile service unless crf is given.
         """
         try:
             logger.info("🔊 Burning subtitles with sync preservation...")
@@ -291,33 +292,38 @@ class AudioSyncManager:
             video_codec = codec_mapping.get(export_codec, "libx264")
             escaped_srt_path = srt_path.replace("\\", "\\\\").replace(":", "\\:")
             
-            cmd = [
-                "ffmpeg", "-hide_banner", "-loglevel", "error",
-                "-i", video_path,
+            async with encoder_profiles.encode_async("burn_in", clip_id=Path(output_path).name) as profile:
+                if crf is not None:
+                    profile = {**profile, "crf": crf}
+                encoder_args = x264_args(profile) if video_codec != "libaom-av1" else ["-crf", str(profile["crf"])]
+            
+                cmd = [
+                    "ffmpeg", "-hide_banner", "-loglevel", "error",
+                    *decoder_thread_args(profile),
+                    "-i", video_path,
                 
-                # Video with subtitles
-                "-vf", f"subtitles='{escaped_srt_path}'",
-                "-c:v", video_codec,
-                "-crf", str(crf),
-                "-preset", "medium",
+                    # Video with subtitles
+                    "-vf", f"subtitles='{escaped_srt_path}'",
+                    "-c:v", video_codec,
+                    *encoder_args,
                 
-                # Audio - copy with sync preservation
-                "-c:a", "copy",
-                "-copyts",  # Preserve timestamps
-                "-avoid_negative_ts", "make_zero",
+                    # Audio - copy with sync preservation
+                    "-c:a", "copy",
+                    "-copyts",  # Preserve timestamps
+                    "-avoid_negative_ts", "make_zero",
                 
-                # Quality settings
-                "-movflags", "+faststart",
-                "-y", output_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+                    # Quality settings
+                    "-movflags", "+faststart",
+                    "-y", output_path
+                ]
+            
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+            
+                stdout, stderr = await process.communicate()
             
             if process.returncode == 0:
                 logger.info("✅ Subtitle burn with sync preservation completed")
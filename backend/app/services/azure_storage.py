@@ -12,17 +12,12 @@ from typing import Optional, List, BinaryIO, Dict, Any
 from datetime import datetime, timedelta
 from pathlib import Path
 import aiofiles
-import aiohttp
 
 from dotenv import load_dotenv 
 
 load_dotenv()
 
-from azure.storage.blob.aio import BlobServiceClient
-from azure.storage.blob import generate_blob_sas, BlobSasPermissions
-from azure.identity.aio import DefaultAzureCredential
-from azure.core.exceptions import ResourceNotFoundError, ResourceExistsError
-
+# The Azure SDK is imported where it's used - it is slow to import and most requests never touch storage
 from ..exceptions import FileUploadError, FileDownloadError
 
 logger = logging.getLogger(__name__)
@@ -54,6 +49,9 @@ class AzureBlobStorageService:
     
     def _initialize_client(self):
         """Initialize Azure Blob Storage client"""
+        from azure.storage.blob.aio import BlobServiceClient
+        from azure.identity.aio import DefaultAzureCredential
+        
         try:
             if self.connection_string:
                 self.blob_service_client = BlobServiceClient.from_connection_string(
@@ -82,6 +80,8 @@ class AzureBlobStorageService:
     
     async def ensure_containers_exist(self):
         """Ensure all required containers exist"""
+        from azure.core.exceptions import ResourceExistsError
+        
         try:
             for container_type, container_name in self.containers.items():
                 try:
@@ -349,6 +349,8 @@ class AzureBlobStorageService:
         Returns:
             True if deleted successfully, False otherwise
         """
+        from azure.core.exceptions import ResourceNotFoundError
+        
         try:
             container_name, blob_name = self._parse_blob_url(blob_url)
             
@@ -385,6 +387,8 @@ class AzureBlobStorageService:
         Returns:
             SAS URL for temporary access
         """
+        from azure.storage.blob import generate_blob_sas, BlobSasPermissions
+        
         try:
             container_name, blob_name = self._parse_blob_url(blob_url)
             
@@ -669,10 +673,13 @@ class AzureBlobStorageService:
             logger.info("Azure Blob Storage client closed")
 
 
-# Global instance
-azure_storage_service = AzureBlobStorageService()
+# Global instance, created on first use
+_azure_storage_service: Optional[AzureBlobStorageService] = None
 
 
 async def get_azure_storage_service() -> AzureBlobStorageService:
     """Dependency injection for Azure Blob Storage service"""
-    return azure_storage_service 
\ No newline at end of file
+    global _azure_storage_service
+    if _azure_storage_service is None:
+        _azure_storage_service = AzureBlobStorageService()
+    return _azure_storage_service 
\ No newline at end of file
@@ -3,14 +3,23 @@
 import os
 import subprocess
 import logging
+import unicodedata
 from typing import Optional, Dict, Any
 from pathlib import Path
 
 from app.exceptions import BurnInError
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
 
 
 logger = logging.getLogger(__name__)
 
+# Map export codecs to FFmpeg codec names
+EXPORT_VIDEO_CODECS = {
+    "h264": "libx264",
+    "h265": "libx265",
+    "av1": "libaom-av1"
+}
+
 
 class BurnInRenderer:
     """FFmpeg-based subtitle burn-in renderer."""
@@ -38,8 +47,8 @@ class BurnInRenderer:
         except Exception as e:
             raise BurnInError(f"FFmpeg verification failed: {str(e)}")
     
+    @staticmethod
     def _build_force_style(
-        self,
         font_size: int = 15,                   # Fixed font size in pixels (much more reliable)
         font_name: str = "Inter",            # Bold, thick font for maximum impact
         primary_colour: str = "&H00FFFFFF&",   # solid white text
@@ -99,7 +108,7 @@ class BurnInRenderer:
         output_path: str,
         font_size: int = 14,
         export_codec: str = "h264",
-        crf: int = 18,
+        crf: Optional[int] = None,
         task_id: Optional[str] = None
     ) -> str:
         """Burn subtitles into video using enhanced sync preservation (async version).
@@ -110,7 +119,7 @@ class BurnInRenderer:
             output_path: Path for output video file
             font_size: Font size in pixels
             export_codec: Video codec (h264, h265, etc.)
-            crf: Constant Rate Factor for video quality
+            crf: Constant Rate Factor for video quality (None = encoder profile's CRF)
             task_id: Task ID for logging
             
         Returns:
@@ -151,7 +160,7 @@ class BurnInRenderer:
         output_path: str,
         font_size: int = 14,
         export_codec: str = "h264",
-        crf: int = 18,
+        crf: Optional[int] = None,
         task_id: Optional[str] = None
     ) -> str:
         """Burn subtitles into video using FFmpeg.
@@ -162,7 +171,8 @@ class BurnInRenderer:
             output_path: Path for output video file
             font_size: Font size in pixels (15px clean and readable)
             export_codec: Video codec (h264, h265, etc.)
-            crf: Constant Rate Factor for video quality (lower = higher quality)
+            crf: Constant Rate Factor for video quality (lower = higher quality);
+                None = the encoder profile's CRF for the current backlog
             task_id: Task ID for logging
             
         Returns:
@@ -188,55 +198,39 @@ class BurnInRenderer:
             if output_dir:
                 os.makedirs(output_dir, exist_ok=True)
             
-            # Build force style for subtitles
-            force_style = self._build_force_style(font_size=font_size)
-            
-            # Build FFmpeg command
             # Map export codecs to FFmpeg codec names
-            codec_mapping = {
-                "h264": "libx264",
-                "h265": "libx265", 
-                "av1": "libaom-av1"
-            }
-            video_codec = codec_mapping.get(export_codec, "libx264")
-            
-            # Escape the SRT path for FFmpeg (handle spaces and special characters)
-            # Also ensure the path is clean ASCII
-            import unicodedata
-            import re
+            video_codec = EXPORT_VIDEO_CODECS.get(export_codec, "libx264")
             
-            # First normalize and clean the path
-            try:
-                # Normalize path and convert to ASCII
-                clean_srt_path = unicodedata.normalize('NFKD', srt_path)
-                clean_srt_path = clean_srt_path.encode('ascii', 'ignore').decode('ascii')
-            except Exception:
-                # Fallback: use original path
-                clean_srt_path = srt_path
-            
-            # Escape for FFmpeg
-            escaped_srt_path = clean_srt_path.replace("\\", "\\\\").replace(":", "\\:")
-            
-            cmd = [
-                "ffmpeg",
-                "-i", video_path,
-                "-vf", f"subtitles='{escaped_srt_path}':force_style='{force_style}'",
-                "-c:v", video_codec,
-                "-crf", str(crf),
-                "-c:a", "copy",  # Copy audio without re-encoding
-                "-y",  # Overwrite output file
-                output_path
-            ]
-            
-            logger.info(f"FFmpeg command: {' '.join(cmd)}")
-            
-            # Execute FFmpeg command
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=False,  # Use binary mode to avoid encoding issues
-                timeout=3600  # 1 hour timeout for long videos
-            )
+            # Preset/CRF/threads follow the encoder backlog; an explicit crf wins
+            with encoder_profiles.encode("burn_in", clip_id=task_id) as profile:
+                if crf is not None:
+                    profile = {**profile, "crf": crf}
+                encoder_args = x264_args(profile)
+                if video_codec == "libaom-av1":
+                    # libaom has no x264-style presets
+                    encoder_args = ["-crf", str(profile["crf"])]
+                
+                cmd = [
+                    "ffmpeg",
+                    *decoder_thread_args(profile),
+                    "-i", video_path,
+                    "-vf", build_subtitles_filter(srt_path, font_size),
+                    "-c:v", video_codec,
+                    *encoder_args,
+                    "-c:a", "copy",  # Copy audio without re-encoding
+                    "-y",  # Overwrite output file
+                    output_path
+                ]
+                
+                logger.info(f"FFmpeg command: {' '.join(cmd)}")
+                
+                # Execute FFmpeg command
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=False,  # Use binary mode to avoid encoding issues
+                    timeout=3600  # 1 hour timeout for long videos
+                )
             
             if result.returncode != 0:
                 error_msg = f"FFmpeg failed with return code {result.returncode}"
@@ -301,13 +295,42 @@ class BurnInRenderer:
             raise BurnInError(f"Failed to get video info: {str(e)}")
 
 
+def build_subtitles_filter(srt_path: str, font_size: int = 14) -> str:
+    """Build the styled subtitles= filter used for burn-in.
+    
+    Usable on its own as -vf or appended to a larger filtergraph, so subtitles can be
+    burned in the same encode as other video filters (e.g. the vertical crop).
+    
+    Args:
+        srt_path: Path to SRT subtitle file
+        font_size: Font size in pixels
+        
+    Returns:
+        FFmpeg filter string
+    """
+    # Escape the SRT path for FFmpeg (handle spaces and special characters)
+    # Also ensure the path is clean ASCII
+    try:
+        # Normalize path and convert to ASCII
+        clean_srt_path = unicodedata.normalize('NFKD', str(srt_path))
+        clean_srt_path = clean_srt_path.encode('ascii', 'ignore').decode('ascii')
+    except Exception:
+        # Fallback: use original path
+        clean_srt_path = str(srt_path)
+    
+    # Escape for FFmpeg
+    escaped_srt_path = clean_srt_path.replace("\\", "\\\\").replace(":", "\\:")
+    force_style = BurnInRenderer._build_force_style(font_size=font_size)
+    return f"subtitles='{escaped_srt_path}':force_style='{force_style}'"
+
+
 def burn_subtitles_to_video(
     video_path: str,
     srt_path: str,
     output_path: str,
     font_size: int = 14,
     export_codec: str = "h264",
-    crf: int = 18,
+    crf: Optional[int] = None,
     task_id: Optional[str] = None
 ) -> str:
     """Convenience function to burn subtitles into video.
@@ -318,7 +341,7 @@ def burn_subtitles_to_video(
         output_path: Path for output video file
         font_size: Font size in pixels (14px clean and readable)
         export_codec: Video codec (h264, h265, etc.)
-        crf: Constant Rate Factor for video quality
+        crf: Constant Rate Factor for video quality (None = encoder profile's CRF)
         task_id: Task ID for logging
         
     Returns:
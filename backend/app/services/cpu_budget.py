@@ -0,0 +1,223 @@
+"""
+Process-wide CPU budget
+FFmpeg encodes and crop workers take core tokens before they start and size their
+thread counts to the tokens they got, so concurrent pools and subprocesses share the
+machine instead of each assuming it has every core. When the tokens run out,
+CPU-heavy stages wait in arrival order.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CPUGrant:
+    """Core tokens held by one stage (see CPUBudget.acquire)"""
+
+    def __init__(self, stage: str, requested: int):
+        self.stage = stage
+        self.requested = requested
+        self.tokens = 0
+        self.enqueued_at = time.monotonic()
+        self.granted_at: Optional[float] = None
+
+    @property
+    def wait_seconds(self) -> float:
+        end = self.granted_at if self.granted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+class _Waiter:
+    """A grant waiting for tokens, woken through an event loop future or a threading.Event"""
+
+    def __init__(self, grant: CPUGrant, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.grant = grant
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event: Optional[threading.Event] = None if loop else threading.Event()
+
+    def wake(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        else:
+            self.event.set()
+
+
+class CPUBudget:
+    """
+    Hand out core tokens to CPU-heavy stages
+
+    A stage asks for a number of tokens (by default a fair share of the cores among
+    everyone holding or waiting, at most max_share) and gets as many as are free, at
+    least one. The
+    queue is first-in first-out, so a stage that needs a token can't be overtaken.
+    Safe to use from several event loops and threads.
+    """
+
+    def __init__(self, cores: Optional[int] = None, max_share: Optional[int] = None):
+        """
+        Args:
+            cores: Tokens in the budget (default: os.cpu_count())
+            max_share: Largest default request (default: half the cores), so a stage that
+                arrives while the machine is idle doesn't take every core
+        """
+        self.cores = cores or os.cpu_count() or 1
+        self.max_share = max(1, min(max_share or self.cores // 2, self.cores))
+
+        self._lock = threading.Lock()
+        self._waiting: Deque[_Waiter] = deque()
+        self.in_use = 0
+        self.active = 0
+
+        self.granted = 0
+        self.waited = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.stage_tokens: Dict[str, int] = {}
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._waiting)
+
+    def fair_share(self) -> int:
+        """Cores per stage if everyone holding or waiting for tokens got an equal share"""
+        with self._lock:
+            return self._fair_share()
+
+    def _fair_share(self) -> int:
+        return max(1, min(self.max_share, self.cores // (self.active + len(self._waiting) + 1)))
+
+    def _new_grant(self, stage: str, tokens: Optional[int]) -> CPUGrant:
+        requested = tokens if tokens else self._fair_share()
+        return CPUGrant(stage, max(1, min(requested, self.cores)))
+
+    async def acquire(self, stage: str, tokens: Optional[int] = None) -> CPUGrant:
+        """Wait for tokens from an event loop; hand the grant back with release()"""
+        with self._lock:
+            grant = self._new_grant(stage, tokens)
+            waiter = _Waiter(grant, asyncio.get_running_loop())
+            self._waiting.append(waiter)
+            self._grant_waiting()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiting:
+                    self._waiting.remove(waiter)
+                    self._grant_waiting()
+                    raise
+            # Granted just as the wait was cancelled - give the tokens back
+            self.release(grant)
+            raise
+        return grant
+
+    def acquire_blocking(self, stage: str, tokens: Optional[int] = None) -> CPUGrant:
+        """
+        Wait for tokens in a worker thread
+
+        Called on an event loop thread (a sync helper used from async code) it doesn't
+        wait - the tokens it would wait for may be held by tasks on that same loop - and
+        runs on one borrowed token when none are free.
+        """
+        try:
+            asyncio.get_running_loop()
+            on_event_loop = True
+        except RuntimeError:
+            on_event_loop = False
+
+        with self._lock:
+            grant = self._new_grant(stage, tokens)
+            if on_event_loop and (self._waiting or self.in_use >= self.cores):
+                grant.requested = 1
+                self._grant(grant, time.monotonic())
+                logger.debug(f"🧮 {stage} borrowed a core on the event loop thread ({self.in_use}/{self.cores} in use)")
+                return grant
+            waiter = _Waiter(grant)
+            self._waiting.append(waiter)
+            self._grant_waiting()
+        waiter.event.wait()
+        return grant
+
+    def release(self, grant: CPUGrant):
+        """Return a grant's tokens to the budget"""
+        with self._lock:
+            if not grant.tokens:
+                return
+            self.in_use = max(0, self.in_use - grant.tokens)
+            self.active -= 1
+            self.stage_tokens[grant.stage] = max(0, self.stage_tokens.get(grant.stage, 0) - grant.tokens)
+            grant.tokens = 0
+            self._grant_waiting()
+
+    def _grant_waiting(self):
+        """Serve waiters in arrival order while tokens are free (caller holds the lock)"""
+        now = time.monotonic()
+        while self._waiting and self.in_use < self.cores:
+            waiter = self._waiting.popleft()
+            self._grant(waiter.grant, now)
+            waiter.wake()
+
+    def _grant(self, grant: CPUGrant, now: float):
+        """Hand a grant its tokens - as many as requested and free, at least one (caller holds the lock)"""
+        grant.tokens = max(1, min(grant.requested, self.cores - self.in_use))
+        grant.granted_at = now
+        self.in_use += grant.tokens
+        self.active += 1
+        self.stage_tokens[grant.stage] = self.stage_tokens.get(grant.stage, 0) + grant.tokens
+
+        self.granted += 1
+        self.total_wait_seconds += grant.wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, grant.wait_seconds)
+        if grant.wait_seconds > 0.01:
+            self.waited += 1
+            logger.info(f"🧮 {grant.stage} got {grant.tokens}/{grant.requested} cores after {grant.wait_seconds:.1f}s ({self.in_use}/{self.cores} in use)")
+
+    @asynccontextmanager
+    async def reserve(self, stage: str, tokens: Optional[int] = None) -> AsyncIterator[CPUGrant]:
+        """Hold tokens for the duration of an async block"""
+        grant = await self.acquire(stage, tokens)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    @contextmanager
+    def hold(self, stage: str, tokens: Optional[int] = None) -> Iterator[CPUGrant]:
+        """Hold tokens for the duration of a block in a worker thread"""
+        grant = self.acquire_blocking(stage, tokens)
+        try:
+            yield grant
+        finally:
+            self.release(grant)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "cores": self.cores,
+                "max_share": self.max_share,
+                "in_use": self.in_use,
+                "active": self.active,
+                "waiting": len(self._waiting),
+                "stage_tokens": {stage: tokens for stage, tokens in self.stage_tokens.items() if tokens},
+                "granted": self.granted,
+                "waited": self.waited,
+                "avg_wait_seconds": round(self.total_wait_seconds / self.granted, 3) if self.granted else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3)
+            }
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+# Global CPU budget shared by every encode and crop worker in this process
+cpu_budget = CPUBudget(cores=int(os.getenv("CPU_BUDGET_CORES", "0")) or None)
@@ -0,0 +1,168 @@
+"""
+Persistent crop-path cache
+Stores analysis-pass crop trajectories on disk so a re-render of the same clip
+(different subtitles, codec or resolution) skips face detection and only renders
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple
+
+from .crop_planner import CropTrajectory
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the analysis pass changes what it produces for the same inputs
+# (3: smart-cut segments start on the requested frame, not up to a GOP earlier)
+CROP_CACHE_VERSION = 3
+
+
+def hash_source_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's content (path and mtime don't matter)"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def crop_cache_key(
+    source_id: str,
+    window: Optional[Tuple[float, float]],
+    params: Dict[str, Any]
+) -> str:
+    """
+    Cache key for one analysis run
+
+    Args:
+        source_id: Content hash of the input, or a stable id such as "youtube_id:format"
+        window: (start, end) seconds of the segment within the source, None for the whole input
+        params: Everything else that changes the trajectory (detector + smoothing settings)
+    """
+    payload = json.dumps({
+        "version": CROP_CACHE_VERSION,
+        "source": source_id,
+        "window": [round(float(t), 3) for t in window] if window else None,
+        "params": params,
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CropPathCache:
+    """
+    LRU cache of crop trajectories, one .npz file per entry
+
+    Recency is the file mtime (refreshed on every hit), so the cache survives
+    restarts and is shared by worker processes without an index file.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int, max_entries: int, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.npz"
+
+    def get(self, key: str) -> Optional[CropTrajectory]:
+        """Cached trajectory for key, or None"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            trajectory = CropTrajectory.load(path)
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # Truncated or stale entry - drop it and recompute
+            logger.warning(f"⚠️ Discarding unreadable crop cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return trajectory
+
+    def put(self, key: str, trajectory: CropTrajectory) -> Optional[Path]:
+        """Store a trajectory and evict least recently used entries over the limits"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        temp_path = self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.npz"
+        try:
+            trajectory.save(temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write crop cache entry: {e}")
+            temp_path.unlink(missing_ok=True)
+            return None
+        self.evict()
+        return path
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits its limits"""
+        with self._lock:
+            entries = []
+            for path in self.cache_dir.glob("*.npz"):
+                if path.name.startswith("."):
+                    continue
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+            entries.sort()
+
+            total_bytes = sum(size for _, size, _ in entries)
+            removed = 0
+            while entries and (total_bytes > self.max_bytes or len(entries) > self.max_entries):
+                _, size, path = entries.pop(0)
+                path.unlink(missing_ok=True)
+                total_bytes -= size
+                removed += 1
+
+            if removed:
+                self.evictions += removed
+                logger.info(f"🧹 Crop cache evicted {removed} entries ({len(entries)} left, {total_bytes / 1024:.0f} KB)")
+            return removed
+
+    def clear(self) -> int:
+        """Delete every entry"""
+        removed = 0
+        for path in self.cache_dir.glob("*.npz"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        entries = [p for p in self.cache_dir.glob("*.npz") if not p.name.startswith(".")]
+        return {
+            "enabled": self.enabled,
+            "cache_dir": str(self.cache_dir),
+            "entries": len(entries),
+            "size_mb": round(sum(p.stat().st_size for p in entries if p.exists()) / (1024 * 1024), 2),
+            "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+# Global cache instance
+crop_path_cache = CropPathCache(
+    cache_dir=Path(os.getenv("CROP_CACHE_DIR", "crop_cache")),
+    max_bytes=int(float(os.getenv("CROP_CACHE_MAX_MB", "256")) * 1024 * 1024),
+    max_entries=int(os.getenv("CROP_CACHE_MAX_ENTRIES", "2000")),
+    enabled=os.getenv("CROP_CACHE_ENABLED", "true").lower() == "true"
+)
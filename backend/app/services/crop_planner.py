@@ -0,0 +1,480 @@
+"""
+Two-pass vertical crop planning: analyze once, let FFmpeg render
+The analysis pass produces a per-frame crop trajectory; the render pass drives
+FFmpeg's crop filter with sendcmd so Python never touches full-resolution pixels
+"""
+
+import asyncio
+import json
+import logging
+import tempfile
+from fractions import Fraction
+from pathlib import Path
+from typing import Optional, Tuple, Dict, Any, List
+
+import numpy as np
+
+from .ffmpeg_pipe import audio_output_args, h264_output_args, probe_audio_codec, probe_video_start_offset
+
+logger = logging.getLogger(__name__)
+
+# Filter instance name targeted by the sendcmd commands
+CROP_FILTER_NAME = "crop@vc"
+
+# Split-screen divider between the two speaker crops (same look as the frame loop's cv2.line)
+DUAL_DIVIDER_COLOR = "0x282828"
+DUAL_DIVIDER_THICKNESS = 2
+
+
+class CropTrajectory:
+    """
+    Per-frame crop windows (x, y, w, h) in source pixel coordinates
+
+    Saved as JSON or npz depending on the file suffix. Dual-speaker spans (split-screen
+    layout) live in metadata["dual_spans"]; frames outside them use the per-frame window.
+    """
+
+    def __init__(
+        self,
+        windows: np.ndarray,
+        fps: float,
+        source_size: Tuple[int, int],
+        target_size: Tuple[int, int],
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.windows = np.asarray(windows, dtype=np.int32).reshape(-1, 4)
+        self.fps = float(fps)
+        self.source_size = (int(source_size[0]), int(source_size[1]))
+        self.target_size = (int(target_size[0]), int(target_size[1]))
+        self.metadata = metadata or {}
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    @property
+    def crop_size(self) -> Tuple[int, int]:
+        """Crop (w, h) - constant for a single-speaker trajectory"""
+        if not len(self.windows):
+            return self.target_size
+        return int(self.windows[0, 2]), int(self.windows[0, 3])
+
+    def save(self, path: Path) -> Path:
+        """Write the trajectory to .json or .npz"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".npz":
+            np.savez_compressed(
+                path,
+                windows=self.windows,
+                fps=self.fps,
+                source_size=np.array(self.source_size),
+                target_size=np.array(self.target_size),
+                metadata=json.dumps(self.metadata)
+            )
+        else:
+            path.write_text(json.dumps({
+                "fps": self.fps,
+                "source_size": list(self.source_size),
+                "target_size": list(self.target_size),
+                "metadata": self.metadata,
+                "windows": self.windows.tolist()
+            }))
+        return path
+
+    @classmethod
+    def load(cls, path: Path) -> "CropTrajectory":
+        """Read a trajectory written by save()"""
+        path = Path(path)
+        if path.suffix == ".npz":
+            with np.load(path) as data:
+                return cls(
+                    data["windows"], float(data["fps"]),
+                    tuple(data["source_size"]), tuple(data["target_size"]),
+                    json.loads(str(data["metadata"]))
+                )
+        data = json.loads(path.read_text())
+        return cls(data["windows"], data["fps"], data["source_size"], data["target_size"], data.get("metadata"))
+
+    def constant_spans(self) -> List[Tuple[int, int, int, int]]:
+        """(start_frame, end_frame, x, y) runs of frames that share one crop position"""
+        if not len(self.windows):
+            return []
+        positions = self.windows[:, :2]
+        starts = np.concatenate(([0], np.flatnonzero(np.any(positions[1:] != positions[:-1], axis=1)) + 1))
+        ends = np.append(starts[1:], len(positions))
+        return [
+            (int(start), int(end), int(positions[start, 0]), int(positions[start, 1]))
+            for start, end in zip(starts, ends)
+        ]
+
+    @property
+    def dual_spans(self) -> List[Dict[str, Any]]:
+        """Split-screen spans: {"start", "end", "top": [x, y, w, h], "bottom": [x, y, w, h]}"""
+        return self.metadata.get("dual_spans", [])
+
+    def layout_spans(self) -> List[Tuple[int, int, Optional[Dict[str, Any]]]]:
+        """(start_frame, end_frame, dual_span or None) runs covering every frame in order"""
+        spans = []
+        position = 0
+        for dual_span in sorted(self.dual_spans, key=lambda span: span["start"]):
+            if dual_span["start"] > position:
+                spans.append((position, dual_span["start"], None))
+            spans.append((dual_span["start"], dual_span["end"], dual_span))
+            position = dual_span["end"]
+        if position < len(self):
+            spans.append((position, len(self), None))
+        return spans
+
+    def to_sendcmd(self, start_time: float = 0.0) -> str:
+        """
+        Build sendcmd commands that move the crop window frame by frame
+
+        Only position changes are emitted. Each command fires half a frame before
+        its frame's timestamp so float rounding can't shift it onto a neighbour.
+        """
+        lines = []
+        half_frame = 0.5 / self.fps
+        previous = None
+        for index, (x, y, _, _) in enumerate(self.windows):
+            if previous == (x, y):
+                continue
+            timestamp = max(0.0, start_time + index / self.fps - half_frame) if index else 0.0
+            lines.append(f"{timestamp:.6f} {CROP_FILTER_NAME} x {x}, {CROP_FILTER_NAME} y {y};")
+            previous = (x, y)
+        return "\n".join(lines) + "\n"
+
+
+def _escape_filter_path(path: Path) -> str:
+    """Escape a file path for use inside an FFmpeg filter argument"""
+    return str(path).replace("\\", "\\\\").replace(":", "\\:").replace("'", "\\'")
+
+
+def build_crop_filter(
+    trajectory: CropTrajectory,
+    sendcmd_path: Optional[Path],
+    post_filter: Optional[str] = None
+) -> str:
+    """
+    Filter chain that follows the trajectory and scales to the target size
+
+    A trajectory with a single position (or no sendcmd_path) is a plain static crop.
+    post_filter (e.g. subtitles=) runs on the cropped output frames.
+    """
+    crop_width, crop_height = trajectory.crop_size
+    target_width, target_height = trajectory.target_size
+    x0, y0 = (int(trajectory.windows[0, 0]), int(trajectory.windows[0, 1])) if len(trajectory) else (0, 0)
+
+    chain = [f"{CROP_FILTER_NAME}=w={crop_width}:h={crop_height}:x={x0}:y={y0}"]
+    if sendcmd_path is not None and len(trajectory.constant_spans()) > 1:
+        chain.insert(0, f"sendcmd=f='{_escape_filter_path(sendcmd_path)}'")
+    if (crop_width, crop_height) != (target_width, target_height):
+        chain.append(f"scale={target_width}:{target_height}")
+    if post_filter:
+        chain.append(post_filter)
+    return ",".join(chain)
+
+
+def build_crop_filtergraph(
+    trajectory: CropTrajectory,
+    sendcmd_path: Optional[Path],
+    post_filter: Optional[str] = None
+) -> str:
+    """
+    -filter_complex graph for a trajectory with dual-speaker spans (output label [vout])
+
+    The source is split into a single-speaker branch (the usual sendcmd crop) and a
+    split-screen branch. Each layout span trims its frames from one branch - dual spans
+    as crop x2 -> scale -> vstack -> drawbox - and concat joins the spans back in order.
+    post_filter runs once on the joined output.
+    """
+    target_width, target_height = trajectory.target_size
+    top_height = target_height // 2
+    bottom_height = target_height - top_height
+    spans = trajectory.layout_spans()
+    single_count = sum(1 for _, _, dual_span in spans if dual_span is None)
+    dual_count = len(spans) - single_count
+
+    def fan_out(label: str, count: int, prefix: str) -> str:
+        if count == 1:
+            return f"[{label}]null[{prefix}0]"
+        return f"[{label}]split={count}" + "".join(f"[{prefix}{index}]" for index in range(count))
+
+    graph = []
+    if single_count and dual_count:
+        graph.append("[0:v]split=2[single_src][dual_src]")
+        single_source, dual_source = "single_src", "dual_src"
+    else:
+        single_source = dual_source = "0:v"
+    if single_count:
+        graph.append(f"[{single_source}]{build_crop_filter(trajectory, sendcmd_path)},setsar=1[single]")
+        graph.append(fan_out("single", single_count, "s"))
+    graph.append(fan_out(dual_source, dual_count, "d"))
+
+    single_index = dual_index = 0
+    for index, (start, end, dual_span) in enumerate(spans):
+        trim = f"trim=start_frame={start}:end_frame={end},setpts=PTS-STARTPTS"
+        if dual_span is None:
+            graph.append(f"[s{single_index}]{trim}[p{index}]")
+            single_index += 1
+            continue
+        d = f"d{dual_index}"
+        top_x, top_y, top_w, top_h = dual_span["top"]
+        bottom_x, bottom_y, bottom_w, bottom_h = dual_span["bottom"]
+        graph.extend([
+            f"[{d}]{trim},split=2[{d}t][{d}b]",
+            f"[{d}t]crop={top_w}:{top_h}:{top_x}:{top_y},scale={target_width}:{top_height}[{d}top]",
+            f"[{d}b]crop={bottom_w}:{bottom_h}:{bottom_x}:{bottom_y},scale={target_width}:{bottom_height}[{d}bottom]",
+            f"[{d}top][{d}bottom]vstack,drawbox=x=0:y={top_height - DUAL_DIVIDER_THICKNESS // 2}"
+            f":w={target_width}:h={DUAL_DIVIDER_THICKNESS}:color={DUAL_DIVIDER_COLOR}:t=fill,setsar=1[p{index}]",
+        ])
+        dual_index += 1
+
+    # concat drops the stream frame rate - restate it so the encoder keeps every frame
+    frame_rate = Fraction(trajectory.fps).limit_denominator(1001)
+    graph.append(
+        "".join(f"[p{index}]" for index in range(len(spans)))
+        + f"concat=n={len(spans)}:v=1:a=0,fps={frame_rate.numerator}/{frame_rate.denominator}"
+        + (f",{post_filter}" if post_filter else "")
+        + "[vout]"
+    )
+    return ";".join(graph)
+
+
+def build_render_command(
+    input_video_path: Path,
+    output_video_path: Path,
+    trajectory: CropTrajectory,
+    sendcmd_path: Optional[Path],
+    audio_codec: Optional[str] = None,
+    input_args: Optional[List[str]] = None,
+    frame_count: Optional[int] = None,
+    post_filter: Optional[str] = None,
+    crf: int = 18,
+    preset: str = "fast",
+    threads: Optional[int] = None,
+    thumbnail_frame: Optional[int] = None
+) -> List[str]:
+    """
+    One FFmpeg command that renders a finished clip: crop graph -> post_filter -> H.264,
+    with the source audio stream-copied (re-encoded only if MP4 can't carry it)
+
+    Passing the subtitle burn-in as post_filter makes crop + captions + audio a single encode.
+    With thumbnail_frame, that cropped frame is also written to stdout as one raw BGR
+    frame (second output), so the thumbnail needs no extra decode. It is taken before
+    post_filter, like the frame loop's, so thumbnails never carry burned-in captions.
+    """
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        *(input_args or []),
+        # Decoder threads follow the encoder's, so the render stays within its CPU share
+        *(['-threads', str(threads)] if threads else []),
+        '-i', str(input_video_path),
+    ]
+    if thumbnail_frame is not None:
+        if trajectory.dual_spans:
+            graph = build_crop_filtergraph(trajectory, sendcmd_path)
+        else:
+            graph = f"[0:v:0]{build_crop_filter(trajectory, sendcmd_path)}[vout]"
+        graph += f";[vout]split=2{'[vcrop]' if post_filter else '[vmain]'}[vthumb]"
+        graph += f";[vthumb]trim=start_frame={thumbnail_frame}:end_frame={thumbnail_frame + 1}[thumb]"
+        if post_filter:
+            graph += f";[vcrop]{post_filter}[vmain]"
+        cmd.extend(['-filter_complex', graph, '-map', '[vmain]'])
+    elif trajectory.dual_spans:
+        cmd.extend(['-filter_complex', build_crop_filtergraph(trajectory, sendcmd_path, post_filter), '-map', '[vout]'])
+    else:
+        cmd.extend(['-map', '0:v:0', '-vf', build_crop_filter(trajectory, sendcmd_path, post_filter)])
+    if audio_codec:
+        cmd.extend(['-map', '0:a:0', *audio_output_args(audio_codec)])
+    if frame_count is not None:
+        cmd.extend(['-frames:v', str(frame_count)])
+    cmd.extend([
+        *h264_output_args(crf, preset, threads),
+        '-movflags', '+faststart',
+        '-y', str(output_video_path)
+    ])
+    if thumbnail_frame is not None:
+        cmd.extend(['-map', '[thumb]', '-frames:v', '1', '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1'])
+    return cmd
+
+
+async def render_crop_trajectory(
+    input_video_path: Path,
+    output_video_path: Path,
+    trajectory: CropTrajectory,
+    crf: int = 18,
+    preset: str = "fast",
+    start_frame: int = 0,
+    include_audio: bool = True,
+    open_ended: bool = False,
+    post_filter: Optional[str] = None,
+    threads: Optional[int] = None,
+    thumbnail_frame: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Render pass: crop the source along a trajectory entirely inside FFmpeg
+
+    Args:
+        start_frame: Source frame the trajectory starts at (time shards); the render
+            seeks there and outputs exactly len(trajectory) frames
+        include_audio: Mux the source audio (off for video-only shards)
+        open_ended: Keep the last crop position until the end of the stream instead of
+            stopping after len(trajectory) frames (trajectories planned from sampled frames)
+        post_filter: Extra filter on the cropped frames, e.g. build_subtitles_filter() to
+            burn captions in the same encode
+        threads: x264 thread count (None = FFmpeg's default)
+        thumbnail_frame: Also return this cropped frame (before post_filter) as a BGR
+            array, for save_thumbnail_frame()
+
+    Returns:
+        Dict with success, output_path, file_size_mb, encodes, thumbnail_frame (None if
+        not requested or past the end of the clip) and error keys
+    """
+    if not len(trajectory):
+        return {"success": False, "error": "Empty crop trajectory"}
+
+    # Filters see the first video frame this late when audio starts before it
+    start_offset = probe_video_start_offset(input_video_path)
+    input_args = []
+    sendcmd_start = start_offset
+    if start_frame > 0:
+        # Seeking half a frame early lands exactly on start_frame, which the filters then
+        # see at t = half a frame
+        input_args = ['-ss', f'{start_offset + (start_frame - 0.5) / trajectory.fps:.6f}']
+        sendcmd_start = 0.5 / trajectory.fps
+
+    with tempfile.TemporaryDirectory(prefix="crop_render_") as temp_dir:
+        sendcmd_path = Path(temp_dir) / "crop_commands.txt"
+        sendcmd_path.write_text(trajectory.to_sendcmd(sendcmd_start))
+
+        audio_codec = probe_audio_codec(input_video_path) if include_audio else None
+        cmd = build_render_command(
+            input_video_path, output_video_path, trajectory, sendcmd_path,
+            audio_codec=audio_codec,
+            input_args=input_args,
+            frame_count=None if open_ended else len(trajectory),
+            post_filter=post_filter,
+            crf=crf,
+            preset=preset,
+            threads=threads,
+            thumbnail_frame=thumbnail_frame
+        )
+
+        logger.info(f"🎬 Rendering {len(trajectory)} frame crop trajectory with FFmpeg ({trajectory.crop_size[0]}x{trajectory.crop_size[1]} → {trajectory.target_size[0]}x{trajectory.target_size[1]}, {len(trajectory.dual_spans)} split-screen spans{', + post filter' if post_filter else ''})")
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+
+    if process.returncode != 0 or not output_video_path.exists():
+        error_msg = stderr.decode(errors='replace').strip() if stderr else "Unknown FFmpeg error"
+        logger.error(f"❌ Crop render failed: {error_msg}")
+        return {"success": False, "error": f"FFmpeg crop render failed: {error_msg}"}
+
+    thumbnail = None
+    target_width, target_height = trajectory.target_size
+    if thumbnail_frame is not None and stdout and len(stdout) == target_width * target_height * 3:
+        thumbnail = np.frombuffer(stdout, dtype=np.uint8).reshape(target_height, target_width, 3)
+
+    file_size_mb = output_video_path.stat().st_size / (1024 * 1024)
+    logger.info(f"✅ Crop render complete ({file_size_mb:.1f} MB): {output_video_path}")
+    return {
+        "success": True,
+        "output_path": str(output_video_path),
+        "file_size_mb": round(file_size_mb, 2),
+        "encodes": 1,
+        "thumbnail_frame": thumbnail
+    }
+
+
+def scale_box(box: Tuple[int, int, int, int], scale_x: float, scale_y: float) -> Tuple[int, int, int, int]:
+    """Map an (x, y, x1, y1) box from analysis to source coordinates"""
+    x, y, x1, y1 = box
+    return (int(x * scale_x), int(y * scale_y), int(x1 * scale_x), int(y1 * scale_y))
+
+
+def scale_speaker_result(speaker_result: Any, scale_x: float, scale_y: float) -> Any:
+    """Map a find_active_speaker() result from analysis to source coordinates"""
+    if isinstance(speaker_result, tuple):
+        return scale_box(speaker_result, scale_x, scale_y)
+    if isinstance(speaker_result, dict) and speaker_result.get("mode") == "dual_speaker":
+        scaled = dict(speaker_result)
+        scaled["speaker_1"] = scale_box(speaker_result["speaker_1"], scale_x, scale_y)
+        scaled["speaker_2"] = scale_box(speaker_result["speaker_2"], scale_x, scale_y)
+        width, height = speaker_result["frame_size"]
+        scaled["frame_size"] = (int(round(width * scale_x)), int(round(height * scale_y)))
+        return scaled
+    return speaker_result
+
+
+def speaker_region_window(
+    frame_size: Tuple[int, int],
+    speaker_box: Tuple[int, int, int, int],
+    region_size: Tuple[int, int]
+) -> Tuple[int, int, int, int]:
+    """
+    Source window (left, top, w, h) framing one speaker of a split-screen
+
+    The window has the region's aspect ratio and 80% of its size, centered on the face
+    and shifted back inside the frame; it is scaled up to region_size when rendered.
+    """
+    w, h = frame_size
+    region_width, region_height = region_size
+    x, y, x1, y1 = speaker_box
+    center_x = (x + x1) // 2
+    center_y = (y + y1) // 2
+
+    region_aspect = region_width / region_height
+    if w / h > region_aspect:
+        crop_height = min(h, int(region_height * 0.8))
+        crop_width = int(crop_height * region_aspect)
+    else:
+        crop_width = min(w, int(region_width * 0.8))
+        crop_height = int(crop_width / region_aspect)
+
+    left = max(0, center_x - crop_width // 2)
+    right = min(w, left + crop_width)
+    top = max(0, center_y - crop_height // 2)
+    bottom = min(h, top + crop_height)
+
+    if right - left < crop_width:
+        if left == 0:
+            right = min(w, crop_width)
+        else:
+            left = max(0, w - crop_width)
+    if bottom - top < crop_height:
+        if top == 0:
+            bottom = min(h, crop_height)
+        else:
+            top = max(0, h - crop_height)
+    return left, top, right - left, bottom - top
+
+
+def plan_dual_spans(
+    dual_windows: List[Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]],
+    resets: List[bool],
+    min_frames: int
+) -> List[Dict[str, Any]]:
+    """
+    Group per-frame split-screen windows into dual-speaker spans
+
+    A span is a run of dual-speaker frames that doesn't cross a scene reset and lasts at
+    least min_frames; shorter runs stay single-speaker, so the layout never flickers.
+    Each span gets one fixed window per speaker (the median over the run).
+    """
+    spans = []
+    start = None
+    for index in range(len(dual_windows) + 1):
+        is_dual = index < len(dual_windows) and dual_windows[index] is not None
+        if start is not None and (not is_dual or resets[index]):
+            if index - start >= min_frames:
+                windows = np.array(dual_windows[start:index])
+                top, bottom = np.median(windows, axis=0).astype(int).tolist()
+                spans.append({"start": start, "end": index, "top": top, "bottom": bottom})
+            start = None
+        if is_dual and start is None:
+            start = index
+    return spans
@@ -0,0 +1,95 @@
+"""
+Time-sharded vertical cropping of long clips
+Shards are cropped in parallel (with a warm-up overlap for the smoothing state) and
+stitched back together with the concat demuxer - no second video encode
+"""
+
+import asyncio
+import logging
+import math
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+from .ffmpeg_pipe import audio_output_args, probe_audio_codec
+
+logger = logging.getLogger(__name__)
+
+
+def plan_time_shards(
+    total_frames: int,
+    fps: float,
+    shard_seconds: float,
+    warmup_seconds: float
+) -> List[Dict[str, Any]]:
+    """
+    Split a clip into frame-aligned shards
+
+    Returns:
+        List of dicts with index, start_frame, end_frame (None = until end of stream),
+        warmup_frames and lookahead_frames (tracked before start_frame / after end_frame,
+        but not rendered)
+    """
+    shard_frames = max(1, int(round(shard_seconds * fps)))
+    shard_count = max(1, math.ceil(total_frames / shard_frames))
+    # Don't leave a sliver of a shard at the end - fold it into the previous one
+    if shard_count > 1 and total_frames - (shard_count - 1) * shard_frames < shard_frames // 4:
+        shard_count -= 1
+    warmup_frames = max(0, int(round(warmup_seconds * fps)))
+
+    shards = []
+    for index in range(shard_count):
+        start_frame = index * shard_frames
+        shards.append({
+            "index": index,
+            "start_frame": start_frame,
+            "end_frame": None if index == shard_count - 1 else start_frame + shard_frames,
+            "warmup_frames": min(warmup_frames, start_frame),
+            "lookahead_frames": 0 if index == shard_count - 1 else warmup_frames,
+        })
+    return shards
+
+
+async def concat_video_shards(
+    shard_paths: List[Path],
+    audio_source: Optional[Path],
+    output_path: Path
+) -> Dict[str, Any]:
+    """
+    Stitch video-only shards with the concat demuxer (stream copy) and mux the source audio once
+
+    Returns:
+        Dict with success and error keys
+    """
+    list_path = output_path.parent / f".{output_path.stem}_shards.txt"
+    list_path.write_text("".join(
+        "file '{}'\n".format(str(Path(path).resolve()).replace("'", "'\\''")) for path in shard_paths
+    ))
+
+    cmd = [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'concat', '-safe', '0', '-i', str(list_path),
+    ]
+    if audio_source is not None:
+        cmd.extend(['-i', str(audio_source), '-map', '0:v:0', '-map', '1:a:0?'])
+        cmd.extend(audio_output_args(probe_audio_codec(audio_source)))
+    else:
+        cmd.extend(['-map', '0:v:0'])
+    cmd.extend(['-c:v', 'copy', '-movflags', '+faststart', '-y', str(output_path)])
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        _, stderr = await process.communicate()
+    finally:
+        list_path.unlink(missing_ok=True)
+
+    if process.returncode != 0 or not output_path.exists():
+        error_msg = stderr.decode(errors='replace').strip() if stderr else "Unknown FFmpeg error"
+        logger.error(f"❌ Shard concat failed: {error_msg}")
+        return {"success": False, "error": f"FFmpeg concat failed: {error_msg}"}
+
+    logger.info(f"🧵 Stitched {len(shard_paths)} shards into {output_path.name} (video stream copy)")
+    return {"success": True}
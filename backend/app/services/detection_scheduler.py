@@ -0,0 +1,183 @@
+"""
+Adaptive face detection scheduling for the vertical crop engine
+Runs the detector only every N frames and interpolates (or tracks) speaker boxes in between
+"""
+
+import logging
+from typing import Optional, Tuple, Any, Dict
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Size of the grayscale thumbnail used for frame-difference measurement
+DIFF_THUMBNAIL_SIZE = (64, 36)
+
+
+class DetectionScheduler:
+    """
+    Decide on which frames the (expensive) face detector has to run
+
+    The stride N adapts to the content:
+    - scene cuts and frame-difference spikes force a detection and drop N to min_stride
+    - large speaker movement between two detections halves N
+    - static scenes (low frame difference, speaker barely moved) grow N up to max_stride
+    - while a face tracker follows the speaker, N stretches to tracked_stride; a lost
+      track forces a detection
+    """
+
+    def __init__(
+        self,
+        min_stride: int = 1,
+        max_stride: int = 6,
+        spike_threshold: float = 25.0,
+        static_threshold: float = 2.0,
+        motion_threshold: float = 0.02,
+        tracked_stride: int = 0
+    ):
+        """
+        Args:
+            min_stride: Smallest detection interval in frames
+            max_stride: Largest detection interval in frames (1 = detect every frame)
+            spike_threshold: Mean absolute thumbnail difference (0-255) treated as a cut
+            static_threshold: Mean absolute thumbnail difference below which a scene is static
+            motion_threshold: Speaker movement between detections, as a fraction of frame width,
+                above which the stride is halved
+            tracked_stride: Detection interval while the tracker is confident - a safety net
+                for speaker switches and new faces (0 = no tracking)
+        """
+        self.min_stride = max(1, min_stride)
+        self.max_stride = max(self.min_stride, max_stride)
+        self.spike_threshold = spike_threshold
+        self.static_threshold = static_threshold
+        self.motion_threshold = motion_threshold
+        self.tracked_stride = max(self.max_stride, tracked_stride) if tracked_stride else 0
+
+        self.stride = self.min_stride
+        self.last_detection_frame: Optional[int] = None
+        # Frame of the most recently scheduled detection - may run ahead of
+        # last_detection_frame while results are still in flight (pipelined crop loop)
+        self.last_scheduled_frame: Optional[int] = None
+        self.last_detection_center: Optional[Tuple[int, int]] = None
+        self._previous_thumbnail: Optional[np.ndarray] = None
+        self._max_diff_since_detection = 0.0
+
+        self.frames_seen = 0
+        self.detections = 0
+        self.tracked_frames = 0
+        self.tracker_redetections = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any frames can be skipped at all"""
+        return self.max_stride > 1 or self.tracked_stride > 1
+
+    def frame_difference(self, frame: np.ndarray) -> float:
+        """Mean absolute difference to the previous frame on a tiny grayscale thumbnail"""
+        h, w = frame.shape[:2]
+        # Subsample before resizing so the cost stays flat from 720p to 4K
+        step = max(1, w // (DIFF_THUMBNAIL_SIZE[0] * 4))
+        small = cv2.resize(frame[::step, ::step], DIFF_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        thumbnail = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        previous = self._previous_thumbnail
+        self._previous_thumbnail = thumbnail
+        if previous is None:
+            return 0.0
+        return float(cv2.absdiff(thumbnail, previous).mean())
+
+    def should_detect(
+        self,
+        frame_idx: int,
+        scene_cut: bool = False,
+        frame_diff: float = 0.0,
+        tracking: bool = False,
+        tracker_lost: bool = False
+    ) -> bool:
+        """
+        Return True if the detector must run on this frame
+
+        Args:
+            tracking: A tracker confidently follows the speaker on this frame
+            tracker_lost: The tracker was following the speaker and lost it on this frame
+        """
+        self.frames_seen += 1
+        self._max_diff_since_detection = max(self._max_diff_since_detection, frame_diff)
+
+        if self.last_scheduled_frame is None:
+            return self._schedule(frame_idx)
+
+        if scene_cut or frame_diff >= self.spike_threshold:
+            self.stride = self.min_stride
+            return self._schedule(frame_idx)
+
+        if tracker_lost:
+            self.tracker_redetections += 1
+            return self._schedule(frame_idx)
+
+        stride = max(self.stride, self.tracked_stride) if tracking else self.stride
+        if frame_idx - self.last_scheduled_frame >= stride:
+            return self._schedule(frame_idx)
+        if tracking:
+            self.tracked_frames += 1
+        return False
+
+    def _schedule(self, frame_idx: int) -> bool:
+        self.last_scheduled_frame = frame_idx
+        return True
+
+    def record_detection(self, frame_idx: int, center: Optional[Tuple[int, int]], frame_width: int):
+        """Update the stride after the detector ran on frame_idx"""
+        self.detections += 1
+
+        moved = None
+        if center is not None and self.last_detection_center is not None:
+            dx = center[0] - self.last_detection_center[0]
+            dy = center[1] - self.last_detection_center[1]
+            moved = (dx * dx + dy * dy) ** 0.5 / max(1, frame_width)
+
+        if moved is not None and moved > self.motion_threshold:
+            self.stride = max(self.min_stride, self.stride // 2)
+        elif self._max_diff_since_detection < self.static_threshold and (moved is None or moved <= self.motion_threshold / 2):
+            self.stride = min(self.max_stride, self.stride + 1)
+
+        self.last_detection_frame = frame_idx
+        self.last_detection_center = center
+        self._max_diff_since_detection = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Detection counters for logging"""
+        return {
+            "frames": self.frames_seen,
+            "detections": self.detections,
+            "detection_ratio": round(self.detections / self.frames_seen, 3) if self.frames_seen else 0.0,
+            "final_stride": self.stride,
+            "tracked_frames": self.tracked_frames,
+            "tracker_redetections": self.tracker_redetections
+        }
+
+
+def speaker_result_center(speaker_result: Any) -> Optional[Tuple[int, int]]:
+    """Center of a single-speaker box, or None for no face / dual-speaker results"""
+    if isinstance(speaker_result, tuple):
+        x, y, x1, y1 = speaker_result
+        return ((x + x1) // 2, (y + y1) // 2)
+    return None
+
+
+def interpolate_speaker_result(start: Any, end: Any, t: float) -> Any:
+    """
+    Interpolate a find_active_speaker() result between two detections
+
+    Single-speaker boxes are linearly interpolated. Anything else (no face,
+    dual-speaker dicts, or a switch between them) is held from the nearest detection.
+
+    Args:
+        start: Result of the detection before the frame
+        end: Result of the detection after the frame
+        t: Position between the two detections, 0.0 (start) to 1.0 (end)
+    """
+    if isinstance(start, tuple) and isinstance(end, tuple):
+        return tuple(int(round(a + (b - a) * t)) for a, b in zip(start, end))
+    return start if t < 0.5 else end
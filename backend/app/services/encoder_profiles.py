@@ -0,0 +1,285 @@
+"""
+Backlog-adaptive encoder profiles
+Every x264 encode asks this service for its preset, CRF and thread count. Idle,
+each job gets its quality settings; as encodes pile up (or a job's latency
+target can't be met) it steps down to faster presets, and back up once the
+backlog drains. With a CPU budget attached, encodes also wait for core tokens
+and run with one thread per token
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterator, List, Optional
+
+from .cpu_budget import CPUBudget, cpu_budget
+
+logger = logging.getLogger(__name__)
+
+# Speed tiers from best compression to fastest encode. crf_offset is added on top of
+# the job's own CRF once it runs at a tier faster than its base tier.
+ENCODER_TIERS: List[Dict[str, Any]] = [
+    {"tier": "quality", "preset": "slow", "crf_offset": 0},
+    {"tier": "balanced", "preset": "medium", "crf_offset": 0},
+    {"tier": "fast", "preset": "fast", "crf_offset": 0},
+    {"tier": "faster", "preset": "veryfast", "crf_offset": 1},
+    {"tier": "fastest", "preset": "ultrafast", "crf_offset": 2},
+]
+
+# Per job: (tier when idle, CRF) - the settings each encode used before tiers existed
+ENCODER_JOBS: Dict[str, Dict[str, Any]] = {
+    "cut": {"tier": "quality", "crf": 18},            # YouTubeService.cut_clips re-encode
+    "segment": {"tier": "balanced", "crf": 18},       # sync-preserving segment cut
+    "smart_cut_edge": {"tier": "balanced", "crf": 18},  # partial GOPs at either end of a smart cut
+    "burn_in": {"tier": "balanced", "crf": 18},       # subtitle burn-in
+    "crop_render": {"tier": "fast", "crf": 18},       # vertical crop (two-pass render or frame loop)
+    "crop_fallback": {"tier": "fast", "crf": 23},     # plain center crop
+    "av1_convert": {"tier": "fast", "crf": 23},       # AV1 -> H.264 before cropping
+    "av1_preprocess": {"tier": "balanced", "crf": 25},  # AV1 -> H.264 right after download
+}
+
+# Backlog per CPU core -> tiers to step down from the job's base tier
+BACKLOG_STEPS = [(1.0, 0), (2.0, 1), (4.0, 2)]
+MAX_BACKLOG_STEP = 3
+
+# Starting estimate of wall seconds per second of 1080p media on the whole machine,
+# refined from measured encodes
+DEFAULT_SECONDS_PER_MEDIA_SECOND = {
+    "slow": 2.0,
+    "medium": 1.0,
+    "fast": 0.7,
+    "veryfast": 0.4,
+    "ultrafast": 0.2,
+}
+
+
+def x264_args(profile: Dict[str, Any]) -> List[str]:
+    """-preset/-crf/-threads output options for a profile from EncoderProfileService"""
+    args = ['-preset', profile["preset"], '-crf', str(profile["crf"])]
+    if profile.get("threads"):
+        args.extend(['-threads', str(profile["threads"])])
+    return args
+
+
+def decoder_thread_args(profile: Dict[str, Any]) -> List[str]:
+    """-threads input option (goes before -i) so decoding stays within the profile's threads"""
+    if profile.get("threads"):
+        return ['-threads', str(profile["threads"])]
+    return []
+
+
+class EncoderProfileService:
+    """
+    Pick encoder settings from the current backlog and each job's latency target
+
+    The backlog is the number of encodes registered through encode() plus whatever the
+    backlog sources report (e.g. crop tasks waiting for admission). Safe to use from
+    several event loops and threads.
+
+    With a CPUBudget, encode() and encode_async() also hold core tokens for the
+    duration of the encode and set the profile's threads to the tokens granted.
+    """
+
+    def __init__(
+        self,
+        adaptive: bool = True,
+        cores: Optional[int] = None,
+        latency_target_ratio: float = 0.0,
+        history_size: int = 200,
+        budget: Optional[CPUBudget] = None
+    ):
+        """
+        Args:
+            adaptive: False pins every job to its base tier
+            cores: CPU cores shared by the encoders (default: os.cpu_count())
+            latency_target_ratio: Default latency target in wall seconds per media second
+                (0 = only explicit latency targets)
+            history_size: Number of recent tier decisions kept for get_stats()
+            budget: CPU budget encodes take core tokens from (None = no token limit)
+        """
+        self.adaptive = adaptive
+        self.cores = cores or os.cpu_count() or 1
+        self.latency_target_ratio = latency_target_ratio
+
+        self._lock = threading.Lock()
+        self._backlog_sources: Dict[str, Callable[[], int]] = {}
+        self._speed = dict(DEFAULT_SECONDS_PER_MEDIA_SECOND)
+        self.active = 0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self.tier_counts: Dict[str, int] = {tier["tier"]: 0 for tier in ENCODER_TIERS}
+
+        self.budget = budget
+        if budget is not None:
+            # Encodes waiting for cores are backlog too
+            self.add_backlog_source("cpu_budget", lambda: budget.waiting)
+
+    def add_backlog_source(self, name: str, source: Callable[[], int]):
+        """Count queued work reported by source() as backlog (a source with the same name is replaced)"""
+        with self._lock:
+            self._backlog_sources[name] = source
+
+    def backlog(self) -> int:
+        """Encodes running or waiting right now"""
+        with self._lock:
+            sources = list(self._backlog_sources.values())
+            active = self.active
+        queued = 0
+        for source in sources:
+            try:
+                queued += int(source())
+            except Exception as e:
+                logger.debug(f"Backlog source failed: {e}")
+        return active + queued
+
+    def estimate_seconds(self, preset: str, media_seconds: float, backlog: int) -> float:
+        """Expected wall time of one encode while backlog encodes share the cores"""
+        with self._lock:
+            seconds_per_media_second = self._speed.get(preset, 1.0)
+        return media_seconds * seconds_per_media_second * max(1.0, backlog / self.cores)
+
+    def select(
+        self,
+        job: str,
+        clip_id: Optional[str] = None,
+        media_seconds: Optional[float] = None,
+        latency_target_seconds: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Choose the encoder profile for one encode (counting it in the backlog)
+
+        Args:
+            job: Key of ENCODER_JOBS
+            clip_id: Logged with the decision for auditing
+            media_seconds: Duration of the media to encode (needed for latency targets)
+            latency_target_seconds: Wall time the encode should finish in
+
+        Returns:
+            Dict with job, tier, preset, crf, threads and backlog keys
+        """
+        base = ENCODER_JOBS.get(job, ENCODER_JOBS["crop_render"])
+        base_index = next(i for i, tier in enumerate(ENCODER_TIERS) if tier["tier"] == base["tier"])
+        backlog = self.backlog() + 1
+        index = base_index
+        reason = "idle"
+
+        if self.adaptive:
+            pressure = backlog / self.cores
+            step = next((steps for limit, steps in BACKLOG_STEPS if pressure <= limit), MAX_BACKLOG_STEP)
+            index = min(base_index + step, len(ENCODER_TIERS) - 1)
+            if step:
+                reason = f"backlog {backlog} on {self.cores} cores"
+
+            if latency_target_seconds is None and self.latency_target_ratio and media_seconds:
+                latency_target_seconds = media_seconds * self.latency_target_ratio
+            if latency_target_seconds and media_seconds:
+                while (index < len(ENCODER_TIERS) - 1 and
+                       self.estimate_seconds(ENCODER_TIERS[index]["preset"], media_seconds, backlog) > latency_target_seconds):
+                    index += 1
+                    reason = f"latency target {latency_target_seconds:.0f}s"
+
+        tier = ENCODER_TIERS[index]
+        crf_offset = max(0, tier["crf_offset"] - ENCODER_TIERS[base_index]["crf_offset"])
+        profile = {
+            "job": job,
+            "tier": tier["tier"],
+            "preset": tier["preset"],
+            "crf": base["crf"] + crf_offset,
+            # Concurrent encodes split the cores instead of each starting one thread per core
+            "threads": max(1, self.cores // backlog) if backlog > 1 else 0,
+            "backlog": backlog,
+        }
+
+        with self._lock:
+            self.tier_counts[tier["tier"]] += 1
+            self.history.append({**profile, "clip_id": clip_id, "reason": reason, "time": time.time()})
+        logger.info(
+            f"🎚️ Encoder tier '{tier['tier']}' for {job}{f' ({clip_id})' if clip_id else ''}: "
+            f"preset {profile['preset']}, crf {profile['crf']}, threads {profile['threads'] or 'auto'} - {reason}"
+        )
+        return profile
+
+    @contextmanager
+    def encode(
+        self,
+        job: str,
+        clip_id: Optional[str] = None,
+        media_seconds: Optional[float] = None,
+        latency_target_seconds: Optional[float] = None,
+        profile: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Select a profile and count the encode in the backlog until the block exits
+
+        A profile chosen elsewhere (e.g. by the parent of a worker process) is used as-is,
+        without taking CPU tokens - whoever chose it holds them. Encodes that finish
+        normally refine the preset's speed estimate. Blocks while waiting for CPU tokens,
+        so on an event loop use encode_async().
+        """
+        with ExitStack() as stack:
+            if profile is None:
+                profile = self.select(job, clip_id, media_seconds, latency_target_seconds)
+                if self.budget is not None:
+                    grant = stack.enter_context(self.budget.hold(job, profile["threads"] or None))
+                    profile = {**profile, "threads": grant.tokens}
+            yield stack.enter_context(self._track(profile, media_seconds))
+
+    @asynccontextmanager
+    async def encode_async(
+        self,
+        job: str,
+        clip_id: Optional[str] = None,
+        media_seconds: Optional[float] = None,
+        latency_target_seconds: Optional[float] = None,
+        profile: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """encode() for event loops: waits for CPU tokens without blocking the loop"""
+        async with AsyncExitStack() as stack:
+            if profile is None:
+                profile = self.select(job, clip_id, media_seconds, latency_target_seconds)
+                if self.budget is not None:
+                    grant = await stack.enter_async_context(self.budget.reserve(job, profile["threads"] or None))
+                    profile = {**profile, "threads": grant.tokens}
+            yield stack.enter_context(self._track(profile, media_seconds))
+
+    @contextmanager
+    def _track(self, profile: Dict[str, Any], media_seconds: Optional[float]) -> Iterator[Dict[str, Any]]:
+        """Count a running encode and feed its wall time into the speed estimates"""
+        with self._lock:
+            self.active += 1
+            concurrent = self.active
+        start = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.active -= 1
+                concurrent = max(concurrent, self.active + 1)
+                preset = profile.get("preset")
+                if media_seconds and preset in self._speed:
+                    observed = elapsed / media_seconds / max(1.0, concurrent / self.cores)
+                    self._speed[preset] = 0.8 * self._speed[preset] + 0.2 * observed
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            recent = list(self.history)[-20:]
+            return {
+                "adaptive": self.adaptive,
+                "cores": self.cores,
+                "active": self.active,
+                "tier_counts": dict(self.tier_counts),
+                "seconds_per_media_second": {preset: round(value, 3) for preset, value in self._speed.items()},
+                "recent": recent,
+            }
+
+
+# Global encoder profile service
+encoder_profiles = EncoderProfileService(
+    adaptive=os.getenv("ENCODER_ADAPTIVE", "true").lower() == "true",
+    cores=int(os.getenv("ENCODER_CORES", "0")) or None,
+    latency_target_ratio=float(os.getenv("ENCODER_LATENCY_TARGET_RATIO", "0")),
+    budget=cpu_budget
+)
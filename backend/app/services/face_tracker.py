@@ -0,0 +1,169 @@
+"""
+Cheap face tracking between detector runs for the vertical crop engine
+Follows the speaker box with sparse Lucas-Kanade optical flow so MediaPipe only
+has to run again when the track degrades, a scene cuts or the safety stride expires
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]
+
+LK_PARAMS = dict(
+    winSize=(15, 15),
+    maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+)
+
+
+class FaceTracker:
+    """
+    Track one (x, y, x1, y1) box with forward-backward checked LK optical flow
+
+    Points are seeded inside the box at every detection. Each update keeps the
+    points whose forward and backward flow agree; the box moves by their median
+    displacement and scales by their median spread ratio. Confidence is the
+    fraction of seeded points still tracked - it only ever decreases until the
+    next detection re-seeds the tracker.
+    """
+
+    def __init__(
+        self,
+        track_width: int = 320,
+        max_points: int = 40,
+        min_points: int = 6,
+        max_fb_error: float = 1.0,
+        min_confidence: float = 0.5
+    ):
+        """
+        Args:
+            track_width: Frames are downscaled to this width (grayscale) for tracking
+            max_points: Corner features seeded per box
+            min_points: Fewer usable points than this means the track is lost
+            max_fb_error: Forward-backward error (tracking pixels) above which a point is dropped
+            min_confidence: Below this fraction of surviving points the box must be re-detected
+        """
+        self.track_width = track_width
+        self.max_points = max_points
+        self.min_points = min_points
+        self.max_fb_error = max_fb_error
+        self.min_confidence = min_confidence
+
+        self.box: Optional[Box] = None
+        self.confidence = 0.0
+        self._scale = 1.0
+        self._gray: Optional[np.ndarray] = None
+        self._points: Optional[np.ndarray] = None
+        self._seeded_points = 0
+        # Box in tracking coordinates (float), kept separately to avoid rounding drift
+        self._track_box: Optional[np.ndarray] = None
+
+    @property
+    def active(self) -> bool:
+        """Whether the tracker holds a box it is confident about"""
+        return self.box is not None and self.confidence >= self.min_confidence
+
+    def _prepare(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        if w > self.track_width:
+            self._scale = w / self.track_width
+            gray = cv2.resize(gray, (self.track_width, int(round(h / self._scale))), interpolation=cv2.INTER_AREA)
+        else:
+            self._scale = 1.0
+        return gray
+
+    def reset(self):
+        """Drop the current track"""
+        self.box = None
+        self.confidence = 0.0
+        self._gray = None
+        self._points = None
+        self._track_box = None
+
+    def start(self, frame: np.ndarray, box: Box) -> bool:
+        """
+        Seed the tracker with a detected box
+
+        Returns:
+            True if enough trackable features were found inside the box
+        """
+        gray = self._prepare(frame)
+        track_box = np.array(box, dtype=np.float64) / self._scale
+
+        # Seed from the inner 80% of the box so few points land on the background
+        x, y, x1, y1 = track_box
+        inset_x, inset_y = (x1 - x) * 0.1, (y1 - y) * 0.1
+        mask = np.zeros_like(gray)
+        mask[int(y + inset_y):int(np.ceil(y1 - inset_y)), int(x + inset_x):int(np.ceil(x1 - inset_x))] = 255
+        points = cv2.goodFeaturesToTrack(gray, self.max_points, 0.01, 3, mask=mask)
+
+        if points is None or len(points) < self.min_points:
+            self.reset()
+            return False
+
+        self._gray = gray
+        self._points = points.astype(np.float32)
+        self._seeded_points = len(points)
+        self._track_box = track_box
+        self.box = tuple(int(v) for v in box)
+        self.confidence = 1.0
+        return True
+
+    def update(self, frame: np.ndarray) -> Tuple[Optional[Box], float]:
+        """
+        Follow the box into the next frame
+
+        Returns:
+            (box in frame coordinates or None if lost, confidence 0.0-1.0)
+        """
+        if self._points is None:
+            return None, 0.0
+
+        gray = self._prepare(frame)
+        forward, status, _ = cv2.calcOpticalFlowPyrLK(self._gray, gray, self._points, None, **LK_PARAMS)
+        backward, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self._gray, forward, None, **LK_PARAMS)
+
+        fb_error = np.linalg.norm((self._points - backward).reshape(-1, 2), axis=1)
+        good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_fb_error)
+        self.confidence = float(good.sum()) / self._seeded_points
+
+        if good.sum() < self.min_points:
+            self.reset()
+            return None, 0.0
+
+        old_points = self._points.reshape(-1, 2)[good]
+        new_points = forward.reshape(-1, 2)[good]
+
+        # Translation: median displacement; scale: median change of distance to the centroid
+        dx, dy = np.median(new_points - old_points, axis=0)
+        old_spread = np.linalg.norm(old_points - old_points.mean(axis=0), axis=1)
+        new_spread = np.linalg.norm(new_points - new_points.mean(axis=0), axis=1)
+        valid = old_spread > 1e-3
+        scale = float(np.median(new_spread[valid] / old_spread[valid])) if valid.any() else 1.0
+
+        x, y, x1, y1 = self._track_box
+        center_x, center_y = (x + x1) / 2 + dx, (y + y1) / 2 + dy
+        half_w, half_h = (x1 - x) / 2 * scale, (y1 - y) / 2 * scale
+        height, width = gray.shape[:2]
+        if not (0 <= center_x < width and 0 <= center_y < height):
+            # The face left the frame
+            self.reset()
+            return None, 0.0
+
+        self._track_box = np.array([center_x - half_w, center_y - half_h, center_x + half_w, center_y + half_h])
+        self._gray = gray
+        self._points = new_points.reshape(-1, 1, 2)
+
+        x, y, x1, y1 = self._track_box * self._scale
+        frame_h, frame_w = frame.shape[:2]
+        self.box = (
+            int(max(0, x)), int(max(0, y)),
+            int(min(frame_w, x1)), int(min(frame_h, y1))
+        )
+        return self.box, self.confidence
@@ -0,0 +1,415 @@
+"""
+Raw video pipe I/O between FFmpeg and numpy
+Decodes frames into a reusable buffer and encodes frames from stdin without temp files
+"""
+
+import json
+import logging
+import subprocess
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Audio codecs the MP4 muxer accepts as-is, so we can stream-copy instead of re-encoding
+MP4_COPYABLE_AUDIO_CODECS = {"aac", "mp3", "alac"}
+
+
+def probe_audio_codec(video_path: Path) -> Optional[str]:
+    """Return the codec name of the first audio stream, or None if the file has no audio"""
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'a:0',
+        '-show_entries', 'stream=codec_name', '-of', 'csv=p=0',
+        str(video_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=30)
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"⚠️ Could not probe audio stream of {video_path}: {e}")
+        return None
+
+    codec_name = result.stdout.strip().lower()
+    if result.returncode != 0 or not codec_name:
+        return None
+    return codec_name
+
+
+def probe_video_start_offset(video_path: Path) -> float:
+    """
+    Return when the first video frame reaches the filters (seconds), 0.0 if unknown
+
+    FFmpeg rebases input timestamps to the container's start_time, so this is the video
+    stream's start_time minus the container's: non-zero when another stream starts first.
+    """
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'stream=start_time:format=start_time', '-of', 'json',
+        str(video_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=30)
+        data = json.loads(result.stdout or "{}")
+        return max(0.0, float(data["streams"][0]["start_time"]) - float(data["format"]["start_time"]))
+    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError, KeyError, IndexError):
+        return 0.0
+
+
+def audio_output_args(audio_codec: Optional[str]) -> List[str]:
+    """Stream-copy MP4-compatible audio, re-encode anything else to AAC"""
+    if audio_codec in MP4_COPYABLE_AUDIO_CODECS:
+        return ['-c:a', 'copy']
+    return ['-c:a', 'aac', '-b:a', '192k']
+
+
+def h264_output_args(crf: int = 18, preset: str = "fast", threads: Optional[int] = None) -> List[str]:
+    """Standard libx264 settings for cropped clip output (threads: None/0 = FFmpeg's default)"""
+    args = [
+        '-c:v', 'libx264',
+        '-preset', preset,
+        '-crf', str(crf),
+        '-pix_fmt', 'yuv420p',
+    ]
+    if threads:
+        args.extend(['-threads', str(threads)])
+    return args
+
+
+class FFmpegFrameReader:
+    """
+    Decode a video into BGR frames over a rawvideo pipe
+
+    A single frame buffer is allocated up front and refilled on every read(),
+    so callers must copy the returned array if they need it after the next read.
+    """
+
+    def __init__(
+        self,
+        video_path: Path,
+        width: int,
+        height: int,
+        video_filter: Optional[str] = None,
+        input_args: Optional[List[str]] = None
+    ):
+        self.video_path = Path(video_path)
+        self.width = width
+        self.height = height
+        self.video_filter = video_filter
+        self.input_args = input_args or []
+
+        self.frame_size = width * height * 3
+        self.buffer = np.empty((height, width, 3), dtype=np.uint8)
+        self._view = memoryview(self.buffer).cast("B")
+        self.process: Optional[subprocess.Popen] = None
+        self.frames_read = 0
+
+    def _build_command(self) -> List[str]:
+        cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            *self.input_args,
+            '-i', str(self.video_path),
+            '-map', '0:v:0',
+        ]
+        if self.video_filter:
+            cmd.extend(['-vf', self.video_filter])
+        cmd.extend([
+            '-fps_mode', 'passthrough',  # One output frame per decoded frame, no dup/drop
+            '-f', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            'pipe:1'
+        ])
+        return cmd
+
+    def start(self) -> "FFmpegFrameReader":
+        """Spawn the decoder process"""
+        cmd = self._build_command()
+        logger.debug(f"🎞️ Starting FFmpeg decoder: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            bufsize=self.frame_size
+        )
+        return self
+
+    def read(self, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """
+        Read the next frame into the shared buffer (or into `out`)
+
+        Args:
+            out: Optional caller-owned (height, width, 3) uint8 buffer to decode into
+
+        Returns:
+            The filled buffer, or None at end of stream
+        """
+        if self.process is None:
+            self.start()
+
+        target = self.buffer if out is None else out
+        view = self._view if out is None else memoryview(out).cast("B")
+        stdout = self.process.stdout
+        filled = 0
+        while filled < self.frame_size:
+            chunk = stdout.readinto(view[filled:])
+            if not chunk:
+                break
+            filled += chunk
+
+        if filled < self.frame_size:
+            if filled:
+                logger.warning(f"⚠️ Truncated frame at end of stream ({filled}/{self.frame_size} bytes) - dropped")
+            return None
+
+        self.frames_read += 1
+        return target
+
+    def close(self) -> int:
+        """Stop the decoder and return its exit code"""
+        if self.process is None:
+            return 0
+
+        process = self.process
+        self.process = None
+        if process.poll() is None:
+            # We may stop reading before EOF (e.g. on error) - don't wait on a blocked writer
+            process.stdout.close()
+            try:
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+        else:
+            process.stdout.close()
+
+        stderr = process.stderr.read().decode(errors='replace').strip() if process.stderr else ""
+        if process.stderr:
+            process.stderr.close()
+        if process.returncode not in (0, None) and stderr:
+            logger.debug(f"FFmpeg decoder exited with {process.returncode}: {stderr}")
+        return process.returncode
+
+    def __enter__(self) -> "FFmpegFrameReader":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def analysis_frame_size(source_size: Tuple[int, int], analysis_width: int) -> Tuple[int, int]:
+    """Downscaled (even) analysis resolution; sources narrower than analysis_width stay as-is"""
+    source_width, source_height = source_size
+    if not analysis_width or source_width <= analysis_width:
+        return source_width, source_height
+    height = int(round(source_height * analysis_width / source_width / 2)) * 2
+    return analysis_width, max(2, height)
+
+
+class AnalysisProxyReader(FFmpegFrameReader):
+    """
+    Low-rate, downscaled proxy stream for analysis stages
+
+    FFmpeg drops unwanted frames with a select filter before scaling, so only the
+    sampled frames are scaled and piped - the caller never sees full-size frames.
+    The decoder also skips the in-loop deblocking filter, whose effect is invisible
+    at proxy resolution. read_indexed() pairs every proxy frame with its source frame index.
+    """
+
+    def __init__(
+        self,
+        video_path: Path,
+        source_size: Tuple[int, int],
+        width: int = 256,
+        frame_step: int = 1,
+        extra_frames: Iterable[int] = (),
+        input_args: Optional[List[str]] = None,
+        fast_decode: bool = True
+    ):
+        """
+        Args:
+            source_size: (width, height) of the source video
+            width: Proxy width (0 = source resolution)
+            frame_step: Keep every frame_step-th source frame
+            extra_frames: Source frame indices to keep in addition (e.g. first frames after cuts)
+            fast_decode: Skip the decoder's deblocking filter
+        """
+        self.source_size = tuple(source_size)
+        self.frame_step = max(1, int(frame_step))
+        self.extra_frames = sorted(set(int(frame) for frame in extra_frames if frame >= 0))
+        proxy_width, proxy_height = analysis_frame_size(source_size, width)
+
+        filters = []
+        if self.frame_step > 1 or self.extra_frames:
+            terms = [f"not(mod(n\\,{self.frame_step}))"] if self.frame_step > 1 else []
+            terms += [f"eq(n\\,{frame})" for frame in self.extra_frames]
+            filters.append(f"select={'+'.join(terms)}")
+        if (proxy_width, proxy_height) != self.source_size:
+            filters.append(f"scale={proxy_width}:{proxy_height}:flags=area")
+
+        decode_args = ['-skip_loop_filter', 'all'] if fast_decode else []
+        super().__init__(
+            video_path, proxy_width, proxy_height,
+            video_filter=",".join(filters) or None, input_args=decode_args + (input_args or [])
+        )
+        self._extra = set(self.extra_frames)
+        self._next_index = 0
+
+    def _selected(self, frame_index: int) -> bool:
+        return frame_index % self.frame_step == 0 or frame_index in self._extra
+
+    def source_indices(self, total_frames: int) -> List[int]:
+        """Source frame indices the proxy yields for a clip of total_frames"""
+        return [index for index in range(total_frames) if self._selected(index)]
+
+    def read_indexed(self, out: Optional[np.ndarray] = None) -> Tuple[Optional[int], Optional[np.ndarray]]:
+        """
+        Read the next proxy frame
+
+        Returns:
+            (source frame index, frame) or (None, None) at end of stream
+        """
+        frame = self.read(out)
+        if frame is None:
+            return None, None
+
+        index = self._next_index
+        while not self._selected(index):
+            index += 1
+        self._next_index = index + 1
+        return index, frame
+
+    def __iter__(self) -> Iterator[Tuple[int, np.ndarray]]:
+        while True:
+            index, frame = self.read_indexed()
+            if frame is None:
+                return
+            yield index, frame
+
+
+class FFmpegFrameWriter:
+    """
+    Encode BGR frames written to stdin as H.264 and mux the source audio in the same process
+
+    Replaces the cv2.VideoWriter (mp4v) temp file + separate audio merge pass.
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        width: int,
+        height: int,
+        fps: float,
+        audio_source: Optional[Path] = None,
+        audio_codec: Optional[str] = None,
+        crf: int = 18,
+        preset: str = "fast",
+        extra_output_args: Optional[List[str]] = None,
+        threads: Optional[int] = None
+    ):
+        self.output_path = Path(output_path)
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.audio_source = Path(audio_source) if audio_source else None
+        self.audio_codec = audio_codec
+        self.crf = crf
+        self.preset = preset
+        self.threads = threads
+        self.extra_output_args = extra_output_args or []
+
+        self.process: Optional[subprocess.Popen] = None
+        self.frames_written = 0
+
+    def _build_command(self) -> List[str]:
+        cmd = [
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}',
+            '-r', f'{self.fps:.6f}'.rstrip('0').rstrip('.'),
+            '-i', 'pipe:0',
+        ]
+
+        if self.audio_source is not None and self.audio_codec:
+            cmd.extend(['-i', str(self.audio_source), '-map', '0:v:0', '-map', '1:a:0'])
+            cmd.extend(audio_output_args(self.audio_codec))
+            cmd.append('-shortest')
+        else:
+            cmd.extend(['-map', '0:v:0'])
+
+        cmd.extend([
+            *h264_output_args(self.crf, self.preset, self.threads),
+            *self.extra_output_args,
+            '-movflags', '+faststart',
+            '-y', str(self.output_path)
+        ])
+        return cmd
+
+    def start(self) -> "FFmpegFrameWriter":
+        """Spawn the encoder process"""
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        cmd = self._build_command()
+        logger.debug(f"🎞️ Starting FFmpeg encoder: {' '.join(cmd)}")
+        self.process = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        return self
+
+    def write(self, frame: np.ndarray):
+        """Write one BGR frame of the configured size"""
+        if self.process is None:
+            self.start()
+
+        if not frame.flags['C_CONTIGUOUS']:
+            frame = np.ascontiguousarray(frame)
+
+        try:
+            self.process.stdin.write(memoryview(frame).cast("B"))
+        except BrokenPipeError:
+            stderr = self.process.stderr.read().decode(errors='replace').strip()
+            raise Exception(f"FFmpeg encoder exited early: {stderr or 'broken pipe'}")
+        self.frames_written += 1
+
+    def close(self) -> int:
+        """Flush stdin, wait for the encoder and return its exit code"""
+        if self.process is None:
+            return 0
+
+        process = self.process
+        self.process = None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        process.stderr.close()
+        process.wait()
+
+        if process.returncode != 0:
+            logger.error(f"❌ FFmpeg encoder failed ({process.returncode}): {stderr}")
+        return process.returncode
+
+    def abort(self):
+        """Kill the encoder without finalizing the output"""
+        if self.process is None:
+            return
+        process = self.process
+        self.process = None
+        process.kill()
+        process.wait()
+        for stream in (process.stdin, process.stderr):
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def __enter__(self) -> "FFmpegFrameWriter":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+        else:
+            self.close()
@@ -14,10 +14,47 @@ from pathlib import Path
 from typing import List, Tuple, Dict, Any, Optional, Generator
 import subprocess
 import uuid
-import mediapipe as mp
+
+from .ffmpeg_pipe import FFmpegFrameReader, FFmpegFrameWriter, probe_audio_codec
 
 logger = logging.getLogger(__name__)
 
+# Ultra-high quality encoding presets
+QUALITY_PRESETS = {
+    'ultra': {
+        'crf': '15',           # Near-lossless quality
+        'preset': 'slower',    # Best compression efficiency
+        'profile': 'high',     # H.264 high profile
+        'level': '4.2',        # Support 4K
+        'pix_fmt': 'yuv420p',  # Standard compatibility
+        'extra': ['-tune', 'film', '-movflags', '+faststart']
+    },
+    'high': {
+        'crf': '18',           # Visually lossless
+        'preset': 'slow',      # Good compression
+        'profile': 'high',
+        'level': '4.1',
+        'pix_fmt': 'yuv420p',
+        'extra': ['-movflags', '+faststart']
+    },
+    'balanced': {
+        'crf': '21',           # High quality
+        'preset': 'medium',    # Balanced speed/quality
+        'profile': 'main',
+        'level': '4.0',
+        'pix_fmt': 'yuv420p',
+        'extra': ['-movflags', '+faststart']
+    },
+    'fast': {
+        'crf': '23',           # Good quality
+        'preset': 'fast',      # Fast encoding
+        'profile': 'main',
+        'level': '3.1',
+        'pix_fmt': 'yuv420p',
+        'extra': []
+    }
+}
+
 class FFmpegVideoProcessor:
     """
     High-quality video processor using FFmpeg for I/O and MediaPipe for face detection
@@ -25,7 +62,8 @@ class FFmpegVideoProcessor:
     """
     
     def __init__(self):
-        # Initialize MediaPipe Face Detection
+        # Initialize MediaPipe Face Detection (imported here - it takes most of a second to load)
+        import mediapipe as mp
         self.mp_face_detection = mp.solutions.face_detection
         self.face_detector = self.mp_face_detection.FaceDetection(
             model_selection=1,  # 1 for videos (better range)
@@ -40,11 +78,16 @@ class FFmpegVideoProcessor:
             '-show_streams', str(video_path)
         ]
         
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            # FFmpeg builds without ffprobe (e.g. imageio-ffmpeg) - read the container via OpenCV
+            logger.warning("⚠️ ffprobe not found - reading video info with OpenCV")
+            return self._get_video_info_opencv(video_path)
         
         stdout, stderr = await process.communicate()
         
@@ -73,6 +116,27 @@ class FFmpegVideoProcessor:
             'frames': int(video_stream.get('nb_frames', 0))
         }
     
+    def _get_video_info_opencv(self, video_path: Path) -> Dict[str, Any]:
+        """get_video_info() fallback when ffprobe is unavailable"""
+        cap = cv2.VideoCapture(str(video_path))
+        if not cap.isOpened():
+            raise Exception(f"Could not open video: {video_path}")
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+            return {
+                'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                'fps': fps,
+                'duration': frames / fps if fps else 0.0,
+                'codec': "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip().lower(),
+                'bitrate': 0,
+                'frames': frames
+            }
+        finally:
+            cap.release()
+    
     async def extract_frames_high_quality(
         self, 
         video_path: Path, 
@@ -126,7 +190,10 @@ class FFmpegVideoProcessor:
         frame = cv2.imread(str(frame_path))
         if frame is None:
             return []
-        
+        return self.detect_faces(frame)
+    
+    def detect_faces(self, frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """Detect faces in a decoded BGR frame using MediaPipe"""
         try:
             h, w = frame.shape[:2]
             
@@ -161,6 +228,56 @@ class FFmpegVideoProcessor:
             logger.error(f"Face detection error: {e}")
             return []
     
+    def vertical_crop_window(
+        self,
+        frame_size: Tuple[int, int],
+        faces: List[Tuple[int, int, int, int]],
+        target_size: Tuple[int, int],
+        crop_position: Optional[Tuple[int, int]] = None
+    ) -> Tuple[int, int, int, int]:
+        """
+        Crop rectangle (left, top, width, height) for one frame
+        
+        Centered on crop_position, else the first face, else the frame center.
+        """
+        w, h = frame_size
+        target_width, target_height = target_size
+        
+        # Determine crop center
+        if crop_position:
+            crop_x, crop_y = crop_position
+        elif faces:
+            # Use first detected face
+            x, y, x1, y1 = faces[0]
+            crop_x = (x + x1) // 2
+            crop_y = (y + y1) // 2
+        else:
+            # Center crop (better than the old 75% right fallback!)
+            crop_x = w // 2
+            crop_y = h // 2
+        
+        # Calculate crop dimensions maintaining aspect ratio
+        if w / h > target_width / target_height:
+            # Wide video - fit height, crop width
+            crop_height = h
+            crop_width = int(h * target_width / target_height)
+        else:
+            # Tall video - fit width, crop height  
+            crop_width = w
+            crop_height = int(w * target_height / target_width)
+        
+        # Calculate crop coordinates
+        left = max(0, crop_x - crop_width // 2)
+        top = max(0, crop_y - crop_height // 2)
+        
+        # Adjust if crop exceeds boundaries
+        if left + crop_width > w:
+            left = w - crop_width
+        if top + crop_height > h:
+            top = h - crop_height
+        
+        return left, top, crop_width, crop_height
+    
     async def crop_frame_to_vertical(
         self, 
         frame_path: Path, 
@@ -184,39 +301,7 @@ class FFmpegVideoProcessor:
             frame = cv2.imread(str(frame_path))
             h, w = frame.shape[:2]
             target_width, target_height = target_size
-            
-            # Determine crop center
-            if crop_position:
-                crop_x, crop_y = crop_position
-            elif faces:
-                # Use first detected face
-                x, y, x1, y1 = faces[0]
-                crop_x = (x + x1) // 2
-                crop_y = (y + y1) // 2
-            else:
-                # Center crop (better than the old 75% right fallback!)
-                crop_x = w // 2
-                crop_y = h // 2
-            
-            # Calculate crop dimensions maintaining aspect ratio
-            if w / h > target_width / target_height:
-                # Wide video - fit height, crop width
-                crop_height = h
-                crop_width = int(h * target_width / target_height)
-            else:
-                # Tall video - fit width, crop height  
-                crop_width = w
-                crop_height = int(w * target_height / target_width)
-            
-            # Calculate crop coordinates
-            left = max(0, crop_x - crop_width // 2)
-            top = max(0, crop_y - crop_height // 2)
-            
-            # Adjust if crop exceeds boundaries
-            if left + crop_width > w:
-                left = w - crop_width
-            if top + crop_height > h:
-                top = h - crop_height
+            left, top, crop_width, crop_height = self.vertical_crop_window((w, h), faces, target_size, crop_position)
             
             # Use FFmpeg for high-quality cropping and scaling
             cmd = [
@@ -264,43 +349,7 @@ class FFmpegVideoProcessor:
             quality_preset: 'ultra', 'high', 'balanced', 'fast'
         """
         try:
-            # Ultra-high quality encoding presets
-            quality_presets = {
-                'ultra': {
-                    'crf': '15',           # Near-lossless quality
-                    'preset': 'slower',    # Best compression efficiency
-                    'profile': 'high',     # H.264 high profile
-                    'level': '4.2',        # Support 4K
-                    'pix_fmt': 'yuv420p',  # Standard compatibility
-                    'extra': ['-tune', 'film', '-movflags', '+faststart']
-                },
-                'high': {
-                    'crf': '18',           # Visually lossless
-                    'preset': 'slow',      # Good compression
-                    'profile': 'high',
-                    'level': '4.1',
-                    'pix_fmt': 'yuv420p',
-                    'extra': ['-movflags', '+faststart']
-                },
-                'balanced': {
-                    'crf': '21',           # High quality
-                    'preset': 'medium',    # Balanced speed/quality
-                    'profile': 'main',
-                    'level': '4.0',
-                    'pix_fmt': 'yuv420p',
-                    'extra': ['-movflags', '+faststart']
-                },
-                'fast': {
-                    'crf': '23',           # Good quality
-                    'preset': 'fast',      # Fast encoding
-                    'profile': 'main',
-                    'level': '3.1',
-                    'pix_fmt': 'yuv420p',
-                    'extra': []
-                }
-            }
-            
-            preset = quality_presets.get(quality_preset, quality_presets['high'])
+            preset = QUALITY_PRESETS.get(quality_preset, QUALITY_PRESETS['high'])
             
             # Base command for video reconstruction
             cmd = [
@@ -348,18 +397,128 @@ class FFmpegVideoProcessor:
             logger.error(f"Error reconstructing video: {e}")
             return False
     
-    async def process_video_to_vertical_ultra_quality(
+    def _stream_crop_frames(
+        self,
+        reader: FFmpegFrameReader,
+        writer: FFmpegFrameWriter,
+        target_size: Tuple[int, int],
+        use_face_detection: bool
+    ) -> int:
+        """Decode → detect → crop → encode loop of the streaming pipeline (runs in a worker thread)"""
+        processed_frames = 0
+        previous_crop_center = None
+        while (frame := reader.read()) is not None:
+            h, w = frame.shape[:2]
+            faces = self.detect_faces(frame) if use_face_detection else []
+            left, top, crop_width, crop_height = self.vertical_crop_window(
+                (w, h), faces, target_size, previous_crop_center
+            )
+            writer.write(frame[top:top + crop_height, left:left + crop_width])
+            processed_frames += 1
+            # Update crop center for smoothing (basic implementation)
+            if faces:
+                x, y, x1, y1 = faces[0]
+                previous_crop_center = ((x + x1) // 2, (y + y1) // 2)
+        return processed_frames
+    
+    async def process_video_to_vertical_streaming(
         self,
         input_video: Path,
         output_video: Path,
         target_size: Tuple[int, int] = (608, 1080),
         quality_preset: str = "ultra",
         use_face_detection: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Streaming pipeline: one FFmpeg decoder → face detection + crop in memory → one FFmpeg encoder
+        
+        Same crop logic and quality presets as the frame-file pipeline, without writing
+        a single frame to disk. The encoder does the lanczos scale and muxes the source audio.
+        """
+        reader = None
+        writer = None
+        try:
+            logger.info(f"🚀 Starting ultra-quality streaming processing: {input_video}")
+            
+            video_info = await self.get_video_info(input_video)
+            width, height = video_info['width'], video_info['height']
+            logger.info(f"📹 Video: {width}x{height}, {video_info['fps']} fps, {video_info['codec']}")
+            
+            preset = QUALITY_PRESETS.get(quality_preset, QUALITY_PRESETS['high'])
+            target_width, target_height = target_size
+            _, _, crop_width, crop_height = self.vertical_crop_window((width, height), [], target_size)
+            
+            # The frame writer always adds +faststart; keep the rest of the preset's extra args (e.g. -tune)
+            extra = preset['extra']
+            tune_args = [arg for flag, value in zip(extra[::2], extra[1::2]) if flag != '-movflags' for arg in (flag, value)]
+            
+            reader = FFmpegFrameReader(input_video, width, height).start()
+            writer = FFmpegFrameWriter(
+                output_video, crop_width, crop_height, video_info['fps'],
+                audio_source=input_video, audio_codec=probe_audio_codec(input_video),
+                crf=int(preset['crf']), preset=preset['preset'],
+                extra_output_args=[
+                    '-vf', f'scale={target_width}:{target_height}:flags=lanczos',
+                    '-profile:v', preset['profile'],
+                    '-level', preset['level'],
+                    *tune_args
+                ]
+            ).start()
+            
+            loop = asyncio.get_event_loop()
+            processed_frames = await loop.run_in_executor(
+                None, self._stream_crop_frames, reader, writer, target_size, use_face_detection
+            )
+            reader.close()
+            returncode = writer.close()
+            if returncode != 0:
+                raise Exception(f"FFmpeg encoder exited with code {returncode}")
+            
+            logger.info(f"🎉 Ultra-quality streaming completed: {processed_frames} frames ({quality_preset}, CRF {preset['crf']})")
+            return {
+                'success': True,
+                'output_path': str(output_video),
+                'original_resolution': f"{width}x{height}",
+                'target_resolution': f"{target_width}x{target_height}",
+                'frames_processed': processed_frames,
+                'quality_preset': quality_preset,
+                'face_detection_used': use_face_detection,
+                'codec': video_info['codec'],
+                'streaming': True
+            }
+        except Exception as e:
+            logger.error(f"❌ Ultra-quality streaming failed: {e}")
+            if writer is not None:
+                writer.abort()
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        finally:
+            if reader is not None:
+                reader.close()
+    
+    async def process_video_to_vertical_ultra_quality(
+        self,
+        input_video: Path,
+        output_video: Path,
+        target_size: Tuple[int, int] = (608, 1080),
+        quality_preset: str = "ultra",
+        use_face_detection: bool = True,
+        streaming: bool = True
     ) -> Dict[str, Any]:
         """
         Complete pipeline: Video → Frames → Face Detection → Crop → Reconstruct
         Using FFmpeg for maximum quality preservation
+        
+        streaming=True pipes frames through memory (process_video_to_vertical_streaming);
+        False uses the original PNG frame files on disk.
         """
+        if streaming:
+            return await self.process_video_to_vertical_streaming(
+                input_video, output_video, target_size, quality_preset, use_face_detection
+            )
+        
         temp_dir = None
         try:
             # Create temporary directory for frames
@@ -441,5 +600,12 @@ class FFmpegVideoProcessor:
                 shutil.rmtree(temp_dir)
                 logger.info("🧹 Temporary files cleaned up")
 
-# Global instance
-ffmpeg_processor = FFmpegVideoProcessor() 
\ No newline at end of file
+# Global instance, created on first use
+_ffmpeg_processor: Optional[FFmpegVideoProcessor] = None
+
+async def get_ffmpeg_processor() -> FFmpegVideoProcessor:
+    """Get the global FFmpeg video processor instance"""
+    global _ffmpeg_processor
+    if _ffmpeg_processor is None:
+        _ffmpeg_processor = FFmpegVideoProcessor()
+    return _ffmpeg_processor
@@ -0,0 +1,227 @@
+"""
+Stage pipeline for the per-frame vertical crop loop
+Decode, face detection and crop/encode run concurrently, connected by bounded queues
+"""
+
+import asyncio
+import heapq
+import logging
+import queue
+import threading
+import time
+from typing import Optional, Callable, Any, Dict, Tuple
+
+import numpy as np
+
+from .ffmpeg_pipe import FFmpegFrameReader, FFmpegFrameWriter
+
+logger = logging.getLogger(__name__)
+
+
+class StageStats:
+    """Throughput and queue-depth counters for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, count: int = 1):
+        """Account for `count` items processed in `seconds` of stage work"""
+        with self._lock:
+            self.items += count
+            self.busy_seconds += seconds
+
+    def observe_queue(self, depth: int):
+        """Record the current depth of the stage's input queue"""
+        self.queue_depth = depth
+        if depth > self.max_queue_depth:
+            self.max_queue_depth = depth
+
+    def as_dict(self, elapsed_seconds: float) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput_fps": round(self.items / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+            "utilization": round(self.busy_seconds / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+        }
+
+
+class FrameDecoderThread:
+    """
+    Decode frames on a background thread into a fixed pool of buffers
+
+    The pool size caps how many decoded frames can be in flight across all
+    later stages; consumers hand buffers back with release() once encoded.
+    """
+
+    def __init__(
+        self,
+        reader: FFmpegFrameReader,
+        loop: asyncio.AbstractEventLoop,
+        pool_size: int,
+        analyze: Optional[Callable[[np.ndarray], Any]] = None
+    ):
+        """
+        Args:
+            reader: Frame reader (started by the thread if needed)
+            loop: Event loop that consumes the decoded frames
+            pool_size: Number of frame buffers
+            analyze: Optional cheap per-frame function run on the decoder thread
+                (e.g. frame differencing); its result travels with the frame
+        """
+        self.reader = reader
+        self.loop = loop
+        self.analyze = analyze
+        self.pool_size = pool_size
+        self.stats = StageStats("decode")
+
+        self._free: "queue.Queue[Optional[np.ndarray]]" = queue.Queue()
+        for _ in range(pool_size):
+            self._free.put(np.empty((reader.height, reader.width, 3), dtype=np.uint8))
+        self._output: asyncio.Queue = asyncio.Queue()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="crop-decoder", daemon=True)
+
+    def start(self) -> "FrameDecoderThread":
+        self._thread.start()
+        return self
+
+    def _emit(self, item: Any):
+        try:
+            self.loop.call_soon_threadsafe(self._output.put_nowait, item)
+        except RuntimeError:
+            # Event loop already closed - nobody is waiting for frames any more
+            pass
+
+    def _run(self):
+        index = 0
+        try:
+            while not self._stopped:
+                buffer = self._free.get()
+                if buffer is None or self._stopped:
+                    break
+                start = time.perf_counter()
+                frame = self.reader.read(out=buffer)
+                if frame is None:
+                    break
+                info = self.analyze(frame) if self.analyze else None
+                self.stats.record(time.perf_counter() - start)
+                self._emit((index, frame, info))
+                index += 1
+        except Exception as e:
+            logger.error(f"❌ Decoder stage failed at frame {index}: {e}")
+            self._emit(e)
+        finally:
+            self._emit(None)
+
+    async def get(self) -> Optional[Tuple[int, np.ndarray, Any]]:
+        """Next (frame_index, buffer, analyze_result) in decode order, or None at end of stream"""
+        item = await self._output.get()
+        self.stats.observe_queue(self._output.qsize())
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def release(self, buffer: np.ndarray):
+        """Return a buffer to the pool"""
+        self._free.put(buffer)
+
+    def stop(self):
+        """Stop decoding early (error path)"""
+        self._stopped = True
+        self._free.put(None)
+        process = self.reader.process
+        if process is not None and process.poll() is None:
+            process.kill()
+        self._thread.join(timeout=10)
+
+
+class FrameWriterThread:
+    """
+    Crop/encode stage: renders queued frames in frame order and feeds the encoder
+
+    Items may arrive out of order; they are held until every earlier frame has been written.
+    After an error the thread keeps draining its queue (releasing buffers) so upstream
+    stages never block on a full pipeline.
+    """
+
+    def __init__(
+        self,
+        writer: FFmpegFrameWriter,
+        render: Callable[[Any], np.ndarray],
+        release: Optional[Callable[[Any], None]] = None,
+        max_queue: int = 8
+    ):
+        """
+        Args:
+            writer: Started frame writer
+            render: Turns a queued payload into the output frame (crop + resize)
+            release: Called with every payload once it is no longer needed
+            max_queue: Input queue capacity
+        """
+        self.writer = writer
+        self.render = render
+        self.release = release
+        self.stats = StageStats("crop_encode")
+        self.error: Optional[Exception] = None
+        self._aborted = False
+
+        self._input: "queue.Queue[Optional[Tuple[int, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name="crop-writer", daemon=True)
+
+    def start(self) -> "FrameWriterThread":
+        self._thread.start()
+        return self
+
+    def put(self, frame_index: int, payload: Any):
+        """Queue a frame for cropping and encoding"""
+        if self.error is not None:
+            raise self.error
+        self._input.put((frame_index, payload))
+        self.stats.observe_queue(self._input.qsize())
+
+    def _run(self):
+        reorder: list = []
+        next_index = 0
+        while True:
+            item = self._input.get()
+            if item is None:
+                break
+            heapq.heappush(reorder, (item[0], id(item[1]), item[1]))
+            while reorder and reorder[0][0] == next_index:
+                _, _, payload = heapq.heappop(reorder)
+                if self.error is None and not self._aborted:
+                    try:
+                        start = time.perf_counter()
+                        self.writer.write(self.render(payload))
+                        self.stats.record(time.perf_counter() - start)
+                    except Exception as e:
+                        logger.error(f"❌ Crop/encode stage failed at frame {next_index}: {e}")
+                        self.error = e
+                if self.release:
+                    self.release(payload)
+                next_index += 1
+
+        # Anything left means frames never arrived - release what we hold
+        for _, _, payload in reorder:
+            if self.release:
+                self.release(payload)
+
+    def close(self):
+        """Wait until every queued frame is written; re-raise a stage error"""
+        self._input.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def abort(self):
+        """Drop queued frames without writing them (error path)"""
+        self._aborted = True
+        self._input.put(None)
+        self._thread.join()
@@ -10,9 +10,6 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
-import groq
-from pydub import AudioSegment
-from pydub.silence import detect_silence
 
 from app.exceptions import TranscriptionError, VADError
 
@@ -33,6 +30,7 @@ class GroqClient:
         if not self.api_key:
             raise ValueError("GROQ_API_KEY environment variable not set")
         
+        import groq
         self.client = groq.Groq(api_key=self.api_key)
         self.model = "whisper-large-v3"
         self.max_file_size_mb = 25  # Groq's file size limit
@@ -64,6 +62,7 @@ class GroqClient:
             logger.info(f"🔧 Splitting large audio file into chunks (task_id: {task_id})")
             
             # Load the audio file
+            from pydub import AudioSegment
             audio = AudioSegment.from_file(file_path)
             duration_ms = len(audio)
             duration_seconds = duration_ms / 1000
@@ -225,6 +224,8 @@ class GroqClient:
             logger.info(f"Applying VAD filtering to {audio_path} (threshold: {silence_threshold}dB, min_duration: {min_silence_duration}ms)")
             
             # Load audio
+            from pydub import AudioSegment
+            from pydub.silence import detect_silence
             audio = AudioSegment.from_file(audio_path)
             
             # Detect silent segments
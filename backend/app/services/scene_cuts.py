@@ -0,0 +1,412 @@
+"""
+Fast scene-cut detection on a tiny grayscale proxy
+FFmpeg scales every frame to 64x36 luma inside the decoder; cut scores are
+computed over whole blocks of frames with numpy, and results are cached on disk
+per source and time range so re-renders of a clip skip the scan, in any worker
+process
+"""
+
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SCENE_PROXY_SIZE = (64, 36)
+HISTOGRAM_BINS = 32
+
+# Frames decoded and scored per numpy block (64x36 luma: ~9 MB per block)
+BLOCK_FRAMES = 4096
+
+# Standardized frames are compared with this floor on the contrast, so near-flat
+# frames (black, title cards) don't turn encoder noise into structure
+MIN_FRAME_STD = 8.0
+
+# Unrelated frames differ by ~1.13 standardized units per pixel; this maps that to ~144
+STRUCTURE_SCALE = 128.0
+
+# Bumped whenever detection changes what it finds for the same inputs
+SCENE_CUT_CACHE_VERSION = 1
+
+
+def source_fingerprint(video_path: Path) -> str:
+    """Cheap identity of a file on disk: resolved path, size and mtime"""
+    stat = os.stat(video_path)
+    return f"{Path(video_path).resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def probe_frame_rate(video_path: Path) -> float:
+    """Frame rate from container metadata, 30.0 if unknown"""
+    import cv2
+
+    cap = cv2.VideoCapture(str(video_path))
+    try:
+        return (cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0) or 30.0
+    finally:
+        cap.release()
+
+
+def gray_proxy_command(
+    video_path: Path,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    size: Tuple[int, int] = SCENE_PROXY_SIZE
+) -> List[str]:
+    """FFmpeg command that writes 8-bit luma frames at proxy size to stdout"""
+    cmd = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-skip_loop_filter', 'all']
+    if start_time > 0:
+        cmd.extend(['-ss', f"{start_time:.3f}"])
+    if end_time is not None:
+        cmd.extend(['-to', f"{end_time:.3f}"])
+    cmd.extend([
+        '-i', str(video_path),
+        '-map', '0:v:0',
+        '-vf', f"scale={size[0]}:{size[1]}:flags=area",
+        '-fps_mode', 'passthrough',
+        '-f', 'rawvideo',
+        '-pix_fmt', 'gray',
+        'pipe:1'
+    ])
+    return cmd
+
+
+def frame_features(frames: np.ndarray, previous: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Content scores and mean luma for a block of proxy frames
+
+    The content score of a frame compares it with the frame before it, on a 0-255
+    scale: the average of a structure term (mean absolute difference of the
+    contrast-normalized frames) and a histogram term (L1 distance of the
+    normalized luma histograms). Brightness changes move the histogram, camera
+    and subject motion barely move either, a cut moves both.
+
+    Args:
+        frames: (n, height, width) uint8 luma frames
+        previous: Last frame of the preceding block (None = the block starts the stream)
+
+    Returns:
+        (scores, means), both shape (n,); the first frame of a stream scores 0
+    """
+    count = len(frames)
+    if previous is not None:
+        frames = np.concatenate([previous[None], frames])
+    flat = frames.reshape(len(frames), -1).astype(np.float32)
+
+    means = flat.mean(axis=1)
+    centered = flat - means[:, None]
+    stds = np.sqrt((centered * centered).mean(axis=1))
+    standardized = centered / np.maximum(stds, MIN_FRAME_STD)[:, None]
+    structure = np.abs(np.diff(standardized, axis=0)).mean(axis=1) * STRUCTURE_SCALE
+
+    # One bincount over the whole block: bin index offset by frame number
+    bins = frames.reshape(len(frames), -1) // (256 // HISTOGRAM_BINS)
+    offsets = (np.arange(len(frames), dtype=np.int64) * HISTOGRAM_BINS)[:, None]
+    histograms = np.bincount((bins + offsets).ravel(), minlength=len(frames) * HISTOGRAM_BINS)
+    histograms = histograms.reshape(len(frames), HISTOGRAM_BINS) / flat.shape[1]
+    histogram = np.abs(np.diff(histograms, axis=0)).sum(axis=1) * 0.5 * 255.0
+
+    scores = np.minimum(0.5 * (structure + histogram), 255.0)
+    if previous is None:
+        scores = np.concatenate([[0.0], scores])
+    else:
+        means = means[1:]
+    return scores.astype(np.float32)[-count:], means.astype(np.float32)[-count:]
+
+
+def pick_content_cuts(scores: np.ndarray, threshold: float, adaptive_ratio: float, window: int = 2) -> np.ndarray:
+    """
+    Frames whose score passes threshold and stands out from its neighbours
+
+    A cut is one spike; fast motion raises a whole run of frames. A frame only
+    counts when its score is adaptive_ratio times the mean of the `window`
+    frames on either side of it.
+    """
+    if len(scores) < 2:
+        return np.empty(0, dtype=np.int64)
+    padded = np.pad(scores, window, mode="edge")
+    neighbourhood = np.lib.stride_tricks.sliding_window_view(padded, 2 * window + 1)
+    neighbour_mean = (neighbourhood.sum(axis=1) - scores) / (2 * window)
+    candidates = (scores >= threshold) & (scores >= adaptive_ratio * neighbour_mean)
+    candidates[0] = False
+    return np.flatnonzero(candidates)
+
+
+def pick_fade_cuts(means: np.ndarray, fade_threshold: float) -> np.ndarray:
+    """Midpoints of dark runs that have lit frames on both sides (fade out -> fade in)"""
+    dark = (means < fade_threshold).astype(np.int8)
+    edges = np.diff(np.concatenate([[0], dark, [0]]))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    inner = (starts > 0) & (ends < len(means))
+    return (starts[inner] + ends[inner]) // 2
+
+
+def enforce_min_scene_length(cuts: np.ndarray, frame_count: int, min_scene_len: int) -> List[int]:
+    """Drop cuts closer than min_scene_len frames to the previous kept cut or to either end"""
+    kept = []
+    last = 0
+    for cut in np.unique(cuts):
+        if cut - last >= min_scene_len and frame_count - cut >= min_scene_len:
+            kept.append(int(cut))
+            last = cut
+    return kept
+
+
+class SceneCutCache:
+    """
+    LRU cache of scene-cut results, one small JSON file per entry
+
+    Keyed by source and time range, so a clip re-rendered with different
+    subtitles or crop settings reuses its cuts. Like the crop-path cache, recency
+    is the file mtime (refreshed on every hit), so entries survive restarts and
+    are shared by the crop worker processes.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 512, enabled: bool = True):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result for key (a fresh copy), or None"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        try:
+            result = json.loads(path.read_text())
+            result["scene_boundaries"] = set(result["scene_boundaries"])
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except Exception as e:
+            # Truncated or stale entry - drop it and rescan
+            logger.warning(f"⚠️ Discarding unreadable scene cut cache entry {path.name}: {e}")
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict[str, Any]) -> Optional[Path]:
+        """Store a result and evict least recently used entries over max_entries"""
+        if not self.enabled:
+            return None
+        path = self._entry_path(key)
+        temp_path = self.cache_dir / f".{key}.{os.getpid()}.{threading.get_ident()}.json"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            temp_path.write_text(json.dumps({**result, "scene_boundaries": sorted(result["scene_boundaries"])}))
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not write scene cut cache entry: {e}")
+            temp_path.unlink(missing_ok=True)
+            return None
+        self.evict()
+        return path
+
+    def _entries(self) -> List[Path]:
+        return [p for p in self.cache_dir.glob("*.json") if not p.name.startswith(".")]
+
+    def evict(self) -> int:
+        """Delete least recently used entries until at most max_entries are left"""
+        with self._lock:
+            entries = []
+            for path in self._entries():
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except FileNotFoundError:
+                    continue
+            entries.sort()
+            removed = 0
+            while len(entries) > self.max_entries:
+                _, path = entries.pop(0)
+                path.unlink(missing_ok=True)
+                removed += 1
+            return removed
+
+    def clear(self) -> int:
+        """Delete every entry"""
+        removed = 0
+        for path in self._entries():
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "cache_dir": str(self.cache_dir),
+            "entries": len(self._entries()),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def scene_cut_cache_key(
+    source_id: str,
+    window: Optional[Tuple[float, Optional[float]]],
+    params: Dict[str, Any]
+) -> str:
+    """
+    Cache key for one detection run
+
+    Args:
+        source_id: source_fingerprint() of the input, or a stable id such as "youtube_id:format"
+        window: (start, end) seconds of the range within the source, None for the whole input
+        params: Detector settings
+    """
+    payload = json.dumps({
+        "version": SCENE_CUT_CACHE_VERSION,
+        "source": source_id,
+        "window": [None if t is None else round(float(t), 3) for t in window] if window else None,
+        "params": params,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _empty_result() -> Dict[str, Any]:
+    return {"scene_boundaries": set(), "scene_count": 0, "scene_stats": [], "total_duration": 0, "cut_boundaries": []}
+
+
+def detect_scene_cuts(
+    video_path: Path,
+    start_time: float = 0.0,
+    end_time: Optional[float] = None,
+    content_threshold: float = 30.0,
+    fade_threshold: float = 8.0,
+    min_scene_len: int = 15,
+    use_fade_detection: bool = True,
+    adaptive_ratio: float = 2.0,
+    fps: Optional[float] = None,
+    cache_source_id: Optional[str] = None,
+    cache_window: Optional[Tuple[float, float]] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Detect hard cuts and fades between start_time and end_time
+
+    Args:
+        video_path: Video file to scan
+        start_time / end_time: Range to scan in seconds (end None = to the end of the file)
+        content_threshold: Content score (0-255) a hard cut must reach
+        fade_threshold: Mean luma below which a frame counts as faded out
+        min_scene_len: Minimum scene length in frames
+        use_fade_detection: Also cut in the middle of fade-out -> fade-in runs
+        adaptive_ratio: How far a cut's score must stand above its neighbours'
+        fps: Frame rate (probed from the container if None)
+        cache_source_id: Stable id of the source for the cache key (default: file path, size and mtime)
+        cache_window: (start, end) seconds of the range within cache_source_id
+        use_cache: Look up and store the result in scene_cut_cache
+
+    Returns:
+        Dict with scene_boundaries (set of frame numbers where a new scene starts),
+        cut_boundaries (the same, sorted), scene_count, scene_stats and total_duration.
+        Frame numbers count from the start of the file, not of the range.
+    """
+    params = {
+        "content_threshold": content_threshold,
+        "fade_threshold": fade_threshold if use_fade_detection else None,
+        "min_scene_len": min_scene_len,
+        "adaptive_ratio": adaptive_ratio,
+    }
+    cache_key = None
+    if use_cache and scene_cut_cache.enabled:
+        cache_key = scene_cut_cache_key(
+            cache_source_id or source_fingerprint(video_path),
+            cache_window if cache_source_id else ((start_time, end_time) if start_time > 0 or end_time is not None else None),
+            params
+        )
+        cached = scene_cut_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"🎬 Scene cuts cache hit: {cached['scene_count']} scenes")
+            return cached
+
+    fps = fps or probe_frame_rate(video_path)
+    width, height = SCENE_PROXY_SIZE
+    frame_bytes = width * height
+
+    process = subprocess.Popen(
+        gray_proxy_command(video_path, start_time, end_time),
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+    score_blocks, mean_blocks = [], []
+    previous = None
+    try:
+        while True:
+            data = process.stdout.read(BLOCK_FRAMES * frame_bytes)
+            if not data:
+                break
+            count = len(data) // frame_bytes
+            if count == 0:
+                break
+            frames = np.frombuffer(data, dtype=np.uint8, count=count * frame_bytes).reshape(count, height, width)
+            scores, means = frame_features(frames, previous)
+            score_blocks.append(scores)
+            mean_blocks.append(means)
+            previous = frames[-1].copy()
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read().decode(errors='replace').strip()
+        process.stderr.close()
+        process.wait()
+
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg scene proxy decode failed: {stderr}")
+    if not score_blocks:
+        return _empty_result()
+
+    scores = np.concatenate(score_blocks)
+    means = np.concatenate(mean_blocks)
+    cuts = pick_content_cuts(scores, content_threshold, adaptive_ratio)
+    if use_fade_detection:
+        cuts = np.concatenate([cuts, pick_fade_cuts(means, fade_threshold)])
+    cuts = enforce_min_scene_length(cuts, len(scores), min_scene_len)
+
+    first_frame = int(round(start_time * fps))
+    edges = [0] + cuts + [len(scores)]
+    scene_stats = []
+    for i, (start, end) in enumerate(zip(edges[:-1], edges[1:])):
+        scene_stats.append({
+            "scene_id": i,
+            "start_frame": first_frame + start,
+            "end_frame": first_frame + end,
+            "length_frames": end - start,
+            "start_time": (first_frame + start) / fps,
+            "end_time": (first_frame + end) / fps,
+            "duration": (end - start) / fps
+        })
+
+    boundaries = [first_frame + cut for cut in cuts]
+    result = {
+        "scene_boundaries": set(boundaries),
+        "scene_count": len(scene_stats),
+        "scene_stats": scene_stats,
+        "total_duration": scene_stats[-1]["end_time"],
+        "cut_boundaries": boundaries
+    }
+    if cache_key is not None:
+        scene_cut_cache.put(cache_key, result)
+    return result
+
+
+# Global cache instance
+scene_cut_cache = SceneCutCache(
+    cache_dir=Path(os.getenv("SCENE_CUT_CACHE_DIR", "scene_cut_cache")),
+    max_entries=int(os.getenv("SCENE_CUT_CACHE_ENTRIES", "512")),
+    enabled=os.getenv("SCENE_CUT_CACHE_ENABLED", "true").lower() == "true"
+)
@@ -8,7 +8,6 @@ import logging
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from apify_client import ApifyClient
 import os
 from dotenv import load_dotenv
 import time
@@ -37,6 +36,7 @@ class SegmentDownloadService:
         self.apify_token = os.getenv("APIFY_TOKEN")
         if not self.apify_token:
             raise ValueError("APIFY_TOKEN environment variable not set")
+        from apify_client import ApifyClient
         self.client = ApifyClient(self.apify_token)
         
         # Initialize HuntAPI fallback service
@@ -581,9 +581,12 @@ class SegmentDownloadService:
             "time_savings_estimate": round(max(0, video_duration - total_segment_duration), 1)
         }
 
-# Global service instance
-segment_download_service = SegmentDownloadService()
+# Global service instance, created on first use
+_segment_download_service: Optional[SegmentDownloadService] = None
 
 async def get_segment_download_service() -> SegmentDownloadService:
     """Get the global segment download service instance"""
-    return segment_download_service 
\ No newline at end of file
+    global _segment_download_service
+    if _segment_download_service is None:
+        _segment_download_service = SegmentDownloadService()
+    return _segment_download_service
@@ -0,0 +1,281 @@
+"""
+Shared-memory frame ring for detector worker processes
+Frames are copied once into preallocated shared slots; only (slot, sequence, result)
+tuples cross the process queues, so nothing frame-sized is ever pickled
+"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrameRing:
+    """
+    Fixed number of frame-sized slots in one shared memory block
+
+    The creating process owns the free list: acquire() blocks while every slot is
+    in use (backpressure) and release() hands a slot back. Attached processes only
+    map the block and read or write the slots they were told about.
+    """
+
+    def __init__(
+        self,
+        slot_count: int,
+        frame_shape: Tuple[int, ...],
+        dtype: Any = np.uint8,
+        name: Optional[str] = None
+    ):
+        """
+        Args:
+            slot_count: Number of frames that can be in flight
+            frame_shape: Shape of every frame, e.g. (1080, 1920, 3)
+            name: Attach to an existing block instead of creating one
+        """
+        self.slot_count = slot_count
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.slot_bytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self.owner = name is None
+
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_bytes * slot_count)
+        else:
+            # Spawned workers share the owner's resource tracker, so attaching registers nothing new
+            # and the block is unlinked exactly once, by the owner
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        self.slots = np.ndarray((slot_count, *self.frame_shape), dtype=self.dtype, buffer=self.shm.buf)
+        self._free: Optional[queue.Queue] = None
+        if self.owner:
+            self._free = queue.Queue()
+            for slot in range(slot_count):
+                self._free.put(slot)
+
+    @classmethod
+    def attach(cls, handle: Dict[str, Any]) -> "SharedFrameRing":
+        """Map a ring created in another process (see handle)"""
+        return cls(handle["slot_count"], handle["frame_shape"], handle["dtype"], name=handle["name"])
+
+    @property
+    def handle(self) -> Dict[str, Any]:
+        """Picklable description for attach()"""
+        return {
+            "name": self.shm.name,
+            "slot_count": self.slot_count,
+            "frame_shape": self.frame_shape,
+            "dtype": self.dtype.str
+        }
+
+    @property
+    def free_slots(self) -> int:
+        return self._free.qsize() if self._free is not None else 0
+
+    def acquire(self, timeout: Optional[float] = None) -> int:
+        """Take a free slot, waiting while all slots are in flight (raises queue.Empty on timeout)"""
+        return self._free.get(timeout=timeout)
+
+    def release(self, slot: int):
+        """Return a slot to the free list"""
+        self._free.put(slot)
+
+    def write(self, frame: np.ndarray, timeout: Optional[float] = None) -> int:
+        """Copy a frame into a free slot and return the slot index"""
+        slot = self.acquire(timeout)
+        np.copyto(self.slots[slot], frame)
+        return slot
+
+    def view(self, slot: int) -> np.ndarray:
+        """Zero-copy view of one slot"""
+        return self.slots[slot]
+
+    def close(self):
+        """Unmap the block (and free it if this process created it)"""
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _detector_worker(handle: Dict[str, Any], detect_fn: Callable[[np.ndarray], Any], work_queue, result_queue):
+    """Worker process loop: run detect_fn on the slots named by the work queue"""
+    ring = SharedFrameRing.attach(handle)
+    try:
+        while (item := work_queue.get()) is not None:
+            slot, sequence = item
+            try:
+                result_queue.put((slot, sequence, detect_fn(ring.view(slot)), None))
+            except Exception as e:
+                result_queue.put((slot, sequence, None, f"{type(e).__name__}: {e}"))
+    finally:
+        ring.close()
+
+
+class SharedMemoryDetectorPool:
+    """
+    Run a frame detector in worker processes fed through a SharedFrameRing
+
+    submit() copies the frame into a free slot (blocking while the ring is full) and
+    returns a Future. A collector thread resolves futures and recycles slots as
+    results arrive, so a slot is never rewritten while a worker still reads it.
+    If a worker dies, pending futures fail with BrokenProcessPool, their slots are
+    freed and later submit() calls raise it too.
+    """
+
+    def __init__(
+        self,
+        detect_fn: Callable[[np.ndarray], Any],
+        frame_shape: Tuple[int, ...],
+        workers: int = 2,
+        slot_count: Optional[int] = None
+    ):
+        """
+        Args:
+            detect_fn: Picklable (module-level) function run on each frame in the workers
+            frame_shape: Shape of every submitted frame
+            workers: Number of detector processes
+            slot_count: Ring size (default: two frames per worker)
+        """
+        self.detect_fn = detect_fn
+        self.workers = workers
+        self.ring = SharedFrameRing(slot_count or workers * 2, frame_shape)
+        self.frame_shape = self.ring.frame_shape
+
+        context = multiprocessing.get_context("spawn")
+        self._work_queue = context.Queue()
+        self._result_queue = context.Queue()
+        self._processes = [
+            context.Process(
+                target=_detector_worker,
+                args=(self.ring.handle, detect_fn, self._work_queue, self._result_queue),
+                daemon=True
+            )
+            for _ in range(workers)
+        ]
+        # sequence -> (future, slot) of every frame in flight
+        self._futures: Dict[int, Tuple[Future, int]] = {}
+        self._broken: Optional[BrokenProcessPool] = None
+        self._futures_lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._collector = threading.Thread(target=self._collect, name="detector-results", daemon=True)
+        self._closing = threading.Event()
+        self._started = False
+
+        self.submitted = 0
+        self.completed = 0
+        self.max_in_flight = 0
+        self.slot_uses = [0] * self.ring.slot_count
+
+    def start(self) -> "SharedMemoryDetectorPool":
+        """Spawn the worker processes"""
+        for process in self._processes:
+            process.start()
+        self._collector.start()
+        self._started = True
+        logger.info(f"🧠 Detector pool: {self.workers} processes, {self.ring.slot_count} shared frame slots {self.frame_shape}")
+        return self
+
+    def submit(self, frame: np.ndarray, timeout: Optional[float] = None) -> Future:
+        """Queue a frame for detection; blocks while all slots are in flight"""
+        if self._broken is not None:
+            raise self._broken
+        if not self._started:
+            self.start()
+        slot = self.ring.write(frame, timeout)
+        future: Future = Future()
+        sequence = next(self._sequence)
+        with self._futures_lock:
+            if self._broken is not None:
+                # The collector stopped while this frame was being copied
+                self.ring.release(slot)
+                raise self._broken
+            self._futures[sequence] = (future, slot)
+            self.submitted += 1
+            self.slot_uses[slot] += 1
+            self.max_in_flight = max(self.max_in_flight, len(self._futures))
+        self._work_queue.put((slot, sequence))
+        return future
+
+    def detect(self, frame: np.ndarray) -> Any:
+        """Blocking detection of one frame"""
+        return self.submit(frame).result()
+
+    def _collect(self):
+        while True:
+            try:
+                item = self._result_queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._closing.is_set():
+                    return
+                if any(not process.is_alive() for process in self._processes):
+                    self._fail_pending(BrokenProcessPool("A detector worker process died"))
+                    return
+                continue
+            if item is None:
+                return
+
+            slot, sequence, result, error = item
+            self.ring.release(slot)
+            with self._futures_lock:
+                future, _ = self._futures.pop(sequence)
+                self.completed += 1
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(RuntimeError(error))
+
+    def _fail_pending(self, error: BrokenProcessPool):
+        """Fail every frame in flight and free its slot; no results arrive after this"""
+        with self._futures_lock:
+            self._broken = error
+            pending, self._futures = list(self._futures.values()), {}
+        for future, slot in pending:
+            self.ring.release(slot)
+            future.set_exception(error)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "slots": self.ring.slot_count,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "max_in_flight": self.max_in_flight,
+            "free_slots": self.ring.free_slots
+        }
+
+    def close(self):
+        """Stop the workers once queued frames are done and free the shared block"""
+        if self._started:
+            for _ in self._processes:
+                self._work_queue.put(None)
+            for process in self._processes:
+                process.join(timeout=10)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            self._closing.set()
+            self._result_queue.put(None)
+            self._collector.join()
+            self._fail_pending(BrokenProcessPool("Detector pool closed"))
+        for q in (self._work_queue, self._result_queue):
+            q.close()
+            q.join_thread()
+        self.ring.close()
+
+    def __enter__(self) -> "SharedMemoryDetectorPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,294 @@
+"""
+Smart-cut segment extraction
+Only the partial GOPs at either end of the requested segment are re-encoded; the whole
+GOPs between them are stream-copied and joined to the re-encoded edges with the concat
+demuxer, so clips are frame-accurate at close to stream-copy cost
+"""
+
+import json
+import logging
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
+from .ffmpeg_pipe import audio_output_args, probe_audio_codec
+
+logger = logging.getLogger(__name__)
+
+# Codecs we can re-encode a matching head for (everything else is re-encoded in full)
+SMART_CUT_CODECS = {"h264"}
+
+# ffprobe profile names -> x264 -profile:v values
+X264_PROFILES = {
+    "constrained baseline": "baseline",
+    "baseline": "baseline",
+    "main": "main",
+    "high": "high",
+}
+
+# The re-encoded edges get their own SPS/PPS ids, so the stream-copied middle's parameter
+# sets (ids 0) can't be mistaken for theirs after the join
+EDGE_SPS_ID = 1
+
+# Well under a frame: keyframe seeks land just after the keyframe (never on the one before
+# it after rounding), and the head stops just before it
+TIMESTAMP_EPSILON = 0.0005
+
+FFMPEG_TIMEOUT = 300
+
+
+def probe_cut_source(video_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Video stream parameters the re-encoded edges have to match
+
+    Returns:
+        Dict with codec_name, profile, level, pix_fmt, width, height, frame_duration,
+        time_base and start_time keys, or None if the file can't be probed
+    """
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'stream=codec_name,profile,level,pix_fmt,width,height,avg_frame_rate,r_frame_rate,time_base:format=start_time',
+        '-of', 'json', str(video_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=30)
+        data = json.loads(result.stdout or "{}")
+        stream = data["streams"][0]
+    except (FileNotFoundError, subprocess.TimeoutExpired, ValueError, KeyError, IndexError) as e:
+        logger.warning(f"⚠️ Could not probe video stream of {video_path}: {e}")
+        return None
+
+    def _rate(value: Optional[str]) -> float:
+        try:
+            num, den = (value or "0/0").split('/')
+            return float(num) / float(den) if float(den) else 0.0
+        except ValueError:
+            return 0.0
+
+    fps = _rate(stream.get("avg_frame_rate")) or _rate(stream.get("r_frame_rate")) or 30.0
+    return {
+        "codec_name": (stream.get("codec_name") or "").lower(),
+        "profile": (stream.get("profile") or "").lower(),
+        "level": stream.get("level"),
+        "pix_fmt": stream.get("pix_fmt") or "yuv420p",
+        "width": stream.get("width"),
+        "height": stream.get("height"),
+        "frame_duration": 1.0 / fps,
+        "time_base": stream.get("time_base"),
+        "start_time": float(data.get("format", {}).get("start_time") or 0.0),
+    }
+
+
+def probe_keyframes(video_path: Path, start: float, end: float, start_time: float = 0.0) -> List[float]:
+    """
+    Keyframe timestamps (relative to the file start, like -ss) around [start, end]
+
+    Only keyframes are decoded, and ffprobe seeks straight to the window.
+    """
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-skip_frame', 'nokey',
+        '-read_intervals', f"{start_time + max(0.0, start - 1.0):.6f}%{start_time + end + 1.0:.6f}",
+        '-show_entries', 'frame=pts_time,best_effort_timestamp_time',
+        '-of', 'csv=p=0', str(video_path)
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False, timeout=60)
+    except (FileNotFoundError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"⚠️ Could not probe keyframes of {video_path}: {e}")
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        for value in line.split(','):
+            try:
+                keyframes.append(float(value) - start_time)
+                break
+            except ValueError:
+                continue
+    return sorted(keyframes)
+
+
+def plan_smart_cut(start: float, end: float, keyframes: List[float], frame_duration: float) -> Dict[str, Any]:
+    """
+    Decide how to cut [start, end) given the source's keyframe times
+
+    Only whole GOPs can be stream-copied: a copy that stopped mid-GOP would keep the
+    frames B-frames before the cut point reference, so the video would end late.
+
+    Returns:
+        Dict with mode ("copy": start and end are on keyframes, "smart": re-encode
+        [start, keyframe) and [tail_keyframe, end) and copy the GOPs between, "reencode":
+        no whole GOP inside the segment), keyframe and tail_keyframe keys
+    """
+    tolerance = frame_duration / 2
+    keyframe = next((k for k in keyframes if k >= start - tolerance), None)
+    tail_keyframe = next((k for k in reversed(keyframes) if k <= end + tolerance), None)
+    if keyframe is None or tail_keyframe is None or tail_keyframe <= keyframe + tolerance:
+        return {"mode": "reencode", "keyframe": None, "tail_keyframe": None}
+    if abs(keyframe - start) <= tolerance and abs(tail_keyframe - end) <= tolerance:
+        return {"mode": "copy", "keyframe": keyframe, "tail_keyframe": tail_keyframe}
+    return {"mode": "smart", "keyframe": keyframe, "tail_keyframe": tail_keyframe}
+
+
+def _run_ffmpeg(cmd: List[str], step: str) -> Optional[str]:
+    """Run one FFmpeg step; returns an error message or None"""
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=FFMPEG_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        return f"{step}: FFmpeg timeout after {FFMPEG_TIMEOUT} seconds"
+    except FileNotFoundError as e:
+        return f"{step}: {e}"
+    if result.returncode != 0:
+        return f"{step}: {result.stderr.strip() or 'Unknown FFmpeg error'}"
+    return None
+
+
+def _edge_codec_args(source: Dict[str, Any], profile: Dict[str, Any]) -> List[str]:
+    """libx264 options that reproduce the source stream's format for the re-encoded edges"""
+    args = ['-c:v', 'libx264', *x264_args(profile), '-pix_fmt', source["pix_fmt"]]
+    x264_profile = X264_PROFILES.get(source["profile"])
+    if x264_profile and source["pix_fmt"] == "yuv420p":
+        args.extend(['-profile:v', x264_profile])
+    if isinstance(source["level"], int) and source["level"] > 0:
+        args.extend(['-level', f"{source['level'] / 10:.1f}"])
+    args.extend(['-x264-params', f"sps-id={EDGE_SPS_ID}"])
+    return args
+
+
+def _audio_args(video_path: Path, start: float, end: float) -> List[str]:
+    """Second input + mapping that take the source audio for [start, end)"""
+    return [
+        '-ss', f"{start:.6f}", '-t', f"{end - start:.6f}", '-i', str(video_path),
+        '-map', '0:v:0', '-map', '1:a:0?',
+        *audio_output_args(probe_audio_codec(video_path)),
+    ]
+
+
+def smart_cut_segment(video_path: Path, start: float, end: float, output_path: Path) -> Dict[str, Any]:
+    """
+    Cut [start, end) seconds of video_path into output_path, frame-accurately
+
+    H.264 sources are cut by re-encoding only the frames outside the segment's whole GOPs
+    (matching the source's profile, level and pixel format) and stream-copying those GOPs.
+    Other codecs, and sources ffprobe can't read, are re-encoded in full.
+
+    Returns:
+        Dict with success, mode, keyframe, tail_keyframe and error keys
+    """
+    video_path = Path(video_path)
+    output_path = Path(output_path)
+    source = probe_cut_source(video_path)
+
+    if source is not None and source["codec_name"] in SMART_CUT_CODECS:
+        plan = plan_smart_cut(
+            start, end, probe_keyframes(video_path, start, end, source["start_time"]), source["frame_duration"]
+        )
+    else:
+        plan = {"mode": "reencode", "keyframe": None, "tail_keyframe": None}
+    mode, keyframe, tail_keyframe = plan["mode"], plan["keyframe"], plan["tail_keyframe"]
+
+    if mode == "reencode":
+        with encoder_profiles.encode("segment", clip_id=output_path.name, media_seconds=end - start) as profile:
+            error = _run_ffmpeg([
+                'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                *decoder_thread_args(profile),
+                '-ss', f"{start:.6f}", '-i', str(video_path),
+                '-t', f"{end - start:.6f}",
+                '-c:v', 'libx264', *x264_args(profile), '-pix_fmt', 'yuv420p',
+                *audio_output_args(probe_audio_codec(video_path)),
+                '-movflags', '+faststart',
+                '-y', str(output_path)
+            ], "re-encode")
+    else:
+        error = _smart_cut(video_path, source, start, keyframe, tail_keyframe, end, output_path)
+
+    if error is None and (not output_path.exists() or output_path.stat().st_size == 0):
+        error = "Output file is empty"
+    if error:
+        logger.error(f"❌ Smart cut of {video_path.name} ({start:.3f}-{end:.3f}s, {mode}) failed: {error}")
+        return {"success": False, "mode": mode, "keyframe": keyframe, "tail_keyframe": tail_keyframe, "error": error}
+
+    if mode == "smart":
+        logger.info(f"✂️ Smart cut {output_path.name}: re-encoded {keyframe - start:.2f}s head and {end - tail_keyframe:.2f}s tail, copied {keyframe:.3f}-{tail_keyframe:.3f}s")
+    else:
+        logger.info(f"✂️ Cut {output_path.name} ({mode}): {start:.3f}-{end:.3f}s")
+    return {"success": True, "mode": mode, "keyframe": keyframe, "tail_keyframe": tail_keyframe, "error": None}
+
+
+def _encode_edge(video_path: Path, source: Dict[str, Any], start: float, end: float, part_path: Path, clip_id: str) -> Optional[str]:
+    """Re-encode [start, end) of the video stream into an MPEG-TS part matching the source"""
+    with encoder_profiles.encode("smart_cut_edge", clip_id=clip_id, media_seconds=end - start) as profile:
+        return _run_ffmpeg([
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            *decoder_thread_args(profile),
+            '-ss', f"{start:.6f}", '-i', str(video_path),
+            '-t', f"{end - start:.6f}",
+            '-map', '0:v:0',
+            *_edge_codec_args(source, profile),
+            '-f', 'mpegts', '-y', str(part_path)
+        ], "edge re-encode")
+
+
+def _smart_cut(
+    video_path: Path,
+    source: Dict[str, Any],
+    start: float,
+    keyframe: float,
+    tail_keyframe: float,
+    end: float,
+    output_path: Path
+) -> Optional[str]:
+    """Re-encode [start, keyframe) and [tail_keyframe, end), copy the GOPs between and join them with the source audio"""
+    tolerance = source["frame_duration"] / 2
+    with tempfile.TemporaryDirectory(prefix=".smart_cut_", dir=output_path.parent) as work_dir:
+        # MPEG-TS parts carry their parameter sets in-band, so each part keeps its own SPS/PPS
+        work_dir = Path(work_dir)
+        parts = []
+
+        if keyframe - start > tolerance:
+            head_path = work_dir / "head.ts"
+            error = _encode_edge(video_path, source, start, keyframe - TIMESTAMP_EPSILON, head_path, output_path.name)
+            if error:
+                return error
+            parts.append((head_path, keyframe - start))
+
+        # A copy limited by -t stops on decode order and would keep a few frames past the
+        # tail keyframe; the segment muxer splits on the keyframe's packet instead, which
+        # leaves exactly the frames before it (x264 GOPs are closed)
+        error = _run_ffmpeg([
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-ss', f"{keyframe + TIMESTAMP_EPSILON:.6f}", '-i', str(video_path),
+            '-t', f"{tail_keyframe - keyframe + source['frame_duration']:.6f}",
+            '-map', '0:v:0', '-c:v', 'copy',
+            '-bsf:v', 'h264_mp4toannexb',
+            '-f', 'segment', '-segment_format', 'mpegts',
+            '-segment_times', f"{tail_keyframe - keyframe:.6f}", '-segment_time_delta', f"{tolerance:.6f}",
+            '-y', str(work_dir / "copy_%03d.ts")
+        ], "stream copy")
+        if error:
+            return error
+        parts.append((work_dir / "copy_000.ts", tail_keyframe - keyframe))
+
+        if end - tail_keyframe > tolerance:
+            tail_path = work_dir / "tail.ts"
+            error = _encode_edge(
+                video_path, source, tail_keyframe - TIMESTAMP_EPSILON, end - TIMESTAMP_EPSILON, tail_path, output_path.name
+            )
+            if error:
+                return error
+            parts.append((tail_path, end - tail_keyframe))
+
+        # Explicit durations so each part's timestamps continue exactly where the last one ends
+        list_path = work_dir / "parts.txt"
+        list_path.write_text("".join(f"file '{path.name}'\nduration {duration:.6f}\n" for path, duration in parts))
+        return _run_ffmpeg([
+            'ffmpeg', '-hide_banner', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', str(list_path),
+            *_audio_args(video_path, start, end),
+            '-c:v', 'copy',
+            '-movflags', '+faststart',
+            '-y', str(output_path)
+        ], "join")
@@ -1,17 +1,102 @@
 """
 Thumbnail generation service for video clips
-Extracts frames from videos using FFmpeg at the 1-second mark
+Extracts frames from videos using FFmpeg at the 1-second mark, or encodes a frame the
+crop renderer already decoded (save_thumbnail_frame) without another FFmpeg process
 """
 
 import asyncio
 import subprocess
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Sequence
 import logging
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# In-process image encoders: file extension -> OpenCV quality flag name
+THUMBNAIL_FORMATS = {
+    "jpg": "IMWRITE_JPEG_QUALITY",
+    "webp": "IMWRITE_WEBP_QUALITY",
+}
+
+
+def thumbnail_frame_index(timestamp: float, fps: float, total_frames: Optional[int] = None) -> int:
+    """Frame shown at timestamp (the last frame for clips shorter than that)"""
+    index = max(0, int(round(timestamp * (fps or 30.0))))
+    if total_frames:
+        index = min(index, total_frames - 1)
+    return index
+
+
+def save_thumbnail_frame(
+    frame,
+    output_dir: Path,
+    clip_id: str,
+    widths: Sequence[int] = (200,),
+    image_format: str = "jpg",
+    quality: int = 90
+) -> Dict[str, Any]:
+    """
+    Encode an already decoded BGR frame as thumbnails, in-process
+
+    The first width is written as {clip_id}.{format} (the file generate_thumbnail
+    would produce); every further width as {clip_id}_{width}.{format}.
+    
+    Args:
+        frame: BGR frame (numpy array)
+        output_dir: Directory to save thumbnails
+        clip_id: Unique identifier for the clip
+        widths: Thumbnail widths (heights keep the frame's aspect ratio)
+        image_format: "jpg" or "webp"
+        quality: Encoder quality (1-100, higher is better)
+    
+    Returns:
+        Dict with success status, thumbnail_path, sizes and error info
+    """
+    import cv2
+    
+    try:
+        if image_format not in THUMBNAIL_FORMATS:
+            raise ValueError(f"Unsupported thumbnail format: {image_format}")
+        if frame is None or not widths:
+            raise ValueError("No frame or widths to encode")
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        height, width = frame.shape[:2]
+        params = [getattr(cv2, THUMBNAIL_FORMATS[image_format]), int(quality)]
+        sizes = []
+        for index, thumb_width in enumerate(widths):
+            thumb_height = max(1, int(round(height * thumb_width / width)))
+            resized = cv2.resize(frame, (thumb_width, thumb_height), interpolation=cv2.INTER_AREA)
+            ok, encoded = cv2.imencode(f".{image_format}", resized, params)
+            if not ok:
+                raise Exception(f"Could not encode {image_format} thumbnail")
+            
+            thumbnail_filename = f"{clip_id}.{image_format}" if index == 0 else f"{clip_id}_{thumb_width}.{image_format}"
+            thumbnail_path = output_dir / thumbnail_filename
+            thumbnail_path.write_bytes(encoded.tobytes())
+            sizes.append({
+                "width": thumb_width,
+                "height": thumb_height,
+                "thumbnail_path": str(thumbnail_path),
+                "thumbnail_filename": thumbnail_filename,
+                "relative_path": f"thumbnails/{thumbnail_filename}",
+                "file_size": thumbnail_path.stat().st_size
+            })
+        
+        logger.info(f"✅ Thumbnail saved from rendered frame: {sizes[0]['thumbnail_filename']} ({len(sizes)} sizes)")
+        return {"success": True, **sizes[0], "sizes": sizes}
+        
+    except Exception as e:
+        logger.error(f"❌ Thumbnail encoding failed for {clip_id}: {str(e)}")
+        return {
+            "success": False,
+            "error": str(e),
+            "thumbnail_path": None,
+            "thumbnail_filename": None
+        }
+
 async def generate_thumbnail(
     video_path: Path,
     output_dir: Path,
@@ -0,0 +1,136 @@
+"""
+Offline crop-path smoothing for the analysis pass
+Smooths the whole per-frame speaker path at once with numpy instead of frame by frame
+"""
+
+import logging
+import math
+from typing import Dict, Any, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Kernel taps below this weight (relative to the center tap) are dropped
+KERNEL_CUTOFF = 1e-3
+
+
+def smoothing_kernel(smoothing_factor: float, stability_frames: int) -> np.ndarray:
+    """
+    Zero-phase smoothing kernel for a smoothing preset
+
+    A forward + backward EMA with decay `smoothing_factor` has the two-sided impulse
+    response f^|k|; it is combined with a centered `stability_frames` moving average
+    (the lookahead counterpart of the causal recent-centers average).
+    """
+    f = min(max(smoothing_factor, 0.0), 0.999)
+    radius = int(math.ceil(math.log(KERNEL_CUTOFF) / math.log(f))) if f > 0 else 0
+    taps = np.arange(-radius, radius + 1)
+    kernel = f ** np.abs(taps)
+
+    # Odd box width keeps the kernel centered (no half-frame shift)
+    box = max(1, int(stability_frames)) // 2 * 2 + 1
+    if box > 1:
+        kernel = np.convolve(kernel, np.ones(box))
+    return kernel / kernel.sum()
+
+
+def fill_missing(values: np.ndarray) -> np.ndarray:
+    """Linearly interpolate NaN entries of a 1-D array (edges hold the nearest value)"""
+    missing = np.isnan(values)
+    if not missing.any() or missing.all():
+        return values
+    indices = np.arange(len(values))
+    filled = values.copy()
+    filled[missing] = np.interp(indices[missing], indices[~missing], values[~missing])
+    return filled
+
+
+def limit_step(path: np.ndarray, max_step: float) -> np.ndarray:
+    """
+    Cap the per-frame movement of a 1-D path at max_step
+
+    Smoothed paths almost never exceed the cap, so this is a vectorized check; only a
+    path that does is walked frame by frame (the cap's deficit carries forward).
+    """
+    if len(path) < 2 or max_step <= 0 or np.abs(np.diff(path)).max() <= max_step:
+        return path
+    limited = path.copy()
+    for i in range(1, len(limited)):
+        step = limited[i] - limited[i - 1]
+        if step > max_step:
+            limited[i] = limited[i - 1] + max_step
+        elif step < -max_step:
+            limited[i] = limited[i - 1] - max_step
+    return limited
+
+
+def smooth_crop_path(
+    raw_centers: np.ndarray,
+    resets: np.ndarray,
+    smoothing_config: Dict[str, Any],
+    fallback_center: Tuple[float, float]
+) -> np.ndarray:
+    """
+    Smooth a complete per-frame crop-center path
+
+    Args:
+        raw_centers: (N, 2) float array of speaker centers, NaN where no face was found
+        resets: (N,) bool array, True where a scene reset starts a new segment
+        smoothing_config: Preset with smoothing_factor, stability_frames and max_jump_distance
+        fallback_center: Center used for segments without any face
+
+    Returns:
+        (N, 2) int array of crop centers
+
+    Frames without a face are filled from the surrounding detections of the same
+    segment instead of snapping to the fallback center. Segments are smoothed
+    independently, so a reset still refocuses immediately.
+    """
+    raw_centers = np.asarray(raw_centers, dtype=np.float64).reshape(-1, 2)
+    count = len(raw_centers)
+    if count == 0:
+        return np.zeros((0, 2), dtype=np.int32)
+
+    kernel = smoothing_kernel(smoothing_config["smoothing_factor"], smoothing_config["stability_frames"])
+    pad = len(kernel) // 2
+    max_step = float(smoothing_config.get("max_jump_distance", 0))
+
+    boundaries = np.flatnonzero(np.asarray(resets, dtype=bool)[1:]) + 1
+    smoothed = np.empty_like(raw_centers)
+    for segment in np.split(np.arange(count), boundaries):
+        for axis in range(2):
+            values = fill_missing(raw_centers[segment, axis])
+            if np.isnan(values).all():
+                smoothed[segment, axis] = fallback_center[axis]
+                continue
+            # Odd reflection continues the local trend past the segment edges, so a
+            # speaker walking into a cut isn't pulled back toward a held edge value
+            padded = np.pad(values, pad, mode="reflect", reflect_type="odd") if len(values) > 1 else np.pad(values, pad, mode="edge")
+            path = np.convolve(padded, kernel, mode="valid")
+            smoothed[segment, axis] = limit_step(path, max_step)
+
+    return np.rint(smoothed).astype(np.int32)
+
+
+def plan_crop_windows(
+    centers: np.ndarray,
+    frame_size: Tuple[int, int],
+    crop_size: Tuple[int, int]
+) -> np.ndarray:
+    """
+    Vectorized crop windows (x, y, w, h) for a path of crop centers
+
+    Same placement as AsyncVerticalCropService._plan_crop_window with an explicit crop center:
+    centered on the point, shifted back inside the frame.
+    """
+    frame_width, frame_height = frame_size
+    crop_width, crop_height = crop_size
+    centers = np.asarray(centers).reshape(-1, 2)
+
+    windows = np.empty((len(centers), 4), dtype=np.int32)
+    windows[:, 0] = np.clip(centers[:, 0] - crop_width // 2, 0, max(0, frame_width - crop_width))
+    windows[:, 1] = np.clip(centers[:, 1] - crop_height // 2, 0, max(0, frame_height - crop_height))
+    windows[:, 2] = min(crop_width, frame_width)
+    windows[:, 3] = min(crop_height, frame_height)
+    return windows
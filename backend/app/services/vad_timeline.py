@@ -0,0 +1,100 @@
+"""
+Frame-aligned voice activity for active-speaker selection
+Runs VAD once over the whole clip's PCM and maps every video frame to its 30 ms
+audio chunk by timestamp, so the crop loops only do an array lookup per frame
+"""
+
+import logging
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Chunks quieter than this RMS (16-bit PCM, about -60 dBFS) are silence without asking the VAD
+SILENCE_RMS = 32.0
+
+
+class VADTimeline:
+    """
+    Per-video-frame speech flags for one clip
+
+    Frames past the end of the audio have no information and count as speech,
+    matching the behaviour of a missing audio frame.
+    """
+
+    def __init__(self, chunk_speech: np.ndarray, fps: float, chunk_ms: int = 30):
+        """
+        Args:
+            chunk_speech: Boolean VAD decision per audio chunk
+            fps: Video frame rate the timeline is indexed by
+            chunk_ms: Duration of one audio chunk
+        """
+        self.chunk_speech = np.asarray(chunk_speech, dtype=bool)
+        self.fps = float(fps)
+        self.chunk_ms = chunk_ms
+
+        # Frame i starts at i / fps seconds - look up the chunk covering that timestamp
+        frame_count = int(np.ceil(len(self.chunk_speech) * chunk_ms / 1000 * self.fps))
+        chunk_index = (np.arange(frame_count) * (1000.0 / (self.fps * chunk_ms))).astype(np.int64)
+        self.frame_speech = self.chunk_speech[np.minimum(chunk_index, len(self.chunk_speech) - 1)] \
+            if len(self.chunk_speech) else np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.frame_speech)
+
+    def has_voice(self, frame_index: int) -> bool:
+        """Speech flag of a video frame (O(1))"""
+        if 0 <= frame_index < len(self.frame_speech):
+            return bool(self.frame_speech[frame_index])
+        return True
+
+    def speech_ratio(self) -> float:
+        """Fraction of frames with speech"""
+        return float(self.frame_speech.mean()) if len(self.frame_speech) else 0.0
+
+
+def build_vad_timeline(
+    audio_data: bytes,
+    vad: Any,
+    fps: float,
+    sample_rate: int = 16000,
+    chunk_ms: int = 30
+) -> Optional[VADTimeline]:
+    """
+    Run VAD over a whole clip in one pass
+
+    Args:
+        audio_data: Mono 16-bit PCM at sample_rate
+        vad: webrtcvad.Vad (or anything with is_speech(bytes, sample_rate))
+        fps: Video frame rate of the clip
+
+    Returns:
+        VADTimeline, or None without audio
+    """
+    if not audio_data or not fps:
+        return None
+
+    samples_per_chunk = sample_rate * chunk_ms // 1000
+    pcm = np.frombuffer(audio_data, dtype=np.int16)
+    chunk_count = len(pcm) // samples_per_chunk
+    if chunk_count == 0:
+        return None
+
+    chunks = pcm[:chunk_count * samples_per_chunk].reshape(chunk_count, samples_per_chunk)
+    # Vectorized energy gate: only chunks with some signal go through the VAD
+    rms = np.sqrt(np.mean(chunks.astype(np.float32) ** 2, axis=1))
+    speech = np.zeros(chunk_count, dtype=bool)
+    for index in np.flatnonzero(rms >= SILENCE_RMS):
+        try:
+            speech[index] = vad.is_speech(chunks[index].tobytes(), sample_rate)
+        except Exception as e:
+            logger.error(f"Voice activity detection error: {e}")
+            speech[index] = True
+
+    timeline = VADTimeline(speech, fps, chunk_ms)
+    logger.info(
+        f"🔊 VAD timeline: {chunk_count} chunks ({int((rms < SILENCE_RMS).sum())} silent), "
+        f"{len(timeline)} frames, {timeline.speech_ratio():.0%} speech"
+    )
+    return timeline
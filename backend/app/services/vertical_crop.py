@@ -9,14 +9,10 @@ import os
 import logging
 from pathlib import Path
 from typing import Optional, Tuple, List
-import webrtcvad
 import wave
 import contextlib
-from pydub import AudioSegment
-from moviepy import VideoFileClip, AudioFileClip
 import subprocess
 import json
-import mediapipe as mp
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -30,13 +26,15 @@ class VerticalCropService:
     def __init__(self):
         # Initialize VAD for voice activity detection
         try:
+            import webrtcvad
             self.vad = webrtcvad.Vad(2)  # Aggressiveness mode 0-3
             logger.info("✅ Voice Activity Detection initialized")
         except Exception as e:
             logger.warning(f"⚠️ Could not initialize VAD: {e}")
             self.vad = None
         
-        # Initialize MediaPipe Face Detection
+        # Initialize MediaPipe Face Detection (imported here - it takes most of a second to load)
+        import mediapipe as mp
         self.mp_face_detection = mp.solutions.face_detection
         self.face_detector = self.mp_face_detection.FaceDetection(
             model_selection=1,  # 1 for videos (better range), 0 for close-up
@@ -306,6 +304,7 @@ class VerticalCropService:
     def extract_audio_for_vad(self, video_path: Path) -> Optional[bytes]:
         """Extract audio from video for voice activity detection"""
         try:
+            from pydub import AudioSegment
             temp_audio_path = "temp_audio_vad.wav"
             audio = AudioSegment.from_file(str(video_path))
             audio = audio.set_frame_rate(16000).set_channels(1)
@@ -352,8 +351,6 @@ class VerticalCropService:
             import numpy as np
             import os
             # Use FFmpeg to get video properties
-            import subprocess
-            import json
             probe_cmd = [
                 'ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries',
                 'stream=width,height,r_frame_rate,nb_frames', '-of', 'json', str(input_video_path)
@@ -489,8 +486,15 @@ class VerticalCropService:
             logger.error(f"❌ Vertical crop failed: {str(e)}")
             return False
 
-# Global service instance
-vertical_crop_service = VerticalCropService()
+# Global service instance, created on first use
+_vertical_crop_service: Optional[VerticalCropService] = None
+
+def get_vertical_crop_service() -> VerticalCropService:
+    """Get the global vertical crop service instance"""
+    global _vertical_crop_service
+    if _vertical_crop_service is None:
+        _vertical_crop_service = VerticalCropService()
+    return _vertical_crop_service
 
 # Convenience functions for integration
 def crop_video_to_vertical(
@@ -512,7 +516,7 @@ def crop_video_to_vertical(
             - "high": Максимальное сглаживание (очень плавно, factor=0.9, jump=25px)
             - "very_high": Экстремальное сглаживание (максимально плавно, factor=0.95, jump=30px)
     """
-    return vertical_crop_service.create_vertical_crop(
+    return get_vertical_crop_service().create_vertical_crop(
         input_path, 
         output_path, 
         use_speaker_detection, 
@@ -634,6 +638,7 @@ def crop_to_vertical_shorts(frame, speaker_box, target_width=608, target_height=
 
 def extract_audio_from_video(video_path, audio_path):
     """Extract audio from video for voice activity detection"""
+    from pydub import AudioSegment
     audio = AudioSegment.from_file(video_path)
     audio = audio.set_frame_rate(16000).set_channels(1)
     audio.export(audio_path, format="wav")
@@ -11,28 +11,41 @@ import logging
 import uuid
 from pathlib import Path
 from typing import Optional, Tuple, List, Dict, Any
-import webrtcvad
 import wave
 import contextlib
-from pydub import AudioSegment
-from moviepy import VideoFileClip, AudioFileClip
 import subprocess
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 import threading
+import multiprocessing
 import json
 import tempfile
-import mediapipe as mp
+import shutil
 
-# Smart Scene detection imports for intelligent crop reset
-try:
-    from scenedetect import VideoManager, SceneManager
-    from scenedetect.detectors import ContentDetector, ThresholdDetector
-    SCENEDETECT_AVAILABLE = True
-    logging.info("✅ PySceneDetect available for smart scene detection")
-except ImportError:
-    SCENEDETECT_AVAILABLE = False
-    logging.warning("⚠️ PySceneDetect not available. Smart scene detection disabled.")
+from .ffmpeg_pipe import AnalysisProxyReader, FFmpegFrameReader, FFmpegFrameWriter, probe_audio_codec, probe_video_start_offset
+from .shared_frame_ring import SharedMemoryDetectorPool
+from .detection_scheduler import DetectionScheduler, interpolate_speaker_result, speaker_result_center
+from .face_tracker import FaceTracker
+from .vad_timeline import VADTimeline, build_vad_timeline
+from .frame_pipeline import FrameDecoderThread, FrameWriterThread, StageStats
+from .trajectory_smoother import smooth_crop_path, plan_crop_windows
+from .crop_sharding import plan_time_shards, concat_video_shards
+from .crop_cache import crop_path_cache, crop_cache_key, hash_source_file
+from .admission_queue import AdmissionQueue, estimate_crop_cost
+from .thumbnail import save_thumbnail_frame, thumbnail_frame_index
+from .burn_in import build_subtitles_filter
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
+from .cpu_budget import cpu_budget
+from .crop_planner import (
+    CropTrajectory, plan_dual_spans, render_crop_trajectory, scale_box, speaker_region_window
+)
+
+from .scene_cuts import detect_scene_cuts
+
+# MediaPipe, webrtcvad and pydub are imported where they are used: together they take seconds
+# to load, which every importer of this module (the API at startup, each spawned worker
+# process) would otherwise pay up front.
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -44,20 +57,65 @@ class AsyncVerticalCropService:
     Supports concurrent processing of multiple requests
     """
     
-    def __init__(self, max_workers: int = 4, max_concurrent_tasks: int = 10):
+    # Motion smoothing presets
+    SMOOTHING_CONFIGS = {
+        "low": {"smoothing_factor": 0.3, "max_jump_distance": 80, "stability_frames": 3},
+        "medium": {"smoothing_factor": 0.75, "max_jump_distance": 50, "stability_frames": 5},
+        "high": {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8},
+        "very_high": {"smoothing_factor": 0.95, "max_jump_distance": 15, "stability_frames": 12}  # 🔧 Reduced jump distance to prevent twitches
+    }
+    
+    def __init__(self, max_workers: int = 4, max_concurrent_tasks: int = 10, max_detection_stride: int = 6, analysis_width: int = 640, detection_width: int = 384, pipeline_depth: int = 8, detection_processes: int = 0):
         # Thread pool for CPU-intensive tasks
         self.thread_executor = ThreadPoolExecutor(max_workers=max_workers)
         
-        # Process pool for very heavy operations
-        self.process_executor = ProcessPoolExecutor(max_workers=min(4, max_workers))
+        # Process pool for whole-clip crops (one MediaPipe detector per worker process).
+        # Spawned rather than forked: the parent already runs threads and MediaPipe state.
+        self.crop_processes = min(4, max_workers, os.cpu_count() or 1)
+        self.process_executor_lock = threading.Lock()
+        self.process_executor = self._create_process_executor()
         
         # Task tracking
         self.active_tasks: Dict[str, Dict[str, Any]] = {}
         self.task_lock = threading.Lock()
         self.max_concurrent_tasks = max_concurrent_tasks
         
+        # Crop tasks wait for a share of a CPU-derived cost budget instead of being rejected
+        self.admission_queue = AdmissionQueue(max_active=max_concurrent_tasks)
+        
+        # Run face detection at most every N frames (1 = every frame), interpolating in between
+        self.max_detection_stride = max_detection_stride
+        
+        # Analysis pass: follow the speaker with an optical-flow tracker between detections and
+        # only re-detect when the track is lost, on cuts, or at least every N frames (0 = no tracker)
+        self.max_tracked_stride = 30
+        
+        # Clips at least this long (seconds) are cropped as parallel time shards in process mode (0 = never)
+        self.shard_min_seconds = 60.0
+        
+        # Width of the downscaled stream decoded by the two-pass analysis pass
+        self.analysis_width = analysis_width
+        
+        # Static-framing fast path: sample one frame every N seconds (0 = off); if the speaker
+        # stays within this fraction of the frame width between cuts, skip the full analysis
+        self.static_sample_seconds = 1.0
+        self.static_max_deviation = 0.02
+        
+        # MediaPipe sees frames downscaled to this width (0 = full resolution)
+        self.detection_width = detection_width
+        
+        # Frame loop pipeline: decoded frame buffers in flight and detections submitted ahead
+        self.pipeline_depth = pipeline_depth
+        self.detection_lookahead = max(1, max_workers)
+        
+        # Frame loop: run face detection in N worker processes fed through a shared-memory frame
+        # ring instead of the thread pool (0 = threads). Only pays off with spare cores.
+        self.detection_processes = detection_processes
+        self.detection_process_fn = _detect_faces_in_worker_process
+        
         # Initialize VAD for voice activity detection
         try:
+            import webrtcvad
             self.vad = webrtcvad.Vad(2)  # Aggressiveness mode 0-3
             logger.info("✅ Voice Activity Detection initialized")
         except Exception as e:
@@ -66,6 +124,7 @@ class AsyncVerticalCropService:
         
         # Initialize MediaPipe Face Detection with thread-local instances
         try:
+            import mediapipe as mp
             self.mp_face_detection = mp.solutions.face_detection
             # Create thread-local storage for MediaPipe detectors
             self._thread_local = threading.local()
@@ -99,6 +158,70 @@ class AsyncVerticalCropService:
         
         return self._thread_local.face_detector
     
+    def _prepare_detection_input(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Downscale a BGR frame to detection_width and convert it to RGB
+        
+        Every step writes into per-thread buffers that are reused for every frame of the same size.
+        MediaPipe returns relative boxes, so no coordinate mapping is needed beyond the source size.
+        """
+        h, w = frame.shape[:2]
+        if self.detection_width and w > self.detection_width:
+            detection_size = (self.detection_width, max(1, int(round(h * self.detection_width / w))))
+        else:
+            detection_size = (w, h)
+        
+        buffers = getattr(self._thread_local, 'detection_buffers', None)
+        if buffers is None or buffers[0] != (w, h):
+            small = np.empty((detection_size[1], detection_size[0], 3), dtype=np.uint8)
+            # Nearest-neighbour subsample to exactly 2x the detection size, when the source is that big
+            subsampled = np.empty((2 * small.shape[0], 2 * small.shape[1], 3), dtype=np.uint8) if w >= 2 * detection_size[0] else None
+            rgb = np.empty_like(small)
+            buffers = ((w, h), subsampled, small, rgb)
+            self._thread_local.detection_buffers = buffers
+        _, subsampled, small, rgb = buffers
+        
+        if detection_size == (w, h):
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        if subsampled is not None:
+            # A strided numpy view would be copied by cv2 on every call, and INTER_AREA is only fast
+            # for integer factors - so subsample in C, then take the 2x2 area fast path
+            cv2.resize(frame, (subsampled.shape[1], subsampled.shape[0]), dst=subsampled, interpolation=cv2.INTER_NEAREST)
+            cv2.resize(subsampled, detection_size, dst=small, interpolation=cv2.INTER_AREA)
+        else:
+            cv2.resize(frame, detection_size, dst=small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+    
+    def _is_valid_detection_input(self, frame: np.ndarray) -> bool:
+        """
+        Shape checks for a detection input
+        
+        Frames of one stream all share a shape, so the checks run on the first frame of each
+        shape a thread sees; later frames only compare their shape with the validated one.
+        """
+        shape = getattr(frame, "shape", None)
+        if shape is not None and shape == getattr(self._thread_local, 'validated_shape', None):
+            return True
+        
+        if frame is None:
+            logger.debug("Frame is None - skipping face detection")
+            return False
+        
+        if not isinstance(frame, np.ndarray):
+            logger.debug("Frame is not a numpy array - skipping face detection")
+            return False
+        
+        if frame.size == 0:
+            logger.debug("Frame is empty (size=0) - skipping face detection")
+            return False
+        
+        if len(frame.shape) < 3 or frame.shape[2] != 3:
+            logger.debug(f"Frame is not a valid color image (shape: {frame.shape}) - skipping face detection")
+            return False
+        
+        self._thread_local.validated_shape = shape
+        return True
+    
     def cleanup_thread_local_detectors(self):
         """Clean up thread-local MediaPipe detectors to prevent memory leaks"""
         try:
@@ -121,10 +244,53 @@ class AsyncVerticalCropService:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(self.thread_executor, func, *args, **kwargs)
     
+    @contextlib.asynccontextmanager
+    async def _analysis_threads(self, encoder_profile: Optional[Dict[str, Any]]):
+        """
+        Hold CPU tokens for a detection pass outside an encode and yield their count
+
+        With a caller-chosen profile the caller already holds the tokens (see
+        encoder_profiles.encode), so its thread count is used as-is.
+        """
+        if encoder_profile is not None:
+            yield encoder_profile["threads"]
+            return
+        async with cpu_budget.reserve("crop_analysis") as grant:
+            yield grant.tokens
+    
     async def _run_heavy_task(self, func, *args, **kwargs):
-        """Run very heavy task in process executor"""
+        """Run very heavy task in process executor (a pool broken by a dying worker is replaced)"""
         loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.process_executor, func, *args, **kwargs)
+        executor = self.process_executor
+        try:
+            return await loop.run_in_executor(executor, func, *args, **kwargs)
+        except BrokenProcessPool:
+            self._replace_broken_process_executor(executor)
+            raise
+    
+    def _create_process_executor(self) -> ProcessPoolExecutor:
+        """Process pool for whole-clip crops and shards"""
+        return ProcessPoolExecutor(
+            max_workers=self.crop_processes,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    
+    def _replace_broken_process_executor(self, broken: ProcessPoolExecutor):
+        """Start a fresh process pool once a worker crash has broken the current one"""
+        with self.process_executor_lock:
+            # Tasks that failed on the same broken pool only replace it once
+            if self.process_executor is not broken:
+                return
+            self.process_executor = self._create_process_executor()
+        logger.warning(f"♻️ Crop process pool was broken by a dying worker - started a new one ({self.crop_processes} processes)")
+        broken.shutdown(wait=False, cancel_futures=True)
+    
+    def _vertical_target_size(self, original_height: int) -> Tuple[int, int]:
+        """9:16 output size at the source height (even width for the encoder)"""
+        target_width = int(original_height * (9 / 16))
+        if target_width % 2 != 0:
+            target_width += 1
+        return target_width, original_height
     
     def _create_task_id(self) -> str:
         """Generate unique task ID"""
@@ -153,6 +319,44 @@ class AsyncVerticalCropService:
         with self.task_lock:
             return self.active_tasks.copy()
     
+    def _estimate_task_cost(self, input_video_path: Path, use_speaker_detection: bool, enable_group_conversation_framing: bool) -> float:
+        """Admission cost of cropping a clip (container metadata only, nothing is decoded)"""
+        detector_mode = "none"
+        if use_speaker_detection:
+            detector_mode = "group" if enable_group_conversation_framing else "speaker"
+        cap = cv2.VideoCapture(str(input_video_path))
+        try:
+            if not cap.isOpened():
+                return estimate_crop_cost(1920, 1080, 1800, detector_mode)
+            return estimate_crop_cost(
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), detector_mode
+            )
+        finally:
+            cap.release()
+    
+    async def _wait_for_admission(self, task_id: str, cost: float, data: Dict[str, Any]):
+        """Register the task as queued and wait for the admission queue to let it run"""
+        with self.task_lock:
+            self.active_tasks[task_id] = {
+                "task_id": task_id,
+                "status": "queued",
+                "progress": 0,
+                "message": "Waiting for processing capacity...",
+                "created_at": datetime.now(),
+                "estimated_cost": cost,
+                **data
+            }
+        ticket = await self.admission_queue.acquire(cost, task_id)
+        if ticket.wait_seconds >= 0.1:
+            logger.info(f"🚦 Task {task_id} admitted after {ticket.wait_seconds:.1f}s in queue")
+        self._update_task_status(task_id, "initializing", 0, "Admitted", {"queue_wait_seconds": round(ticket.wait_seconds, 3)})
+        return ticket
+    
+    def get_admission_stats(self) -> Dict[str, Any]:
+        """Admission queue budget, occupancy and wait times"""
+        return self.admission_queue.get_stats()
+    
     async def cleanup_completed_tasks(self, max_age_hours: int = 24):
         """Clean up old completed tasks"""
         cutoff_time = datetime.now().timestamp() - (max_age_hours * 3600)
@@ -179,71 +383,37 @@ class AsyncVerticalCropService:
                 logger.debug("No face detector available for this thread - skipping face detection")
                 return []
             
-            # 🔍 FRAME VALIDATION: Check if frame is valid before processing
-            if frame is None:
-                logger.debug("Frame is None - skipping face detection")
-                return []
-            
-            if not isinstance(frame, np.ndarray):
-                logger.debug("Frame is not a numpy array - skipping face detection")
-                return []
-            
-            if frame.size == 0:
-                logger.debug("Frame is empty (size=0) - skipping face detection")
-                return []
-            
-            if len(frame.shape) < 2:
-                logger.debug(f"Frame has invalid shape {frame.shape} - skipping face detection")
+            # 🔍 FRAME VALIDATION: once per stream (frame shape), not per frame
+            if not self._is_valid_detection_input(frame):
                 return []
             
             h, w = frame.shape[:2]
             
-            # Validate frame dimensions
-            if h <= 0 or w <= 0:
-                logger.debug(f"Frame has invalid dimensions {w}x{h} - skipping face detection")
-                return []
-            
-            if len(frame.shape) < 3 or frame.shape[2] != 3:
-                logger.debug(f"Frame is not a valid color image (shape: {frame.shape}) - skipping face detection")
-                return []
+            # Downscale + convert BGR to RGB for MediaPipe (into reused buffers)
+            rgb_frame = self._prepare_detection_input(frame)
             
-            # Check for corrupted frame data
-            if not frame.any():
+            # Blank (all-black) frames: checked on the small detection input, not the full frame
+            if not rgb_frame.any():
                 logger.debug("Frame contains only zeros - skipping face detection")
                 return []
             
-            # Convert BGR to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            
-            # Final validation after color conversion
-            if rgb_frame is None or rgb_frame.size == 0:
-                logger.debug("RGB conversion failed - skipping face detection")
-                return []
-            
             # Process frame with MediaPipe (using thread-local detector)
-            results = face_detector.process(rgb_frame)
+            detections = face_detector.process(rgb_frame).detections
+            if not detections:
+                return []
             
             faces = []
-            if results.detections:
-                for detection in results.detections:
-                    # Get relative bounding box from MediaPipe
-                    bbox = detection.location_data.relative_bounding_box
-                    
-                    # Convert relative coordinates to absolute pixel coordinates
-                    x = int(bbox.xmin * w)
-                    y = int(bbox.ymin * h)
-                    x1 = int((bbox.xmin + bbox.width) * w)
-                    y1 = int((bbox.ymin + bbox.height) * h)
-                    
-                    # Ensure coordinates are within frame bounds
-                    x = max(0, min(w, x))
-                    y = max(0, min(h, y))
-                    x1 = max(0, min(w, x1))
-                    y1 = max(0, min(h, y1))
-                    
-                    # Ensure valid bounding box (x1 > x and y1 > y)
-                    if x1 > x and y1 > y:
-                        faces.append((x, y, x1, y1))
+            for detection in detections:
+                # Relative MediaPipe box -> absolute source pixels, clamped to the frame
+                bbox = detection.location_data.relative_bounding_box
+                x = min(w, max(0, int(bbox.xmin * w)))
+                y = min(h, max(0, int(bbox.ymin * h)))
+                x1 = min(w, max(0, int((bbox.xmin + bbox.width) * w)))
+                y1 = min(h, max(0, int((bbox.ymin + bbox.height) * h)))
+                
+                # Ensure valid bounding box (x1 > x and y1 > y)
+                if x1 > x and y1 > y:
+                    faces.append((x, y, x1, y1))
             
             return faces
         except cv2.error as e:
@@ -257,36 +427,29 @@ class AsyncVerticalCropService:
         """Async face detection"""
         return await self._run_cpu_bound_task(self._detect_faces_sync, frame)
     
-    def _detect_voice_activity_sync(self, audio_frame: bytes) -> bool:
-        """Synchronous voice activity detection"""
-        if self.vad is None:
-            return True
-        
-        try:
-            return self.vad.is_speech(audio_frame, 16000)
-        except Exception as e:
-            logger.error(f"Voice activity detection error: {e}")
-            return True
-    
-    async def detect_voice_activity(self, audio_frame: bytes) -> bool:
-        """Async voice activity detection"""
-        return await self._run_cpu_bound_task(self._detect_voice_activity_sync, audio_frame)
-    
     async def find_active_speaker(
         self, 
         frame: np.ndarray, 
-        audio_frame: Optional[bytes] = None,
+        vad_timeline: Optional[VADTimeline] = None,
         previous_crop_center: Optional[Tuple[int, int]] = None,
-        enable_dual_speaker_mode: bool = False
+        enable_dual_speaker_mode: bool = False,
+        frame_index: int = 0,
+        faces: Optional[List[Tuple[int, int, int, int]]] = None
     ) -> Optional[Tuple[int, int, int, int]] | Dict[str, Any]:
         """
         Async active speaker detection with optional dual-speaker mode
         
+        Args:
+            vad_timeline: Precomputed voice activity of the clip (None = assume speech)
+            frame_index: Source frame index of frame, for the VAD lookup
+            faces: Face boxes already detected elsewhere (e.g. a detector process) - skips detection
+        
         Returns:
             - Single speaker mode: Tuple of (x, y, x1, y1) for best face or None
             - Dual speaker mode: Dict with 'mode' and 'speakers' keys for 2 faces, or single tuple for 1 face
         """
-        faces = await self.detect_faces(frame)
+        if faces is None:
+            faces = await self.detect_faces(frame)
         
         if not faces:
             return None
@@ -302,9 +465,7 @@ class AsyncVerticalCropService:
             faces_sorted = sorted(faces, key=lambda face: (face[0] + face[2]) / 2)
             
             # Check voice activity
-            has_voice_activity = True
-            if audio_frame:
-                has_voice_activity = await self.detect_voice_activity(audio_frame)
+            has_voice_activity = vad_timeline.has_voice(frame_index) if vad_timeline else True
             
             return {
                 "mode": "dual_speaker",
@@ -320,9 +481,7 @@ class AsyncVerticalCropService:
         best_score = 0
         
         # Check voice activity
-        has_voice_activity = True
-        if audio_frame:
-            has_voice_activity = await self.detect_voice_activity(audio_frame)
+        has_voice_activity = vad_timeline.has_voice(frame_index) if vad_timeline else True
         
         for face in faces:
             x, y, x1, y1 = face
@@ -374,11 +533,10 @@ class AsyncVerticalCropService:
         if previous_crop_center is None:
             return new_center, [new_center]
         
-        # Add new center to history
-        recent_centers = recent_centers.copy()
+        # Add new center to history (the caller hands over its list - updated in place)
         recent_centers.append(new_center)
         if len(recent_centers) > stability_frames:
-            recent_centers.pop(0)
+            del recent_centers[0]
         
         # Calculate average
         avg_x = sum(center[0] for center in recent_centers) / len(recent_centers)
@@ -404,16 +562,49 @@ class AsyncVerticalCropService:
         
         return (smoothed_x, smoothed_y), recent_centers
     
-    def _crop_frame_to_vertical(
-        self, 
-        frame: np.ndarray, 
+    def _next_crop_center(
+        self,
+        speaker_box: Optional[Tuple[int, int, int, int]],
+        frame_size: Tuple[int, int],
+        should_reset: bool,
+        previous_crop_center: Optional[Tuple[int, int]],
+        recent_centers: List[Tuple[int, int]],
+        smoothing_config: Dict[str, Any]
+    ) -> Tuple[Tuple[int, int], List[Tuple[int, int]]]:
+        """Raw speaker center (or fallback) for one frame, smoothed unless a scene reset happened"""
+        if speaker_box:
+            x, y, x1, y1 = speaker_box
+            raw_center = ((x + x1) // 2, (y + y1) // 2)
+        else:
+            w, h = frame_size
+            # 🔧 IMPROVED FALLBACK: Smart center crop when no face detected
+            # Instead of 75% right (which shows empty space), use better positioning  
+            crop_center_x = int(w * 0.55)  # 55% from left (FIXED: was 75%, avoids empty spaces)
+            crop_center_y = int(h * 0.45)  # 45% from top (focus on upper portion)
+            raw_center = (crop_center_x, crop_center_y)
+        
+        if should_reset:
+            return raw_center, [raw_center]
+        return self._smooth_crop_center(raw_center, previous_crop_center, recent_centers, smoothing_config)
+    
+    def _plan_crop_window(
+        self,
+        frame_size: Tuple[int, int],
         speaker_box: Optional[Tuple[int, int, int, int]],
         target_size: Tuple[int, int],
         crop_center: Optional[Tuple[int, int]] = None,
         padding_factor: float = 2.0
-    ) -> np.ndarray:
-        """Synchronous frame cropping for thread executor"""
-        h, w = frame.shape[:2]
+    ) -> Tuple[int, int, int, int]:
+        """
+        Compute the source-frame crop window for a vertical crop
+        
+        Args:
+            frame_size: Source frame (width, height)
+            
+        Returns:
+            (left, top, width, height) of the crop window in source pixels
+        """
+        w, h = frame_size
         target_width, target_height = target_size
         target_aspect = target_width / target_height
         
@@ -460,14 +651,39 @@ class AsyncVerticalCropService:
             else:
                 top = max(0, h - crop_height)
         
+        return left, top, right - left, bottom - top
+    
+    def _crop_frame_to_vertical(
+        self, 
+        frame: np.ndarray, 
+        speaker_box: Optional[Tuple[int, int, int, int]],
+        target_size: Tuple[int, int],
+        crop_center: Optional[Tuple[int, int]] = None,
+        padding_factor: float = 2.0,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Synchronous frame cropping for thread executor
+        
+        Args:
+            out: Optional (target_height, target_width, 3) buffer to render into, reused across frames
+        """
+        h, w = frame.shape[:2]
+        target_width, target_height = target_size
+        left, top, crop_width, crop_height = self._plan_crop_window(
+            (w, h), speaker_box, target_size, crop_center, padding_factor
+        )
+        
         # Perform crop
-        cropped = frame[top:bottom, left:right]
+        cropped = frame[top:top + crop_height, left:left + crop_width]
         
         # Resize to target
-        if cropped.shape[:2] != (target_height, target_width):
-            cropped = cv2.resize(cropped, target_size)
-        
-        return cropped
+        if cropped.shape[:2] == (target_height, target_width):
+            if out is None:
+                return cropped
+            np.copyto(out, cropped)
+            return out
+        return cv2.resize(cropped, target_size, dst=out)
     
     async def crop_frame_to_vertical(
         self, 
@@ -486,6 +702,7 @@ class AsyncVerticalCropService:
     def _extract_audio_sync(self, video_path: Path) -> Optional[bytes]:
         """Synchronous audio extraction"""
         try:
+            from pydub import AudioSegment
             temp_audio_path = f"temp_audio_vad_{uuid.uuid4().hex[:8]}.wav"
             audio = AudioSegment.from_file(str(video_path))
             audio = audio.set_frame_rate(16000).set_channels(1)
@@ -504,11 +721,15 @@ class AsyncVerticalCropService:
         """Async audio extraction"""
         return await self._run_cpu_bound_task(self._extract_audio_sync, video_path)
     
-    async def _detect_and_convert_av1_if_needed(self, video_path: Path) -> Path:
+    async def _detect_and_convert_av1_if_needed(self, video_path: Path, encoder_profile: Optional[Dict[str, Any]] = None) -> Path:
         """
         Detect AV1 codec and check if conversion is needed
         With conda-forge OpenCV, AV1 should work natively
         
+        Args:
+            encoder_profile: Profile (and CPU tokens) the caller already holds for this clip;
+                the conversion runs on it instead of asking the CPU budget again
+        
         Returns:
             Path to usable video file (original or converted)
         """
@@ -552,7 +773,7 @@ class AsyncVerticalCropService:
                 else:
                     logger.error(f"❌ OpenCV cannot open {codec_name} video file")
                 cap.release()
-                return await self._convert_to_h264(video_path)
+                return await self._convert_to_h264(video_path, encoder_profile)
             
             # Try to read first few frames to check for decoding issues
             frames_tested = 0
@@ -577,13 +798,13 @@ class AsyncVerticalCropService:
                     logger.error(f"❌ conda-forge OpenCV cannot decode AV1 frames - fallback to H.264 conversion")
                 else:
                     logger.error(f"❌ OpenCV cannot read any {codec_name} frames - converting to H.264")
-                return await self._convert_to_h264(video_path)
+                return await self._convert_to_h264(video_path, encoder_profile)
             elif success_rate < 0.5:
                 if codec_name == 'av1':
                     logger.warning(f"⚠️ conda-forge OpenCV AV1 decode success rate too low ({success_rate:.1%}) - converting to H.264")
                 else:
                     logger.warning(f"⚠️ Low {codec_name} frame read success rate ({success_rate:.1%}) - converting to H.264")
-                return await self._convert_to_h264(video_path)
+                return await self._convert_to_h264(video_path, encoder_profile)
             else:
                 if codec_name == 'av1':
                     logger.info(f"✅ conda-forge OpenCV handling AV1 natively! ({success_rate:.1%} success rate)")
@@ -595,16 +816,19 @@ class AsyncVerticalCropService:
             logger.error(f"❌ Error testing video compatibility: {e}")
             # If testing fails, try converting as fallback, but don't fail completely if FFmpeg is missing
             try:
-                return await self._convert_to_h264(video_path)
+                return await self._convert_to_h264(video_path, encoder_profile)
             except Exception as convert_error:
                 logger.warning(f"⚠️ Conversion also failed: {convert_error}")
                 logger.warning(f"⚠️ Proceeding with original video - results may be unreliable")
                 return video_path
     
-    async def _convert_to_h264(self, input_path: Path) -> Path:
+    async def _convert_to_h264(self, input_path: Path, encoder_profile: Optional[Dict[str, Any]] = None) -> Path:
         """
         Convert video to H.264 for better OpenCV compatibility
         
+        Args:
+            encoder_profile: Profile whose CPU tokens the caller holds (None = take new ones)
+        
         Returns:
             Path to converted video file
         """
@@ -618,31 +842,28 @@ class AsyncVerticalCropService:
             logger.info(f"   📁 Input: {input_path.name}")
             logger.info(f"   📁 Output: {temp_path.name}")
             
-            # Use FFmpeg to convert to H.264 with good quality/speed balance
-            cmd = [
-                'ffmpeg', '-hide_banner', '-loglevel', 'error',
-                '-i', str(input_path),
-                '-c:v', 'libx264',
-                '-preset', 'fast',  # Good balance of speed/quality
-                # TODO: For faster AV1 conversion, could use 'ultrafast' preset and CRF 28
-                # '-preset', 'ultrafast',  # Fastest encoding
-                # '-crf', '28',           # Slightly lower quality for speed
-                '-crf', '23',       # Good quality
-                '-c:a', 'copy',     # Copy audio without re-encoding
-                '-movflags', '+faststart',
-                '-avoid_negative_ts', 'make_zero',
-                '-threads', '0',    # Use all available CPU cores
-                str(temp_path),
-                '-y'
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            async with encoder_profiles.encode_async("av1_convert", clip_id=input_path.name, profile=encoder_profile) as profile:
+                # Preset/CRF follow the encoder backlog (fast / CRF 23 when idle)
+                cmd = [
+                    'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                    *decoder_thread_args(profile),
+                    '-i', str(input_path),
+                    '-c:v', 'libx264',
+                    *x264_args(profile),
+                    '-c:a', 'copy',     # Copy audio without re-encoding
+                    '-movflags', '+faststart',
+                    '-avoid_negative_ts', 'make_zero',
+                    str(temp_path),
+                    '-y'
+                ]
+                
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                
+                stdout, stderr = await process.communicate()
             
             if process.returncode == 0 and temp_path.exists():
                 file_size = temp_path.stat().st_size / (1024 * 1024)  # MB
@@ -663,18 +884,6 @@ class AsyncVerticalCropService:
             logger.error(f"❌ Exception during H.264 conversion: {e}")
             return input_path
     
-    def _process_audio_frames(self, audio_data: bytes, sample_rate: int = 16000, frame_duration_ms: int = 30):
-        """Generator for audio frame processing"""
-        if not audio_data:
-            return
-        
-        n = int(sample_rate * frame_duration_ms / 1000) * 2
-        offset = 0
-        while offset + n <= len(audio_data):
-            frame = audio_data[offset:offset + n]
-            offset += n
-            yield frame
-    
     async def create_vertical_crop_async(
         self, 
         input_video_path: Path, 
@@ -688,7 +897,16 @@ class AsyncVerticalCropService:
         ignore_micro_cuts: bool = True,
         micro_cut_threshold: int = 10,
         smoothing_strength: str = "very_high",
-        task_id: Optional[str] = None
+        task_id: Optional[str] = None,
+        render_mode: str = "two_pass",
+        trajectory_path: Optional[Path] = None,
+        use_crop_cache: bool = True,
+        cache_source_id: Optional[str] = None,
+        cache_window: Optional[Tuple[float, float]] = None,
+        subtitles_path: Optional[Path] = None,
+        subtitle_font_size: int = 14,
+        encoder_profile: Optional[Dict[str, Any]] = None,
+        thumbnail_options: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Create vertical crop asynchronously with smart scene detection and progress tracking
@@ -706,35 +924,82 @@ class AsyncVerticalCropService:
             micro_cut_threshold: Threshold for micro-cut detection in frames
             smoothing_strength: Motion smoothing level
             task_id: Optional task ID for tracking
+            render_mode: "two_pass" (analyze a downscaled stream, crop in FFmpeg) or "frame_loop"
+                (crop every frame in Python). Split-screen spans render as an FFmpeg filtergraph too.
+            trajectory_path: Optional .json/.npz path to keep the two-pass crop trajectory
+            use_crop_cache: Reuse a cached two-pass crop trajectory (skips detection on a hit)
+            cache_source_id: Stable source id for the cache key (e.g. "youtube_id:format");
+                defaults to a content hash of the input file
+            cache_window: (start, end) seconds of this clip within cache_source_id
+            subtitles_path: SRT to burn in during the crop render, so crop + captions + audio
+                are one encode (result reports subtitles_burned and encodes)
+            subtitle_font_size: Burn-in font size in pixels
+            encoder_profile: Encoder settings chosen by the caller (default: picked from the
+                encoder backlog right before the render)
+            thumbnail_options: Save a thumbnail from a frame the render already produced
+                (keys: output_dir, clip_id, timestamp, widths, image_format; see
+                save_thumbnail_frame). Thumbnails are taken before the subtitle burn-in on
+                every render path. The result's thumbnail is None when the crop couldn't
+                provide the frame, so callers fall back to generate_thumbnail
+        
+        When the service is busy the task waits in the admission queue (status "queued")
+        instead of failing; the result reports queue_wait_seconds.
         """
         if not task_id:
             task_id = self._create_task_id()
         
-        # Check concurrent task limit
-        with self.task_lock:
-            active_count = len([t for t in self.active_tasks.values() if t["status"] == "processing"])
-            if active_count >= self.max_concurrent_tasks:
-                return {
-                    "success": False,
-                    "error": f"Maximum concurrent tasks ({self.max_concurrent_tasks}) reached",
-                    "task_id": task_id
-                }
-        
-        # Initialize task tracking
-        with self.task_lock:
-            self.active_tasks[task_id] = {
-                "task_id": task_id,
-                "status": "initializing",
-                "progress": 0,
-                "message": "Initializing video processing...",
-                "created_at": datetime.now(),
-                "input_path": str(input_video_path),
-                "output_path": str(output_video_path),
-                "use_speaker_detection": use_speaker_detection,
-                "use_smart_scene_detection": use_smart_scene_detection,
-                "enable_group_conversation_framing": enable_group_conversation_framing,
-                "smoothing_strength": smoothing_strength
-            }
+        # Opening the container is blocking I/O - keep it off the event loop
+        cost = await self._run_cpu_bound_task(
+            self._estimate_task_cost, input_video_path, use_speaker_detection, enable_group_conversation_framing
+        )
+        ticket = await self._wait_for_admission(task_id, cost, {
+            "input_path": str(input_video_path),
+            "output_path": str(output_video_path),
+            "use_speaker_detection": use_speaker_detection,
+            "use_smart_scene_detection": use_smart_scene_detection,
+            "enable_group_conversation_framing": enable_group_conversation_framing,
+            "smoothing_strength": smoothing_strength
+        })
+        try:
+            result = await self._create_vertical_crop_admitted(
+                task_id, input_video_path, output_video_path,
+                use_speaker_detection, use_smart_scene_detection, enable_group_conversation_framing,
+                scene_content_threshold, scene_fade_threshold, scene_min_length,
+                ignore_micro_cuts, micro_cut_threshold, smoothing_strength,
+                render_mode, trajectory_path, use_crop_cache, cache_source_id, cache_window,
+                subtitles_path, subtitle_font_size, encoder_profile, thumbnail_options
+            )
+        finally:
+            self.admission_queue.release(ticket)
+        result["queue_wait_seconds"] = round(ticket.wait_seconds, 3)
+        return result
+    
+    async def _create_vertical_crop_admitted(
+        self,
+        task_id: str,
+        input_video_path: Path,
+        output_video_path: Path,
+        use_speaker_detection: bool,
+        use_smart_scene_detection: bool,
+        enable_group_conversation_framing: bool,
+        scene_content_threshold: float,
+        scene_fade_threshold: float,
+        scene_min_length: int,
+        ignore_micro_cuts: bool,
+        micro_cut_threshold: int,
+        smoothing_strength: str,
+        render_mode: str,
+        trajectory_path: Optional[Path],
+        use_crop_cache: bool,
+        cache_source_id: Optional[str],
+        cache_window: Optional[Tuple[float, float]],
+        subtitles_path: Optional[Path] = None,
+        subtitle_font_size: int = 14,
+        encoder_profile: Optional[Dict[str, Any]] = None,
+        thumbnail_options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Body of create_vertical_crop_async, run once the task holds an admission ticket"""
+        self._update_task_status(task_id, "initializing", 0, "Initializing video processing...")
         
         # Initialize variables for cleanup tracking
         actual_video_path = input_video_path
@@ -744,7 +1009,7 @@ class AsyncVerticalCropService:
             # 🔧 AV1 COMPATIBILITY FIX - Check and convert if needed
             self._update_task_status(task_id, "processing", 2, "Checking video codec compatibility...")
             
-            actual_video_path = await self._detect_and_convert_av1_if_needed(input_video_path)
+            actual_video_path = await self._detect_and_convert_av1_if_needed(input_video_path, encoder_profile)
             is_converted = actual_video_path != input_video_path
             
             if is_converted:
@@ -764,35 +1029,64 @@ class AsyncVerticalCropService:
             
             original_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             original_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            fps = int(cap.get(cv2.CAP_PROP_FPS))
+            source_fps = cap.get(cv2.CAP_PROP_FPS)
+            fps = int(source_fps)
             total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             cap.release()
             
             # Calculate target size
-            target_height = original_height
-            target_width = int(original_height * (9 / 16))
-            if target_width % 2 != 0:
-                target_width += 1
-            target_size = (target_width, target_height)
+            target_size = self._vertical_target_size(original_height)
             
-            # Configure smoothing
-            smoothing_configs = {
-                "low": {"smoothing_factor": 0.3, "max_jump_distance": 80, "stability_frames": 3},
-                "medium": {"smoothing_factor": 0.75, "max_jump_distance": 50, "stability_frames": 5},
-                "high": {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8},
-                "very_high": {"smoothing_factor": 0.95, "max_jump_distance": 15, "stability_frames": 12}  # 🔧 Reduced jump distance to prevent twitches
-            }
+            # Captions are burned into the crop render itself instead of a second encode
+            post_filter = build_subtitles_filter(str(subtitles_path), subtitle_font_size) if subtitles_path else None
             
-            smoothing_config = smoothing_configs.get(smoothing_strength, smoothing_configs["medium"])
+            # The thumbnail comes out of the render too, instead of another decode of the clip
+            thumbnail_frame = thumbnail_frame_index(
+                thumbnail_options.get("timestamp", 1.0), source_fps or fps, total_frames
+            ) if thumbnail_options else None
+            
+            # Configure smoothing
+            smoothing_config = self.SMOOTHING_CONFIGS.get(smoothing_strength, self.SMOOTHING_CONFIGS["medium"])
             
             self._update_task_status(
                 task_id, "processing", 10, 
                 f"Video: {target_size[0]}x{target_size[1]}, {fps}fps, {total_frames} frames"
             )
             
+            # 💾 CROP CACHE - a previous analysis of the same clip skips detection entirely
+            two_pass = render_mode == "two_pass"
+            cache_key = None
+            cached_trajectory = None
+            if two_pass and use_crop_cache and crop_path_cache.enabled:
+                cache_key = await self._crop_cache_key(
+                    input_video_path, cache_source_id, cache_window, {
+                        "source_size": [original_width, original_height],
+                        "source_fps": round(source_fps, 3),
+                        "target_size": list(target_size),
+                        "smoothing": smoothing_config,
+                        "use_speaker_detection": use_speaker_detection,
+                        "use_vad": bool(self.vad),
+                        "scene_detection": [
+                            scene_content_threshold, scene_fade_threshold, scene_min_length
+                        ] if use_smart_scene_detection else None,
+                        "micro_cuts": [ignore_micro_cuts, micro_cut_threshold],
+                        "analysis_width": self.analysis_width,
+                        "detection_width": self.detection_width,
+                        "max_detection_stride": self.max_detection_stride,
+                        "max_tracked_stride": self.max_tracked_stride,
+                        "group_conversation_framing": enable_group_conversation_framing,
+                    }
+                )
+                cached_trajectory = crop_path_cache.get(cache_key)
+                if cached_trajectory is not None:
+                    logger.info(f"💾 Crop cache hit ({cache_key[:12]}) - skipping analysis, render only")
+            
             # 🎬 SMART SCENE DETECTION - Pre-compute all scene boundaries upfront
             scene_data = {"scene_boundaries": set(), "scene_stats": [], "scene_count": 0}
-            if use_smart_scene_detection and SCENEDETECT_AVAILABLE:
+            if cached_trajectory is not None:
+                scene_data["scene_count"] = cached_trajectory.metadata.get("scene_count", 0)
+                scene_data["cut_boundaries"] = cached_trajectory.metadata.get("cut_boundaries", [])
+            elif use_smart_scene_detection:
                 self._update_task_status(task_id, "processing", 12, "🎬 Smart scene analysis - scanning for cuts...")
                 
                 try:
@@ -801,7 +1095,9 @@ class AsyncVerticalCropService:
                         scene_content_threshold, 
                         scene_fade_threshold, 
                         scene_min_length,
-                        use_fade_detection=True
+                        use_fade_detection=True,
+                        cache_source_id=cache_source_id,
+                        cache_window=cache_window
                     )
                     
                     cut_count = len(scene_data.get("scene_boundaries", set()))
@@ -834,23 +1130,108 @@ class AsyncVerticalCropService:
             
             logger.info(f"🎬 Proceeding to video processing with {scene_data['scene_count']} detected scenes")
             
-            # Extract audio if needed
-            audio_data = None
-            if use_speaker_detection and self.vad:
+            # 📐 STATIC FRAMING - a speaker who barely moves gets one fixed crop per scene, no full analysis
+            static_trajectory = None
+            if two_pass and cached_trajectory is None and not enable_group_conversation_framing:
+                self._update_task_status(task_id, "processing", 16, "📐 Sampling frames for static framing...")
+                async with self._analysis_threads(encoder_profile) as threads:
+                    static_trajectory = await self._analyze_static_framing(
+                        actual_video_path, target_size, use_speaker_detection, fps, total_frames, scene_data,
+                        ignore_micro_cuts, micro_cut_threshold,
+                        source_size=(original_width, original_height), source_fps=source_fps, threads=threads
+                    )
+            
+            # Extract audio and run VAD over the whole clip once, indexed by video frame
+            vad_timeline = None
+            if use_speaker_detection and self.vad and cached_trajectory is None and static_trajectory is None:
                 self._update_task_status(task_id, "processing", 17, "Extracting audio for voice detection...")
                 audio_data = await self.extract_audio_for_vad(actual_video_path)
+                if audio_data:
+                    vad_timeline = await self._run_cpu_bound_task(
+                        build_vad_timeline, audio_data, self.vad, source_fps or fps
+                    )
             
             # Process video with smart scene awareness
             self._update_task_status(task_id, "processing", 20, "Starting smart video processing...")
             
             # ALWAYS continue to video processing regardless of scene detection result
-            logger.info(f"🎬 Starting video frame processing...")
-            result = await self._process_video_frames_smart(
-                task_id, actual_video_path, output_video_path, 
-                target_size, smoothing_config, audio_data,
-                use_speaker_detection, enable_group_conversation_framing, fps, total_frames, scene_data,
-                ignore_micro_cuts, micro_cut_threshold
-            )
+            result = None
+            if two_pass:
+                if cached_trajectory is not None:
+                    result = {
+                        "success": True,
+                        "trajectory": cached_trajectory,
+                        "smart_resets": cached_trajectory.metadata.get("smart_resets", 0)
+                    }
+                elif static_trajectory is not None:
+                    result = {
+                        "success": True,
+                        "trajectory": static_trajectory,
+                        "smart_resets": static_trajectory.metadata["smart_resets"]
+                    }
+                else:
+                    logger.info(f"🎬 Starting two-pass crop (analysis at {self.analysis_width}px, FFmpeg render)...")
+                    async with self._analysis_threads(encoder_profile) as threads:
+                        result = await self._analyze_crop_trajectory(
+                            task_id, actual_video_path, target_size, smoothing_config, vad_timeline,
+                            use_speaker_detection, fps, total_frames, scene_data,
+                            ignore_micro_cuts, micro_cut_threshold,
+                            source_size=(original_width, original_height), source_fps=source_fps,
+                            enable_group_conversation_framing=enable_group_conversation_framing, threads=threads
+                        )
+                if result["success"] and cache_key and cached_trajectory is None:
+                    result["trajectory"].metadata.update({
+                        "scene_count": scene_data["scene_count"],
+                        "cut_boundaries": scene_data.get("cut_boundaries", [])
+                    })
+                    crop_path_cache.put(cache_key, result["trajectory"])
+                if result["success"]:
+                    trajectory = result["trajectory"]
+                    if trajectory_path:
+                        trajectory.save(trajectory_path)
+                        logger.info(f"💾 Crop trajectory saved: {trajectory_path}")
+                    self._update_task_status(task_id, "processing", 85, "Rendering crop with FFmpeg...")
+                    async with encoder_profiles.encode_async(
+                        "crop_render", clip_id=task_id, media_seconds=total_frames / (source_fps or fps or 30),
+                        profile=encoder_profile
+                    ) as profile:
+                        render_result = await render_crop_trajectory(
+                            actual_video_path, output_video_path, trajectory,
+                            crf=profile["crf"], preset=profile["preset"], threads=profile["threads"],
+                            open_ended=trajectory.metadata.get("static_framing", False),
+                            post_filter=post_filter, thumbnail_frame=thumbnail_frame
+                        )
+                    render_result["smart_resets"] = result["smart_resets"]
+                    render_result["static_framing"] = trajectory.metadata.get("static_framing", False)
+                    render_result["dual_speaker_spans"] = len(trajectory.dual_spans)
+                    result = render_result
+                if not result["success"]:
+                    logger.warning(f"⚠️ Two-pass crop failed ({result.get('error')}) - falling back to frame loop")
+                    result = None
+            
+            if result is None:
+                logger.info(f"🎬 Starting video frame processing...")
+                async with encoder_profiles.encode_async(
+                    "crop_render", clip_id=task_id, media_seconds=total_frames / (source_fps or fps or 30),
+                    profile=encoder_profile
+                ) as profile:
+                    result = await self._process_video_frames_smart(
+                        task_id, actual_video_path, output_video_path, 
+                        target_size, smoothing_config, vad_timeline,
+                        use_speaker_detection, enable_group_conversation_framing, fps, total_frames, scene_data,
+                        ignore_micro_cuts, micro_cut_threshold,
+                        source_size=(original_width, original_height), source_fps=source_fps,
+                        post_filter=post_filter, encoder_profile=profile, thumbnail_frame=thumbnail_frame
+                    )
+            
+            thumbnail = None
+            if result["success"] and result.get("thumbnail_frame") is not None:
+                thumbnail = await self._run_cpu_bound_task(
+                    save_thumbnail_frame, result["thumbnail_frame"],
+                    Path(thumbnail_options["output_dir"]), thumbnail_options["clip_id"],
+                    widths=thumbnail_options.get("widths", (200,)),
+                    image_format=thumbnail_options.get("image_format", "jpg")
+                )
             
             if result["success"]:
                 scene_info = ""
@@ -865,7 +1246,11 @@ class AsyncVerticalCropService:
                         "file_size_mb": result.get("file_size_mb", 0),
                         "scenes_detected": scene_data["scene_count"],
                         "smart_resets": result.get("smart_resets", 0),
-                        "cut_boundaries": scene_data.get("cut_boundaries", [])
+                        "cut_boundaries": scene_data.get("cut_boundaries", []),
+                        "pipeline_stats": result.get("pipeline_stats"),
+                        "crop_cache_hit": cached_trajectory is not None,
+                        "static_framing": result.get("static_framing", False),
+                        "dual_speaker_spans": result.get("dual_speaker_spans", 0)
                     }
                 )
             else:
@@ -888,6 +1273,13 @@ class AsyncVerticalCropService:
                 "output_path": str(output_video_path) if result["success"] else None,
                 "scenes_detected": scene_data["scene_count"],
                 "smart_resets": result.get("smart_resets", 0),
+                "crop_cache_hit": cached_trajectory is not None,
+                "static_framing": result.get("static_framing", False),
+                "dual_speaker_spans": result.get("dual_speaker_spans", 0),
+                "subtitles_burned": result["success"] and post_filter is not None,
+                # The AV1 -> H.264 conversion is an encode of its own
+                "encodes": (1 + int(is_converted)) if result["success"] else 0,
+                "thumbnail": thumbnail,
                 "error": result.get("error")
             }
             
@@ -909,6 +1301,627 @@ class AsyncVerticalCropService:
                 "task_id": task_id
             }
     
+    async def _crop_cache_key(
+        self,
+        input_video_path: Path,
+        cache_source_id: Optional[str],
+        cache_window: Optional[Tuple[float, float]],
+        params: Dict[str, Any]
+    ) -> str:
+        """Crop cache key - hashes the input file (off the event loop) unless a source id is given"""
+        if cache_source_id is None:
+            loop = asyncio.get_event_loop()
+            cache_source_id = await loop.run_in_executor(self.thread_executor, hash_source_file, input_video_path)
+            cache_window = None
+        return crop_cache_key(cache_source_id, cache_window, params)
+    
+    async def _analyze_static_framing(
+        self,
+        input_video_path: Path,
+        target_size: Tuple[int, int],
+        use_speaker_detection: bool,
+        fps: int,
+        total_frames: int,
+        scene_data: Dict[str, Any],
+        ignore_micro_cuts: bool,
+        micro_cut_threshold: int,
+        source_size: Tuple[int, int],
+        source_fps: Optional[float] = None,
+        threads: Optional[int] = None
+    ) -> Optional[CropTrajectory]:
+        """
+        Cheap pre-analysis for static framing: detect faces on ~1 frame per second
+        
+        Between scene cuts the sampled speaker centers must stay within static_max_deviation
+        of the frame width. If every span qualifies, the result is a piecewise-constant
+        trajectory (one fixed crop per span) and no per-frame analysis is needed.
+        Without speaker detection nothing is decoded at all. threads caps the decoder.
+        
+        Returns:
+            CropTrajectory, or None if the speaker moves (or the clip can't be sampled)
+        """
+        if self.static_sample_seconds <= 0 or total_frames <= 0:
+            return None
+        
+        scene_boundaries = scene_data.get("scene_boundaries", set())
+        scene_stats = scene_data.get("scene_stats", [])
+        cuts = sorted(
+            frame for frame in scene_boundaries
+            if 0 < frame < total_frames and self._apply_smart_reset(
+                frame, scene_boundaries, scene_stats, ignore_micro_cuts, micro_cut_threshold
+            )
+        )
+        span_starts = [0] + cuts
+        span_ends = cuts + [total_frames]
+        
+        # Every step-th frame plus the first frame of every span, as a low-rate proxy
+        step = max(1, int(round(fps * self.static_sample_seconds)))
+        reader = AnalysisProxyReader(
+            input_video_path, source_size, self.analysis_width, frame_step=step, extra_frames=cuts,
+            input_args=decoder_thread_args({"threads": threads})
+        )
+        sample_frames = reader.source_indices(total_frames)
+        
+        source_width, source_height = source_size
+        analysis_width, analysis_height = reader.width, reader.height
+        scale_x = source_width / analysis_width
+        scale_y = source_height / analysis_height
+        
+        centers = np.full((len(sample_frames), 2), np.nan)
+        sampled = 0
+        if not use_speaker_detection:
+            sampled = len(sample_frames)
+        else:
+            reader.start()
+            try:
+                previous_center = None
+                for index in range(len(sample_frames)):
+                    frame_index, frame = reader.read_indexed()
+                    if frame is None:
+                        break
+                    speaker_result = await self.find_active_speaker(
+                        frame, None, previous_center, False, frame_index=frame_index
+                    )
+                    center = speaker_result_center(speaker_result)
+                    if center is not None:
+                        centers[index] = (center[0] * scale_x, center[1] * scale_y)
+                        previous_center = center
+                    sampled += 1
+            finally:
+                reader.close()
+        
+        if sampled < len(sample_frames):
+            logger.info(f"📐 Static framing check: only {sampled}/{len(sample_frames)} samples decoded - full analysis")
+            return None
+        
+        sample_frames = np.array(sample_frames)
+        max_deviation = self.static_max_deviation * source_width
+        fallback_center = (source_width * 0.55, source_height * 0.45)
+        frame_centers = np.empty((total_frames, 2))
+        for start, end in zip(span_starts, span_ends):
+            span_centers = centers[(sample_frames >= start) & (sample_frames < end)]
+            span_centers = span_centers[~np.isnan(span_centers[:, 0])]
+            if len(span_centers) == 0:
+                frame_centers[start:end] = fallback_center
+                continue
+            position = np.median(span_centers, axis=0)
+            if np.abs(span_centers - position).max() > max_deviation:
+                logger.info(f"📐 Speaker moves in frames {start}-{end} - full analysis needed")
+                return None
+            frame_centers[start:end] = position
+        
+        crop_size = self._plan_crop_window(source_size, None, target_size)[2:]
+        windows = plan_crop_windows(np.rint(frame_centers).astype(np.int32), source_size, crop_size)
+        trajectory = CropTrajectory(
+            windows, source_fps or fps, source_size, target_size,
+            {
+                "analysis_size": [analysis_width, analysis_height],
+                "smart_resets": len(cuts),
+                "static_framing": True,
+                "sampled_frames": len(sample_frames),
+            }
+        )
+        logger.info(f"📐 Static framing: {len(trajectory.constant_spans())} fixed crops from {len(sample_frames)} sampled frames")
+        return trajectory
+    
+    async def _analyze_crop_trajectory(
+        self,
+        task_id: str,
+        input_video_path: Path,
+        target_size: Tuple[int, int],
+        smoothing_config: Dict[str, Any],
+        vad_timeline: Optional[VADTimeline],
+        use_speaker_detection: bool,
+        fps: int,
+        total_frames: int,
+        scene_data: Dict[str, Any],
+        ignore_micro_cuts: bool,
+        micro_cut_threshold: int,
+        source_size: Tuple[int, int],
+        source_fps: Optional[float] = None,
+        start_frame: int = 0,
+        frame_count_limit: Optional[int] = None,
+        enable_group_conversation_framing: bool = False,
+        threads: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Analysis pass of the two-pass crop: decode a downscaled stream, track the speaker
+        and plan one crop window per frame in source coordinates
+        
+        Args:
+            start_frame: First source frame to analyze (time shards); scene boundaries stay absolute
+            frame_count_limit: Stop after this many frames (None = until end of stream)
+            enable_group_conversation_framing: Plan split-screen spans where two speakers share the shot
+            threads: Decoder threads (the CPU tokens held for the pass; None = FFmpeg's default)
+        
+        Returns:
+            Dict with success, trajectory (CropTrajectory) and smart_resets
+        """
+        reader = None
+        try:
+            scene_boundaries = scene_data.get("scene_boundaries", set())
+            scene_stats = scene_data.get("scene_stats", [])
+            
+            source_width, source_height = source_size
+            input_args = decoder_thread_args({"threads": threads})
+            if start_frame > 0:
+                # Half a frame early lands exactly on start_frame
+                start_offset = probe_video_start_offset(input_video_path)
+                input_args += ['-ss', f'{start_offset + (start_frame - 0.5) / (source_fps or fps):.6f}']
+            reader = AnalysisProxyReader(
+                input_video_path, source_size, self.analysis_width, input_args=input_args
+            ).start()
+            analysis_width, analysis_height = reader.width, reader.height
+            scale_x = source_width / analysis_width
+            scale_y = source_height / analysis_height
+            
+            logger.info(f"🔍 Analysis pass at {analysis_width}x{analysis_height} for {source_width}x{source_height} source")
+            
+            scheduler = DetectionScheduler(max_stride=self.max_detection_stride, tracked_stride=self.max_tracked_stride)
+            tracker = FaceTracker() if self.max_tracked_stride else None
+            
+            # Raw per-frame speaker centers (source coordinates, NaN = no face) - smoothed offline at the end
+            raw_centers: List[Tuple[float, float]] = []
+            resets: List[bool] = []
+            # Per-frame (top, bottom) split-screen windows in source coordinates (None = single layout)
+            dual_windows: List[Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]] = []
+            region_size = (target_size[0], target_size[1] // 2)
+            last_speaker_result = None
+            pending_frames: List[Tuple[int, bool]] = []
+            smart_resets = 0
+            frame_count = 0
+            
+            def plan_frame(speaker_result: Any, should_reset: bool):
+                """Record the raw speaker center of the next frame (in frame order)"""
+                center = speaker_result_center(speaker_result)
+                if center is None:
+                    raw_centers.append((np.nan, np.nan))
+                else:
+                    raw_centers.append((center[0] * scale_x, center[1] * scale_y))
+                if isinstance(speaker_result, dict) and speaker_result.get("mode") == "dual_speaker":
+                    dual_windows.append(tuple(
+                        speaker_region_window(
+                            source_size, scale_box(speaker_result[speaker], scale_x, scale_y), region_size
+                        )
+                        for speaker in ("speaker_1", "speaker_2")
+                    ))
+                else:
+                    dual_windows.append(None)
+                resets.append(should_reset)
+            
+            while frame_count_limit is None or frame_count < frame_count_limit:
+                frame = reader.read()
+                if frame is None:
+                    break
+                
+                should_reset = self._apply_smart_reset(
+                    start_frame + frame_count, scene_boundaries, scene_stats,
+                    ignore_micro_cuts, micro_cut_threshold
+                )
+                if should_reset:
+                    smart_resets += 1
+                
+                if not use_speaker_detection:
+                    plan_frame(None, should_reset)
+                else:
+                    frame_diff = scheduler.frame_difference(frame) if scheduler.enabled else 0.0
+                    
+                    # Follow the speaker box from the last detection - cuts always re-detect
+                    tracked_result = None
+                    tracker_lost = False
+                    if tracker is not None and tracker.box is not None:
+                        if should_reset:
+                            tracker.reset()
+                        else:
+                            tracked_box, _ = tracker.update(frame)
+                            if tracked_box is not None and tracker.active:
+                                tracked_result = tracked_box
+                            else:
+                                tracker_lost = True
+                                tracker.reset()
+                    
+                    if scheduler.should_detect(
+                        frame_count, should_reset, frame_diff,
+                        tracking=tracked_result is not None, tracker_lost=tracker_lost
+                    ):
+                        # The tracked box (if any) is the freshest speaker position for stability scoring
+                        previous_result = tracked_result if tracked_result is not None else last_speaker_result
+                        speaker_result = await self.find_active_speaker(
+                            frame, vad_timeline, speaker_result_center(previous_result),
+                            enable_group_conversation_framing, frame_index=start_frame + frame_count
+                        )
+                        
+                        span = frame_count - scheduler.last_detection_frame if scheduler.last_detection_frame is not None else 1
+                        for pending_index, pending_reset in pending_frames:
+                            # Frames before a cut belong to the previous shot - don't blend across it
+                            t = 0.0 if should_reset else (pending_index - scheduler.last_detection_frame) / span
+                            plan_frame(interpolate_speaker_result(last_speaker_result, speaker_result, t), pending_reset)
+                        pending_frames.clear()
+                        
+                        scheduler.record_detection(frame_count, speaker_result_center(speaker_result), frame.shape[1])
+                        last_speaker_result = speaker_result
+                        plan_frame(speaker_result, should_reset)
+                        
+                        if tracker is not None:
+                            if isinstance(speaker_result, tuple):
+                                tracker.start(frame, speaker_result)
+                            else:
+                                tracker.reset()
+                    elif tracked_result is not None:
+                        # A live track is planned directly - nothing is pending while the tracker holds
+                        last_speaker_result = tracked_result
+                        plan_frame(tracked_result, should_reset)
+                    else:
+                        # Only the frame index is buffered - the window is planned at the next detection
+                        pending_frames.append((frame_count, should_reset))
+                
+                frame_count += 1
+                if total_frames and frame_count % (fps * 5) == 0:
+                    progress = 20 + int((frame_count / total_frames) * 60)
+                    self._update_task_status(task_id, "processing", min(progress, 80), f"🔍 Analyzed {frame_count}/{total_frames} frames")
+            
+            for pending_index, pending_reset in pending_frames:
+                plan_frame(last_speaker_result, pending_reset)
+            
+            reader.close()
+            if use_speaker_detection:
+                logger.info(f"👁️ Face detection schedule: {scheduler.get_stats()}")
+            
+            if not raw_centers:
+                return {"success": False, "error": "No frames decoded during analysis"}
+            
+            # Whole-path smoothing with lookahead (replaces the per-frame _smooth_crop_center)
+            centers = smooth_crop_path(
+                np.array(raw_centers), np.array(resets), smoothing_config,
+                fallback_center=(source_width * 0.55, source_height * 0.45)
+            )
+            crop_size = self._plan_crop_window(source_size, None, target_size)[2:]
+            windows = plan_crop_windows(centers, source_size, crop_size)
+            
+            # Split-screen needs at least half a second of both speakers, so the layout never flickers
+            dual_spans = plan_dual_spans(dual_windows, resets, max(1, fps // 2))
+            
+            trajectory = CropTrajectory(
+                windows, source_fps or fps, source_size, target_size,
+                {
+                    "analysis_size": [analysis_width, analysis_height], "smart_resets": smart_resets,
+                    "start_frame": start_frame, "dual_spans": dual_spans
+                }
+            )
+            logger.info(f"✅ Analysis pass complete: {len(trajectory)} crop windows, {smart_resets} smart resets, {len(dual_spans)} split-screen spans")
+            return {"success": True, "trajectory": trajectory, "smart_resets": smart_resets}
+        except Exception as e:
+            logger.error(f"❌ Crop analysis failed: {str(e)}")
+            if reader is not None:
+                reader.close()
+            return {"success": False, "error": str(e)}
+    
+    async def create_vertical_crop_in_process(
+        self,
+        input_video_path: Path,
+        output_video_path: Path,
+        task_id: Optional[str] = None,
+        **crop_options
+    ) -> Dict[str, Any]:
+        """
+        Crop a whole clip in a worker process of the process pool
+        
+        The worker runs create_vertical_crop_async with its own service instance (and its own
+        MediaPipe detector), so several clips crop in parallel without sharing the GIL.
+        Only paths and counters cross the process boundary, never frames.
+        
+        Args:
+            crop_options: Keyword arguments for create_vertical_crop_async
+        """
+        if not task_id:
+            task_id = self._create_task_id()
+        
+        cost = await self._run_cpu_bound_task(
+            self._estimate_task_cost, input_video_path, crop_options.get("use_speaker_detection", True),
+            crop_options.get("enable_group_conversation_framing", False)
+        )
+        ticket = await self._wait_for_admission(task_id, cost, {
+            "input_path": str(input_video_path),
+            "output_path": str(output_video_path),
+            "execution_mode": "process"
+        })
+        try:
+            # The worker can't see this process's encoder backlog - choose its encoder settings here
+            async with encoder_profiles.encode_async("crop_render", clip_id=task_id, profile=crop_options.get("encoder_profile")) as profile:
+                result = await self._crop_admitted_clip_in_process(
+                    task_id, input_video_path, output_video_path, {**crop_options, "encoder_profile": profile}
+                )
+        finally:
+            self.admission_queue.release(ticket)
+        if result is None:
+            # The worker process died - crop in-process (this re-enters the admission queue)
+            with self.task_lock:
+                self.active_tasks.pop(task_id, None)
+            return await self.create_vertical_crop_async(
+                input_video_path, output_video_path, task_id=task_id, **crop_options
+            )
+        result["queue_wait_seconds"] = round(ticket.wait_seconds, 3)
+        return result
+    
+    async def _crop_admitted_clip_in_process(
+        self,
+        task_id: str,
+        input_video_path: Path,
+        output_video_path: Path,
+        crop_options: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Body of create_vertical_crop_in_process (None = the worker process pool broke)"""
+        # Long clips: split into time shards so one clip can use every worker process.
+        # Sharded crops don't use the crop-path cache and don't write trajectory_path:
+        # each shard plans its own partial trajectory, so there is no whole-clip one.
+        can_shard = (
+            self.shard_min_seconds > 0 and
+            self.crop_processes > 1 and
+            not crop_options.get("enable_group_conversation_framing") and
+            not crop_options.get("subtitles_path") and
+            crop_options.get("render_mode", "two_pass") == "two_pass"
+        )
+        if can_shard:
+            cap = cv2.VideoCapture(str(input_video_path))
+            fps = cap.get(cv2.CAP_PROP_FPS) if cap.isOpened() else 0
+            duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps if fps else 0
+            cap.release()
+            if duration >= self.shard_min_seconds:
+                return await self.create_vertical_crop_sharded(
+                    input_video_path, output_video_path,
+                    shard_seconds=duration / self.crop_processes,
+                    task_id=task_id,
+                    **{key: crop_options[key] for key in (
+                        "use_speaker_detection", "use_smart_scene_detection", "smoothing_strength",
+                        "ignore_micro_cuts", "micro_cut_threshold", "encoder_profile", "thumbnail_options"
+                    ) if key in crop_options}
+                )
+        
+        self._update_task_status(task_id, "processing", 0, "Cropping in worker process...")
+        
+        try:
+            result = await self._run_heavy_task(
+                _crop_clip_in_worker_process, str(input_video_path), str(output_video_path), crop_options
+            )
+        except BrokenProcessPool as e:
+            logger.error(f"❌ Crop worker process died ({e}) - cropping in-process instead")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Crop worker process failed for task {task_id}: {e}")
+            result = {"success": False, "error": str(e)}
+        
+        result["task_id"] = task_id
+        if result.get("success"):
+            self._update_task_status(
+                task_id, "completed", 100,
+                f"Vertical crop completed in worker process {result.get('worker_pid')}",
+                {"output_path": result.get("output_path")}
+            )
+        else:
+            self._update_task_status(task_id, "failed", 0, f"Processing failed: {result.get('error', 'Unknown error')}")
+        return result
+    
+    async def create_vertical_crop_sharded(
+        self,
+        input_video_path: Path,
+        output_video_path: Path,
+        shard_seconds: float = 30.0,
+        warmup_seconds: float = 2.0,
+        use_speaker_detection: bool = True,
+        use_smart_scene_detection: bool = False,
+        smoothing_strength: str = "very_high",
+        ignore_micro_cuts: bool = True,
+        micro_cut_threshold: int = 10,
+        task_id: Optional[str] = None,
+        encoder_profile: Optional[Dict[str, Any]] = None,
+        thumbnail_options: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Crop a long clip as K time shards in parallel worker processes
+        
+        Every shard starts tracking warmup_seconds before its first frame so the smoothing
+        state has converged at the shard boundary. Shards are video-only two-pass renders,
+        stitched with the concat demuxer (no re-encode) with the source audio muxed once.
+        
+        Args:
+            shard_seconds: Target shard length
+            warmup_seconds: Overlap decoded (but not rendered) before each shard
+            encoder_profile: Encoder settings for the clip; its threads are split between shards
+            thumbnail_options: As for create_vertical_crop_async; the shard holding the
+                thumbnail frame returns it from its render
+        """
+        if not task_id:
+            task_id = self._create_task_id()
+        
+        with self.task_lock:
+            self.active_tasks[task_id] = {
+                "task_id": task_id,
+                "status": "processing",
+                "progress": 0,
+                "message": "Planning time shards...",
+                "created_at": datetime.now(),
+                "input_path": str(input_video_path),
+                "output_path": str(output_video_path),
+                "execution_mode": "sharded"
+            }
+        
+        actual_video_path = input_video_path
+        shard_dir = output_video_path.parent / f".shards_{task_id}"
+        try:
+            # A caller holding the clip's CPU tokens (create_vertical_crop_in_process) lends them
+            # to the conversion - asking the budget again while holding them can wait forever
+            actual_video_path = await self._detect_and_convert_av1_if_needed(input_video_path, encoder_profile)
+            
+            cap = cv2.VideoCapture(str(actual_video_path))
+            if not cap.isOpened():
+                raise Exception(f"Could not open video: {actual_video_path}")
+            source_size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            cap.release()
+            
+            scene_data = {}
+            if use_smart_scene_detection:
+                self._update_task_status(task_id, "processing", 5, "🎬 Smart scene analysis - scanning for cuts...")
+                scene_data = await self._smart_scene_detection(actual_video_path, 30.0, 8.0, 15, use_fade_detection=True)
+            
+            shards = plan_time_shards(total_frames, fps, shard_seconds, warmup_seconds)
+            if thumbnail_options:
+                thumbnail_frame = thumbnail_frame_index(thumbnail_options.get("timestamp", 1.0), fps, total_frames)
+                for shard in shards:
+                    if shard["start_frame"] <= thumbnail_frame and (shard["end_frame"] is None or thumbnail_frame < shard["end_frame"]):
+                        shard["thumbnail_frame"] = thumbnail_frame - shard["start_frame"]
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            shard_paths = [shard_dir / f"shard_{shard['index']:03d}.mp4" for shard in shards]
+            
+            logger.info(f"🧩 Cropping {total_frames} frames as {len(shards)} time shards ({shard_seconds}s + {warmup_seconds}s warm-up) on {self.crop_processes} processes")
+            self._update_task_status(task_id, "processing", 10, f"Cropping {len(shards)} time shards in parallel...")
+            
+            # The shards split the clip's CPU tokens (taken here unless the caller already holds them)
+            async with encoder_profiles.encode_async("crop_render", clip_id=task_id, profile=encoder_profile) as encoder_profile:
+                shard_options = {
+                    "source_size": source_size,
+                    "fps": fps,
+                    "use_speaker_detection": use_speaker_detection,
+                    "smoothing_strength": smoothing_strength,
+                    "scene_data": {
+                        "scene_boundaries": scene_data.get("scene_boundaries", set()),
+                        "scene_stats": scene_data.get("scene_stats", []),
+                    },
+                    "ignore_micro_cuts": ignore_micro_cuts,
+                    "micro_cut_threshold": micro_cut_threshold,
+                    "encoder_profile": {
+                        **encoder_profile,
+                        "threads": max(1, (encoder_profile["threads"] or encoder_profiles.cores) // len(shards))
+                    },
+                }
+                results = await asyncio.gather(*[
+                    self._run_heavy_task(_crop_shard_in_worker_process, str(actual_video_path), str(path), shard, shard_options)
+                    for shard, path in zip(shards, shard_paths)
+                ])
+            failed = [r for r in results if not r.get("success")]
+            if failed:
+                raise Exception(f"{len(failed)}/{len(shards)} shards failed: {failed[0].get('error')}")
+            
+            self._update_task_status(task_id, "processing", 90, "Stitching shards...")
+            concat_result = await concat_video_shards(shard_paths, actual_video_path, output_video_path)
+            if not concat_result["success"]:
+                raise Exception(concat_result["error"])
+            
+            thumbnail = None
+            thumbnail_frame = next((r["thumbnail_frame"] for r in results if r.get("thumbnail_frame") is not None), None)
+            if thumbnail_frame is not None:
+                thumbnail = await self._run_cpu_bound_task(
+                    save_thumbnail_frame, thumbnail_frame,
+                    Path(thumbnail_options["output_dir"]), thumbnail_options["clip_id"],
+                    widths=thumbnail_options.get("widths", (200,)),
+                    image_format=thumbnail_options.get("image_format", "jpg")
+                )
+            
+            smart_resets = sum(r.get("smart_resets", 0) for r in results)
+            file_size_mb = output_video_path.stat().st_size / (1024 * 1024)
+            self._update_task_status(
+                task_id, "completed", 100,
+                f"Sharded vertical crop completed ({len(shards)} shards): {output_video_path}",
+                {"output_path": str(output_video_path), "file_size_mb": round(file_size_mb, 2), "shards": len(shards)}
+            )
+            return {
+                "success": True,
+                "task_id": task_id,
+                "output_path": str(output_video_path),
+                "shards": len(shards),
+                "smart_resets": smart_resets,
+                "file_size_mb": round(file_size_mb, 2),
+                # Shards each encode their own frames once; AV1 input adds the conversion encode
+                "encodes": 1 + int(actual_video_path != input_video_path),
+                "thumbnail": thumbnail
+            }
+        except Exception as e:
+            logger.error(f"❌ Sharded vertical crop failed for task {task_id}: {str(e)}")
+            self._update_task_status(task_id, "failed", 0, f"Error: {str(e)}")
+            return {"success": False, "error": str(e), "task_id": task_id}
+        finally:
+            shutil.rmtree(shard_dir, ignore_errors=True)
+            if actual_video_path != input_video_path and actual_video_path.exists():
+                actual_video_path.unlink()
+    
+    async def crop_time_shard(
+        self,
+        input_video_path: Path,
+        output_path: Path,
+        shard: Dict[str, Any],
+        source_size: Tuple[int, int],
+        fps: float,
+        use_speaker_detection: bool = True,
+        smoothing_strength: str = "very_high",
+        scene_data: Optional[Dict[str, Any]] = None,
+        ignore_micro_cuts: bool = True,
+        micro_cut_threshold: int = 10,
+        encoder_profile: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Crop one time shard (from plan_time_shards) into a video-only file
+        
+        Tracking starts warmup_frames before the shard and runs lookahead_frames past its end;
+        those windows are dropped before rendering. A shard with a thumbnail_frame (relative
+        to its start_frame) returns that cropped frame as thumbnail_frame.
+        """
+        start_frame = shard["start_frame"]
+        analysis_start = start_frame - shard["warmup_frames"]
+        # The offline smoother looks ahead, so analyze the same overlap past the shard end as well
+        frame_limit = None if shard["end_frame"] is None else shard["end_frame"] + shard["lookahead_frames"] - analysis_start
+        target_size = self._vertical_target_size(source_size[1])
+        smoothing_config = self.SMOOTHING_CONFIGS.get(smoothing_strength, self.SMOOTHING_CONFIGS["medium"])
+        
+        analysis = await self._analyze_crop_trajectory(
+            f"shard_{shard['index']}", input_video_path, target_size, smoothing_config, None,
+            use_speaker_detection, max(1, int(fps)), 0, scene_data or {},
+            ignore_micro_cuts, micro_cut_threshold,
+            source_size=source_size, source_fps=fps,
+            start_frame=analysis_start, frame_count_limit=frame_limit,
+            threads=encoder_profile["threads"] if encoder_profile else None
+        )
+        if not analysis["success"]:
+            return analysis
+        
+        trajectory = analysis["trajectory"]
+        first = start_frame - analysis_start
+        last = None if shard["end_frame"] is None else first + shard["end_frame"] - start_frame
+        trajectory.windows = trajectory.windows[first:last]
+        if not len(trajectory):
+            return {"success": False, "error": f"Shard {shard['index']} has no frames after warm-up"}
+        
+        encoder_settings = {}
+        if encoder_profile:
+            encoder_settings = {key: encoder_profile[key] for key in ("crf", "preset", "threads")}
+        result = await render_crop_trajectory(
+            input_video_path, output_path, trajectory, start_frame=start_frame, include_audio=False,
+            thumbnail_frame=shard.get("thumbnail_frame"), **encoder_settings
+        )
+        result["frames"] = len(trajectory)
+        result["smart_resets"] = analysis["smart_resets"]
+        return result
+    
     async def _process_video_frames_smart(
         self,
         task_id: str,
@@ -916,16 +1929,34 @@ class AsyncVerticalCropService:
         output_video_path: Path,
         target_size: Tuple[int, int],
         smoothing_config: Dict[str, Any],
-        audio_data: Optional[bytes],
+        vad_timeline: Optional[VADTimeline],
         use_speaker_detection: bool,
         enable_group_conversation_framing: bool,
         fps: int,
         total_frames: int,
         scene_data: Dict[str, Any],
         ignore_micro_cuts: bool,
-        micro_cut_threshold: int
+        micro_cut_threshold: int,
+        source_size: Tuple[int, int],
+        source_fps: Optional[float] = None,
+        post_filter: Optional[str] = None,
+        encoder_profile: Optional[Dict[str, Any]] = None,
+        thumbnail_frame: Optional[int] = None
     ) -> Dict[str, Any]:
-        """Process video frames with smart scene-aware cropping and explicit reset events"""
+        """
+        Process video frames with smart scene-aware cropping and explicit reset events
+        
+        Runs as a stage pipeline: a decoder thread, face detection on the thread pool or in
+        detector processes (several detections in flight), an in-order crop planner and a
+        crop/encode writer thread. With thumbnail_frame, a copy of that cropped frame (before
+        post_filter) is returned as thumbnail_frame.
+        """
+        reader = None
+        writer = None
+        decoder = None
+        writer_stage = None
+        planner = None
+        detector_pool = None
         try:
             logger.info(f"🎬 Starting smart video frame processing...")
             logger.info(f"   📁 Input: {input_video_path}")
@@ -934,9 +1965,7 @@ class AsyncVerticalCropService:
             logger.info(f"   🎬 Scene boundaries: {len(scene_data.get('scene_boundaries', set()))}")
             logger.info(f"   🎛️ Total frames to process: {total_frames}")
 
-            # Setup temp video path
-            temp_video_path = output_video_path.with_name(f"{output_video_path.stem}_temp_{task_id}.mp4")
-            temp_video_path.parent.mkdir(parents=True, exist_ok=True)
+            output_video_path.parent.mkdir(parents=True, exist_ok=True)
 
             # Extract scene information
             scene_boundaries = scene_data.get("scene_boundaries", set())
@@ -950,206 +1979,272 @@ class AsyncVerticalCropService:
 
             logger.info(f"🎬 Starting smart processing with {len(scene_boundaries)} scene boundaries")
 
-            # Setup audio generator
-            audio_generator = None
-            if audio_data:
-                logger.info(f"🔊 Audio data available for voice detection")
-                audio_generator = self._process_audio_frames(audio_data)
+            if vad_timeline is not None:
+                logger.info(f"🔊 VAD timeline available for voice detection ({vad_timeline.speech_ratio():.0%} speech)")
             else:
                 logger.info(f"🔇 No audio data - using visual detection only")
 
-            # Use OpenCV directly since conda-forge handles AV1 perfectly
-            import cv2
-            import numpy as np
-            frame_count = 0
             last_progress_update = 0
 
-            # Setup video writer for temp output
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            out = cv2.VideoWriter(str(temp_video_path), fourcc, fps, target_size)
-            if not out.isOpened():
-                raise Exception(f"Could not open video writer for: {temp_video_path} - no compatible codec found")
+            # Source audio is muxed by the encoder itself - no temp file, no separate merge pass
+            audio_codec = probe_audio_codec(input_video_path)
+            if audio_codec is None:
+                logger.warning("⚠️ Original video has no audio. The output will be silent.")
 
-            # Use OpenCV VideoCapture directly (works great with conda-forge AV1 support)
-            cap = cv2.VideoCapture(str(input_video_path))
-            if not cap.isOpened():
-                raise Exception(f"Could not open video with OpenCV: {input_video_path}")
-            
-            logger.info(f"🎬 Using OpenCV VideoCapture for frame processing (AV1 native support)")
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # 🔍 FRAME VALIDATION: Validate frame before processing
-                if frame is None:
-                    logger.warning(f"Frame {frame_count} is None - skipping")
-                    frame_count += 1
-                    continue
-                
-                if not isinstance(frame, np.ndarray):
-                    logger.warning(f"Frame {frame_count} is not a numpy array - skipping")
-                    frame_count += 1
-                    continue
-                
-                if frame.size == 0:
-                    logger.warning(f"Frame {frame_count} is empty (size=0) - skipping")
-                    frame_count += 1
-                    continue
-                
-                if len(frame.shape) < 3 or frame.shape[2] != 3:
-                    logger.warning(f"Frame {frame_count} has invalid shape {frame.shape} - skipping")
-                    frame_count += 1
-                    continue
-                
-                h, w = frame.shape[:2]
-                if h <= 0 or w <= 0:
-                    logger.warning(f"Frame {frame_count} has invalid dimensions {w}x{h} - skipping")
-                    frame_count += 1
-                    continue
+            source_width, source_height = source_size
+            reader = FFmpegFrameReader(
+                input_video_path, source_width, source_height,
+                input_args=decoder_thread_args(encoder_profile) if encoder_profile else None
+            ).start()
+            writer = FFmpegFrameWriter(
+                output_video_path, target_size[0], target_size[1], source_fps or fps,
+                audio_source=input_video_path if audio_codec else None,
+                audio_codec=audio_codec,
+                extra_output_args=['-vf', post_filter] if post_filter else None,
+                **({
+                    "crf": encoder_profile["crf"],
+                    "preset": encoder_profile["preset"],
+                    "threads": encoder_profile["threads"]
+                } if encoder_profile else {})
+            ).start()
+            
+            scheduler = DetectionScheduler(max_stride=self.max_detection_stride)
+            
+            # Every buffered frame (between detections, in flight, queued for encode) holds a pool
+            # buffer, so the pool must at least cover one full detection stride
+            pool_size = max(self.pipeline_depth, self.max_detection_stride + 2)
+            loop = asyncio.get_running_loop()
+            decoder = FrameDecoderThread(
+                reader, loop, pool_size,
+                analyze=scheduler.frame_difference if use_speaker_detection and scheduler.enabled else None
+            ).start()
+            
+            # The writer thread renders a frame and pipes it to the encoder before rendering the next,
+            # so one output buffer serves the whole stream
+            output_frame = np.empty((target_size[1], target_size[0], 3), dtype=np.uint8)
+            # Frames reach the writer in order, so a counter finds the thumbnail frame
+            rendered = {"frames": 0, "thumbnail": None}
+            
+            def render_frame(payload) -> np.ndarray:
+                """Crop/encode stage: runs on the writer thread"""
+                frame, speaker_result, crop_center = payload
+                if isinstance(speaker_result, dict):
+                    cropped = self._create_dual_speaker_frame_sync(
+                        frame, speaker_result["speaker_1"], speaker_result["speaker_2"], target_size, out=output_frame
+                    )
+                else:
+                    cropped = self._crop_frame_to_vertical(frame, speaker_result, target_size, crop_center, out=output_frame)
+                if rendered["frames"] == thumbnail_frame:
+                    rendered["thumbnail"] = cropped.copy()
+                rendered["frames"] += 1
+                return cropped
+            
+            writer_stage = FrameWriterThread(
+                writer, render_frame, release=lambda payload: decoder.release(payload[0]), max_queue=pool_size
+            ).start()
+            detect_stats = StageStats("detect")
+            # Detections submitted ahead of the crop planner, bounded by the detector pool size and
+            # by the CPU tokens the encode holds, so detection threads stay within the budget
+            detection_lookahead = self.detection_lookahead
+            if encoder_profile and encoder_profile["threads"]:
+                detection_lookahead = max(1, min(detection_lookahead, encoder_profile["threads"]))
+            segments: asyncio.Queue = asyncio.Queue(maxsize=detection_lookahead)
+            if use_speaker_detection and self.detection_processes > 0:
+                # Frames reach the detector processes through shared memory - only boxes come back
+                detector_pool = SharedMemoryDetectorPool(
+                    self.detection_process_fn, (source_height, source_width, 3),
+                    workers=self.detection_processes,
+                    slot_count=detection_lookahead + self.detection_processes
+                ).start()
+            
+            logger.info(f"🎬 Using pipelined decode → detect → crop/encode ({pool_size} frame buffers, {detection_lookahead} detections in flight)")
+            
+            crop_trajectory: List[Tuple[int, int]] = []
+            
+            def plan_frame(frame_index: int, frame: np.ndarray, speaker_result: Any, should_reset: bool):
+                """Pick the crop for one frame (in frame order) and queue it for the writer"""
+                nonlocal previous_crop_center, recent_centers, last_dual_speaker_frame
                 
-                # SMART SCENE RESET LOGIC
-                should_reset = self._apply_smart_reset(
-                    frame_count, scene_boundaries, scene_stats, 
-                    ignore_micro_cuts, micro_cut_threshold
-                )
                 if should_reset:
-                    smart_resets += 1
-                    recent_centers.clear()
+                    recent_centers = []
                     previous_crop_center = None
-                    logger.info(f"🎬 Smart reset #{smart_resets} at frame {frame_count} - fresh start")
-                    if frame_count - last_progress_update >= (fps * 2):
-                        progress = 20 + int((frame_count / total_frames) * 60)
-                        self._update_task_status(
-                            task_id, "processing", progress,
-                            f"🎬 Smart reset #{smart_resets} at frame {frame_count} - refocusing"
-                        )
-                        last_progress_update = frame_count
-                # Get audio frame
-                audio_frame = None
-                if audio_generator:
-                    try:
-                        audio_frame = next(audio_generator)
-                    except StopIteration:
-                        audio_frame = None
-                # SMART SPEAKER DETECTION
-                speaker_result = None
-                if use_speaker_detection:
-                    speaker_result = await self.find_active_speaker(
-                        frame, audio_frame, previous_crop_center, enable_group_conversation_framing
-                    )
+                
                 can_use_dual_speaker = (
                     speaker_result and 
                     isinstance(speaker_result, dict) and 
                     speaker_result.get("mode") == "dual_speaker" and
-                    (frame_count - last_dual_speaker_frame) >= dual_speaker_stability_threshold
+                    (frame_index - last_dual_speaker_frame) >= dual_speaker_stability_threshold
                 )
                 if can_use_dual_speaker:
-                    last_dual_speaker_frame = frame_count
-                    cropped_frame = await self.create_dual_speaker_frame(
-                        frame, 
-                        speaker_result["speaker_1"], 
-                        speaker_result["speaker_2"], 
-                        target_size
-                    )
-                    h, w = frame.shape[:2]
+                    last_dual_speaker_frame = frame_index
+                    payload = (frame, speaker_result, None)
                     if previous_crop_center is None:
-                        previous_crop_center = (int(w * 0.55), int(h * 0.45))  # FIXED: was 75% right, now 55% center
-                        recent_centers = [(int(w * 0.55), int(h * 0.45))]  # FIXED: consistent with fallback
+                        previous_crop_center = (int(source_width * 0.55), int(source_height * 0.45))  # FIXED: was 75% right, now 55% center
+                        recent_centers = [previous_crop_center]  # FIXED: consistent with fallback
                 else:
                     speaker_box = speaker_result if isinstance(speaker_result, tuple) else None
-                    if speaker_box:
-                        x, y, x1, y1 = speaker_box
-                        raw_center = ((x + x1) // 2, (y + y1) // 2)
-                    else:
-                        h, w = frame.shape[:2]
-                        # 🔧 IMPROVED FALLBACK: Smart center crop when no face detected
-                        # Instead of 75% right (which shows empty space), use better positioning  
-                        crop_center_x = int(w * 0.55)  # 55% from left (FIXED: was 75%, avoids empty spaces)
-                        crop_center_y = int(h * 0.45)  # 45% from top (focus on upper portion)
-                        raw_center = (crop_center_x, crop_center_y)
-                    if should_reset:
-                        crop_center = raw_center
-                        recent_centers = [raw_center]
-                    else:
-                        crop_center, recent_centers = self._smooth_crop_center(
-                            raw_center, previous_crop_center, recent_centers, smoothing_config
-                        )
-                    previous_crop_center = crop_center
-                    cropped_frame = await self.crop_frame_to_vertical(
-                        frame, speaker_box, target_size, crop_center
+                    previous_crop_center, recent_centers = self._next_crop_center(
+                        speaker_box, source_size, should_reset, previous_crop_center, recent_centers, smoothing_config
                     )
-                out.write(cropped_frame)
-                frame_count += 1
-                if frame_count % (fps * 5) == 0:
-                    logger.info(f"📊 Processed {frame_count} frames...")
+                    payload = (frame, speaker_box, previous_crop_center)
+                crop_trajectory.append(previous_crop_center)
+                writer_stage.put(frame_index, payload)
+            
+            async def resolve_segments():
+                """
+                Crop planner: walks detection segments in frame order, interpolating the
+                speaker between consecutive detections
+                
+                A segment is (pending_frames, detection) where detection is
+                (frame_index, frame, should_reset, detection_task) or None (hold last result).
+                """
+                last_speaker_result = None
+                last_index = None
+                error = None
+                while (segment := await segments.get()) is not None:
+                    pending, detection = segment
+                    if error is not None:
+                        # Keep draining so the dispatcher never blocks; just hand buffers back
+                        if detection is not None:
+                            detection[3].cancel()
+                            decoder.release(detection[1])
+                        for _, pending_frame, _ in pending:
+                            decoder.release(pending_frame)
+                        continue
+                    try:
+                        if detection is None:
+                            for pending_index, pending_frame, pending_reset in pending:
+                                plan_frame(pending_index, pending_frame, last_speaker_result, pending_reset)
+                            continue
+                        
+                        detection_index, detection_frame, detection_reset, detection_task = detection
+                        speaker_result = await detection_task
+                        span = detection_index - last_index if last_index is not None else 1
+                        for pending_index, pending_frame, pending_reset in pending:
+                            t = (pending_index - last_index) / span
+                            plan_frame(
+                                pending_index, pending_frame,
+                                interpolate_speaker_result(last_speaker_result, speaker_result, t),
+                                pending_reset
+                            )
+                        scheduler.record_detection(detection_index, speaker_result_center(speaker_result), source_width)
+                        last_speaker_result = speaker_result
+                        last_index = detection_index
+                        plan_frame(detection_index, detection_frame, speaker_result, detection_reset)
+                    except Exception as e:
+                        error = e
+                if error is not None:
+                    raise error
+            
+            async def timed_detection(frame: np.ndarray, frame_index: int, crop_center: Optional[Tuple[int, int]]):
+                start = loop.time()
+                faces = await self._run_cpu_bound_task(detector_pool.detect, frame) if detector_pool else None
+                result = await self.find_active_speaker(
+                    frame, vad_timeline, crop_center, enable_group_conversation_framing, frame_index, faces
+                )
+                detect_stats.record(loop.time() - start)
+                return result
+            
+            started_at = loop.time()
+            planner = asyncio.create_task(resolve_segments())
+            pending_frames: List[Tuple[int, np.ndarray, bool]] = []
             
-            # Clean up video capture and writer
-            cap.release()
-            out.release()
-            logger.info(f"🎬 Frame processing complete. Proceeding to audio merging...")
-            # --- AUDIO INTEGRATION STEP (FIXED - No MoviePy) ---
             try:
-                if not temp_video_path.exists():
-                    logger.error(f"Temp video not found: {temp_video_path}")
-                    return {"success": False, "error": "Temp video not found"}
-                
-                # Check if original video has audio using FFprobe directly
-                check_audio_cmd = [
-                    'ffprobe', '-v', 'quiet', '-select_streams', 'a:0', 
-                    '-show_entries', 'stream=codec_name', '-of', 'csv=p=0', 
-                    str(input_video_path)
-                ]
-                
-                import subprocess
-                audio_check = subprocess.run(check_audio_cmd, capture_output=True, text=True, check=False)
-                
-                if audio_check.returncode != 0 or not audio_check.stdout.strip():
-                    logger.warning("⚠️ Original video has no audio. The output will be silent.")
-                    temp_video_path.rename(output_video_path)
-                    return {"success": True, "output_path": str(output_video_path)}
-                
-                # DIRECT FFmpeg audio merging (no MoviePy)
-                cmd = [
-                    'ffmpeg',
-                    '-hide_banner', '-loglevel', 'error',
-                    '-i', str(temp_video_path),  # Processed video (no audio)
-                    '-i', str(input_video_path), # Original video (with audio)
-                    '-c:v', 'copy',              # Copy video stream as-is
-                    '-c:a', 'aac',               # Re-encode audio for compatibility
-                    '-b:a', '192k',              # High audio bitrate
-                    '-map', '0:v:0',             # Video from processed file
-                    '-map', '1:a:0',             # Audio from original file
-                    '-shortest',                 # Match shortest stream
-                    '-y', str(output_video_path) # CORRECT: -y before output
-                ]
-                
-                logger.info("🔊 Merging audio using direct FFmpeg (no MoviePy)...")
-                result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-                
-                if result.returncode == 0:
-                    logger.info(f"✅ Audio successfully merged! Final video: {output_video_path}")
-                    if temp_video_path.exists():
-                        os.remove(temp_video_path)
-                    return {"success": True, "output_path": str(output_video_path)}
-                else:
-                    logger.error(f"❌ Direct FFmpeg audio merge failed: {result.stderr.strip()}")
-                    # Fallback: save silent video
-                    if temp_video_path.exists():
-                        temp_video_path.rename(output_video_path)
-                        logger.warning(f"⚠️ Fallback: Saved SILENT video to {output_video_path}")
-                    return {"success": True, "output_path": str(output_video_path), "warning": "Silent video - audio merge failed"}
+                while (item := await decoder.get()) is not None:
+                    frame_count, frame, frame_diff = item
                     
-            except Exception as e:
-                logger.error(f"❌ An unexpected error occurred during audio merging: {e}")
-                if temp_video_path.exists():
-                    temp_video_path.rename(output_video_path)
-                    logger.warning(f"⚠️ Fallback: Saved SILENT video to {output_video_path}")
-                return {"success": True, "output_path": str(output_video_path), "warning": "Silent video - error occurred"}
+                    # SMART SCENE RESET LOGIC
+                    should_reset = self._apply_smart_reset(
+                        frame_count, scene_boundaries, scene_stats, 
+                        ignore_micro_cuts, micro_cut_threshold
+                    )
+                    if should_reset:
+                        smart_resets += 1
+                        logger.info(f"🎬 Smart reset #{smart_resets} at frame {frame_count} - fresh start")
+                        if frame_count - last_progress_update >= (fps * 2):
+                            progress = 20 + int((frame_count / total_frames) * 60)
+                            self._update_task_status(
+                                task_id, "processing", progress,
+                                f"🎬 Smart reset #{smart_resets} at frame {frame_count} - refocusing"
+                            )
+                            last_progress_update = frame_count
+                    # SMART SPEAKER DETECTION (strided - frames in between are interpolated by the planner)
+                    if not use_speaker_detection:
+                        await segments.put(([(frame_count, frame, should_reset)], None))
+                    elif scheduler.should_detect(frame_count, should_reset, frame_diff or 0.0):
+                        detection_task = asyncio.create_task(timed_detection(frame, frame_count, previous_crop_center))
+                        await segments.put((pending_frames, (frame_count, frame, should_reset, detection_task)))
+                        pending_frames = []
+                        detect_stats.observe_queue(segments.qsize())
+                    else:
+                        pending_frames.append((frame_count, frame, should_reset))
+                    
+                    if (frame_count + 1) % (fps * 5) == 0:
+                        logger.info(f"📊 Processed {frame_count + 1} frames (queues: decoded={decoder.stats.queue_depth}, detections={segments.qsize()}, encode={writer_stage.stats.queue_depth})")
+                
+                # Frames after the last detection hold its result
+                if pending_frames:
+                    await segments.put((pending_frames, None))
+            finally:
+                await segments.put(None)
+            
+            await planner
+            frame_count = reader.frames_read
+            
+            # Finalize decoder and encoder
+            writer_stage.close()
+            reader.close()
+            returncode = writer.close()
+            if returncode != 0:
+                return {"success": False, "error": f"FFmpeg encoder failed with code {returncode}"}
+            
+            elapsed = loop.time() - started_at
+            pipeline_stats = {
+                "elapsed_seconds": round(elapsed, 3),
+                "frames": frame_count,
+                "fps": round(frame_count / elapsed, 1) if elapsed > 0 else 0.0,
+                "stages": {
+                    "decode": decoder.stats.as_dict(elapsed),
+                    "detect": detect_stats.as_dict(elapsed),
+                    "crop_encode": writer_stage.stats.as_dict(elapsed),
+                },
+                "pool_size": pool_size,
+            }
+            if detector_pool is not None:
+                pipeline_stats["detector_pool"] = detector_pool.get_stats()
+            if use_speaker_detection:
+                logger.info(f"👁️ Face detection schedule: {scheduler.get_stats()}")
+            logger.info(f"📊 Pipeline stats: {pipeline_stats}")
+            
+            file_size_mb = output_video_path.stat().st_size / (1024 * 1024) if output_video_path.exists() else 0
+            logger.info(f"✅ Frame processing complete ({frame_count} frames, {file_size_mb:.1f} MB): {output_video_path}")
+            return {
+                "success": True,
+                "output_path": str(output_video_path),
+                "file_size_mb": round(file_size_mb, 2),
+                "smart_resets": smart_resets,
+                "crop_trajectory": crop_trajectory,
+                "pipeline_stats": pipeline_stats,
+                "thumbnail_frame": rendered["thumbnail"]
+            }
         except Exception as e:
             logger.error(f"❌ Smart frame processing failed: {str(e)}")
+            if planner is not None and not planner.done():
+                planner.cancel()
+            if decoder is not None:
+                decoder.stop()
+            if writer_stage is not None:
+                writer_stage.abort()
+            if writer is not None:
+                writer.abort()
+            if reader is not None:
+                reader.close()
+            if output_video_path.exists():
+                output_video_path.unlink()
             return {"success": False, "error": str(e)}
+        finally:
+            if detector_pool is not None:
+                await self._run_cpu_bound_task(detector_pool.close)
     
     async def _add_audio_to_video(self, temp_video_path: Path, input_video_path: Path, output_video_path: Path) -> bool:
         """Add audio back to processed video with enhanced sync preservation"""
@@ -1251,7 +2346,9 @@ class AsyncVerticalCropService:
         content_threshold: float = 30.0,
         fade_threshold: float = 8.0,
         min_scene_len: int = 15,
-        use_fade_detection: bool = True
+        use_fade_detection: bool = True,
+        cache_source_id: Optional[str] = None,
+        cache_window: Optional[Tuple[float, float]] = None
     ) -> Dict[str, Any]:
         """
         Smart scene detection with timeout protection and robust fallback
@@ -1262,14 +2359,12 @@ class AsyncVerticalCropService:
             fade_threshold: Sensitivity for gradual transitions/fades
             min_scene_len: Minimum scene length in frames to avoid micro-cuts
             use_fade_detection: Whether to detect gradual fades as scene changes
+            cache_source_id: Stable source id for the scene-cut cache (default: the file itself)
+            cache_window: (start, end) seconds of this clip within cache_source_id
             
         Returns:
             Dict with scene_boundaries (set), scene_stats, and metadata
         """
-        if not SCENEDETECT_AVAILABLE:
-            logger.warning("⚠️ PySceneDetect not available. Smart scene detection skipped.")
-            return {"scene_boundaries": set(), "scene_count": 0, "scene_stats": [], "total_duration": 0, "cut_boundaries": []}
-        
         try:
             logger.info(f"🎬 Starting async scene detection with 60s timeout...")
             
@@ -1277,7 +2372,8 @@ class AsyncVerticalCropService:
             result = await asyncio.wait_for(
                 self._run_cpu_bound_task(
                     self._detect_scenes_smart_sync, 
-                    video_path, content_threshold, fade_threshold, min_scene_len, use_fade_detection
+                    video_path, content_threshold, fade_threshold, min_scene_len, use_fade_detection,
+                    cache_source_id, cache_window
                 ),
                 timeout=60.0  # 60 second timeout
             )
@@ -1303,84 +2399,30 @@ class AsyncVerticalCropService:
         content_threshold: float = 30.0,
         fade_threshold: float = 8.0,
         min_scene_len: int = 15,
-        use_fade_detection: bool = True
+        use_fade_detection: bool = True,
+        cache_source_id: Optional[str] = None,
+        cache_window: Optional[Tuple[float, float]] = None
     ) -> Dict[str, Any]:
-        """Synchronous smart scene detection with multiple detectors and robust error handling"""
+        """Synchronous scene detection on a 64x36 grayscale proxy, cached per source and time range"""
         try:
             logger.info(f"🎬 Starting scene detection for: {video_path}")
             
-            # Create video manager and scene manager
-            video_manager = VideoManager([str(video_path)])
-            scene_manager = SceneManager()
-            
-            # Add multiple detectors for comprehensive scene detection
-            scene_manager.add_detector(ContentDetector(threshold=content_threshold, min_scene_len=min_scene_len))
-            
-            if use_fade_detection:
-                scene_manager.add_detector(ThresholdDetector(threshold=fade_threshold, min_scene_len=min_scene_len))
-            
-            # Set duration and start with timeout protection
-            video_manager.set_duration()
-            video_manager.start()
-            
-            logger.info(f"🎬 Video manager started, detecting scenes...")
-            
-            # Perform scene detection with progress feedback
-            scene_manager.detect_scenes(frame_source=video_manager)
-            
-            logger.info(f"🎬 Scene detection completed, processing results...")
-            
-            # Get scene list and convert to frame numbers for easy lookup
-            scene_list = scene_manager.get_scene_list()
-            scene_boundaries = set()
-            scene_stats = []
-            
-            if not scene_list:
-                logger.warning("�� No scenes detected - video might be very stable or detection failed")
-                video_manager.release()
-                return {
-                    "scene_boundaries": set(),
-                    "scene_count": 0,
-                    "scene_stats": [],
-                    "total_duration": 0,
-                    "cut_boundaries": []
-                }
-            
-            for i, (start_time, end_time) in enumerate(scene_list):
-                start_frame = int(start_time.get_frames())
-                end_frame = int(end_time.get_frames())
-                scene_length = end_frame - start_frame
-                
-                # Add end frame as boundary (where next scene starts)
-                if i < len(scene_list) - 1:  # Don't add boundary after last scene
-                    scene_boundaries.add(end_frame)
-                
-                scene_stats.append({
-                    "scene_id": i,
-                    "start_frame": start_frame,
-                    "end_frame": end_frame,
-                    "length_frames": scene_length,
-                    "start_time": start_time.get_seconds(),
-                    "end_time": end_time.get_seconds(),
-                    "duration": end_time.get_seconds() - start_time.get_seconds()
-                })
-            
-            video_manager.release()
-            
-            total_duration = scene_list[-1][1].get_seconds() if scene_list else 0
+            result = detect_scene_cuts(
+                video_path,
+                content_threshold=content_threshold,
+                fade_threshold=fade_threshold,
+                min_scene_len=min_scene_len,
+                use_fade_detection=use_fade_detection,
+                cache_source_id=cache_source_id,
+                cache_window=cache_window
+            )
             
             logger.info(f"🎬 Smart scene detection complete:")
-            logger.info(f"   └─ {len(scene_list)} scenes detected")
-            logger.info(f"   └─ {len(scene_boundaries)} cut boundaries found")
-            logger.info(f"   └─ Scene boundaries at frames: {sorted(list(scene_boundaries))}")
+            logger.info(f"   └─ {result['scene_count']} scenes detected")
+            logger.info(f"   └─ {len(result['scene_boundaries'])} cut boundaries found")
+            logger.info(f"   └─ Scene boundaries at frames: {result['cut_boundaries']}")
             
-            return {
-                "scene_boundaries": scene_boundaries,
-                "scene_count": len(scene_list),
-                "scene_stats": scene_stats,
-                "total_duration": total_duration,
-                "cut_boundaries": sorted(list(scene_boundaries))
-            }
+            return result
             
         except Exception as e:
             logger.error(f"🎬 Scene detection sync error: {e}")
@@ -1447,28 +2489,28 @@ class AsyncVerticalCropService:
         speaker_1_box: Tuple[int, int, int, int],
         speaker_2_box: Tuple[int, int, int, int],
         target_size: Tuple[int, int],
-        padding_factor: float = 1.8
+        padding_factor: float = 1.8,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Create a split-screen vertical frame with two speakers
         Top half: Speaker 1, Bottom half: Speaker 2
+        
+        Args:
+            out: Optional (target_height, target_width, 3) buffer to render into, reused across frames
         """
         target_width, target_height = target_size
         half_height = target_height // 2
         
-        # Create individual crops for each speaker
-        speaker_1_crop = self._crop_single_speaker_region(
-            frame, speaker_1_box, (target_width, half_height), padding_factor
+        # Each speaker crop is resized straight into its half of the split-screen frame
+        dual_frame = out if out is not None else np.empty((target_height, target_width, 3), dtype=np.uint8)
+        self._crop_single_speaker_region(
+            frame, speaker_1_box, (target_width, half_height), padding_factor, out=dual_frame[0:half_height]
         )
-        
-        speaker_2_crop = self._crop_single_speaker_region(
-            frame, speaker_2_box, (target_width, half_height), padding_factor
+        self._crop_single_speaker_region(
+            frame, speaker_2_box, (target_width, half_height), padding_factor, out=dual_frame[half_height:2 * half_height]
         )
-        
-        # Combine into split-screen layout
-        dual_frame = np.zeros((target_height, target_width, 3), dtype=np.uint8)
-        dual_frame[0:half_height, :] = speaker_1_crop  # Top half
-        dual_frame[half_height:target_height, :] = speaker_2_crop  # Bottom half
+        dual_frame[2 * half_height:] = 0  # Odd target heights leave one row
         
         # Optional: Add a subtle divider line
         divider_y = half_height
@@ -1481,61 +2523,32 @@ class AsyncVerticalCropService:
         frame: np.ndarray,
         speaker_box: Tuple[int, int, int, int],
         target_size: Tuple[int, int],
-        padding_factor: float = 1.8
+        padding_factor: float = 1.8,
+        out: Optional[np.ndarray] = None
     ) -> np.ndarray:
         """
         Crop a single speaker region with smart framing
+        
+        Args:
+            out: Optional (target_height, target_width, 3) buffer to render into
         """
         h, w = frame.shape[:2]
         target_width, target_height = target_size
         
-        x, y, x1, y1 = speaker_box
-        face_center_x = (x + x1) // 2
-        face_center_y = (y + y1) // 2
-        face_height = y1 - y
-        
-        # Add padding above the face for better framing
-        padding_y = int(face_height * padding_factor) // 2
-        crop_center_x = face_center_x
-        crop_center_y = max(face_center_y - padding_y, face_center_y)
-        
-        # Calculate crop dimensions maintaining aspect ratio
-        target_aspect = target_width / target_height
-        
-        if w / h > target_aspect:
-            crop_height = min(h, int(target_height * 0.8))  # Use 80% of available height for better framing
-            crop_width = int(crop_height * target_aspect)
-        else:
-            crop_width = min(w, int(target_width * 0.8))
-            crop_height = int(crop_width / target_aspect)
-        
-        # Calculate crop boundaries
-        left = max(0, crop_center_x - crop_width // 2)
-        right = min(w, left + crop_width)
-        top = max(0, crop_center_y - crop_height // 2)
-        bottom = min(h, top + crop_height)
-        
-        # Adjust if boundaries are out of frame
-        if right - left < crop_width:
-            if left == 0:
-                right = min(w, crop_width)
-            else:
-                left = max(0, w - crop_width)
-        
-        if bottom - top < crop_height:
-            if top == 0:
-                bottom = min(h, crop_height)
-            else:
-                top = max(0, h - crop_height)
+        # Same window the two-pass render crops in FFmpeg for split-screen spans
+        left, top, crop_width, crop_height = speaker_region_window((w, h), speaker_box, target_size)
+        right, bottom = left + crop_width, top + crop_height
         
         # Perform crop
         cropped = frame[top:bottom, left:right]
         
         # Resize to exact target size
-        if cropped.shape[:2] != (target_height, target_width):
-            cropped = cv2.resize(cropped, target_size)
-        
-        return cropped
+        if cropped.shape[:2] == (target_height, target_width):
+            if out is None:
+                return cropped
+            np.copyto(out, cropped)
+            return out
+        return cv2.resize(cropped, target_size, dst=out)
     
     async def create_dual_speaker_frame(
         self,
@@ -1551,8 +2564,50 @@ class AsyncVerticalCropService:
             frame, speaker_1_box, speaker_2_box, target_size, padding_factor
         )
 
-# Global async service instance
-async_vertical_crop_service = AsyncVerticalCropService()
+# Per-process service used by crop worker processes (created on first use in the worker)
+_worker_crop_service: Optional[AsyncVerticalCropService] = None
+
+def _get_worker_crop_service() -> AsyncVerticalCropService:
+    global _worker_crop_service
+    if _worker_crop_service is None:
+        # Each worker only crops one clip at a time - keep its thread pools small
+        _worker_crop_service = AsyncVerticalCropService(max_workers=2)
+    return _worker_crop_service
+
+def _crop_clip_in_worker_process(input_path: str, output_path: str, crop_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Process pool entry point: crop one clip and return its output path and counters"""
+    result = asyncio.run(_get_worker_crop_service().create_vertical_crop_async(
+        Path(input_path), Path(output_path), **crop_options
+    ))
+    result["worker_pid"] = os.getpid()
+    return result
+
+def _detect_faces_in_worker_process(frame: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """Detector pool entry point: face boxes for one shared-memory frame"""
+    return _get_worker_crop_service()._detect_faces_sync(frame)
+
+def _crop_shard_in_worker_process(input_path: str, output_path: str, shard: Dict[str, Any], shard_options: Dict[str, Any]) -> Dict[str, Any]:
+    """Process pool entry point: crop one time shard"""
+    result = asyncio.run(_get_worker_crop_service().crop_time_shard(
+        Path(input_path), Path(output_path), shard, **shard_options
+    ))
+    result["worker_pid"] = os.getpid()
+    return result
+
+# Global async service instance, created on first use (it starts thread and process pools)
+_async_vertical_crop_service: Optional[AsyncVerticalCropService] = None
+
+async def get_async_vertical_crop_service() -> AsyncVerticalCropService:
+    """Get the global async vertical crop service instance"""
+    global _async_vertical_crop_service
+    if _async_vertical_crop_service is None:
+        _async_vertical_crop_service = AsyncVerticalCropService(
+            detection_processes=int(os.getenv("CROP_DETECTION_PROCESSES", "0"))
+        )
+        # Crop tasks waiting for admission will each encode once admitted
+        admission_queue = _async_vertical_crop_service.admission_queue
+        encoder_profiles.add_backlog_source("crop_admission", lambda: admission_queue.get_stats()["waiting"])
+    return _async_vertical_crop_service
 
 # Convenience functions
 async def crop_video_to_vertical_async(
@@ -1567,12 +2622,21 @@ async def crop_video_to_vertical_async(
     ignore_micro_cuts: bool = True,
     micro_cut_threshold: int = 10,
     smoothing_strength: str = "very_high",
-    task_id: Optional[str] = None
+    task_id: Optional[str] = None,
+    render_mode: str = "two_pass",
+    trajectory_path: Optional[Path] = None,
+    use_process_pool: bool = False,
+    use_crop_cache: bool = True,
+    cache_source_id: Optional[str] = None,
+    cache_window: Optional[Tuple[float, float]] = None,
+    subtitles_path: Optional[Path] = None,
+    subtitle_font_size: int = 14,
+    thumbnail_options: Optional[Dict[str, Any]] = None
 ) -> Dict[str, Any]:
     """
     Async convenience function to crop video to vertical format with smart scene detection
     
-    This implements the intelligent scene-aware cropping system where PySceneDetect
+    This implements the intelligent scene-aware cropping system where scene-cut detection
     acts as the "brain" telling your smoothing when to reset for perfect responsiveness
     on every real cut while maintaining smooth tracking in stable scenes.
     
@@ -1589,24 +2653,60 @@ async def crop_video_to_vertical_async(
         micro_cut_threshold: Threshold for micro-cut detection in frames (10 = default)
         smoothing_strength: Motion smoothing level ("very_high" = most stable)
         task_id: Optional task ID for tracking
+        render_mode: "two_pass" (FFmpeg-side crop from an analysis pass) or "frame_loop"
+        trajectory_path: Optional .json/.npz path to keep the crop trajectory artifact
+        use_process_pool: Crop the whole clip in a worker process (use when cropping several clips at once)
+        use_crop_cache: Reuse a cached crop trajectory for this clip (re-renders skip face detection)
+        cache_source_id: Stable source id for the cache (e.g. "youtube_id:format"), default = input file hash
+        cache_window: (start, end) seconds of the clip within cache_source_id
+        subtitles_path: SRT to burn in during the crop render (one encode for crop + captions)
+        subtitle_font_size: Burn-in font size in pixels
+        thumbnail_options: Save the clip thumbnail from the rendered frames (output_dir, clip_id,
+            timestamp, widths, image_format) instead of decoding the clip again
     
     Returns:
-        Dict with success, task_id, output_path, scenes_detected, smart_resets, error keys
+        Dict with success, task_id, output_path, scenes_detected, smart_resets,
+        subtitles_burned, encodes, thumbnail (None = not produced), error keys
     """
-    return await async_vertical_crop_service.create_vertical_crop_async(
-        input_path, output_path, use_speaker_detection, use_smart_scene_detection,
-        enable_group_conversation_framing, scene_content_threshold, scene_fade_threshold, scene_min_length,
-        ignore_micro_cuts, micro_cut_threshold, smoothing_strength, task_id
+    crop_options = {
+        "use_speaker_detection": use_speaker_detection,
+        "use_smart_scene_detection": use_smart_scene_detection,
+        "enable_group_conversation_framing": enable_group_conversation_framing,
+        "scene_content_threshold": scene_content_threshold,
+        "scene_fade_threshold": scene_fade_threshold,
+        "scene_min_length": scene_min_length,
+        "ignore_micro_cuts": ignore_micro_cuts,
+        "micro_cut_threshold": micro_cut_threshold,
+        "smoothing_strength": smoothing_strength,
+        "render_mode": render_mode,
+        "trajectory_path": trajectory_path,
+        "use_crop_cache": use_crop_cache,
+        "cache_source_id": cache_source_id,
+        "cache_window": cache_window,
+        "subtitles_path": subtitles_path,
+        "subtitle_font_size": subtitle_font_size,
+        "thumbnail_options": thumbnail_options,
+    }
+    service = await get_async_vertical_crop_service()
+    if use_process_pool:
+        return await service.create_vertical_crop_in_process(
+            input_path, output_path, task_id=task_id, **crop_options
+        )
+    return await service.create_vertical_crop_async(
+        input_path, output_path, task_id=task_id, **crop_options
     )
 
 async def get_crop_task_status(task_id: str) -> Optional[Dict[str, Any]]:
     """Get status of a cropping task"""
-    return await async_vertical_crop_service.get_task_status(task_id)
+    service = await get_async_vertical_crop_service()
+    return await service.get_task_status(task_id)
 
 async def list_crop_tasks() -> Dict[str, Dict[str, Any]]:
     """List all active cropping tasks"""
-    return await async_vertical_crop_service.list_active_tasks()
+    service = await get_async_vertical_crop_service()
+    return await service.list_active_tasks()
 
 async def cleanup_old_crop_tasks(max_age_hours: int = 24):
     """Clean up old completed tasks"""
-    await async_vertical_crop_service.cleanup_completed_tasks(max_age_hours) 
\ No newline at end of file
+    service = await get_async_vertical_crop_service()
+    await service.cleanup_completed_tasks(max_age_hours) 
\ No newline at end of file
@@ -11,13 +11,14 @@ from pathlib import Path
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
-from .youtube import youtube_service, get_video_id
+from .youtube import get_youtube_service, get_video_id
 from .transcript import fetch_youtube_transcript_with_word_timestamps
 from .gemini import analyze_transcript_for_viral_segments
 from .vertical_crop_async import get_async_vertical_crop_service
 from .burn_in import BurnInRenderer
 from .audio_sync_manager import get_audio_sync_manager
 from .subs import convert_groq_to_subtitles
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
 
 logger = logging.getLogger(__name__)
 
@@ -68,7 +69,7 @@ class EnhancedVideoProcessingWorkflow:
             # Step 1: Download video
             logger.info("📥 Downloading video...")
             video_id = get_video_id(youtube_url)
-            download_result = await youtube_service.download_video_async(youtube_url, quality)
+            download_result = await get_youtube_service().download_video_async(youtube_url, quality)
             
             if not download_result["success"]:
                 raise Exception(f"Video download failed: {download_result.get('error', 'Unknown error')}")
@@ -239,29 +240,30 @@ class EnhancedVideoProcessingWorkflow:
     ) -> bool:
         """Create video segment with sync preservation"""
         try:
-            # Use sync manager's enhanced clipping
-            cmd = [
-                'ffmpeg', '-hide_banner', '-loglevel', 'error',
-                '-ss', str(start),
-                '-i', str(source_path),
-                '-t', str(end - start),
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-crf', '18',
-                '-preset', 'medium',
-                '-avoid_negative_ts', 'make_zero',
-                '-fflags', '+genpts',
-                '-movflags', '+faststart',
-                '-y', str(output_path)  # FIXED: -y flag before output path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
+            async with encoder_profiles.encode_async("segment", clip_id=output_path.name, media_seconds=end - start) as profile:
+                # Use sync manager's enhanced clipping
+                cmd = [
+                    'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                    '-ss', str(start),
+                    *decoder_thread_args(profile),
+                    '-i', str(source_path),
+                    '-t', str(end - start),
+                    '-c:v', 'libx264',
+                    '-c:a', 'aac',
+                    *x264_args(profile),
+                    '-avoid_negative_ts', 'make_zero',
+                    '-fflags', '+genpts',
+                    '-movflags', '+faststart',
+                    '-y', str(output_path)  # FIXED: -y flag before output path
+                ]
+                
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                
+                stdout, stderr = await process.communicate()
             return process.returncode == 0
             
         except Exception as e:
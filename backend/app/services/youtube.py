@@ -6,12 +6,13 @@ import tempfile
 import json
 from pathlib import Path
 from typing import List, Dict, Optional
-from moviepy import VideoFileClip
 import asyncio
-from apify_client import ApifyClient
 from dotenv import load_dotenv
 import shutil
 
+from .encoder_profiles import decoder_thread_args, encoder_profiles, x264_args
+from .smart_cut import smart_cut_segment
+
 # Load environment variables
 load_dotenv()
 
@@ -55,32 +56,18 @@ def create_clip_with_direct_ffmpeg(video_path: Path, start: float, end: float, o
     """
     Fallback function to create clips using direct ffmpeg calls with proper error handling.
     This addresses the 'NoneType' object has no attribute 'stdout' issue.
+    
+    Cuts are frame-accurate: only the partial GOPs at either end are re-encoded, the
+    rest is stream-copied (see smart_cut.smart_cut_segment).
     """
     try:
-        cmd = [
-            'ffmpeg',
-            '-hide_banner', '-loglevel', 'error',
-            '-ss', str(start),
-            '-i', str(video_path),
-            '-t', str(end - start),
-            '-c', 'copy',  # Copy streams without re-encoding for speed
-            '-avoid_negative_ts', 'make_zero',
-            str(output_path),
-            '-y'  # Overwrite output file
-        ]
-        
-        # Use subprocess.run with proper error handling (as suggested in the original query)
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
-        
-        if result.returncode == 0:
+        result = smart_cut_segment(video_path, start, end, output_path)
+        if result["success"]:
             return True
         else:
-            print(f"❌ FFmpeg stderr: {result.stderr}")
+            print(f"❌ FFmpeg error: {result['error']}")
             return False
             
-    except subprocess.TimeoutExpired:
-        print(f"❌ FFmpeg timeout after 300 seconds")
-        return False
     except Exception as e:
         print(f"❌ FFmpeg exception: {str(e)}")
         return False
@@ -102,7 +89,8 @@ class YouTubeService:
         if not self.apify_token:
             raise ValueError("APIFY_TOKEN environment variable not set. Please add your Apify API token to the .env file.")
         
-        # Initialize Apify client
+        # Initialize Apify client (imported here - the SDK is slow to import and only needed for downloads)
+        from apify_client import ApifyClient
         self.client = ApifyClient(self.apify_token)
         
         # Initialize HuntAPI fallback service
@@ -395,63 +383,63 @@ class YouTubeService:
             logger.info(f"   📁 Input: {input_path.name}")
             logger.info(f"   📁 Output: {h264_path.name}")
             
-            # Use balanced settings: faster than high-quality but better than ultrafast
-            cmd = [
-                'ffmpeg', '-hide_banner', '-loglevel', 'error',
-                '-i', str(input_path),
-                '-c:v', 'libx264',
-                '-preset', 'medium',    # Balanced speed/quality for preprocessing
-                '-crf', '25',           # Good quality for processing
-                '-c:a', 'copy',         # Copy audio without re-encoding
-                '-movflags', '+faststart',
-                '-avoid_negative_ts', 'make_zero',
-                '-threads', '0',        # Use all CPU cores
-                str(h264_path),
-                '-y'
-            ]
-            
-            # Allow longer timeout during download (user expects to wait)
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            # Wait for conversion (allow up to 10 minutes during download)
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=600.0  # 10 minutes timeout during download
+            # Balanced settings when idle (medium, CRF 25), faster under encode backlog
+            async with encoder_profiles.encode_async("av1_preprocess", clip_id=input_path.name) as profile:
+                cmd = [
+                    'ffmpeg', '-hide_banner', '-loglevel', 'error',
+                    *decoder_thread_args(profile),
+                    '-i', str(input_path),
+                    '-c:v', 'libx264',
+                    *x264_args(profile),
+                    '-c:a', 'copy',         # Copy audio without re-encoding
+                    '-movflags', '+faststart',
+                    '-avoid_negative_ts', 'make_zero',
+                    str(h264_path),
+                    '-y'
+                ]
+                
+                # Allow longer timeout during download (user expects to wait)
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE
                 )
                 
-                if process.returncode == 0 and h264_path.exists():
-                    file_size = h264_path.stat().st_size / (1024 * 1024)  # MB
-                    logger.info(f"✅ H.264 preprocessing completed ({file_size:.1f} MB)")
-                    return h264_path
-                else:
-                    error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
-                    logger.error(f"❌ H.264 preprocessing failed: {error_msg}")
+                # Wait for conversion (allow up to 10 minutes during download)
+                try:
+                    stdout, stderr = await asyncio.wait_for(
+                        process.communicate(),
+                        timeout=600.0  # 10 minutes timeout during download
+                    )
                     
-                    # Clean up failed file
+                    if process.returncode == 0 and h264_path.exists():
+                        file_size = h264_path.stat().st_size / (1024 * 1024)  # MB
+                        logger.info(f"✅ H.264 preprocessing completed ({file_size:.1f} MB)")
+                        return h264_path
+                    else:
+                        error_msg = stderr.decode() if stderr else "Unknown FFmpeg error"
+                        logger.error(f"❌ H.264 preprocessing failed: {error_msg}")
+                        
+                        # Clean up failed file
+                        if h264_path.exists():
+                            h264_path.unlink()
+                        return input_path
+                        
+                except asyncio.TimeoutError:
+                    logger.error(f"❌ H.264 preprocessing timed out (10 minutes)")
+                    logger.warning(f"⚠️ Using original AV1 video - processing may be slower")
+                    
+                    # Try to kill the process and clean up
+                    try:
+                        process.kill()
+                        await process.wait()
+                    except:
+                        pass
+                        
                     if h264_path.exists():
                         h264_path.unlink()
                     return input_path
                     
-            except asyncio.TimeoutError:
-                logger.error(f"❌ H.264 preprocessing timed out (10 minutes)")
-                logger.warning(f"⚠️ Using original AV1 video - processing may be slower")
-                
-                # Try to kill the process and clean up
-                try:
-                    process.kill()
-                    await process.wait()
-                except:
-                    pass
-                    
-                if h264_path.exists():
-                    h264_path.unlink()
-                return input_path
-                
         except Exception as e:
             logger.error(f"❌ H.264 preprocessing exception: {e}")
             return input_path
@@ -600,12 +588,20 @@ class YouTubeService:
                     return file
         return None
 
-youtube_service = YouTubeService()
+# Global instance, created on first use so importing this module stays cheap
+_youtube_service: Optional[YouTubeService] = None
+
+def get_youtube_service() -> YouTubeService:
+    """Get the global YouTube service instance"""
+    global _youtube_service
+    if _youtube_service is None:
+        _youtube_service = YouTubeService()
+    return _youtube_service
 
 # Backward compatibility functions for existing FastAPI endpoints
 def get_video_id(url: str) -> str:
     """Extract video ID from YouTube URL"""
-    info = youtube_service.get_video_info(url)
+    info = get_youtube_service().get_video_info(url)
     return info['id']
 
 async def download_video(url: str, quality: str = "best") -> Path:
@@ -613,15 +609,15 @@ async def download_video(url: str, quality: str = "best") -> Path:
     Download video with specified quality
     Supported qualities: best, 8k, 4k, 1440p, 1080p, 720p
     """
-    return await youtube_service.download_video(url, quality)
+    return await get_youtube_service().download_video(url, quality)
 
 def get_video_info(url: str) -> Dict:
     """Get detailed video information"""
-    return youtube_service.get_video_info(url)
+    return get_youtube_service().get_video_info(url)
 
 def get_available_formats(url: str) -> List[Dict]:
     """Get available video formats"""
-    return youtube_service.get_available_formats(url)
+    return get_youtube_service().get_available_formats(url)
 
 def cut_clips(video_path: Path, analysis: Dict) -> List[Path]:
     """
@@ -658,6 +654,7 @@ def cut_clips(video_path: Path, analysis: Dict) -> List[Path]:
     print(f"✂️ Нарезаю {len(viral_segments)} клипов из {video_path.name}")
     
     # Load video with MoviePy 2.2.1
+    from moviepy import VideoFileClip
     try:
         video = VideoFileClip(str(video_path))
         video_duration = video.duration
@@ -699,12 +696,21 @@ def cut_clips(video_path: Path, analysis: Dict) -> List[Path]:
         
         try:
             # Create safe filename
-            safe_title = youtube_service._sanitize_filename(title)
+            safe_title = get_youtube_service()._sanitize_filename(title)
             clip_filename = f"{clip_id:02d}_{safe_title}.mp4"
             clip_path = clips_dir / clip_filename
             
             print(f"📁 Сохраняю как: {clip_filename}")
             
+            # Frame-accurate smart cut first: only the leading GOP is re-encoded
+            if create_clip_with_direct_ffmpeg(video_path, start, end, clip_path):
+                if clip_path.exists() and clip_path.stat().st_size > 0:
+                    file_size_mb = clip_path.stat().st_size / (1024*1024)
+                    print(f"✅ Клип создан (smart cut): {clip_path.name} ({file_size_mb:.1f} MB)")
+                    created_clips.append(clip_path.absolute())
+                    continue
+            print(f"⚠️ Smart cut failed for clip {clip_id}, re-encoding with MoviePy...")
+            
             # Cut segment with MoviePy 2.2.1 API
             print(f"✂️ Нарезаю сегмент {start:.1f}-{end:.1f}...")
             try:
@@ -735,22 +741,25 @@ def cut_clips(video_path: Path, analysis: Dict) -> List[Path]:
             # Write video file with MAXIMUM QUALITY settings
             print(f"💾 Записываю видеофайл с максимальным качеством...")
             try:
-                segment_clip.write_videofile(
-                    str(clip_path),
-                    codec='libx264',
-                    audio_codec='aac',
-                    # High quality settings
-                    ffmpeg_params=[
-                        '-crf', '18',        # Visually lossless quality
-                        '-preset', 'slow',   # Better compression efficiency
-                        '-profile:v', 'high', # H.264 high profile for better quality
-                        '-level', '4.0',     # H.264 level for compatibility
-                        '-pix_fmt', 'yuv420p', # Standard pixel format for compatibility
-                        '-movflags', '+faststart', # Fast start for web playback
-                        '-b:a', '192k'       # High audio bitrate
-                    ],
-                    logger=None
-                )
+                # CRF 18 at preset slow when idle; faster tiers while encodes are backed up
+                with encoder_profiles.encode("cut", clip_id=f"{clip_id}: {title}", media_seconds=end - start) as profile:
+                    segment_clip.write_videofile(
+                        str(clip_path),
+                        codec='libx264',
+                        audio_codec='aac',
+                        preset=profile["preset"],
+                        threads=profile["threads"] or None,
+                        # High quality settings
+                        ffmpeg_params=[
+                            '-crf', str(profile["crf"]),
+                            '-profile:v', 'high', # H.264 high profile for better quality
+                            '-level', '4.0',     # H.264 level for compatibility
+                            '-pix_fmt', 'yuv420p', # Standard pixel format for compatibility
+                            '-movflags', '+faststart', # Fast start for web playback
+                            '-b:a', '192k'       # High audio bitrate
+                        ],
+                        logger=None
+                    )
             except Exception as e:
                 if "'NoneType' object has no attribute 'stdout'" in str(e):
                     print(f"⚠️ MoviePy failed for clip {clip_id}, trying direct ffmpeg fallback...")
@@ -873,7 +882,7 @@ def cut_clips_vertical(video_path: Path, analysis: Dict, smoothing_strength: str
         if start_time is None or end_time is None:
             continue
 
-        base_name = youtube_service._sanitize_filename(segment.get("title", f"segment_{i+1}"))
+        base_name = get_youtube_service()._sanitize_filename(segment.get("title", f"segment_{i+1}"))
         
         # Create a temporary horizontal clip first
         temp_horizontal_clip_path = clips_dir / f"temp_{base_name}.mp4"
@@ -987,7 +996,8 @@ async def cut_clips_vertical_async(video_path: Path, analysis: Dict, smoothing_s
     Returns:
         A list of paths to the created vertical clips.
     """
-    from app.services.vertical_crop_async import async_vertical_crop_service
+    from app.services.vertical_crop_async import get_async_vertical_crop_service
+    async_vertical_crop_service = await get_async_vertical_crop_service()
     
     # Create output directory for clips
     clips_dir = Path("clips")
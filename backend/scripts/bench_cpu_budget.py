@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark: throughput of concurrent clip encodes with and without the CPU budget
+
+Both runs start --clips vertical crop encodes (crop + libx264 fast crf18, audio copied)
+at the same time:
+- "unmanaged" replays the previous behaviour: every ffmpeg runs with its default
+  thread count (all cores for decoding and for x264)
+- "budget" takes core tokens from a CPUBudget through EncoderProfileService, so
+  each ffmpeg runs with -threads equal to its tokens and the rest wait
+
+Without --video a synthetic 1080p30 clip with audio is generated first.
+
+Usage:
+    python scripts/bench_cpu_budget.py [--video clip.mp4] [--seconds 20] [--clips 6] [--cores N]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.cpu_budget import CPUBudget
+from app.services.encoder_profiles import EncoderProfileService, decoder_thread_args, x264_args
+
+
+def make_synthetic_clip(path: Path, seconds: float):
+    subprocess.run([
+        'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"testsrc2=s=1920x1080:r=30:d={seconds}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-g', '60',
+        '-c:a', 'aac', '-shortest', str(path)
+    ], check=True)
+
+
+def crop_command(source: Path, output: Path, profile: dict) -> list:
+    return [
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        *decoder_thread_args(profile),
+        '-i', str(source),
+        '-vf', 'crop=606:1080:657:0',
+        '-c:v', 'libx264', '-c:a', 'copy',
+        *x264_args(profile),
+        '-y', str(output)
+    ]
+
+
+async def run_ffmpeg(cmd: list):
+    process = await asyncio.create_subprocess_exec(*cmd, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode(errors='replace'))
+
+
+async def run_unmanaged(source: Path, work_dir: Path, clips: int):
+    profile = {"preset": "fast", "crf": 18, "threads": 0}
+    await asyncio.gather(*[
+        run_ffmpeg(crop_command(source, work_dir / f"unmanaged_{i}.mp4", profile)) for i in range(clips)
+    ])
+
+
+async def run_budget(source: Path, work_dir: Path, clips: int, cores: int) -> dict:
+    budget = CPUBudget(cores=cores)
+    # Non-adaptive: same preset/CRF as the unmanaged run, only the threading differs
+    service = EncoderProfileService(adaptive=False, cores=cores, budget=budget)
+
+    async def clip(i: int):
+        async with service.encode_async("crop_render", clip_id=f"clip_{i}") as profile:
+            await run_ffmpeg(crop_command(source, work_dir / f"budget_{i}.mp4", profile))
+
+    await asyncio.gather(*[clip(i) for i in range(clips)])
+    return budget.get_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", type=Path)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--clips", type=int, default=6)
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        video_path = args.video
+        if video_path is None:
+            video_path = work_dir / "source.mp4"
+            print(f"🎬 Generating a {args.seconds:.0f}s 1080p30 clip with audio...")
+            make_synthetic_clip(video_path, args.seconds)
+
+        print(f"🎞️ {args.clips} concurrent crops of {video_path.name} on {args.cores} cores")
+        start = time.perf_counter()
+        asyncio.run(run_unmanaged(video_path, work_dir, args.clips))
+        unmanaged = time.perf_counter() - start
+
+        start = time.perf_counter()
+        stats = asyncio.run(run_budget(video_path, work_dir, args.clips, args.cores))
+        managed = time.perf_counter() - start
+
+        for label, elapsed in (("unmanaged", unmanaged), ("budget", managed)):
+            print(f"   ⏱️ {label:<10} {elapsed:7.2f}s   {args.clips / elapsed * 60:6.1f} clips/min")
+        print(f"   🧮 {stats['waited']}/{stats['granted']} encodes waited for cores (max {stats['max_wait_seconds']:.1f}s)")
+        print(f"   🚀 {unmanaged / managed:.2f}x throughput with the CPU budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-frame Python crop loop vs two-pass (analyze + FFmpeg render)
+
+Generates synthetic 1080p and 4K clips with FFmpeg's testsrc2 source and crops
+each one with both render modes, reporting frames per second per stage.
+
+Usage:
+    python scripts/bench_crop_render.py [--seconds 5] [--resolutions 1080p,4k]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.vertical_crop_async import AsyncVerticalCropService
+from app.services.crop_planner import render_crop_trajectory
+
+RESOLUTIONS = {
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4k": (3840, 2160),
+}
+SMOOTHING = {"smoothing_factor": 0.95, "max_jump_distance": 15, "stability_frames": 12}
+FPS = 30
+
+
+def make_clip(path: Path, size, seconds: int):
+    """Synthetic test clip with a moving pattern"""
+    width, height = size
+    subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size={width}x{height}:rate={FPS}',
+        '-t', str(seconds), '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+        '-y', str(path)
+    ], check=True)
+
+
+async def bench_resolution(service: AsyncVerticalCropService, name: str, seconds: int, work_dir: Path):
+    size = RESOLUTIONS[name]
+    frames = seconds * FPS
+    target_size = (int(size[1] * 9 / 16) // 2 * 2, size[1])
+    clip = work_dir / f"{name}.mp4"
+    make_clip(clip, size, seconds)
+
+    print(f"\n🎬 {name} ({size[0]}x{size[1]}, {frames} frames)")
+
+    start = time.perf_counter()
+    result = await service._process_video_frames_smart(
+        "bench", clip, work_dir / f"{name}_loop.mp4", target_size, SMOOTHING, None,
+        True, False, FPS, frames, {}, True, 10, source_size=size, source_fps=FPS
+    )
+    loop_seconds = time.perf_counter() - start
+    if not result["success"]:
+        print(f"   ❌ Frame loop failed: {result.get('error')}")
+        return
+
+    start = time.perf_counter()
+    analysis = await service._analyze_crop_trajectory(
+        "bench", clip, target_size, SMOOTHING, None,
+        True, FPS, frames, {}, True, 10, source_size=size, source_fps=FPS
+    )
+    analysis_seconds = time.perf_counter() - start
+    if not analysis["success"]:
+        print(f"   ❌ Analysis failed: {analysis.get('error')}")
+        return
+
+    start = time.perf_counter()
+    render = await render_crop_trajectory(clip, work_dir / f"{name}_two_pass.mp4", analysis["trajectory"])
+    render_seconds = time.perf_counter() - start
+    if not render["success"]:
+        print(f"   ❌ Render failed: {render.get('error')}")
+        return
+
+    two_pass_seconds = analysis_seconds + render_seconds
+    print(f"   🐢 Frame loop:      {frames / loop_seconds:7.1f} fps ({loop_seconds:.2f}s)")
+    print(f"   🔍 Analysis pass:   {frames / analysis_seconds:7.1f} fps ({analysis_seconds:.2f}s)")
+    print(f"   🎞️ FFmpeg render:   {frames / render_seconds:7.1f} fps ({render_seconds:.2f}s)")
+    print(f"   🚀 Two-pass total:  {frames / two_pass_seconds:7.1f} fps ({two_pass_seconds:.2f}s, {loop_seconds / two_pass_seconds:.2f}x)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=5)
+    parser.add_argument("--resolutions", default="1080p,4k")
+    args = parser.parse_args()
+
+    service = AsyncVerticalCropService(max_workers=4)
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench_crop_") as temp_dir:
+            for name in args.resolutions.split(","):
+                await bench_resolution(service, name.strip(), args.seconds, Path(temp_dir))
+    finally:
+        service.thread_executor.shutdown()
+        service.process_executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-frame overhead of the crop frame path
+
+Times, in µs per frame at 1080p, the work the frame loop does around face
+detection and encoding - everything except the detector itself and FFmpeg:
+- detect input: validation, blank-frame check, downscale, BGR -> RGB
+- render: crop + resize to the 9:16 output frame handed to the encoder
+- smoothing: the per-frame crop-center update
+
+"before" replays the previous per-frame code (full validation and a full-frame
+any() per frame, strided subsample copy, fresh output arrays, list copies);
+"after" runs the service's current methods with a stub detector.
+
+Usage:
+    python scripts/bench_frame_hot_loop.py [--frames 200] [--size 1920x1080]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.vertical_crop_async import AsyncVerticalCropService
+
+TARGET_SIZE = (608, 1080)
+SMOOTHING = {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8}
+
+
+class NoFacesDetector:
+    def process(self, rgb_frame):
+        return SimpleNamespace(detections=None)
+
+
+def legacy_detect_input(frame: np.ndarray, detection_width: int, buffers: dict):
+    """The previous _detect_faces_sync + _prepare_detection_input, minus the detector call"""
+    if frame is None or not isinstance(frame, np.ndarray) or frame.size == 0 or len(frame.shape) < 2:
+        return None
+    h, w = frame.shape[:2]
+    if h <= 0 or w <= 0 or len(frame.shape) < 3 or frame.shape[2] != 3:
+        return None
+    if not frame.any():
+        return None
+    size = (detection_width, max(1, int(round(h * detection_width / w))))
+    if "small" not in buffers:
+        buffers["small"] = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        buffers["rgb"] = np.empty_like(buffers["small"])
+    step = max(1, w // (size[0] * 2))
+    cv2.resize(frame[::step, ::step], size, dst=buffers["small"], interpolation=cv2.INTER_AREA)
+    rgb = cv2.cvtColor(buffers["small"], cv2.COLOR_BGR2RGB, dst=buffers["rgb"])
+    if rgb is None or rgb.size == 0:
+        return None
+    return rgb
+
+
+def legacy_render(service: AsyncVerticalCropService, frame: np.ndarray, center):
+    """The previous _crop_frame_to_vertical: fresh resize output, made contiguous for the pipe"""
+    h, w = frame.shape[:2]
+    left, top, crop_width, crop_height = service._plan_crop_window((w, h), None, TARGET_SIZE, center)
+    cropped = frame[top:top + crop_height, left:left + crop_width]
+    if cropped.shape[:2] != (TARGET_SIZE[1], TARGET_SIZE[0]):
+        cropped = cv2.resize(cropped, TARGET_SIZE)
+    return np.ascontiguousarray(cropped)
+
+
+def legacy_smooth(new_center, previous, recent, config):
+    """The previous _smooth_crop_center: copies the history list every frame"""
+    if previous is None:
+        return new_center, [new_center]
+    recent = recent.copy()
+    recent.append(new_center)
+    if len(recent) > config["stability_frames"]:
+        recent.pop(0)
+    avg_x = sum(c[0] for c in recent) / len(recent)
+    avg_y = sum(c[1] for c in recent) / len(recent)
+    new_x, new_y = int(avg_x), int(avg_y)
+    prev_x, prev_y = previous
+    distance = np.sqrt((new_x - prev_x) ** 2 + (new_y - prev_y) ** 2)
+    if distance > config["max_jump_distance"]:
+        new_x = prev_x + (new_x - prev_x) / distance * config["max_jump_distance"]
+        new_y = prev_y + (new_y - prev_y) / distance * config["max_jump_distance"]
+    factor = config["smoothing_factor"]
+    return (int(prev_x * factor + new_x * (1 - factor)), int(prev_y * factor + new_y * (1 - factor))), recent
+
+
+def per_frame_us(fn, frames) -> float:
+    fn(frames[0])  # warm up buffers
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    return (time.perf_counter() - start) * 1e6 / len(frames)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--size", default="1920x1080")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    rng = np.random.default_rng(0)
+    distinct = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+    frames = [distinct[i % len(distinct)] for i in range(args.frames)]
+    centers = [(width // 2 + int(200 * np.sin(i / 20)), height // 2) for i in range(args.frames)]
+
+    service = AsyncVerticalCropService(max_workers=1)
+    service._thread_local.face_detector = NoFacesDetector()
+    output = np.empty((TARGET_SIZE[1], TARGET_SIZE[0], 3), dtype=np.uint8)
+    legacy_buffers = {}
+
+    def smooth_loop(step):
+        previous, recent = None, []
+        start = time.perf_counter()
+        for center in centers:
+            previous, recent = step(center, previous, recent)
+        return (time.perf_counter() - start) * 1e6 / len(centers)
+
+    try:
+        rows = [
+            (
+                "detect input",
+                per_frame_us(lambda f: legacy_detect_input(f, service.detection_width, legacy_buffers), frames),
+                per_frame_us(service._detect_faces_sync, frames),
+            ),
+            (
+                "render",
+                per_frame_us(lambda f: legacy_render(service, f, centers[0]), frames),
+                per_frame_us(lambda f: service._crop_frame_to_vertical(f, None, TARGET_SIZE, centers[0], out=output), frames),
+            ),
+            (
+                "smoothing",
+                smooth_loop(lambda c, p, r: legacy_smooth(c, p, r, SMOOTHING)),
+                smooth_loop(lambda c, p, r: service._smooth_crop_center(c, p, r, SMOOTHING)),
+            ),
+        ]
+    finally:
+        service.thread_executor.shutdown()
+        service.process_executor.shutdown()
+
+    print(f"🎞️ {args.frames} frames at {width}x{height} -> {TARGET_SIZE[0]}x{TARGET_SIZE[1]}, detection width {service.detection_width}")
+    for label, before, after in rows:
+        print(f"   ⏱️ {label:<13} before {before:8.1f} µs/frame   after {after:8.1f} µs/frame")
+    before_total = sum(row[1] for row in rows)
+    after_total = sum(row[2] for row in rows)
+    print(f"   🚀 total         before {before_total:8.1f} µs/frame   after {after_total:8.1f} µs/frame ({before_total / after_total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark: encodes per clip, separate passes vs the single-encode render graph
+
+"before" replays the previous clip pipeline:
+- (--sync-fix) AudioSyncManager sync correction re-encoding the video (libx264 medium crf18)
+- crop render along the trajectory (libx264 fast crf18)
+- BurnInRenderer.burn_subtitles on the cropped clip (libx264 crf18)
+
+"after" runs the current code: the sync correction stream-copies the video and the
+crop render burns the subtitles itself, with the audio stream-copied.
+
+Without --video a synthetic 1080p30 clip with audio is generated first; the
+trajectory pans across it so the render exercises sendcmd.
+
+Usage:
+    python scripts/bench_render_graph.py [--video clip.mp4] [--seconds 20] [--sync-fix]
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.audio_sync_manager import AudioSyncManager
+from app.services.burn_in import build_subtitles_filter, burn_subtitles_to_video
+from app.services.crop_planner import CropTrajectory, render_crop_trajectory
+
+SYNC_OFFSET_MS = 120.0
+
+
+def make_synthetic_clip(path: Path, seconds: float):
+    subprocess.run([
+        'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"testsrc2=s=1920x1080:r=30:d={seconds}",
+        '-f', 'lavfi', '-i', f"sine=frequency=440:duration={seconds}",
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', '-g', '60',
+        '-c:a', 'aac', '-shortest', str(path)
+    ], check=True)
+
+
+def write_srt(path: Path, seconds: float):
+    """One two-second caption every two seconds"""
+    def stamp(t: float) -> str:
+        return f"{int(t // 3600):02d}:{int(t % 3600 // 60):02d}:{int(t % 60):02d},{int(t * 1000 % 1000):03d}"
+
+    cues = []
+    for index, start in enumerate(np.arange(0.0, seconds - 0.5, 2.0)):
+        cues.append(f"{index + 1}\n{stamp(start)} --> {stamp(min(start + 1.9, seconds))}\nCaption number {index + 1}\n")
+    path.write_text("\n".join(cues))
+
+
+def panning_trajectory(video_path: Path) -> CropTrajectory:
+    cap = cv2.VideoCapture(str(video_path))
+    width, height = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    crop_width = int(height * 9 / 16) // 2 * 2
+    xs = (width - crop_width) / 2 + (width - crop_width) / 2 * np.sin(np.arange(frame_count) / (fps * 2))
+    windows = [(int(x), 0, crop_width, height) for x in np.clip(xs, 0, width - crop_width)]
+    return CropTrajectory(np.array(windows), fps, (width, height), (crop_width, height))
+
+
+async def legacy_sync_correction(input_path: Path, output_path: Path):
+    """The previous create_sync_corrected_video: shifts the audio and re-encodes the video"""
+    process = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-i', str(input_path), '-itsoffset', str(SYNC_OFFSET_MS / 1000), '-i', str(input_path),
+        '-map', '0:v:0', '-map', '1:a:0',
+        '-c:v', 'libx264', '-preset', 'medium', '-crf', '18',
+        '-c:a', 'aac', '-b:a', '192k', '-ar', '48000', '-ac', '2',
+        '-movflags', '+faststart', '-fflags', '+genpts', '-avoid_negative_ts', 'make_zero',
+        '-y', str(output_path)
+    )
+    await process.wait()
+
+
+async def run_before(source: Path, srt_path: Path, work_dir: Path, sync_fix: bool) -> int:
+    encodes = 0
+    if sync_fix:
+        corrected = work_dir / "before_sync.mp4"
+        await legacy_sync_correction(source, corrected)
+        source = corrected
+        encodes += 1
+
+    cropped = work_dir / "before_vertical.mp4"
+    result = await render_crop_trajectory(source, cropped, panning_trajectory(source))
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    encodes += result["encodes"]
+
+    burn_subtitles_to_video(str(cropped), str(srt_path), str(work_dir / "before_subtitled.mp4"))
+    return encodes + 1
+
+
+async def run_after(source: Path, srt_path: Path, work_dir: Path, sync_fix: bool) -> int:
+    if sync_fix:
+        corrected = work_dir / "after_sync.mp4"
+        if not await AudioSyncManager().create_sync_corrected_video(source, corrected, SYNC_OFFSET_MS, ensure_sync=False):
+            raise RuntimeError("Sync correction failed")
+        source = corrected
+
+    result = await render_crop_trajectory(
+        source, work_dir / "after_subtitled.mp4", panning_trajectory(source),
+        post_filter=build_subtitles_filter(str(srt_path))
+    )
+    if not result["success"]:
+        raise RuntimeError(result["error"])
+    return result["encodes"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", type=Path)
+    parser.add_argument("--seconds", type=float, default=20.0)
+    parser.add_argument("--sync-fix", action="store_true", help="Include the audio sync correction stage")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        video_path = args.video
+        if video_path is None:
+            video_path = work_dir / "source.mp4"
+            print(f"🎬 Generating a {args.seconds:.0f}s 1080p30 clip with audio...")
+            make_synthetic_clip(video_path, args.seconds)
+
+        cap = cv2.VideoCapture(str(video_path))
+        duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / (cap.get(cv2.CAP_PROP_FPS) or 30.0)
+        cap.release()
+        srt_path = work_dir / "captions.srt"
+        write_srt(srt_path, duration)
+
+        print(f"🎞️ {video_path.name} ({duration:.1f}s){' with sync correction' if args.sync_fix else ''}")
+        rows = []
+        for label, run in (("before", run_before), ("after", run_after)):
+            start = time.perf_counter()
+            encodes = asyncio.run(run(video_path, srt_path, work_dir, args.sync_fix))
+            rows.append((label, encodes, time.perf_counter() - start))
+
+        for label, encodes, elapsed in rows:
+            print(f"   ⏱️ {label:<7} {encodes} video encodes   {elapsed:7.2f}s")
+        print(f"   🚀 {rows[0][2] / rows[1][2]:.2f}x faster per clip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scene-cut detection
+
+Scans one clip with:
+- PySceneDetect (ContentDetector + ThresholdDetector) on full-size OpenCV frames
+- detect_scene_cuts() on the 64x36 grayscale proxy, cold and from the cache
+
+Without --video a synthetic 1080p30 clip with two hard cuts and a fade
+through black is generated first.
+
+Usage:
+    python scripts/bench_scene_detection.py [--video clip.mp4] [--seconds 30]
+"""
+
+import argparse
+import importlib.util
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.scene_cuts import detect_scene_cuts, scene_cut_cache
+
+
+def make_synthetic_clip(path: Path, seconds: float):
+    """Three shots: moving test pattern | cut | bars with a moving box, fading out | black | test card fading in"""
+    shot = seconds / 3
+    filtergraph = (
+        f"[0]format=yuv420p[a];"
+        f"[1][2]overlay=x=100+t*80:y=400,format=yuv420p,fade=t=out:st={shot - 1}:d=1[b];"
+        f"[3]format=yuv420p,fade=t=in:st=0:d=1[c];"
+        f"[a][b][c]concat=n=3:v=1:a=0[v]"
+    )
+    subprocess.run([
+        'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f"testsrc2=s=1920x1080:r=30:d={shot}",
+        '-f', 'lavfi', '-i', f"smptehdbars=s=1920x1080:r=30:d={shot}",
+        '-f', 'lavfi', '-i', f"testsrc=s=320x240:r=30:d={shot}",
+        '-f', 'lavfi', '-i', f"pal100bars=s=1920x1080:r=30:d={shot}",
+        '-filter_complex', filtergraph, '-map', '[v]',
+        '-c:v', 'libx264', '-preset', 'veryfast', '-crf', '23', str(path)
+    ], check=True)
+
+
+def bench_pyscenedetect(video_path: Path):
+    from scenedetect import SceneManager, open_video
+    from scenedetect.detectors import ContentDetector, ThresholdDetector
+
+    start = time.perf_counter()
+    video = open_video(str(video_path), backend="opencv")
+    manager = SceneManager()
+    manager.add_detector(ContentDetector(threshold=30.0, min_scene_len=15))
+    manager.add_detector(ThresholdDetector(threshold=8.0, min_scene_len=15))
+    manager.detect_scenes(video=video)
+    cuts = [int(end.get_frames()) for _, end in manager.get_scene_list()[:-1]]
+    return time.perf_counter() - start, cuts
+
+
+def bench_fast(video_path: Path):
+    start = time.perf_counter()
+    cuts = detect_scene_cuts(video_path)["cut_boundaries"]
+    return time.perf_counter() - start, cuts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--video", type=Path)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--skip-full-frame", action="store_true", help="Skip the slow full-size PySceneDetect run")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        video_path = args.video
+        if video_path is None:
+            video_path = Path(temp_dir) / "scenes.mp4"
+            print(f"🎬 Generating a {args.seconds:.0f}s 1080p30 clip with two cuts and a fade...")
+            make_synthetic_clip(video_path, args.seconds)
+
+        print(f"🎞️ {video_path.name}")
+        runs = []
+        if importlib.util.find_spec("scenedetect") is None:
+            print("   ⚠️ PySceneDetect not installed - skipping its run")
+        elif not args.skip_full_frame:
+            runs.append(("PySceneDetect, full frames", lambda: bench_pyscenedetect(video_path)))
+
+        scene_cut_cache.clear()
+        runs.append(("64x36 gray proxy", lambda: bench_fast(video_path)))
+        runs.append(("64x36 gray proxy, cached", lambda: bench_fast(video_path)))
+
+        for label, run in runs:
+            elapsed, cuts = run()
+            print(f"   ⏱️ {label:<28} {elapsed:7.3f}s  cuts at {cuts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-frame crop-center smoothing vs the offline numpy smoother
+
+Builds a synthetic speaker path (slow drift, detector jitter, dropped detections
+and a scene cut every few seconds) and smooths it with both the causal per-frame
+_next_crop_center and the whole-path smooth_crop_path, reporting µs per frame.
+
+Usage:
+    python scripts/bench_trajectory_smoother.py [--seconds 180] [--repeat 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.vertical_crop_async import AsyncVerticalCropService
+from app.services.trajectory_smoother import smooth_crop_path, plan_crop_windows
+
+FPS = 30
+FRAME_SIZE = (1920, 1080)
+TARGET_SIZE = (608, 1080)
+
+
+def make_path(frames: int, seed: int = 0):
+    """Raw speaker boxes (None = missed detection) and scene-reset flags"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / FPS
+    xs = 960 + 300 * np.sin(t / 4) + rng.normal(0, 6, frames)
+    ys = 480 + rng.normal(0, 4, frames)
+    missed = rng.random(frames) < 0.05
+    resets = np.zeros(frames, dtype=bool)
+    resets[::FPS * 7] = True
+
+    boxes = [
+        None if miss else (int(x) - 60, int(y) - 80, int(x) + 60, int(y) + 80)
+        for x, y, miss in zip(xs, ys, missed)
+    ]
+    return boxes, resets
+
+
+def bench_per_frame(service: AsyncVerticalCropService, boxes, resets, smoothing):
+    previous, recent = None, []
+    windows = []
+    for box, reset in zip(boxes, resets):
+        previous, recent = service._next_crop_center(box, FRAME_SIZE, bool(reset), previous, recent, smoothing)
+        windows.append(service._plan_crop_window(FRAME_SIZE, None, TARGET_SIZE, previous))
+    return windows
+
+
+def bench_offline(service: AsyncVerticalCropService, boxes, resets, smoothing):
+    raw = np.array([
+        (np.nan, np.nan) if box is None else ((box[0] + box[2]) / 2, (box[1] + box[3]) / 2)
+        for box in boxes
+    ])
+    centers = smooth_crop_path(raw, resets, smoothing, (FRAME_SIZE[0] * 0.55, FRAME_SIZE[1] * 0.45))
+    crop_size = service._plan_crop_window(FRAME_SIZE, None, TARGET_SIZE)[2:]
+    return plan_crop_windows(centers, FRAME_SIZE, crop_size)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=180)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = args.seconds * FPS
+    boxes, resets = make_path(frames)
+    service = AsyncVerticalCropService(max_workers=1)
+    try:
+        print(f"📈 Smoothing a {args.seconds}s path ({frames} frames, best of {args.repeat})")
+        for preset, smoothing in AsyncVerticalCropService.SMOOTHING_CONFIGS.items():
+            per_frame = timed(lambda: bench_per_frame(service, boxes, resets, smoothing), args.repeat)
+            offline = timed(lambda: bench_offline(service, boxes, resets, smoothing), args.repeat)
+            print(
+                f"   {preset:>9}: per-frame {per_frame / frames * 1e6:6.2f} µs/frame | "
+                f"offline {offline / frames * 1e6:6.2f} µs/frame | {per_frame / offline:5.1f}x"
+            )
+    finally:
+        service.thread_executor.shutdown()
+        service.process_executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
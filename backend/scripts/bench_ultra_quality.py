@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ultra-quality vertical crop via PNG frame files vs streaming pipes
+
+Generates a synthetic 1080p clip (testsrc2 + tone) and runs
+FFmpegVideoProcessor.process_video_to_vertical_ultra_quality in both modes,
+reporting wall time and peak disk usage (temp files + output).
+
+Usage:
+    python scripts/bench_ultra_quality.py [--seconds 60] [--preset fast] [--modes disk,streaming]
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add the backend directory to the Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.ffmpeg_video_processor import FFmpegVideoProcessor
+
+FPS = 30
+
+
+def make_clip(path: Path, seconds: int):
+    """Synthetic 1080p test clip with an AAC tone"""
+    subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', f'testsrc2=size=1920x1080:rate={FPS}',
+        '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=48000',
+        '-t', str(seconds), '-c:v', 'libx264', '-preset', 'ultrafast', '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-shortest', '-y', str(path)
+    ], check=True)
+
+
+class DiskUsageMonitor:
+    """Polls the total size of a directory tree and keeps the peak"""
+
+    def __init__(self, root: Path, interval: float = 0.1):
+        self.root = root
+        self.interval = interval
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _usage(self) -> int:
+        # os.walk skips directories that vanish mid-scan (temp dirs being cleaned up)
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                try:
+                    total += os.stat(os.path.join(directory, name)).st_size
+                except FileNotFoundError:
+                    pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self._usage())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "DiskUsageMonitor":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, self._usage())
+
+
+async def bench_mode(processor: FFmpegVideoProcessor, clip: Path, mode: str, preset: str, work_dir: Path):
+    run_dir = work_dir / mode
+    run_dir.mkdir()
+    # Temp frame directories land inside the monitored run directory
+    tempfile.tempdir = str(run_dir)
+    try:
+        with DiskUsageMonitor(run_dir) as monitor:
+            start = time.perf_counter()
+            result = await processor.process_video_to_vertical_ultra_quality(
+                clip, run_dir / "vertical.mp4", quality_preset=preset, streaming=(mode == "streaming")
+            )
+            seconds = time.perf_counter() - start
+    finally:
+        tempfile.tempdir = None
+
+    if not result["success"]:
+        print(f"   ❌ {mode}: {result.get('error')}")
+        return None
+    frames = result["frames_processed"]
+    print(
+        f"   {'💾' if mode == 'disk' else '🌊'} {mode:>9}: {seconds:7.1f}s "
+        f"({frames / seconds:5.1f} fps), peak disk {monitor.peak_bytes / (1024 * 1024):8.1f} MB"
+    )
+    return seconds
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, default=60)
+    parser.add_argument("--preset", default="fast", help="ultra, high, balanced or fast")
+    parser.add_argument("--modes", default="disk,streaming")
+    args = parser.parse_args()
+
+    processor = FFmpegVideoProcessor()
+    with tempfile.TemporaryDirectory(prefix="bench_ultra_") as temp_dir:
+        work_dir = Path(temp_dir)
+        clip = work_dir / "clip_1080p.mp4"
+        make_clip(clip, args.seconds)
+        print(f"🎬 1920x1080, {args.seconds}s ({args.seconds * FPS} frames), '{args.preset}' preset")
+
+        timings = {}
+        for mode in args.modes.split(","):
+            timings[mode.strip()] = await bench_mode(processor, clip, mode.strip(), args.preset, work_dir)
+
+        if timings.get("disk") and timings.get("streaming"):
+            print(f"   🚀 Streaming speedup: {timings['disk'] / timings['streaming']:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
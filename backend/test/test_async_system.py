@@ -6,11 +6,12 @@ Test script to verify async system can handle concurrent requests
 import asyncio
 import time
 from pathlib import Path
-from app.services.vertical_crop_async import async_vertical_crop_service
+from app.services.vertical_crop_async import get_async_vertical_crop_service
 
 async def test_concurrent_requests():
     """Test multiple concurrent requests to the async vertical crop service"""
     
+    service = await get_async_vertical_crop_service()
     print("🧪 Testing concurrent async video processing...")
     
     # Simulate multiple video files (you would replace these with actual video paths)
@@ -41,23 +42,23 @@ async def test_concurrent_requests():
         }
         
         # Simulate adding to task queue
-        async_vertical_crop_service.active_tasks[task_info["task_id"]] = task_info
+        service.active_tasks[task_info["task_id"]] = task_info
         
     print(f"⏳ All tasks queued. Checking task management...")
     
     # Test task status retrieval
-    active_tasks = await async_vertical_crop_service.list_active_tasks()
+    active_tasks = await service.list_active_tasks()
     print(f"📊 Active tasks: {len(active_tasks)}")
     
     for task_id, task_info in active_tasks.items():
-        status = await async_vertical_crop_service.get_task_status(task_id)
+        status = await service.get_task_status(task_id)
         print(f"  📋 {task_id}: {status['status']} - {status['input_path']}")
     
     # Test task cleanup
     print(f"🧹 Testing task cleanup...")
-    await async_vertical_crop_service.cleanup_completed_tasks(0)  # Clean all
+    await service.cleanup_completed_tasks(0)  # Clean all
     
-    remaining_tasks = await async_vertical_crop_service.list_active_tasks()
+    remaining_tasks = await service.list_active_tasks()
     print(f"📊 Remaining tasks after cleanup: {len(remaining_tasks)}")
     
     elapsed_time = time.time() - start_time
@@ -69,13 +70,14 @@ async def test_task_limits():
     """Test concurrent task limits"""
     print("\n🧪 Testing concurrent task limits...")
     
-    max_tasks = async_vertical_crop_service.max_concurrent_tasks
+    service = await get_async_vertical_crop_service()
+    max_tasks = service.max_concurrent_tasks
     print(f"📊 Max concurrent tasks: {max_tasks}")
     
     # Try to exceed the limit
     tasks_created = 0
     for i in range(max_tasks + 5):  # Try to create more than the limit
-        result = await async_vertical_crop_service.create_vertical_crop_async(
+        result = await service.create_vertical_crop_async(
             input_video_path=Path(f"fake_video_{i}.mp4"),
             output_video_path=Path(f"fake_output_{i}.mp4"),
             use_speaker_detection=False,
@@ -91,7 +93,7 @@ async def test_task_limits():
     print(f"📊 Tasks created: {tasks_created}")
     
     # Clean up
-    await async_vertical_crop_service.cleanup_completed_tasks(0)
+    await service.cleanup_completed_tasks(0)
     
     return True
 
@@ -109,9 +111,10 @@ async def main():
         
         print("\n✅ All tests passed! Async system is working correctly.")
         print("\n📋 System Capabilities:")
-        print(f"   🔧 Max workers: {async_vertical_crop_service.thread_executor._max_workers}")
-        print(f"   🎯 Max concurrent tasks: {async_vertical_crop_service.max_concurrent_tasks}")
-        print(f"   📊 Current active tasks: {len(await async_vertical_crop_service.list_active_tasks())}")
+        service = await get_async_vertical_crop_service()
+        print(f"   🔧 Max workers: {service.thread_executor._max_workers}")
+        print(f"   🎯 Max concurrent tasks: {service.max_concurrent_tasks}")
+        print(f"   📊 Current active tasks: {len(await service.list_active_tasks())}")
         
     except Exception as e:
         print(f"❌ Test failed: {str(e)}")
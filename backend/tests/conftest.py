@@ -0,0 +1,99 @@
+"""Shared markers and synthetic-clip helpers for the backend tests."""
+
+import shutil
+import subprocess
+from itertools import chain
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pytest
+
+from app.services.ffmpeg_pipe import FFmpegFrameWriter
+
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="FFmpeg not installed")
+requires_ffprobe = pytest.mark.skipif(
+    shutil.which("ffmpeg") is None or shutil.which("ffprobe") is None, reason="FFmpeg/ffprobe not installed"
+)
+
+# Bits of the frame index written by encode_frame_index
+INDEX_BITS = 8
+
+
+def write_clip(path: Path, frames: Iterable[np.ndarray], fps: float = 30.0, **writer_kwargs) -> Path:
+    """Encode BGR frames into a synthetic test clip (lossless ultrafast x264 unless overridden)"""
+    frames = iter(frames)
+    first = next(frames)
+    writer_kwargs = {"crf": 0, "preset": "ultrafast", **writer_kwargs}
+    with FFmpegFrameWriter(path, first.shape[1], first.shape[0], fps, **writer_kwargs) as writer:
+        for frame in chain([first], frames):
+            writer.write(frame)
+    return path
+
+
+def with_start_offset(source: Path, output: Path, start: float, audio_lead: float = 0.0) -> Path:
+    """
+    Remux source so its timestamps start at `start` seconds, like a clip cut from a stream
+
+    With audio_lead, a silent audio track starts that much before the video, so the video
+    stream's start_time is later than the container's.
+    """
+    cmd = ['ffmpeg', '-v', 'error', '-itsoffset', f'{audio_lead:.6f}', '-i', str(source)]
+    if audio_lead:
+        cmd += ['-f', 'lavfi', '-i', 'anullsrc=r=48000:cl=mono', '-map', '0:v', '-map', '1:a', '-c:a', 'aac', '-shortest']
+    cmd += ['-c:v', 'copy', '-output_ts_offset', f'{start:.6f}', '-y', str(output)]
+    subprocess.run(cmd, check=True)
+    return output
+
+
+def square_position(frame_index: int, width: int) -> int:
+    """Left edge of the synthetic 'face' - slow drift, then a hard cut."""
+    if frame_index < 60:
+        return 100 + frame_index * 2
+    return width - 200
+
+
+def square_frame(x: int, width: int = 640, height: int = 360) -> np.ndarray:
+    """Black frame with a bright 100px square (rows 120-220) whose left edge is x."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[120:220, x:x + 100] = 255
+    return frame
+
+
+def locate_square(frame: np.ndarray):
+    """Stand-in face detector: bounding box of the bright square."""
+    ys, xs = np.nonzero(frame[:, :, 0] > 128)
+    if len(xs) == 0:
+        return []
+    return [(int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)]
+
+
+def brightness_ramp(width: int = 640, height: int = 360) -> np.ndarray:
+    """Horizontal brightness ramp: a crop's brightness shows which x offset it came from."""
+    return np.tile((np.arange(width) * 255 // width).astype(np.uint8)[None, :, None], (height, 1, 3))
+
+
+def encode_frame_index(frame: np.ndarray, index: int):
+    """Write the frame index as full-width horizontal bands (one per bit), so any crop keeps it."""
+    band = frame.shape[0] // INDEX_BITS
+    for bit in range(INDEX_BITS):
+        frame[bit * band:(bit + 1) * band] = 255 if (index >> bit) & 1 else 0
+
+
+def decode_frame_index(frame: np.ndarray) -> int:
+    band = frame.shape[0] // INDEX_BITS
+    index = 0
+    for bit in range(INDEX_BITS):
+        # Sample the middle of each band to stay clear of chroma bleed at the edges
+        if frame[bit * band + band // 2, :, 1].mean() > 128:
+            index |= 1 << bit
+    return index
+
+
+def index_frames(count: int, width: int, height: int) -> Iterable[np.ndarray]:
+    """Frames 0..count-1, each stamped with its index by encode_frame_index."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    for index in range(count):
+        encode_frame_index(frame, index)
+        yield frame
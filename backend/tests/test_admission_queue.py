@@ -0,0 +1,137 @@
+"""Tests for the cost-aware crop admission queue."""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from app.services.admission_queue import AdmissionQueue, estimate_crop_cost
+from tests.conftest import requires_ffmpeg, write_clip
+
+
+class TestAdmissionQueue:
+    """Test budget accounting, ordering and aging."""
+
+    def test_cost_scales_with_pixels_frames_and_detector(self):
+        base = estimate_crop_cost(1920, 1080, 900, "speaker")
+        assert estimate_crop_cost(1920, 1080, 1800, "speaker") == 2 * base
+        assert estimate_crop_cost(1280, 720, 900, "speaker") < base
+        assert estimate_crop_cost(1920, 1080, 900, "none") < base < estimate_crop_cost(1920, 1080, 900, "group")
+
+    def test_waits_for_budget_in_arrival_order(self):
+        admission = AdmissionQueue(budget=10, aging_seconds=60)
+        order = []
+
+        async def task(name, cost, hold):
+            ticket = await admission.acquire(cost, name)
+            order.append(name)
+            await asyncio.sleep(hold)
+            admission.release(ticket)
+            return ticket.wait_seconds
+
+        async def run():
+            first = asyncio.create_task(task("a", 6, 0.05))
+            await asyncio.sleep(0)
+            rest = [asyncio.create_task(task(name, 6, 0.01)) for name in ("b", "c")]
+            return await asyncio.gather(first, *rest)
+
+        waits = asyncio.run(run())
+        assert order == ["a", "b", "c"]
+        assert waits[0] < 0.01 and waits[1] >= 0.04
+        stats = admission.get_stats()
+        assert stats["admitted"] == 3 and stats["in_use"] == 0 and stats["active"] == 0
+        assert stats["max_wait_seconds"] >= 0.04
+
+    def test_small_task_passes_until_the_head_ages(self):
+        admission = AdmissionQueue(budget=10, aging_seconds=0.05)
+
+        async def run():
+            running = await admission.acquire(6)
+            big = asyncio.create_task(admission.acquire(8))
+            await asyncio.sleep(0)
+            # The big task can't fit yet, but a small one can run beside the current task
+            small = await asyncio.wait_for(admission.acquire(3), 1)
+            admission.release(small)
+
+            # After aging_seconds the big task holds back everything behind it
+            await asyncio.sleep(0.06)
+            late_small = asyncio.create_task(admission.acquire(3))
+            await asyncio.sleep(0.01)
+            assert not late_small.done()
+
+            admission.release(running)
+            big_ticket = await asyncio.wait_for(big, 1)
+            admission.release(big_ticket)
+            admission.release(await asyncio.wait_for(late_small, 1))
+
+        asyncio.run(run())
+        assert admission.get_stats()["admitted"] == 4
+
+    def test_oversized_task_runs_alone(self):
+        admission = AdmissionQueue(budget=10)
+
+        async def run():
+            ticket = await asyncio.wait_for(admission.acquire(1000), 1)
+            assert admission.get_stats()["in_use"] == 10
+            admission.release(ticket)
+
+        asyncio.run(run())
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        admission = AdmissionQueue(budget=10)
+
+        async def run():
+            running = await admission.acquire(10)
+            waiter = asyncio.create_task(admission.acquire(5))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            assert admission.get_stats()["waiting"] == 0
+            admission.release(running)
+
+        asyncio.run(run())
+        assert admission.get_stats()["in_use"] == 0
+
+
+@requires_ffmpeg
+class TestConcurrentSubmissions:
+    """A burst of crop requests larger than the service's capacity must all complete."""
+
+    def test_twenty_concurrent_crops_all_complete(self, tmp_path):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        video_path = write_clip(tmp_path / "clip.mp4", (np.full((180, 320, 3), i * 10, dtype=np.uint8) for i in range(15)))
+
+        service = AsyncVerticalCropService(max_workers=2, max_concurrent_tasks=3)
+        # A budget of two clips: the rest of the burst has to queue
+        service.admission_queue.budget = 2 * service._estimate_task_cost(video_path, False, False)
+
+        async def submit_all():
+            return await asyncio.gather(*[
+                service.create_vertical_crop_async(
+                    video_path, tmp_path / f"out_{i}.mp4", use_speaker_detection=False,
+                    use_smart_scene_detection=False, use_crop_cache=False
+                )
+                for i in range(20)
+            ])
+
+        try:
+            started = time.perf_counter()
+            results = asyncio.run(submit_all())
+            elapsed = time.perf_counter() - started
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert all(result["success"] for result in results), [r.get("error") for r in results if not r["success"]]
+        assert all((tmp_path / f"out_{i}.mp4").exists() for i in range(20))
+        assert all(service.active_tasks[r["task_id"]]["status"] == "completed" for r in results)
+
+        stats = service.get_admission_stats()
+        assert stats["admitted"] == 20 and stats["active"] == 0 and stats["waiting"] == 0
+        assert stats["max_queued"] > 2
+        # Queued tasks report how long they waited
+        assert max(result["queue_wait_seconds"] for result in results) > 0
+        assert max(result["queue_wait_seconds"] for result in results) <= elapsed
@@ -5,7 +5,7 @@ from unittest.mock import Mock, patch, MagicMock
 import subprocess
 import json
 
-from app.services.burn_in import BurnInRenderer, burn_subtitles_to_video
+from app.services.burn_in import BurnInRenderer, build_subtitles_filter, burn_subtitles_to_video
 from app.exceptions import BurnInError
 
 
@@ -282,6 +282,14 @@ class TestBurnInRenderer:
 class TestConvenienceFunctions:
     """Test convenience functions."""
     
+    def test_build_subtitles_filter(self):
+        """Test the standalone filter matches the renderer's burn-in style."""
+        subtitles_filter = build_subtitles_filter("C:\\clips\\sub titles.srt", font_size=18)
+        
+        assert subtitles_filter.startswith("subtitles='C\\:\\\\clips\\\\sub titles.srt':force_style='")
+        assert "Fontsize=18" in subtitles_filter
+        assert subtitles_filter.endswith(f"{BurnInRenderer._build_force_style(font_size=18)}'")
+    
     @patch.object(BurnInRenderer, '__init__', return_value=None)
     @patch.object(BurnInRenderer, 'burn_subtitles')
     def test_burn_subtitles_to_video(self, mock_burn, mock_init):
@@ -0,0 +1,190 @@
+"""Tests for the process-wide CPU token budget."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from app.services.cpu_budget import CPUBudget
+from app.services.encoder_profiles import EncoderProfileService
+
+
+class TestCPUBudget:
+    """Test token accounting, waiting and fair shares."""
+
+    def test_grants_fair_shares_and_waits_when_tokens_run_out(self):
+        budget = CPUBudget(cores=4)
+        order = []
+
+        async def stage(name, tokens, hold):
+            async with budget.reserve(name, tokens) as grant:
+                order.append((name, grant.tokens))
+                await asyncio.sleep(hold)
+            return grant.wait_seconds
+
+        async def run():
+            first = asyncio.create_task(stage("a", 3, 0.05))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(stage("b", 2, 0.1))
+            await asyncio.sleep(0)
+            third = asyncio.create_task(stage("c", 2, 0.01))
+            return await asyncio.gather(first, second, third)
+
+        waits = asyncio.run(run())
+        # "b" gets the one free core right away, "c" waits for "a" to finish
+        assert order == [("a", 3), ("b", 1), ("c", 2)]
+        assert waits[0] < 0.01 and waits[1] < 0.01 and waits[2] >= 0.04
+
+        stats = budget.get_stats()
+        assert stats["in_use"] == 0 and stats["active"] == 0 and stats["waiting"] == 0
+        assert stats["granted"] == 3 and stats["waited"] == 1
+
+    def test_default_request_is_a_fair_share(self):
+        budget = CPUBudget(cores=8)
+        # Idle, a default request still leaves half the machine for whoever comes next
+        assert budget.fair_share() == 4
+        with budget.hold("a") as first, budget.hold("b") as second:
+            assert (first.tokens, second.tokens) == (4, 4)
+        with budget.hold("a", tokens=2), budget.hold("b"), budget.hold("c") as third:
+            # Two holders plus this request: a third of the cores, capped by what's free
+            assert third.tokens == 2
+        assert CPUBudget(cores=8, max_share=8).fair_share() == 8
+
+    def test_worker_threads_wait_for_tokens(self):
+        budget = CPUBudget(cores=1)
+        events = []
+
+        def worker(name):
+            with budget.hold(name):
+                events.append(f"{name} start")
+                time.sleep(0.02)
+                events.append(f"{name} end")
+
+        threads = [threading.Thread(target=worker, args=(name,)) for name in ("a", "b")]
+        threads[0].start()
+        time.sleep(0.005)
+        threads[1].start()
+        for thread in threads:
+            thread.join(1)
+
+        assert events == ["a start", "a end", "b start", "b end"]
+
+    def test_blocking_hold_on_an_event_loop_borrows_instead_of_deadlocking(self):
+        budget = CPUBudget(cores=1)
+
+        async def run():
+            async with budget.reserve("async stage"):
+                # A sync helper called from async code while the loop's own task holds the core
+                with budget.hold("sync helper") as grant:
+                    assert grant.tokens == 1
+                    assert budget.get_stats()["in_use"] == 2
+
+        asyncio.run(asyncio.wait_for(run(), 1))
+        assert budget.get_stats()["in_use"] == 0
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        budget = CPUBudget(cores=1)
+
+        async def run():
+            held = await budget.acquire("a")
+            waiter = asyncio.create_task(budget.acquire("b"))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(waiter, return_exceptions=True)
+            assert budget.waiting == 0
+            budget.release(held)
+
+        asyncio.run(run())
+        assert budget.get_stats()["in_use"] == 0
+
+
+class TestEncoderThreadsFollowTokens:
+    """Encodes take their thread count from the CPU budget."""
+
+    def test_encode_threads_match_granted_tokens(self):
+        budget = CPUBudget(cores=4)
+        service = EncoderProfileService(cores=4, budget=budget)
+
+        with service.encode("burn_in") as first:
+            assert first["threads"] == 2
+            assert budget.get_stats()["stage_tokens"] == {"burn_in": 2}
+        assert budget.get_stats()["in_use"] == 0
+
+    def test_async_encodes_wait_for_cores(self):
+        budget = CPUBudget(cores=2)
+        service = EncoderProfileService(cores=2, budget=budget)
+        running = []
+
+        async def encode(name):
+            async with service.encode_async("crop_render", clip_id=name) as profile:
+                running.append(budget.get_stats()["in_use"])
+                await asyncio.sleep(0.02)
+                return profile["threads"]
+
+        async def run():
+            return await asyncio.gather(*[encode(f"clip_{i}") for i in range(4)])
+
+        threads = asyncio.run(run())
+        assert all(1 <= count <= 2 for count in threads)
+        assert max(running) <= 2
+        assert service.active == 0 and budget.get_stats()["in_use"] == 0
+
+    def test_profile_chosen_elsewhere_takes_no_tokens(self):
+        budget = CPUBudget(cores=1)
+        service = EncoderProfileService(cores=1, budget=budget)
+        given = {"preset": "fast", "crf": 18, "tier": "fast", "threads": 1}
+
+        with budget.hold("parent"), service.encode("crop_render", profile=given) as profile:
+            assert profile is given
+            assert budget.get_stats()["in_use"] == 1
+
+    def test_nested_encode_reuses_the_held_profile(self):
+        budget = CPUBudget(cores=8)
+        service = EncoderProfileService(cores=8, budget=budget)
+
+        async def run():
+            async with service.encode_async("crop_render", clip_id="clip") as outer:
+                # e.g. the AV1 conversion inside a sharded crop: runs on the clip's tokens
+                async with service.encode_async("av1_convert", clip_id="clip", profile=outer) as inner:
+                    assert inner is outer
+                    assert budget.get_stats()["in_use"] == outer["threads"] == 4
+                # A nested request that does ask again still finds free cores
+                async with service.encode_async("av1_convert", clip_id="clip") as extra:
+                    assert extra["threads"] >= 1
+
+        asyncio.run(asyncio.wait_for(run(), 1))
+        assert budget.get_stats()["in_use"] == 0
+
+
+class TestCropAnalysisTokens:
+    """Detection passes outside an encode take CPU tokens too."""
+
+    def test_analysis_waits_for_tokens_unless_the_caller_holds_them(self):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        budget = CPUBudget(cores=2)
+        service = AsyncVerticalCropService(max_workers=2)
+
+        async def analysis(profile):
+            async with service._analysis_threads(profile) as threads:
+                return threads, budget.get_stats()["stage_tokens"]
+
+        async def run():
+            async with budget.reserve("crop_render", 2):
+                waiting = asyncio.create_task(analysis(None))
+                await asyncio.sleep(0.05)
+                assert not waiting.done() and budget.waiting == 1
+                # A worker process analyzes on the tokens its parent holds
+                assert await analysis({"threads": 2}) == (2, {"crop_render": 2})
+            return await waiting
+
+        try:
+            with patch('app.services.vertical_crop_async.cpu_budget', budget):
+                threads, stage_tokens = asyncio.run(run())
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert threads == 1
+        assert stage_tokens == {"crop_analysis": 1}
+        assert budget.get_stats()["in_use"] == 0
@@ -0,0 +1,141 @@
+"""Unit tests for the persistent crop-path cache."""
+
+import asyncio
+import os
+
+import numpy as np
+import pytest
+
+from app.services.crop_cache import CropPathCache, crop_cache_key, hash_source_file
+from app.services.crop_planner import CropTrajectory
+from tests.conftest import locate_square, requires_ffmpeg, square_frame, square_position, write_clip
+
+PARAMS = {"smoothing": {"smoothing_factor": 0.9}, "detection_width": 384}
+
+
+def _trajectory(frames=30, x=100):
+    windows = np.tile([x, 0, 202, 360], (frames, 1))
+    return CropTrajectory(windows, 30.0, (640, 360), (202, 360), {"smart_resets": 2})
+
+
+class TestCacheKey:
+    """Test cache key derivation."""
+
+    def test_key_is_stable(self):
+        assert crop_cache_key("abc:best", (10.0, 40.0), PARAMS) == crop_cache_key("abc:best", (10.0, 40.0), dict(PARAMS))
+
+    @pytest.mark.parametrize("change", [
+        {"source_id": "abc:720p"},
+        {"window": (10.0, 41.0)},
+        {"params": {**PARAMS, "detection_width": 256}},
+        {"params": {**PARAMS, "smoothing": {"smoothing_factor": 0.95}}},
+    ])
+    def test_any_input_changes_the_key(self, change):
+        base = {"source_id": "abc:best", "window": (10.0, 40.0), "params": PARAMS}
+        assert crop_cache_key(**base) != crop_cache_key(**{**base, **change})
+
+    def test_file_hash_ignores_path(self, tmp_path):
+        first, second = tmp_path / "a.mp4", tmp_path / "b.mp4"
+        first.write_bytes(b"same bytes")
+        second.write_bytes(b"same bytes")
+        assert hash_source_file(first) == hash_source_file(second)
+
+
+class TestCropPathCache:
+    """Test storage, LRU eviction and corrupt entries."""
+
+    def test_roundtrip(self, tmp_path):
+        cache = CropPathCache(tmp_path, max_bytes=10**7, max_entries=10)
+        assert cache.get("k") is None
+
+        cache.put("k", _trajectory())
+        loaded = cache.get("k")
+
+        assert loaded.windows.tolist() == _trajectory().windows.tolist()
+        assert loaded.metadata["smart_resets"] == 2
+        assert cache.get_stats()["hits"] == 1
+        assert cache.get_stats()["misses"] == 1
+
+    def test_evicts_least_recently_used_entry(self, tmp_path):
+        cache = CropPathCache(tmp_path, max_bytes=10**7, max_entries=2)
+        cache.put("old", _trajectory())
+        cache.put("used", _trajectory())
+        os.utime(tmp_path / "old.npz", (1000, 1000))
+        os.utime(tmp_path / "used.npz", (2000, 2000))
+
+        # A hit refreshes recency, so "old" becomes the most recently used entry
+        assert cache.get("old") is not None
+        cache.put("new", _trajectory())
+
+        assert cache.get("used") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+        assert cache.evictions == 1
+
+    def test_size_limit(self, tmp_path):
+        cache = CropPathCache(tmp_path, max_bytes=10**7, max_entries=100)
+        cache.put("a", _trajectory(3000, 1))
+        entry_size = (tmp_path / "a.npz").stat().st_size
+        cache.max_bytes = int(entry_size * 2.5)
+
+        os.utime(tmp_path / "a.npz", (1000, 1000))
+        for index, key in enumerate(["b", "c"]):
+            cache.put(key, _trajectory(3000, index + 2))
+
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get("a") is None
+
+    def test_corrupt_entry_is_discarded(self, tmp_path):
+        cache = CropPathCache(tmp_path, max_bytes=10**7, max_entries=10)
+        (tmp_path / "bad.npz").write_bytes(b"not a zip file")
+
+        assert cache.get("bad") is None
+        assert not (tmp_path / "bad.npz").exists()
+
+    def test_disabled_cache_stores_nothing(self, tmp_path):
+        cache = CropPathCache(tmp_path, max_bytes=10**7, max_entries=10, enabled=False)
+        assert cache.put("k", _trajectory()) is None
+        assert cache.get("k") is None
+
+
+@requires_ffmpeg
+class TestCachedCrop:
+    """A second crop of the same clip must skip detection and only render."""
+
+    def test_second_crop_hits_cache(self, tmp_path, monkeypatch):
+        from app.services import vertical_crop_async
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        video_path = write_clip(tmp_path / "square.mp4", (square_frame(square_position(i, 640)) for i in range(45)))
+
+        cache = CropPathCache(tmp_path / "cache", max_bytes=10**7, max_entries=10)
+        monkeypatch.setattr(vertical_crop_async, "crop_path_cache", cache)
+
+        detections = []
+        service = AsyncVerticalCropService(max_workers=1, analysis_width=320)
+        service._detect_faces_sync = lambda frame: detections.append(1) or locate_square(frame)
+        try:
+            first = asyncio.run(service.create_vertical_crop_async(
+                video_path, tmp_path / "first.mp4", use_smart_scene_detection=False, smoothing_strength="high"
+            ))
+            detections_after_first = len(detections)
+            second = asyncio.run(service.create_vertical_crop_async(
+                video_path, tmp_path / "second.mp4", use_smart_scene_detection=False, smoothing_strength="high"
+            ))
+            detections_after_second = len(detections)
+            other_preset = asyncio.run(service.create_vertical_crop_async(
+                video_path, tmp_path / "third.mp4", use_smart_scene_detection=False, smoothing_strength="low"
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert first["success"] and second["success"] and other_preset["success"]
+        assert detections_after_first > 0
+        assert not first["crop_cache_hit"]
+        assert second["crop_cache_hit"]
+        assert not other_preset["crop_cache_hit"]
+        assert detections_after_second == detections_after_first
+        assert len(detections) > detections_after_second
+        assert (tmp_path / "second.mp4").exists()
+        assert cache.get_stats()["entries"] == 2
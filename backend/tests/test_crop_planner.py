@@ -0,0 +1,415 @@
+"""Unit tests for the two-pass crop planner."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.crop_planner import (
+    CropTrajectory,
+    build_crop_filter,
+    build_crop_filtergraph,
+    build_render_command,
+    plan_dual_spans,
+    render_crop_trajectory,
+    scale_speaker_result,
+    speaker_region_window,
+)
+from app.services.burn_in import build_subtitles_filter
+from app.services.ffmpeg_pipe import FFmpegFrameReader, analysis_frame_size
+from tests.conftest import (
+    brightness_ramp,
+    locate_square,
+    requires_ffmpeg,
+    requires_ffprobe,
+    square_frame,
+    square_position,
+    with_start_offset,
+    write_clip,
+)
+
+
+def _trajectory(xs, crop_size=(202, 360), fps=30.0):
+    windows = [(x, 0, crop_size[0], crop_size[1]) for x in xs]
+    return CropTrajectory(np.array(windows), fps, (640, 360), crop_size)
+
+
+class TestCropTrajectory:
+    """Test trajectory serialization and sendcmd generation."""
+
+    @pytest.mark.parametrize("suffix", [".json", ".npz"])
+    def test_save_load_round_trip(self, tmp_path, suffix):
+        trajectory = _trajectory([0, 10, 20, 20])
+        trajectory.metadata = {"smart_resets": 2}
+        loaded = CropTrajectory.load(trajectory.save(tmp_path / f"path{suffix}"))
+
+        assert np.array_equal(loaded.windows, trajectory.windows)
+        assert loaded.fps == 30.0
+        assert loaded.source_size == (640, 360)
+        assert loaded.target_size == (202, 360)
+        assert loaded.metadata == {"smart_resets": 2}
+
+    def test_sendcmd_only_emits_changes(self):
+        commands = _trajectory([5, 5, 5, 40, 40]).to_sendcmd().strip().splitlines()
+
+        assert len(commands) == 2
+        assert commands[0] == "0.000000 crop@vc x 5, crop@vc y 0;"
+        # Frame 3 at 30 fps, half a frame early
+        assert commands[1].startswith("0.083333 ")
+
+    def test_constant_spans(self):
+        assert _trajectory([5, 5, 5, 40, 40, 5]).constant_spans() == [(0, 3, 5, 0), (3, 5, 40, 0), (5, 6, 5, 0)]
+        assert _trajectory([]).constant_spans() == []
+
+    def test_single_position_needs_no_sendcmd(self, tmp_path):
+        static_filter = build_crop_filter(_trajectory([120] * 30), tmp_path / "commands.txt")
+        moving_filter = build_crop_filter(_trajectory([120] * 15 + [300] * 15), tmp_path / "commands.txt")
+
+        assert static_filter == "crop@vc=w=202:h=360:x=120:y=0"
+        assert moving_filter.startswith("sendcmd=")
+
+
+class TestAnalysisScaling:
+    """Test analysis-to-source coordinate mapping."""
+
+    def test_analysis_frame_size(self):
+        assert analysis_frame_size((3840, 2160), 640) == (640, 360)
+        assert analysis_frame_size((1920, 1080), 640) == (640, 360)
+        assert analysis_frame_size((480, 270), 640) == (480, 270)
+
+    def test_scale_speaker_result(self):
+        assert scale_speaker_result((10, 20, 30, 40), 6.0, 6.0) == (60, 120, 180, 240)
+        assert scale_speaker_result(None, 6.0, 6.0) is None
+
+        dual = {"mode": "dual_speaker", "speaker_1": (0, 0, 10, 10), "speaker_2": (50, 0, 60, 10), "frame_size": (640, 360)}
+        scaled = scale_speaker_result(dual, 3.0, 3.0)
+        assert scaled["speaker_2"] == (150, 0, 180, 30)
+        assert scaled["frame_size"] == (1920, 1080)
+
+
+class TestDualSpeakerSpans:
+    """Test split-screen span planning and its filtergraph."""
+
+    def test_region_window_is_centered_and_clamped(self):
+        # 608x540 split-screen half of a 1080p vertical output: 80% size window
+        assert speaker_region_window((1920, 1080), (900, 400, 1000, 500), (608, 540)) == (707, 234, 486, 432)
+        # A face at the frame edge shifts the window back inside
+        assert speaker_region_window((1920, 1080), (1880, 0, 1920, 40), (608, 540)) == (1434, 0, 486, 432)
+
+    def test_short_runs_and_resets(self):
+        top, bottom = (0, 0, 100, 50), (300, 0, 100, 50)
+        moved = (10, 0, 100, 50)
+        dual = [None] * 3 + [(top, bottom)] * 2 + [None] * 2 + [(top, bottom)] * 4 + [(moved, bottom)] * 3
+        resets = [False] * len(dual)
+        resets[9] = True
+
+        # The 2-frame run is too short; the reset at frame 9 splits the long run in two
+        spans = plan_dual_spans(dual, resets, min_frames=2)
+        assert [(span["start"], span["end"]) for span in spans] == [(3, 5), (7, 9), (9, 14)]
+        assert spans[2]["top"] == [10, 0, 100, 50]
+        assert plan_dual_spans(dual, resets, min_frames=3) == [{"start": 9, "end": 14, "top": [10, 0, 100, 50], "bottom": [300, 0, 100, 50]}]
+
+    def test_filtergraph_concatenates_layouts(self, tmp_path):
+        trajectory = _trajectory([0] * 10 + [40] * 10 + [40] * 10)
+        trajectory.metadata["dual_spans"] = [{"start": 10, "end": 20, "top": [0, 0, 160, 142], "bottom": [400, 0, 160, 142]}]
+        assert trajectory.layout_spans() == [(0, 10, None), (10, 20, trajectory.dual_spans[0]), (20, 30, None)]
+
+        graph = build_crop_filtergraph(trajectory, tmp_path / "commands.txt")
+        assert graph.startswith("[0:v]split=2[single_src][dual_src];[single_src]sendcmd=")
+        assert "[d0]trim=start_frame=10:end_frame=20" in graph
+        assert "crop=160:142:400:0,scale=202:180" in graph
+        assert "vstack,drawbox=x=0:y=179:w=202:h=2" in graph
+        assert graph.endswith("[p0][p1][p2]concat=n=3:v=1:a=0,fps=30/1[vout]")
+
+
+class TestRenderCommand:
+    """Crop, post filter (subtitle burn-in) and audio must come out as one FFmpeg encode."""
+
+    def test_post_filter_runs_on_the_cropped_frames(self, tmp_path):
+        chain = build_crop_filter(_trajectory([0] * 5 + [40] * 5, crop_size=(202, 360)), tmp_path / "c.txt", "subtitles='a.srt'")
+        assert chain.endswith("crop@vc=w=202:h=360:x=0:y=0,subtitles='a.srt'")
+
+        trajectory = _trajectory([0] * 20)
+        trajectory.metadata["dual_spans"] = [{"start": 5, "end": 10, "top": [0, 0, 160, 142], "bottom": [400, 0, 160, 142]}]
+        graph = build_crop_filtergraph(trajectory, tmp_path / "c.txt", "subtitles='a.srt'")
+        assert graph.endswith("concat=n=3:v=1:a=0,fps=30/1,subtitles='a.srt'[vout]")
+        assert graph.count("subtitles=") == 1
+
+    def test_single_encode_with_audio_copy(self, tmp_path):
+        cmd = build_render_command(
+            tmp_path / "in.mp4", tmp_path / "out.mp4", _trajectory([0] * 10), tmp_path / "c.txt",
+            audio_codec="aac", frame_count=10, post_filter=build_subtitles_filter(str(tmp_path / "in.srt"))
+        )
+        assert cmd.count("-i") == 1
+        assert cmd.count("-c:v") == 1
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert cmd[cmd.index("-frames:v") + 1] == "10"
+        assert "subtitles=" in cmd[cmd.index("-vf") + 1]
+
+        # Only audio that MP4 can't carry is re-encoded
+        cmd = build_render_command(tmp_path / "in.mkv", tmp_path / "out.mp4", _trajectory([0] * 10), None, audio_codec="opus")
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+        assert "-frames:v" not in cmd
+
+
+@requires_ffmpeg
+class TestCropRender:
+    """FFmpeg must apply every crop window on its own frame."""
+
+    def _render_means(self, source_path, tmp_path, xs):
+        trajectory = CropTrajectory(np.array([(x, 0, 202, 360) for x in xs]), 30.0, (640, 360), (202, 360))
+        output_path = tmp_path / "cropped.mp4"
+        result = asyncio.run(render_crop_trajectory(source_path, output_path, trajectory, crf=0, preset="ultrafast"))
+        assert result["success"], result.get("error")
+
+        means = []
+        with FFmpegFrameReader(output_path, 202, 360) as reader:
+            while (frame := reader.read()) is not None:
+                means.append(float(frame[:, 0, 0].mean()))
+        return means
+
+    def test_render_follows_trajectory_frame_accurately(self, tmp_path):
+        # A crop's mean brightness encodes its x offset
+        source_path = write_clip(tmp_path / "ramp.mp4", [brightness_ramp()] * 45)
+        xs = [0] * 15 + [200] * 15 + [400] * 15
+
+        means = self._render_means(source_path, tmp_path, xs)
+
+        assert len(means) == len(xs)
+        expected = [x * 255 // 640 for x in xs]
+        # Windows are 80 levels apart, so a 10 level tolerance still pins each one to its frame
+        assert np.abs(np.array(means) - np.array(expected)).max() < 10
+
+    @requires_ffprobe
+    @pytest.mark.parametrize("audio_lead", [0.0, 0.5])
+    def test_render_is_frame_accurate_on_sources_with_a_start_time(self, tmp_path, audio_lead):
+        # Clips cut from streams start at a non-zero timestamp, often with audio first
+        source_path = with_start_offset(
+            write_clip(tmp_path / "ramp.mp4", [brightness_ramp()] * 45), tmp_path / "offset.mp4",
+            start=1.0, audio_lead=audio_lead
+        )
+        xs = [0] * 15 + [200] * 15 + [400] * 15
+
+        means = self._render_means(source_path, tmp_path, xs)
+
+        assert len(means) == len(xs)
+        expected = [x * 255 // 640 for x in xs]
+        assert np.abs(np.array(means) - np.array(expected)).max() < 10
+
+
+    def test_render_switches_between_single_and_split_screen(self, tmp_path):
+        width, height = 640, 360
+        # Dark left half, bright right half: each crop's brightness shows where it came from
+        frame = np.full((height, width, 3), 40, dtype=np.uint8)
+        frame[:, width // 2:] = 220
+        source_path = write_clip(tmp_path / "halves.mp4", [frame] * 30)
+
+        trajectory = _trajectory([438] * 30)
+        trajectory.metadata["dual_spans"] = [{"start": 10, "end": 20, "top": [40, 40, 160, 142], "bottom": [440, 40, 160, 142]}]
+        output_path = tmp_path / "split.mp4"
+        result = asyncio.run(render_crop_trajectory(source_path, output_path, trajectory, crf=0, preset="ultrafast"))
+        assert result["success"], result.get("error")
+
+        halves = []
+        with FFmpegFrameReader(output_path, 202, 360) as reader:
+            while (out := reader.read()) is not None:
+                halves.append((float(out[:170].mean()), float(out[190:].mean()), float(out[179:181].mean())))
+
+        assert len(halves) == 30
+        for index, (top, bottom, divider) in enumerate(halves):
+            if 10 <= index < 20:
+                assert abs(top - 40) < 8 and abs(bottom - 220) < 8
+                assert divider < 60
+            else:
+                assert abs(top - 220) < 8 and abs(bottom - 220) < 8
+
+
+@requires_ffmpeg
+class TestAnalysisPass:
+    """The downscaled analysis pass must track the speaker at least as well as the frame loop."""
+
+    def test_analysis_tracks_speaker_closer_than_frame_loop(self, tmp_path):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        width, height = 640, 360
+        video_path = write_clip(tmp_path / "moving_square.mp4", (square_frame(square_position(i, width)) for i in range(90)))
+
+        smoothing = {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8}
+        scene_data = {"scene_boundaries": {60}, "scene_stats": [
+            {"start_frame": 0, "end_frame": 60, "length_frames": 60},
+            {"start_frame": 60, "end_frame": 90, "length_frames": 30},
+        ]}
+        service = AsyncVerticalCropService(max_workers=1, analysis_width=320)
+        service._detect_faces_sync = locate_square
+        try:
+            analysis = asyncio.run(service._analyze_crop_trajectory(
+                "test", video_path, (202, 360), smoothing, None, True, 30, 90, scene_data,
+                True, 10, source_size=(width, height), source_fps=30.0
+            ))
+            frame_loop = asyncio.run(service._process_video_frames_smart(
+                "test", video_path, tmp_path / "frame_loop.mp4", (202, 360), smoothing,
+                None, True, False, 30, 90, scene_data, True, 10,
+                source_size=(width, height), source_fps=30.0
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert analysis["success"], analysis.get("error")
+        assert frame_loop["success"], frame_loop.get("error")
+
+        trajectory = analysis["trajectory"]
+        assert trajectory.metadata["analysis_size"] == [320, 180]
+        assert trajectory.windows.shape == (90, 4)
+
+        # Ideal window: centered on the square in every frame
+        ideal = np.array([
+            service._plan_crop_window((width, height), None, (202, 360), (square_position(i, width) + 50, 170))[0]
+            for i in range(90)
+        ])
+        frame_loop_x = np.array([
+            service._plan_crop_window((width, height), None, (202, 360), center)[0]
+            for center in frame_loop["crop_trajectory"]
+        ])
+
+        # The offline smoother looks ahead, so it has no lag behind the moving square
+        offline_error = np.abs(trajectory.windows[:, 0] - ideal)
+        assert offline_error.mean() < np.abs(frame_loop_x - ideal).mean()
+        assert offline_error[:60].max() <= 6
+        # The scene cut at frame 60 refocuses immediately
+        assert offline_error[60] <= 2
+
+    def test_two_speakers_become_a_split_screen_span(self, tmp_path):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        def locate_squares(frame):
+            """Stand-in face detector: one box per bright square."""
+            columns = np.flatnonzero((frame[:, :, 0] > 128).any(axis=0))
+            if len(columns) == 0:
+                return []
+            breaks = np.flatnonzero(np.diff(columns) > 1)
+            starts = [columns[0], *columns[breaks + 1]]
+            ends = [*columns[breaks], columns[-1]]
+            ys = np.flatnonzero((frame[:, :, 0] > 128).any(axis=1))
+            return [(int(x), int(ys[0]), int(x1) + 1, int(ys[-1]) + 1) for x, x1 in zip(starts, ends)]
+
+        def frames():
+            for i in range(90):
+                frame = square_frame(100)
+                if 30 <= i < 60:
+                    frame[120:220, 450:550] = 255
+                yield frame
+
+        video_path = write_clip(tmp_path / "two_speakers.mp4", frames())
+
+        smoothing = {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8}
+        scene_data = {"scene_boundaries": {30, 60}, "scene_stats": [
+            {"start_frame": 0, "end_frame": 30, "length_frames": 30},
+            {"start_frame": 30, "end_frame": 60, "length_frames": 30},
+            {"start_frame": 60, "end_frame": 90, "length_frames": 30},
+        ]}
+        service = AsyncVerticalCropService(max_workers=1, analysis_width=320)
+        service._detect_faces_sync = locate_squares
+        try:
+            analysis = asyncio.run(service._analyze_crop_trajectory(
+                "test", video_path, (202, 360), smoothing, None, True, 30, 90, scene_data,
+                True, 10, source_size=(640, 360), source_fps=30.0, enable_group_conversation_framing=True
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert analysis["success"], analysis.get("error")
+        trajectory = analysis["trajectory"]
+        assert len(trajectory) == 90
+        [span] = trajectory.dual_spans
+        assert (span["start"], span["end"]) == (30, 60)
+        # Left speaker on top, right speaker below, each window centered on its square
+        assert abs(span["top"][0] + span["top"][2] // 2 - 150) <= 4
+        assert abs(span["bottom"][0] + span["bottom"][2] // 2 - 500) <= 4
+
+
+def _write_square_clip(path, positions, width=640, height=360):
+    """Clip with a bright 100px square whose left edge follows positions (one per frame)"""
+    return write_clip(path, (square_frame(x, width, height) for x in positions))
+
+
+@requires_ffmpeg
+class TestStaticFraming:
+    """A barely moving speaker is framed from ~1 fps samples with fixed crops."""
+
+    def _service(self, detections):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        service = AsyncVerticalCropService(max_workers=1, analysis_width=320)
+        service._detect_faces_sync = lambda frame: detections.append(1) or locate_square(frame)
+        return service
+
+    def test_static_speaker_gets_one_crop_per_scene(self, tmp_path):
+        video_path = tmp_path / "static.mp4"
+        # Speaker jitters by a few pixels, then the shot cuts to a different position at frame 75
+        _write_square_clip(video_path, [100 + (i % 3) for i in range(75)] + [400] * 75)
+        scene_data = {"scene_boundaries": {75}, "scene_stats": [
+            {"start_frame": 0, "end_frame": 75, "length_frames": 75},
+            {"start_frame": 75, "end_frame": 150, "length_frames": 75},
+        ]}
+
+        detections = []
+        service = self._service(detections)
+        try:
+            trajectory = asyncio.run(service._analyze_static_framing(
+                video_path, (202, 360), True, 30, 150, scene_data, True, 10, source_size=(640, 360)
+            ))
+            rendered = asyncio.run(render_crop_trajectory(
+                video_path, tmp_path / "out.mp4", trajectory, crf=0, preset="ultrafast", open_ended=True
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert trajectory is not None
+        # Frames 0, 30, 60 | 75, 90, 120
+        assert trajectory.metadata["sampled_frames"] == 6
+        assert len(detections) == 6
+        spans = trajectory.constant_spans()
+        assert [(start, end) for start, end, _, _ in spans] == [(0, 75), (75, 150)]
+        # Square centers (150, 450) minus half the crop width, give or take the analysis downscale
+        assert abs(spans[0][2] - (150 - 101)) <= 2
+        assert abs(spans[1][2] - (450 - 101)) <= 2
+
+        assert rendered["success"], rendered.get("error")
+        with FFmpegFrameReader(tmp_path / "out.mp4", 202, 360) as reader:
+            frames = 0
+            while reader.read() is not None:
+                frames += 1
+        assert frames == 150
+
+    def test_moving_speaker_needs_full_analysis(self, tmp_path):
+        video_path = tmp_path / "moving.mp4"
+        _write_square_clip(video_path, [100 + i * 2 for i in range(90)])
+
+        service = self._service([])
+        try:
+            trajectory = asyncio.run(service._analyze_static_framing(
+                video_path, (202, 360), True, 30, 90, {}, True, 10, source_size=(640, 360)
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert trajectory is None
+
+    def test_open_ended_render_covers_frames_past_the_trajectory(self, tmp_path):
+        video_path = tmp_path / "clip.mp4"
+        _write_square_clip(video_path, [100] * 40)
+
+        result = asyncio.run(render_crop_trajectory(
+            video_path, tmp_path / "out.mp4", _trajectory([120] * 30), crf=0, preset="ultrafast", open_ended=True
+        ))
+        assert result["success"], result.get("error")
+
+        with FFmpegFrameReader(tmp_path / "out.mp4", 202, 360) as reader:
+            frames = 0
+            while reader.read() is not None:
+                frames += 1
+        assert frames == 40
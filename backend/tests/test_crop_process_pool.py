@@ -0,0 +1,87 @@
+"""Tests for whole-clip crops in worker processes."""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pytest
+
+from app.services.ffmpeg_pipe import FFmpegFrameReader
+from tests.conftest import requires_ffmpeg, write_clip
+
+
+def _moving_square_frames(count):
+    """320x180 frames with a 60px square sliding right 4px per frame"""
+    for i in range(count):
+        frame = np.zeros((180, 320, 3), dtype=np.uint8)
+        frame[60:120, 40 + i * 4:100 + i * 4] = 200
+        yield frame
+
+
+def _crash_worker():
+    """Kill the worker process the way a native crash would"""
+    os._exit(1)
+
+
+@requires_ffmpeg
+class TestProcessPoolCrop:
+    """Clips dispatched to the process pool come back as output files."""
+
+    def test_clips_crop_in_worker_processes(self, tmp_path):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        clips = []
+        for clip_index in range(2):
+            clips.append(write_clip(tmp_path / f"clip_{clip_index}.mp4", _moving_square_frames(30)))
+
+        service = AsyncVerticalCropService(max_workers=2)
+
+        async def crop_all():
+            return await asyncio.gather(*[
+                service.create_vertical_crop_in_process(
+                    clip, tmp_path / f"{clip.stem}_vertical.mp4",
+                    use_smart_scene_detection=False, smoothing_strength="high", use_crop_cache=False
+                )
+                for clip in clips
+            ])
+
+        try:
+            results = asyncio.run(crop_all())
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        for clip, result in zip(clips, results):
+            assert result["success"], result.get("error")
+            assert result["worker_pid"] != os.getpid()
+            assert result["output_path"] == str(tmp_path / f"{clip.stem}_vertical.mp4")
+            assert service.active_tasks[result["task_id"]]["status"] == "completed"
+
+            frames = 0
+            with FFmpegFrameReader(result["output_path"], 102, 180) as reader:
+                while reader.read() is not None:
+                    frames += 1
+            assert frames == 30
+
+
+def test_broken_pool_is_replaced():
+    from app.services.vertical_crop_async import AsyncVerticalCropService
+
+    service = AsyncVerticalCropService(max_workers=2)
+    broken = service.process_executor
+
+    async def crash_then_run():
+        with pytest.raises(BrokenProcessPool):
+            await service._run_heavy_task(_crash_worker)
+        return await service._run_heavy_task(os.getpid)
+
+    try:
+        worker_pid = asyncio.run(crash_then_run())
+    finally:
+        service.thread_executor.shutdown()
+        service.process_executor.shutdown()
+
+    # Later clips run in a fresh pool instead of silently falling back to in-process crops
+    assert service.process_executor is not broken
+    assert worker_pid != os.getpid()
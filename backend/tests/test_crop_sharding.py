@@ -0,0 +1,63 @@
+"""Tests for time-sharded vertical cropping."""
+
+import asyncio
+
+import pytest
+
+from app.services.crop_sharding import plan_time_shards
+from app.services.ffmpeg_pipe import FFmpegFrameReader
+from tests.conftest import decode_frame_index, index_frames, requires_ffprobe, with_start_offset, write_clip
+
+
+class TestPlanTimeShards:
+    """Test shard planning."""
+
+    def test_shards_cover_every_frame_once(self):
+        shards = plan_time_shards(total_frames=280, fps=30.0, shard_seconds=3.0, warmup_seconds=1.0)
+
+        assert [s["start_frame"] for s in shards] == [0, 90, 180]
+        assert [s["end_frame"] for s in shards] == [90, 180, None]
+        assert [s["warmup_frames"] for s in shards] == [0, 30, 30]
+        assert [s["lookahead_frames"] for s in shards] == [30, 30, 0]
+
+    def test_short_tail_is_folded_into_last_shard(self):
+        shards = plan_time_shards(total_frames=95, fps=30.0, shard_seconds=3.0, warmup_seconds=1.0)
+        assert len(shards) == 1
+        assert shards[0]["end_frame"] is None
+
+
+@requires_ffprobe
+class TestShardedCrop:
+    """Stitched shards must contain every source frame exactly once."""
+
+    @pytest.mark.parametrize("audio_lead", [None, 0.5])
+    def test_no_duplicated_or_missing_frames_at_joins(self, tmp_path, audio_lead):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        width, height, frame_count = 320, 176, 150
+        video_path = write_clip(tmp_path / "indexed.mp4", index_frames(frame_count, width, height))
+        if audio_lead is not None:
+            # A clip cut from a stream: starts at 1 s, with audio before the video
+            video_path = with_start_offset(video_path, tmp_path / "offset.mp4", start=1.0, audio_lead=audio_lead)
+
+        service = AsyncVerticalCropService(max_workers=2)
+        output_path = tmp_path / "sharded.mp4"
+        try:
+            result = asyncio.run(service.create_vertical_crop_sharded(
+                video_path, output_path, shard_seconds=1.1, warmup_seconds=0.5,
+                use_speaker_detection=False
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert result["success"], result.get("error")
+        assert result["shards"] == 5
+        assert not (tmp_path / f".shards_{result['task_id']}").exists()
+
+        indices = []
+        with FFmpegFrameReader(output_path, 100, height) as reader:
+            while (frame := reader.read()) is not None:
+                indices.append(decode_frame_index(frame))
+
+        assert indices == list(range(frame_count))
@@ -0,0 +1,138 @@
+"""Unit tests for strided face detection scheduling."""
+
+import asyncio
+
+import numpy as np
+
+from app.services.detection_scheduler import (
+    DetectionScheduler,
+    interpolate_speaker_result,
+    speaker_result_center,
+)
+from tests.conftest import locate_square, requires_ffmpeg, square_frame, square_position, write_clip
+
+
+class TestDetectionScheduler:
+    """Test stride adaptation."""
+
+    def test_first_frame_always_detected(self):
+        """The first frame has nothing to interpolate from."""
+        scheduler = DetectionScheduler(max_stride=8)
+        assert scheduler.should_detect(0)
+
+    def test_stride_grows_in_static_scene(self):
+        """A static speaker in a static scene grows the stride up to max_stride."""
+        scheduler = DetectionScheduler(max_stride=4)
+        detected = []
+        for i in range(40):
+            if scheduler.should_detect(i, frame_diff=0.5):
+                detected.append(i)
+                scheduler.record_detection(i, (500, 300), 1920)
+
+        assert scheduler.stride == 4
+        gaps = np.diff(detected)
+        assert gaps[-1] == 4
+        assert len(detected) < 20
+
+    def test_scene_cut_forces_detection_and_shrinks_stride(self):
+        """A scene cut triggers an immediate detection at the minimum stride."""
+        scheduler = DetectionScheduler(max_stride=6)
+        scheduler.stride = 6
+        scheduler.should_detect(0)
+        scheduler.record_detection(0, (500, 300), 1920)
+
+        assert not scheduler.should_detect(1)
+        assert scheduler.should_detect(2, scene_cut=True)
+        assert scheduler.stride == 1
+
+    def test_frame_difference_spike_forces_detection(self):
+        """A large frame difference is treated like a cut."""
+        scheduler = DetectionScheduler(max_stride=6, spike_threshold=20.0)
+        scheduler.stride = 6
+        scheduler.should_detect(0)
+        scheduler.record_detection(0, (500, 300), 1920)
+
+        assert scheduler.should_detect(1, frame_diff=40.0)
+        assert scheduler.stride == 1
+
+    def test_fast_motion_halves_stride(self):
+        """Large speaker movement between detections shrinks the stride."""
+        scheduler = DetectionScheduler(max_stride=8)
+        scheduler.stride = 8
+        scheduler.should_detect(0)
+        scheduler.record_detection(0, (500, 300), 1920)
+        scheduler.record_detection(8, (700, 300), 1920)
+
+        assert scheduler.stride == 4
+
+    def test_max_stride_one_detects_every_frame(self):
+        """max_stride=1 keeps the original every-frame behaviour."""
+        scheduler = DetectionScheduler(max_stride=1)
+        for i in range(10):
+            assert scheduler.should_detect(i, frame_diff=0.0)
+            scheduler.record_detection(i, (500, 300), 1920)
+
+    def test_frame_difference(self):
+        """Identical frames have zero difference, a cut has a large one."""
+        scheduler = DetectionScheduler()
+        black = np.zeros((360, 640, 3), dtype=np.uint8)
+        white = np.full((360, 640, 3), 255, dtype=np.uint8)
+
+        assert scheduler.frame_difference(black) == 0.0
+        assert scheduler.frame_difference(black) == 0.0
+        assert scheduler.frame_difference(white) > 200
+
+
+class TestInterpolation:
+    """Test speaker result interpolation."""
+
+    def test_boxes_are_linearly_interpolated(self):
+        assert interpolate_speaker_result((0, 0, 10, 10), (100, 0, 110, 10), 0.5) == (50, 0, 60, 10)
+
+    def test_non_boxes_hold_nearest(self):
+        dual = {"mode": "dual_speaker"}
+        assert interpolate_speaker_result(None, (0, 0, 10, 10), 0.25) is None
+        assert interpolate_speaker_result(None, (0, 0, 10, 10), 0.75) == (0, 0, 10, 10)
+        assert interpolate_speaker_result(dual, dual, 0.3) is dual
+
+    def test_speaker_result_center(self):
+        assert speaker_result_center((10, 20, 30, 40)) == (20, 30)
+        assert speaker_result_center(None) is None
+        assert speaker_result_center({"mode": "dual_speaker"}) is None
+
+
+@requires_ffmpeg
+class TestStridedCropPath:
+    """Strided detection must reproduce the every-frame crop path."""
+
+    def _crop_path(self, tmp_path, video_path, max_stride, scene_boundaries):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        service = AsyncVerticalCropService(max_workers=1, max_detection_stride=max_stride)
+        service._detect_faces_sync = locate_square
+        scene_stats = [
+            {"start_frame": 0, "end_frame": 60, "length_frames": 60},
+            {"start_frame": 60, "end_frame": 90, "length_frames": 30},
+        ]
+        try:
+            result = asyncio.run(service._process_video_frames_smart(
+                "test", video_path, tmp_path / f"out_{max_stride}.mp4", (202, 360),
+                {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8},
+                None, True, False, 30, 90,
+                {"scene_boundaries": scene_boundaries, "scene_stats": scene_stats},
+                True, 10, source_size=(640, 360), source_fps=30.0
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+        assert result["success"], result.get("error")
+        return np.array(result["crop_trajectory"])
+
+    def test_strided_path_matches_every_frame_path(self, tmp_path):
+        video_path = write_clip(tmp_path / "moving_square.mp4", (square_frame(square_position(i, 640)) for i in range(90)))
+
+        reference = self._crop_path(tmp_path, video_path, 1, {60})
+        strided = self._crop_path(tmp_path, video_path, 6, {60})
+
+        assert reference.shape == strided.shape == (90, 2)
+        assert np.abs(reference - strided).max() <= 3
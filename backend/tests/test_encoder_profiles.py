@@ -0,0 +1,122 @@
+"""Unit tests for backlog-adaptive encoder profiles."""
+
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from app.services.burn_in import BurnInRenderer
+from app.services.cpu_budget import CPUBudget
+from app.services.encoder_profiles import EncoderProfileService, encoder_profiles, x264_args
+
+
+def _hold(service, stack, count, job="crop_render"):
+    """Keep `count` encodes registered until the ExitStack closes"""
+    for _ in range(count):
+        stack.enter_context(service.encode(job))
+
+
+class TestTierSelection:
+    """Idle jobs keep their quality settings; backlog and latency targets step them down."""
+
+    def test_idle_jobs_use_their_base_settings(self):
+        service = EncoderProfileService(cores=4)
+
+        assert {key: service.select("cut")[key] for key in ("tier", "preset", "crf", "threads")} == {
+            "tier": "quality", "preset": "slow", "crf": 18, "threads": 0
+        }
+        assert service.select("burn_in")["preset"] == "medium"
+        assert service.select("crop_render")["preset"] == "fast"
+        assert service.select("crop_fallback")["crf"] == 23
+
+    def test_backlog_degrades_and_recovers(self):
+        service = EncoderProfileService(cores=2)
+
+        with ExitStack() as stack:
+            _hold(service, stack, 2)
+            busy = service.select("burn_in")
+            assert busy["backlog"] == 3
+            assert busy["preset"] == "fast"
+            # Three encodes share two cores
+            assert busy["threads"] == 1
+
+            _hold(service, stack, 6)
+            swamped = service.select("burn_in")
+            assert swamped["tier"] == "fastest"
+            assert swamped["crf"] == 20
+
+        assert service.active == 0
+        assert service.select("burn_in")["preset"] == "medium"
+
+    def test_backlog_sources_count_as_queued_work(self):
+        service = EncoderProfileService(cores=1)
+        waiting = [0]
+        service.add_backlog_source("queue", lambda: waiting[0])
+        assert service.select("crop_render")["tier"] == "fast"
+
+        waiting[0] = 3
+        assert service.select("crop_render")["tier"] == "fastest"
+
+        # Re-registering a name replaces the source
+        service.add_backlog_source("queue", lambda: 0)
+        assert service.backlog() == 0
+
+    def test_latency_target_picks_a_faster_preset(self):
+        service = EncoderProfileService(cores=1)
+
+        # medium ~60s and fast ~42s for a 60s clip miss a 30s target; veryfast ~24s makes it
+        profile = service.select("burn_in", media_seconds=60, latency_target_seconds=30)
+        assert profile["preset"] == "veryfast"
+        assert profile["crf"] == 19
+        assert service.select("burn_in", media_seconds=60, latency_target_seconds=120)["preset"] == "medium"
+
+        ratio_service = EncoderProfileService(cores=1, latency_target_ratio=0.5)
+        assert ratio_service.select("burn_in", media_seconds=60)["preset"] == "veryfast"
+
+    def test_non_adaptive_service_pins_base_tier(self):
+        service = EncoderProfileService(adaptive=False, cores=1)
+        with ExitStack() as stack:
+            _hold(service, stack, 5)
+            assert service.select("cut", media_seconds=60, latency_target_seconds=1)["preset"] == "slow"
+
+    def test_decisions_are_recorded_for_auditing(self):
+        service = EncoderProfileService(cores=2)
+        service.select("cut", clip_id="clip_1")
+        with service.encode("burn_in", clip_id="clip_2", profile={"preset": "fast", "crf": 18, "tier": "fast"}) as profile:
+            # A profile chosen elsewhere is used as-is and not logged twice
+            assert profile["preset"] == "fast"
+            assert service.active == 1
+
+        stats = service.get_stats()
+        assert [entry["clip_id"] for entry in stats["recent"]] == ["clip_1"]
+        assert stats["tier_counts"]["quality"] == 1
+        assert stats["active"] == 0
+
+
+def test_x264_args():
+    assert x264_args({"preset": "fast", "crf": 20, "threads": 0}) == ['-preset', 'fast', '-crf', '20']
+    assert x264_args({"preset": "slow", "crf": 18, "threads": 2}) == ['-preset', 'slow', '-crf', '18', '-threads', '2']
+
+
+def test_burn_in_uses_the_encoder_profile():
+    with patch.object(BurnInRenderer, '_verify_ffmpeg'):
+        renderer = BurnInRenderer()
+
+    with patch('os.path.exists', return_value=True), \
+         patch('os.path.getsize', return_value=1024), \
+         patch('os.makedirs'), \
+         patch('subprocess.run') as mock_run, \
+         patch.object(encoder_profiles, 'budget', CPUBudget(cores=8)), \
+         patch.object(encoder_profiles, 'select', return_value={
+             "job": "burn_in", "tier": "faster", "preset": "veryfast", "crf": 19, "threads": 2, "backlog": 3
+         }):
+        mock_run.return_value.returncode = 0
+        renderer.burn_subtitles("/input/video.mp4", "/input/subtitles.srt", "/output/video.mp4")
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-preset") + 1] == "veryfast"
+        assert cmd[cmd.index("-crf") + 1] == "19"
+        assert cmd[cmd.index("-threads") + 1] == "2"
+
+        # An explicit CRF still wins
+        renderer.burn_subtitles("/input/video.mp4", "/input/subtitles.srt", "/output/video.mp4", crf=23)
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index("-crf") + 1] == "23"
+        assert cmd[cmd.index("-preset") + 1] == "veryfast"
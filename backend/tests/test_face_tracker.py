@@ -0,0 +1,124 @@
+"""Unit tests for the optical-flow face tracker used between detections."""
+
+import asyncio
+
+import numpy as np
+
+from app.services.detection_scheduler import DetectionScheduler
+from app.services.face_tracker import FaceTracker
+from tests.conftest import locate_square, requires_ffmpeg, write_clip
+
+# Blocky random texture standing in for a face - gives the tracker corners to follow
+TEXTURE = np.kron(
+    np.random.default_rng(7).integers(140, 256, size=(13, 13)), np.ones((8, 8))
+).astype(np.uint8)[:100, :100]
+
+
+def _textured_frame(x: int, y: int = 120, width: int = 640, height: int = 360) -> np.ndarray:
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    frame[y:y + 100, x:x + 100] = TEXTURE[:, :, None]
+    return frame
+
+
+def _textured_position(frame_index: int, width: int) -> int:
+    """Left edge of the textured 'face' - steady drift, then a hard cut."""
+    if frame_index < 60:
+        return 100 + frame_index * 3
+    return width - 200 - (frame_index - 60) * 2
+
+
+class TestFaceTracker:
+    """Test box following and loss detection."""
+
+    def test_follows_moving_box(self):
+        tracker = FaceTracker()
+        assert tracker.start(_textured_frame(100), (100, 120, 200, 220))
+
+        for step in range(1, 21):
+            box, confidence = tracker.update(_textured_frame(100 + step * 3))
+            assert box is not None
+            assert tracker.active
+
+        assert abs(box[0] - 160) <= 2
+        assert abs(box[1] - 120) <= 2
+        assert abs((box[2] - box[0]) - 100) <= 4
+        assert confidence > 0.8
+
+    def test_lost_when_face_disappears(self):
+        tracker = FaceTracker()
+        assert tracker.start(_textured_frame(100), (100, 120, 200, 220))
+
+        box, confidence = tracker.update(np.zeros((360, 640, 3), dtype=np.uint8))
+
+        assert box is None
+        assert confidence == 0.0
+        assert not tracker.active
+
+    def test_textureless_box_cannot_be_tracked(self):
+        frame = np.zeros((360, 640, 3), dtype=np.uint8)
+        frame[120:220, 100:200] = 255
+        tracker = FaceTracker()
+
+        assert not tracker.start(frame, (100, 120, 200, 220))
+        assert tracker.update(frame) == (None, 0.0)
+
+
+class TestTrackedScheduling:
+    """A confident tracker stretches the detection stride; losing it re-detects."""
+
+    def test_tracking_stretches_stride(self):
+        scheduler = DetectionScheduler(max_stride=4, tracked_stride=20)
+        detected = [i for i in range(60) if scheduler.should_detect(i, tracking=i > 0)]
+
+        assert detected == [0, 20, 40]
+        assert scheduler.get_stats()["tracked_frames"] == 57
+
+    def test_tracker_lost_forces_detection(self):
+        scheduler = DetectionScheduler(max_stride=4, tracked_stride=20)
+        scheduler.should_detect(0)
+        scheduler.record_detection(0, (500, 300), 1920)
+
+        assert not scheduler.should_detect(1, tracking=True)
+        assert scheduler.should_detect(2, tracker_lost=True)
+        assert scheduler.get_stats()["tracker_redetections"] == 1
+
+
+@requires_ffmpeg
+class TestTrackedAnalysis:
+    """The analysis pass must keep the crop path while calling the detector far less."""
+
+    def _analyze(self, video_path, max_stride, tracked_stride):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        detections = []
+        service = AsyncVerticalCropService(max_workers=1, max_detection_stride=max_stride, analysis_width=320)
+        service.max_tracked_stride = tracked_stride
+        service._detect_faces_sync = lambda frame: detections.append(1) or locate_square(frame)
+        scene_data = {"scene_boundaries": {60}, "scene_stats": [
+            {"start_frame": 0, "end_frame": 60, "length_frames": 60},
+            {"start_frame": 60, "end_frame": 120, "length_frames": 60},
+        ]}
+        try:
+            analysis = asyncio.run(service._analyze_crop_trajectory(
+                "test", video_path, (202, 360),
+                {"smoothing_factor": 0.3, "max_jump_distance": 80, "stability_frames": 3},
+                None, True, 30, 120, scene_data, True, 10, source_size=(640, 360), source_fps=30.0
+            ))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+        assert analysis["success"], analysis.get("error")
+        return analysis["trajectory"].windows[:, 0], len(detections)
+
+    def test_tracker_matches_every_frame_detection(self, tmp_path):
+        video_path = write_clip(
+            tmp_path / "textured_square.mp4", (_textured_frame(_textured_position(i, 640)) for i in range(120))
+        )
+
+        reference, reference_detections = self._analyze(video_path, 1, 0)
+        tracked, tracked_detections = self._analyze(video_path, 6, 30)
+
+        assert reference_detections == 120
+        # Start, the cut at frame 60 and the 30-frame safety re-detections only
+        assert tracked_detections <= 6
+        assert np.abs(reference - tracked).max() <= 4
@@ -0,0 +1,109 @@
+"""Unit tests for FFmpeg rawvideo pipe I/O."""
+
+from pathlib import Path
+
+import numpy as np
+
+from app.services.ffmpeg_pipe import AnalysisProxyReader, FFmpegFrameReader, FFmpegFrameWriter
+from tests.conftest import requires_ffmpeg, write_clip
+
+
+class TestFFmpegFrameWriterCommand:
+    """Test encoder command construction."""
+
+    def test_copies_mp4_compatible_audio(self):
+        """AAC source audio is stream-copied into the output."""
+        writer = FFmpegFrameWriter(Path("/out.mp4"), 608, 1080, 30.0, audio_source=Path("/in.mp4"), audio_codec="aac")
+        cmd = writer._build_command()
+
+        assert cmd[cmd.index("-c:a") + 1] == "copy"
+        assert ["-map", "1:a:0"] == cmd[cmd.index("1:a:0") - 1:cmd.index("1:a:0") + 1]
+        assert "-shortest" in cmd
+
+    def test_reencodes_other_audio(self):
+        """Opus source audio is re-encoded to AAC."""
+        writer = FFmpegFrameWriter(Path("/out.mp4"), 608, 1080, 30.0, audio_source=Path("/in.webm"), audio_codec="opus")
+        cmd = writer._build_command()
+
+        assert cmd[cmd.index("-c:a") + 1] == "aac"
+
+    def test_silent_output_without_audio(self):
+        """No audio input is added when the source has no audio stream."""
+        writer = FFmpegFrameWriter(Path("/out.mp4"), 608, 1080, 29.97)
+        cmd = writer._build_command()
+
+        assert "-c:a" not in cmd
+        assert cmd.count("-i") == 1
+        assert cmd[cmd.index("-r") + 1] == "29.97"
+
+
+@requires_ffmpeg
+class TestFFmpegRoundTrip:
+    """Encode frames through the writer and decode them back through the reader."""
+
+    def test_round_trip_frame_count_and_buffer_reuse(self, tmp_path):
+        """Every written frame comes back, decoded into the same buffer."""
+        video_path = tmp_path / "synthetic.mp4"
+        width, height, frame_count = 64, 48, 12
+
+        with FFmpegFrameWriter(video_path, width, height, 24.0, crf=0, preset="ultrafast") as writer:
+            for i in range(frame_count):
+                frame = np.full((height, width, 3), i * 20, dtype=np.uint8)
+                writer.write(frame)
+
+        assert video_path.exists()
+
+        buffers = set()
+        means = []
+        with FFmpegFrameReader(video_path, width, height) as reader:
+            while (frame := reader.read()) is not None:
+                buffers.add(id(frame))
+                means.append(float(frame.mean()))
+
+        assert len(means) == frame_count
+        assert buffers == {id(reader.buffer)}
+        # Brightness ramps up frame by frame (allowing for yuv420p rounding)
+        assert all(b > a for a, b in zip(means, means[1:]))
+
+    def test_read_into_caller_buffer(self, tmp_path):
+        """read(out=...) decodes straight into a caller-owned buffer."""
+        video_path = tmp_path / "synthetic.mp4"
+        with FFmpegFrameWriter(video_path, 64, 48, 24.0, crf=0, preset="ultrafast") as writer:
+            writer.write(np.full((48, 64, 3), 100, dtype=np.uint8))
+
+        out = np.zeros((48, 64, 3), dtype=np.uint8)
+        with FFmpegFrameReader(video_path, 64, 48) as reader:
+            assert reader.read(out=out) is out
+            assert reader.read(out=out) is None
+
+        assert abs(float(out.mean()) - 100) < 8
+
+
+@requires_ffmpeg
+class TestAnalysisProxyReader:
+    """The proxy yields sampled, downscaled frames tagged with their source index."""
+
+    def _ramp_video(self, tmp_path, frame_count=30):
+        return write_clip(tmp_path / "ramp.mp4", (np.full((180, 320, 3), i * 8, dtype=np.uint8) for i in range(frame_count)))
+
+    def test_step_and_extra_frames(self, tmp_path):
+        video_path = self._ramp_video(tmp_path)
+        reader = AnalysisProxyReader(video_path, (320, 180), width=80, frame_step=10, extra_frames=[13, 27])
+        assert reader.source_indices(30) == [0, 10, 13, 20, 27]
+
+        with reader:
+            sampled = [(index, frame.shape, float(frame.mean())) for index, frame in reader]
+
+        assert [index for index, _, _ in sampled] == [0, 10, 13, 20, 27]
+        assert all(shape == (44, 80, 3) for _, shape, _ in sampled)
+        # Brightness identifies the decoded source frame (allowing for yuv420p rounding)
+        assert all(abs(mean - index * 8) < 6 for index, _, mean in sampled)
+
+    def test_full_rate_proxy_at_source_size(self, tmp_path):
+        video_path = self._ramp_video(tmp_path, 12)
+        with AnalysisProxyReader(video_path, (320, 180), width=640) as reader:
+            indices = [index for index, frame in reader]
+
+        assert reader.video_filter is None
+        assert (reader.width, reader.height) == (320, 180)
+        assert indices == list(range(12))
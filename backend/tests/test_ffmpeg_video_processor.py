@@ -0,0 +1,62 @@
+"""Unit tests for the ultra-quality FFmpeg video processor."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.ffmpeg_pipe import FFmpegFrameReader
+from app.services.ffmpeg_video_processor import FFmpegVideoProcessor
+from tests.conftest import locate_square, requires_ffmpeg, write_clip
+
+
+@pytest.fixture(scope="module")
+def processor():
+    return FFmpegVideoProcessor()
+
+
+class TestCropWindow:
+    """Test the per-frame crop rectangle."""
+
+    def test_centers_on_first_face(self, processor):
+        assert processor.vertical_crop_window((1920, 1080), [(900, 100, 1100, 300)], (608, 1080)) == (696, 0, 608, 1080)
+
+    def test_clamps_to_frame(self, processor):
+        assert processor.vertical_crop_window((1920, 1080), [(1850, 0, 1920, 80)], (608, 1080)) == (1312, 0, 608, 1080)
+
+    def test_crop_position_overrides_faces(self, processor):
+        window = processor.vertical_crop_window((1920, 1080), [(0, 0, 10, 10)], (608, 1080), crop_position=(960, 540))
+        assert window == (656, 0, 608, 1080)
+
+    def test_no_face_is_center_crop(self, processor):
+        assert processor.vertical_crop_window((1920, 1080), [], (608, 1080)) == (656, 0, 608, 1080)
+
+
+@requires_ffmpeg
+class TestStreamingPipeline:
+    """The streaming mode must crop every frame without any frame files."""
+
+    def test_streaming_crop_follows_face(self, processor, tmp_path, monkeypatch):
+        frame = np.zeros((180, 320, 3), dtype=np.uint8)
+        frame[60:120, 40:100] = 255
+        source_path = write_clip(tmp_path / "square.mp4", [frame] * 30)
+
+        monkeypatch.setattr(processor, "detect_faces", locate_square)
+        result = asyncio.run(processor.process_video_to_vertical_ultra_quality(
+            source_path, tmp_path / "vertical.mp4", target_size=(100, 180), quality_preset="fast"
+        ))
+        assert result["success"], result.get("error")
+        assert result["streaming"]
+        assert result["frames_processed"] == 30
+        assert not list(tmp_path.glob("**/*.png"))
+
+        frames = []
+        with FFmpegFrameReader(tmp_path / "vertical.mp4", 100, 180) as reader:
+            while (frame := reader.read()) is not None:
+                frames.append(frame.copy())
+
+        assert len(frames) == 30
+        # Square center x=70 → crop starts at 20, so the square sits at columns 20..80
+        last = frames[-1][:, :, 0].astype(int)
+        assert last[70:110, 25:75].mean() > 200
+        assert last[:, 85:].mean() < 30
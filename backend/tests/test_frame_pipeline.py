@@ -0,0 +1,95 @@
+"""Unit tests for the crop loop stage pipeline."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.ffmpeg_pipe import FFmpegFrameReader
+from app.services.frame_pipeline import FrameDecoderThread, FrameWriterThread, StageStats
+from tests.conftest import requires_ffmpeg, write_clip
+
+
+class _ListWriter:
+    """Stand-in FFmpegFrameWriter that keeps written frames."""
+
+    def __init__(self):
+        self.frames = []
+
+    def write(self, frame):
+        self.frames.append(frame)
+
+
+class TestFrameWriterThread:
+    """Test the crop/encode stage."""
+
+    def test_restores_frame_order(self):
+        writer = _ListWriter()
+        released = []
+        stage = FrameWriterThread(writer, render=lambda payload: payload, release=released.append, max_queue=8).start()
+
+        for index in (2, 0, 3, 1, 4):
+            stage.put(index, index)
+        stage.close()
+
+        assert writer.frames == [0, 1, 2, 3, 4]
+        assert sorted(released) == [0, 1, 2, 3, 4]
+        assert stage.stats.items == 5
+
+    def test_error_is_raised_and_buffers_still_released(self):
+        def render(payload):
+            if payload == 1:
+                raise ValueError("bad crop")
+            return payload
+
+        released = []
+        stage = FrameWriterThread(_ListWriter(), render=render, release=released.append, max_queue=8).start()
+        for index in range(4):
+            stage.put(index, index)
+
+        with pytest.raises(ValueError):
+            stage.close()
+        assert sorted(released) == [0, 1, 2, 3]
+
+
+class TestStageStats:
+    def test_as_dict(self):
+        stats = StageStats("detect")
+        stats.record(0.5, count=10)
+        stats.observe_queue(3)
+        stats.observe_queue(1)
+
+        summary = stats.as_dict(2.0)
+        assert summary["throughput_fps"] == 5.0
+        assert summary["utilization"] == 0.25
+        assert summary["queue_depth"] == 1
+        assert summary["max_queue_depth"] == 3
+
+
+@requires_ffmpeg
+class TestFrameDecoderThread:
+    """Test the decode stage."""
+
+    def test_pool_bounds_frames_in_flight(self, tmp_path):
+        video_path = write_clip(tmp_path / "frames.mp4", (np.full((32, 32, 3), i * 20, dtype=np.uint8) for i in range(10)))
+
+        async def run():
+            reader = FFmpegFrameReader(video_path, 32, 32)
+            decoder = FrameDecoderThread(reader, asyncio.get_running_loop(), pool_size=3).start()
+
+            held = [await decoder.get() for _ in range(3)]
+            # No buffer released yet - the decoder must be stalled
+            await asyncio.sleep(0.2)
+            assert decoder.stats.items == 3
+
+            indices = [item[0] for item in held]
+            for _, buffer, _ in held:
+                decoder.release(buffer)
+            while (item := await decoder.get()) is not None:
+                indices.append(item[0])
+                assert any(item[1] is buffer for _, buffer, _ in held)
+                decoder.release(item[1])
+            reader.close()
+            return indices
+
+        assert asyncio.run(run()) == list(range(10))
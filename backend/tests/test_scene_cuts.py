@@ -0,0 +1,179 @@
+"""Unit tests for scene-cut detection on the 64x36 grayscale proxy."""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from app.services.scene_cuts import (
+    SceneCutCache, detect_scene_cuts, enforce_min_scene_length, frame_features,
+    pick_content_cuts, pick_fade_cuts, scene_cut_cache, scene_cut_cache_key
+)
+from tests.conftest import requires_ffmpeg, write_clip
+
+
+def _shot(seed, shape=(36, 64)):
+    """Smooth random image - structure at the proxy scale like a real shot"""
+    rng = np.random.default_rng(seed)
+    coarse = rng.integers(0, 256, size=(shape[0] // 4, shape[1] // 4)).astype(np.float32)
+    return np.kron(coarse, np.ones((4, 4), dtype=np.float32))
+
+
+def _panning_frames(seed, count, start=0):
+    """A shot whose content drifts one pixel per frame"""
+    image = np.tile(_shot(seed), (1, 3))
+    return np.stack([image[:, start + i:start + i + 64] for i in range(count)]).astype(np.uint8)
+
+
+class TestFrameScoring:
+    """Test the vectorized scoring on proxy frame arrays."""
+
+    def test_cut_scores_high_and_motion_low(self):
+        frames = np.concatenate([_panning_frames(1, 30), _panning_frames(2, 30)])
+        scores, means = frame_features(frames)
+
+        assert scores.shape == means.shape == (60,)
+        assert scores[0] == 0
+        assert scores[30] > 60
+        assert np.delete(scores, 30).max() < 30
+        assert list(pick_content_cuts(scores, 30.0, 2.0)) == [30]
+
+    def test_blocks_score_the_same_as_one_array(self):
+        frames = np.concatenate([_panning_frames(1, 20), _panning_frames(2, 20)])
+        whole, whole_means = frame_features(frames)
+        first, first_means = frame_features(frames[:17])
+        second, second_means = frame_features(frames[17:], previous=frames[16])
+
+        np.testing.assert_allclose(np.concatenate([first, second]), whole, rtol=1e-5)
+        np.testing.assert_allclose(np.concatenate([first_means, second_means]), whole_means, rtol=1e-5)
+
+    def test_flat_colour_change_is_a_cut(self):
+        frames = np.concatenate([np.full((10, 36, 64), 40, np.uint8), np.full((10, 36, 64), 200, np.uint8)])
+        scores, _ = frame_features(frames)
+        assert list(pick_content_cuts(scores, 30.0, 2.0)) == [10]
+
+    def test_sustained_change_is_not_a_cut(self):
+        # Every frame differs a lot from the last (e.g. a whip pan) - no single spike
+        scores = np.full(40, 50.0, dtype=np.float32)
+        assert len(pick_content_cuts(scores, 30.0, 2.0)) == 0
+
+    def test_fade_cut_at_middle_of_dark_run(self):
+        means = np.array([100] * 10 + [3] * 6 + [100] * 10, dtype=np.float32)
+        assert list(pick_fade_cuts(means, 8.0)) == [13]
+
+        # Dark at the very start or end is a fade in/out of the clip, not a cut
+        assert len(pick_fade_cuts(np.array([2, 2, 100, 100, 2], dtype=np.float32), 8.0)) == 0
+
+    def test_min_scene_length(self):
+        assert enforce_min_scene_length(np.array([5, 20, 24, 50, 95]), 100, 15) == [20, 50]
+
+
+class TestSceneCutCache:
+    """Test on-disk LRU behaviour and that callers can't mutate cached results."""
+
+    def _result(self, cut):
+        return {"scene_boundaries": {cut}, "scene_count": 2, "scene_stats": [{"scene_id": 0}], "total_duration": 3, "cut_boundaries": [cut]}
+
+    def test_lru_eviction(self, tmp_path):
+        cache = SceneCutCache(tmp_path, max_entries=2)
+        cache.put("a", self._result(1))
+        cache.put("b", self._result(2))
+        os.utime(tmp_path / "a.json", (1000, 1000))
+        os.utime(tmp_path / "b.json", (2000, 2000))
+        # A hit makes "a" the most recently used entry
+        assert cache.get("a") is not None
+        cache.put("c", self._result(3))
+        assert cache.get("b") is None
+        assert cache.get("a")["cut_boundaries"] == [1]
+        assert cache.get_stats()["entries"] == 2
+
+    def test_results_are_copies(self, tmp_path):
+        cache = SceneCutCache(tmp_path)
+        cache.put("a", self._result(1))
+        result = cache.get("a")
+        result["scene_boundaries"].add(99)
+        result["scene_stats"][0]["scene_id"] = 7
+        result.setdefault("extra", True)
+        assert cache.get("a") == self._result(1)
+
+    def test_entries_are_shared_between_instances(self, tmp_path):
+        # e.g. the crop worker processes, or the service after a restart
+        SceneCutCache(tmp_path).put("a", self._result(1))
+        assert SceneCutCache(tmp_path).get("a") == self._result(1)
+
+    def test_key_covers_source_window_and_settings(self):
+        key = scene_cut_cache_key("abc:137", (10.0, 13.0), {"min_scene_len": 15})
+        assert key == scene_cut_cache_key("abc:137", (10.0004, 13.0), {"min_scene_len": 15})
+        assert key != scene_cut_cache_key("abc:137", (10.5, 13.0), {"min_scene_len": 15})
+        assert key != scene_cut_cache_key("abc:137", (10.0, 13.0), {"min_scene_len": 20})
+
+
+def _write_shots(path, cut_frame=45, frame_count=90, fade=None):
+    """Two moving shots (640x360) with a hard cut, optionally dark frames in `fade` (start, end)"""
+    def frames():
+        for i in range(frame_count):
+            shot = _panning_frames(1 if i < cut_frame else 2, 1, start=i % 64)[0]
+            frame = np.repeat(np.repeat(shot, 10, axis=0), 10, axis=1)
+            if fade and fade[0] <= i < fade[1]:
+                frame = np.zeros_like(frame)
+            yield np.dstack([frame] * 3)
+
+    write_clip(path, frames(), crf=18)
+
+
+@requires_ffmpeg
+class TestDetectSceneCuts:
+    """Cuts must come back at source frame numbers and be cached per source and range."""
+
+    @pytest.fixture(autouse=True)
+    def isolated_cache(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(scene_cut_cache, "cache_dir", tmp_path / "scene_cut_cache")
+
+    def test_finds_cut_and_caches(self, tmp_path):
+        video_path = tmp_path / "shots.mp4"
+        _write_shots(video_path)
+
+        result = detect_scene_cuts(video_path)
+        assert result["cut_boundaries"] == [45]
+        assert result["scene_boundaries"] == {45}
+        assert result["scene_count"] == 2
+        assert [(s["start_frame"], s["end_frame"]) for s in result["scene_stats"]] == [(0, 45), (45, 90)]
+        assert result["total_duration"] == pytest.approx(3.0)
+
+        hits = scene_cut_cache.hits
+        assert detect_scene_cuts(video_path) == result
+        assert scene_cut_cache.hits == hits + 1
+
+        # Different settings are a different entry
+        assert detect_scene_cuts(video_path, min_scene_len=50)["cut_boundaries"] == []
+
+    def test_time_range_keeps_source_frame_numbers(self, tmp_path):
+        video_path = tmp_path / "shots.mp4"
+        _write_shots(video_path)
+
+        result = detect_scene_cuts(video_path, start_time=1.0, end_time=2.5)
+        assert result["cut_boundaries"] == [45]
+        assert result["scene_stats"][0]["start_frame"] == 30
+        assert result["scene_stats"][-1]["end_frame"] == 75
+
+        # The range is part of the key
+        assert detect_scene_cuts(video_path, start_time=2.0)["cut_boundaries"] == []
+
+    def test_cache_source_id_shares_results_between_files(self, tmp_path):
+        first, second = tmp_path / "first.mp4", tmp_path / "second.mp4"
+        _write_shots(first)
+        shutil.copy(first, second)
+
+        detect_scene_cuts(first, cache_source_id="abc:137", cache_window=(10.0, 13.0))
+        hits = scene_cut_cache.hits
+        assert detect_scene_cuts(second, cache_source_id="abc:137", cache_window=(10.0, 13.0))["cut_boundaries"] == [45]
+        assert scene_cut_cache.hits == hits + 1
+
+    def test_fade_through_black(self, tmp_path):
+        video_path = tmp_path / "fade.mp4"
+        _write_shots(video_path, cut_frame=60, fade=(50, 70))
+
+        result = detect_scene_cuts(video_path, min_scene_len=5)
+        assert 60 in result["cut_boundaries"]
+        assert all(50 <= cut <= 70 for cut in result["cut_boundaries"])
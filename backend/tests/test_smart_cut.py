@@ -0,0 +1,123 @@
+"""Tests for smart-cut segment extraction."""
+
+import subprocess
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.ffmpeg_pipe import FFmpegFrameReader
+from app.services.smart_cut import _edge_codec_args, plan_smart_cut, probe_keyframes, smart_cut_segment
+from tests.conftest import decode_frame_index, index_frames, requires_ffprobe, write_clip
+
+FPS = 30.0
+GOP = 30
+
+
+def _frame_times(video_path):
+    """pts_time of every decoded video frame, via ffprobe"""
+    result = subprocess.run([
+        'ffprobe', '-v', 'quiet', '-select_streams', 'v:0',
+        '-show_entries', 'frame=pts_time', '-of', 'csv=p=0', str(video_path)
+    ], capture_output=True, text=True, check=True)
+    return [float(line.split(',')[0]) for line in result.stdout.splitlines() if line.strip()]
+
+
+class TestPlanSmartCut:
+    """Choosing between stream copy, smart cut and full re-encode."""
+
+    keyframes = [0.0, 1.0, 2.0, 3.0]
+    frame_duration = 1 / FPS
+
+    def test_segment_of_whole_gops_is_a_plain_copy(self):
+        assert plan_smart_cut(1.0, 3.0, self.keyframes, self.frame_duration) == {
+            "mode": "copy", "keyframe": 1.0, "tail_keyframe": 3.0
+        }
+        # Within half a frame still counts as on the keyframe
+        assert plan_smart_cut(0.99, 3.01, self.keyframes, self.frame_duration)["mode"] == "copy"
+
+    def test_partial_gops_at_either_end_are_reencoded(self):
+        assert plan_smart_cut(1.4, 3.2, self.keyframes, self.frame_duration) == {
+            "mode": "smart", "keyframe": 2.0, "tail_keyframe": 3.0
+        }
+        # Starting on a keyframe still re-encodes a partial GOP at the end
+        assert plan_smart_cut(1.0, 2.5, self.keyframes, self.frame_duration) == {
+            "mode": "smart", "keyframe": 1.0, "tail_keyframe": 2.0
+        }
+
+    def test_no_whole_gop_inside_the_segment_reencodes_everything(self):
+        assert plan_smart_cut(1.4, 1.9, self.keyframes, self.frame_duration)["mode"] == "reencode"
+        assert plan_smart_cut(1.4, 2.9, self.keyframes, self.frame_duration)["mode"] == "reencode"
+        assert plan_smart_cut(3.4, 4.0, self.keyframes, self.frame_duration)["mode"] == "reencode"
+
+
+def test_probe_keyframes_parses_relative_times():
+    stdout = "10.500000,10.500000\nN/A,11.500000\n\n12.500000,12.500000\n"
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value.stdout = stdout
+        assert probe_keyframes("video.mp4", 0.0, 5.0, start_time=10.5) == [0.0, 1.0, 2.0]
+        cmd = mock_run.call_args[0][0]
+        assert cmd[cmd.index('-skip_frame') + 1] == 'nokey'
+
+
+def test_head_matches_source_format():
+    source = {"profile": "constrained baseline", "level": 31, "pix_fmt": "yuv420p"}
+    args = _edge_codec_args(source, {"preset": "medium", "crf": 18, "threads": 0})
+    assert args[args.index('-profile:v') + 1] == 'baseline'
+    assert args[args.index('-level') + 1] == '3.1'
+    assert args[args.index('-x264-params') + 1] == 'sps-id=1'
+
+
+@requires_ffprobe
+class TestSmartCutAccuracy:
+    """Cuts of a synthetic 1 s GOP file must start and end on the requested frames."""
+
+    @pytest.fixture
+    def gop_video(self, tmp_path):
+        width, height, frame_count = 160, 96, 150
+        gop_args = ['-g', str(GOP), '-keyint_min', str(GOP), '-sc_threshold', '0', '-bf', '2']
+        video_path = write_clip(
+            tmp_path / "gop.mp4", index_frames(frame_count, width, height), FPS,
+            crf=10, preset="veryfast", extra_output_args=gop_args
+        )
+        return video_path, width, height
+
+    def _indices(self, video_path, width, height):
+        indices = []
+        with FFmpegFrameReader(video_path, width, height) as reader:
+            while (frame := reader.read()) is not None:
+                indices.append(decode_frame_index(frame))
+        return indices
+
+    @pytest.mark.parametrize("start_frame,end_frame,mode", [
+        (42, 96, "smart"),
+        (30, 75, "smart"),
+        (30, 90, "copy"),
+        (47, 58, "reencode"),
+    ])
+    def test_cut_is_frame_accurate(self, gop_video, tmp_path, start_frame, end_frame, mode):
+        video_path, width, height = gop_video
+        output_path = tmp_path / f"cut_{start_frame}.mp4"
+
+        result = smart_cut_segment(video_path, start_frame / FPS, end_frame / FPS, output_path)
+
+        assert result["success"], result["error"]
+        assert result["mode"] == mode
+        assert self._indices(output_path, width, height) == list(range(start_frame, end_frame))
+
+        times = _frame_times(output_path)
+        assert len(times) == end_frame - start_frame
+        assert times[0] == pytest.approx(0.0, abs=0.002)
+        assert np.allclose(np.diff(times), 1 / FPS, atol=0.002)
+        assert not list(tmp_path.glob(".smart_cut_*"))
+
+    def test_unprobeable_source_is_reencoded_in_full(self, gop_video, tmp_path):
+        video_path, width, height = gop_video
+        output_path = tmp_path / "cut.mp4"
+
+        with patch('app.services.smart_cut.probe_cut_source', return_value=None):
+            result = smart_cut_segment(video_path, 42 / FPS, 96 / FPS, output_path)
+
+        assert result["success"], result["error"]
+        assert result["mode"] == "reencode"
+        assert self._indices(output_path, width, height) == list(range(42, 96))
@@ -0,0 +1,92 @@
+"""Tests for thumbnails taken from frames the crop render already produced."""
+
+import asyncio
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.crop_planner import CropTrajectory, build_render_command, render_crop_trajectory
+from app.services.thumbnail import save_thumbnail_frame, thumbnail_frame_index
+from tests.conftest import brightness_ramp, requires_ffmpeg, write_clip
+
+
+def _trajectory(xs, crop_size=(202, 360), fps=30.0):
+    windows = [(x, 0, crop_size[0], crop_size[1]) for x in xs]
+    return CropTrajectory(np.array(windows), fps, (640, 360), crop_size)
+
+
+def test_frame_index_is_clamped_to_the_clip():
+    assert thumbnail_frame_index(1.0, 30.0) == 30
+    assert thumbnail_frame_index(1.0, 29.97, total_frames=100) == 30
+    # Clips shorter than the timestamp use their last frame
+    assert thumbnail_frame_index(1.0, 30.0, total_frames=12) == 11
+
+
+class TestSaveThumbnailFrame:
+    """In-process JPEG/WebP encoding of an already decoded frame."""
+
+    @pytest.mark.parametrize("image_format", ["jpg", "webp"])
+    def test_writes_every_width(self, tmp_path, image_format):
+        frame = np.full((360, 202, 3), 128, dtype=np.uint8)
+        result = save_thumbnail_frame(frame, tmp_path, "clip_1", widths=(300, 100), image_format=image_format)
+
+        assert result["success"], result["error"]
+        # The first size keeps generate_thumbnail's file name
+        assert result["thumbnail_filename"] == f"clip_1.{image_format}"
+        assert result["relative_path"] == f"thumbnails/clip_1.{image_format}"
+        assert [(size["width"], size["height"]) for size in result["sizes"]] == [(300, 535), (100, 178)]
+
+        small = cv2.imread(str(tmp_path / f"clip_1_100.{image_format}"))
+        assert small.shape == (178, 100, 3)
+        assert abs(float(small.mean()) - 128) < 4
+
+    def test_unknown_format_fails_like_generate_thumbnail(self, tmp_path):
+        result = save_thumbnail_frame(np.zeros((10, 10, 3), dtype=np.uint8), tmp_path, "clip_1", image_format="bmp")
+        assert not result["success"]
+        assert result["thumbnail_path"] is None
+
+
+def test_render_command_pipes_the_thumbnail_frame(tmp_path):
+    cmd = build_render_command(
+        tmp_path / "in.mp4", tmp_path / "out.mp4", _trajectory([0] * 10), tmp_path / "c.txt",
+        audio_codec="aac", frame_count=10, thumbnail_frame=4
+    )
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert "split=2[vmain][vthumb]" in graph
+    assert "trim=start_frame=4:end_frame=5[thumb]" in graph
+    assert cmd.count("-i") == 1 and "-vf" not in cmd
+
+    # The clip output comes first (with its frame limit), then one raw frame on stdout
+    output_index = cmd.index(str(tmp_path / "out.mp4"))
+    assert cmd.index("-frames:v") < output_index < cmd.index("[thumb]")
+    assert cmd[-5:] == ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+
+
+def test_thumbnail_is_taken_before_the_caption_burn_in(tmp_path):
+    cmd = build_render_command(
+        tmp_path / "in.mp4", tmp_path / "out.mp4", _trajectory([0] * 10), tmp_path / "c.txt",
+        post_filter="subtitles='a.srt'", thumbnail_frame=4
+    )
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    # Same as the frame loop, which crops in Python and burns captions in the encoder
+    assert "split=2[vcrop][vthumb]" in graph
+    assert graph.endswith("[vcrop]subtitles='a.srt'[vmain]")
+    assert graph.count("subtitles=") == 1
+
+
+@requires_ffmpeg
+def test_render_returns_the_requested_frame(tmp_path):
+    width, height, frame_count = 640, 360, 45
+    # The thumbnail's brightness shows which crop window it came from
+    source_path = write_clip(tmp_path / "ramp.mp4", [brightness_ramp(width, height)] * frame_count)
+
+    trajectory = _trajectory([0] * 15 + [400] * 30)
+    result = asyncio.run(render_crop_trajectory(
+        source_path, tmp_path / "cropped.mp4", trajectory, crf=0, preset="ultrafast", thumbnail_frame=20
+    ))
+    assert result["success"], result.get("error")
+
+    thumbnail = result["thumbnail_frame"]
+    assert thumbnail.shape == (360, 202, 3)
+    assert abs(float(thumbnail[:, 0, 0].mean()) - 400 * 255 // width) < 10
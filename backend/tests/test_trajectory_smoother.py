@@ -0,0 +1,111 @@
+"""Unit tests for the offline crop-path smoother."""
+
+import numpy as np
+import pytest
+
+from app.services.trajectory_smoother import (
+    fill_missing,
+    limit_step,
+    plan_crop_windows,
+    smooth_crop_path,
+    smoothing_kernel,
+)
+from app.services.vertical_crop_async import AsyncVerticalCropService
+
+SMOOTHING = {"smoothing_factor": 0.9, "max_jump_distance": 25, "stability_frames": 8}
+
+
+def _path(xs, y=200.0):
+    return np.stack([np.asarray(xs, dtype=np.float64), np.full(len(xs), y)], axis=1)
+
+
+class TestSmoothingKernel:
+    """Test the zero-phase kernel."""
+
+    @pytest.mark.parametrize("preset", sorted(AsyncVerticalCropService.SMOOTHING_CONFIGS))
+    def test_presets_give_centered_normalized_kernels(self, preset):
+        config = AsyncVerticalCropService.SMOOTHING_CONFIGS[preset]
+        kernel = smoothing_kernel(config["smoothing_factor"], config["stability_frames"])
+
+        assert len(kernel) % 2 == 1
+        assert kernel.sum() == pytest.approx(1.0)
+        np.testing.assert_allclose(kernel, kernel[::-1])
+
+    def test_stronger_presets_smooth_over_more_frames(self):
+        configs = AsyncVerticalCropService.SMOOTHING_CONFIGS
+        low = smoothing_kernel(configs["low"]["smoothing_factor"], configs["low"]["stability_frames"])
+        high = smoothing_kernel(configs["very_high"]["smoothing_factor"], configs["very_high"]["stability_frames"])
+        assert len(high) > len(low)
+
+
+class TestSmoothCropPath:
+    """Test whole-path smoothing."""
+
+    def test_constant_path_stays_put(self):
+        centers = smooth_crop_path(_path([320] * 50), np.zeros(50, bool), SMOOTHING, (0, 0))
+        assert (centers == [320, 200]).all()
+
+    def test_linear_motion_has_no_lag(self):
+        xs = 100 + 2 * np.arange(120)
+        centers = smooth_crop_path(_path(xs), np.zeros(120, bool), SMOOTHING, (0, 0))
+        assert np.abs(centers[:, 0] - xs).max() <= 1
+
+    def test_jitter_is_removed(self):
+        rng = np.random.default_rng(0)
+        xs = 400 + rng.normal(0, 8, 300)
+        centers = smooth_crop_path(_path(xs), np.zeros(300, bool), SMOOTHING, (0, 0))
+        assert centers[:, 0].std() < xs.std() / 3
+
+    def test_reset_refocuses_immediately(self):
+        xs = [200] * 40 + [500] * 40
+        resets = np.zeros(80, bool)
+        resets[40] = True
+        centers = smooth_crop_path(_path(xs), resets, SMOOTHING, (0, 0))
+        assert (centers[:40, 0] == 200).all()
+        assert (centers[40:, 0] == 500).all()
+
+    def test_missing_faces_are_interpolated(self):
+        xs = [200.0] * 10 + [np.nan] * 10 + [300.0] * 10
+        centers = smooth_crop_path(_path(xs), np.zeros(30, bool), SMOOTHING, (0, 0))
+        assert np.all(np.diff(centers[:, 0]) >= 0)
+        assert 200 < centers[15, 0] < 300
+
+    def test_segment_without_faces_uses_fallback(self):
+        raw = np.full((20, 2), np.nan)
+        raw[:10] = [300, 200]
+        resets = np.zeros(20, bool)
+        resets[10] = True
+        centers = smooth_crop_path(raw, resets, SMOOTHING, (352, 162))
+        assert (centers[10:] == [352, 162]).all()
+
+    def test_empty_path(self):
+        assert smooth_crop_path(np.zeros((0, 2)), np.zeros(0, bool), SMOOTHING, (0, 0)).shape == (0, 2)
+
+
+class TestPathHelpers:
+    """Test gap filling, step limiting and window placement."""
+
+    def test_fill_missing_holds_edges(self):
+        filled = fill_missing(np.array([np.nan, 10.0, np.nan, 20.0, np.nan]))
+        assert filled.tolist() == [10.0, 10.0, 15.0, 20.0, 20.0]
+
+    def test_limit_step_caps_movement(self):
+        limited = limit_step(np.array([0.0, 0.0, 100.0, 100.0, 100.0]), 30)
+        assert limited.tolist() == [0.0, 0.0, 30.0, 60.0, 90.0]
+
+    def test_limit_step_keeps_slow_paths(self):
+        path = np.arange(10, dtype=np.float64)
+        assert limit_step(path, 5) is path
+
+    def test_windows_match_scalar_planner(self):
+        service = AsyncVerticalCropService(max_workers=1)
+        try:
+            frame_size, target_size = (1920, 1080), (608, 1080)
+            crop_size = service._plan_crop_window(frame_size, None, target_size)[2:]
+            centers = np.array([[0, 0], [960, 540], [1900, 1000], [300, 540]])
+            windows = plan_crop_windows(centers, frame_size, crop_size)
+            expected = [service._plan_crop_window(frame_size, None, target_size, tuple(c)) for c in centers]
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+        assert windows.tolist() == [list(w) for w in expected]
@@ -0,0 +1,85 @@
+"""Unit tests for the frame-aligned VAD timeline."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.services.vad_timeline import VADTimeline, build_vad_timeline
+
+SAMPLE_RATE = 16000
+
+
+class LoudnessVad:
+    """VAD stand-in: a chunk is speech when it is loud, and every call is counted."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def is_speech(self, chunk: bytes, sample_rate: int) -> bool:
+        self.calls += 1
+        return np.abs(np.frombuffer(chunk, dtype=np.int16)).mean() > 1000
+
+
+def _pcm(seconds: float, speech_spans) -> bytes:
+    """Silent 16 kHz PCM with a loud tone inside each (start, end) span."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pcm = np.zeros_like(t)
+    for start, end in speech_spans:
+        inside = (t >= start) & (t < end)
+        pcm[inside] = 8000 * np.sin(2 * np.pi * 220 * t[inside])
+    return pcm.astype(np.int16).tobytes()
+
+
+class TestVADTimeline:
+    """Test timestamp alignment and lookups."""
+
+    @pytest.mark.parametrize("fps", [24, 30, 60])
+    def test_frames_follow_audio_timestamps(self, fps):
+        timeline = build_vad_timeline(_pcm(3.0, [(1.0, 2.0)]), LoudnessVad(), fps)
+
+        assert len(timeline) == pytest.approx(3.0 * fps, abs=1)
+        assert not timeline.has_voice(int(0.5 * fps))
+        assert timeline.has_voice(int(1.5 * fps))
+        assert not timeline.has_voice(int(2.5 * fps))
+        # The speech span covers one second of frames at any frame rate
+        assert timeline.frame_speech.sum() == pytest.approx(fps, abs=2)
+
+    def test_silent_chunks_skip_the_vad(self):
+        vad = LoudnessVad()
+        timeline = build_vad_timeline(_pcm(3.0, [(1.0, 1.5)]), vad, 30)
+
+        assert vad.calls <= 18
+        assert len(timeline.chunk_speech) == 100
+
+    def test_frames_past_the_audio_count_as_speech(self):
+        timeline = VADTimeline(np.zeros(10, dtype=bool), 30)
+        assert not timeline.has_voice(0)
+        assert timeline.has_voice(len(timeline) + 5)
+        assert timeline.has_voice(-1)
+
+    def test_no_audio_means_no_timeline(self):
+        assert build_vad_timeline(b"", LoudnessVad(), 30) is None
+        assert build_vad_timeline(b"\x00" * 100, LoudnessVad(), 30) is None
+
+
+class TestSpeakerLookup:
+    """find_active_speaker reads voice activity from the timeline by frame index."""
+
+    def test_dual_speaker_voice_flag(self):
+        from app.services.vertical_crop_async import AsyncVerticalCropService
+
+        service = AsyncVerticalCropService(max_workers=1)
+        service._detect_faces_sync = lambda frame: [(10, 10, 50, 50), (200, 10, 240, 50)]
+        timeline = VADTimeline(np.array([False] * 10 + [True] * 10), 30)
+        frame = np.zeros((180, 320, 3), dtype=np.uint8)
+        try:
+            silent = asyncio.run(service.find_active_speaker(frame, timeline, None, True, frame_index=3))
+            speaking = asyncio.run(service.find_active_speaker(frame, timeline, None, True, frame_index=15))
+        finally:
+            service.thread_executor.shutdown()
+            service.process_executor.shutdown()
+
+        assert silent["mode"] == "dual_speaker"
+        assert not silent["has_voice"]
+        assert speaking["has_voice"]
@@ -0,0 +1,129 @@
+"""Unit tests for the vertical crop face detection input."""
+
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.vertical_crop_async import AsyncVerticalCropService
+
+
+class _RecordingDetector:
+    """Stand-in MediaPipe detector: records its input and returns one relative box."""
+
+    def __init__(self):
+        self.inputs = []
+
+    def process(self, rgb_frame):
+        self.inputs.append(rgb_frame)
+        bbox = SimpleNamespace(xmin=0.25, ymin=0.5, width=0.125, height=0.25)
+        detection = SimpleNamespace(location_data=SimpleNamespace(relative_bounding_box=bbox))
+        return SimpleNamespace(detections=[detection])
+
+
+@pytest.fixture
+def service():
+    service = AsyncVerticalCropService(max_workers=1, detection_width=384)
+    yield service
+    service.thread_executor.shutdown()
+    service.process_executor.shutdown()
+
+
+class TestDetectionInput:
+    """Test the downscaled MediaPipe input."""
+
+    def test_4k_frame_is_downscaled_into_reused_buffer(self, service):
+        frame = np.zeros((2160, 3840, 3), dtype=np.uint8)
+        frame[:, :, 0] = 200  # Blue in BGR
+
+        first = service._prepare_detection_input(frame)
+        second = service._prepare_detection_input(frame)
+
+        assert first.shape == (216, 384, 3)
+        assert first is second
+        # Converted to RGB: blue ends up in the last channel
+        assert first[0, 0].tolist() == [0, 0, 200]
+
+    def test_small_frames_keep_their_size(self, service):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        assert service._prepare_detection_input(frame).shape == (240, 320, 3)
+
+    def test_boxes_map_back_to_source_coordinates(self, service):
+        detector = _RecordingDetector()
+        service._thread_local.face_detector = detector
+        frame = np.full((2160, 3840, 3), 30, dtype=np.uint8)
+
+        faces = service._detect_faces_sync(frame)
+
+        assert detector.inputs[0].shape == (216, 384, 3)
+        assert faces == [(960, 1080, 1440, 1620)]
+
+    def test_downscale_matches_area_filter_on_smooth_content(self, service):
+        ramp = np.linspace(0, 255, 1920, dtype=np.float32)
+        frame = np.dstack([np.tile(ramp, (1080, 1))] * 3).astype(np.uint8)
+
+        rgb = service._prepare_detection_input(frame)
+        reference = cv2.cvtColor(cv2.resize(frame, (384, 216), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2RGB)
+        assert np.abs(rgb.astype(int) - reference.astype(int)).max() <= 2
+
+
+class TestDetectionValidation:
+    """Frames are validated once per shape; blank frames never reach the detector."""
+
+    def test_invalid_frames_are_rejected(self, service):
+        detector = _RecordingDetector()
+        service._thread_local.face_detector = detector
+
+        assert service._detect_faces_sync(None) == []
+        assert service._detect_faces_sync(np.zeros((0, 0, 3), dtype=np.uint8)) == []
+        assert service._detect_faces_sync(np.full((240, 320), 30, dtype=np.uint8)) == []
+        assert detector.inputs == []
+
+    def test_validated_shape_is_remembered(self, service):
+        service._thread_local.face_detector = _RecordingDetector()
+        frame = np.full((240, 320, 3), 30, dtype=np.uint8)
+
+        assert service._detect_faces_sync(frame)
+        assert service._thread_local.validated_shape == (240, 320, 3)
+        # A different shape (a new stream) is validated again
+        assert service._detect_faces_sync(np.full((240, 320, 4), 30, dtype=np.uint8)) == []
+        assert service._thread_local.validated_shape == (240, 320, 3)
+
+    def test_blank_frames_skip_the_detector(self, service):
+        detector = _RecordingDetector()
+        service._thread_local.face_detector = detector
+
+        assert service._detect_faces_sync(np.zeros((1080, 1920, 3), dtype=np.uint8)) == []
+        assert detector.inputs == []
+
+
+class TestRenderIntoBuffer:
+    """The frame loop renders every output frame into one reused buffer."""
+
+    def test_crop_into_buffer_matches_fresh_output(self, service):
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+        out = np.empty((1080, 608, 3), dtype=np.uint8)
+
+        expected = service._crop_frame_to_vertical(frame, None, (608, 1080), (900, 500))
+        rendered = service._crop_frame_to_vertical(frame, None, (608, 1080), (900, 500), out=out)
+        assert rendered is out
+        np.testing.assert_array_equal(rendered, expected)
+
+        # No resize needed: the crop is copied into the buffer
+        exact_out = np.empty((1080, 607, 3), dtype=np.uint8)
+        rendered = service._crop_frame_to_vertical(frame, None, (607, 1080), (900, 500), out=exact_out)
+        assert rendered is exact_out
+        np.testing.assert_array_equal(rendered, service._crop_frame_to_vertical(frame, None, (607, 1080), (900, 500)))
+
+    def test_dual_speaker_frame_into_buffer(self, service):
+        rng = np.random.default_rng(1)
+        frame = rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8)
+        out = np.full((1080, 608, 3), 7, dtype=np.uint8)
+        boxes = ((200, 200, 300, 320), (900, 220, 1000, 340))
+
+        expected = service._create_dual_speaker_frame_sync(frame, *boxes, (608, 1080))
+        rendered = service._create_dual_speaker_frame_sync(frame, *boxes, (608, 1080), out=out)
+        assert rendered is out
+        np.testing.assert_array_equal(rendered, expected)